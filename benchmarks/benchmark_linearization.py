@@ -0,0 +1,88 @@
+"""
+Benchmark of the text linearization of a large document.
+
+A synthetic document is built by repeating the pages of a saved Textract response, then Document.get_text(),
+Document.to_html() and Document.to_markdown() are timed with the default configurations. The linearization cache is
+cleared before each run unless --warm is passed.
+
+Usage: python benchmarks/benchmark_linearization.py --pages 300
+"""
+
+import argparse
+import copy
+import json
+import os
+import time
+
+from textractor.parsers import response_parser
+from textractor.utils.linearization_cache import LinearizationCache
+
+DEFAULT_RESPONSE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "tests",
+    "fixtures",
+    "saved_api_responses",
+    "test_document_to_html_amzn_q2.png.json",
+)
+
+
+def make_response(response: dict, page_count: int) -> dict:
+    """
+    Repeats the pages of a Textract response page_count times, block IDs are suffixed to keep them unique.
+
+    :param response: Textract response to repeat
+    :type response: dict
+    :param page_count: Number of pages in the output response
+    :type page_count: int
+    :return: Synthetic Textract response
+    :rtype: dict
+    """
+    source_pages = max(b.get("Page", 1) for b in response["Blocks"])
+    blocks = []
+    for page in range(page_count):
+        source_page = page % source_pages + 1
+        for block in response["Blocks"]:
+            if block.get("Page", 1) != source_page:
+                continue
+            block = copy.deepcopy(block)
+            block["Id"] = f"{block['Id']}-{page}"
+            block["Page"] = page + 1
+            for relationship in block.get("Relationships", []):
+                relationship["Ids"] = [f"{i}-{page}" for i in relationship["Ids"]]
+            blocks.append(block)
+    output = copy.deepcopy({k: v for k, v in response.items() if k != "Blocks"})
+    output["Blocks"] = blocks
+    output["DocumentMetadata"] = {"Pages": page_count}
+    return output
+
+
+def timeit(name: str, function, repeat: int, warm: bool = False):
+    timings = []
+    for _ in range(repeat):
+        if not warm:
+            LinearizationCache.clear()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    print(f"{name:<12} best {min(timings):8.3f}s  mean {sum(timings) / len(timings):8.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300, help="Number of pages of the synthetic document")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs")
+    parser.add_argument("--response", default=DEFAULT_RESPONSE, help="Saved Textract response to repeat")
+    parser.add_argument("--warm", action="store_true", help="Keep the linearization cache between runs")
+    args = parser.parse_args()
+
+    with open(args.response) as f:
+        response = make_response(json.load(f), args.pages)
+
+    start = time.perf_counter()
+    document = response_parser.parse(response)
+    print(f"{'parse':<12} {time.perf_counter() - start:8.3f}s ({args.pages} pages, {len(document.words)} words)")
+
+    timeit("get_text", document.get_text, args.repeat, args.warm)
+    timeit("to_html", document.to_html, args.repeat, args.warm)
+    timeit("to_markdown", document.to_markdown, args.repeat, args.warm)
@@ -29,7 +29,7 @@ setup(name='amazon-textract-caller',
       packages=find_packages(exclude=['tests']),
       include_package_data=True,
       exclude_package_data={"": ["test_*.py", "__pycache__"]},
-      version='0.2.4',
+      version='0.2.5',
       description='Amazon Textract Caller tools',
       install_requires=requirements,
       extras_require={'testing': ['amazon-textract-response-parser', 'pytest']},
@@ -0,0 +1,124 @@
+import asyncio
+import os
+
+import pytest
+
+from textractcaller import LocalResponseCache, ResponseCache, acall_textract, call_textract, Textract_Features
+
+
+class CountingTextractClient:
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_document(self, Document, FeatureTypes, **kwargs):
+        self.calls += 1
+        return {
+            "DocumentMetadata": {"Pages": 1},
+            "Blocks": [{"Id": f"block-{i}", "BlockType": "WORD"} for i in range(50)],
+            "ResponseMetadata": {"HTTPStatusCode": 200},
+        }
+
+
+def test_call_textract_response_cache(tmp_path):
+    client = CountingTextractClient()
+    cache = LocalResponseCache(str(tmp_path))
+    for _ in range(3):
+        response = call_textract(
+            input_document=b"document",
+            features=[Textract_Features.TABLES],
+            boto3_textract_client=client,
+            response_cache=cache,
+        )
+        assert len(response["Blocks"]) == 50
+    assert client.calls == 1
+    call_textract(
+        input_document=b"document",
+        features=[Textract_Features.FORMS],
+        boto3_textract_client=client,
+        response_cache=cache,
+    )
+    call_textract(
+        input_document=b"other document",
+        features=[Textract_Features.TABLES],
+        boto3_textract_client=client,
+        response_cache=cache,
+    )
+    assert client.calls == 3
+    metrics = cache.metrics()
+    assert (metrics.hits, metrics.misses, metrics.writes) == (2, 3, 3)
+    assert metrics.hit_rate == 0.4
+
+
+def test_acall_textract_response_cache(tmp_path):
+    client = CountingTextractClient()
+    cache = LocalResponseCache(str(tmp_path))
+    # the responses of the sync and async callers share the cache
+    call_textract(
+        input_document=b"document",
+        features=[Textract_Features.TABLES],
+        boto3_textract_client=client,
+        response_cache=cache,
+    )
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                acall_textract(
+                    input_document=document,
+                    features=[Textract_Features.TABLES],
+                    boto3_textract_client=client,
+                    response_cache=cache,
+                )
+                for document in (b"document", b"other document")
+            )
+        )
+
+    responses = asyncio.run(run())
+    assert [len(response["Blocks"]) for response in responses] == [50, 50]
+    assert client.calls == 2
+    asyncio.run(run())
+    assert client.calls == 2
+    metrics = cache.metrics()
+    assert (metrics.hits, metrics.misses, metrics.writes) == (3, 2, 2)
+
+
+def test_local_response_cache_eviction(tmp_path):
+    cache = LocalResponseCache(str(tmp_path))
+    responses = {f"key-{i}": {"Blocks": [{"Id": os.urandom(512).hex()}]} for i in range(3)}
+    for key in ["key-0", "key-1"]:
+        cache.put(key, responses[key])
+    # room for two responses only
+    cache.max_bytes = cache.size_bytes * 5 // 4
+    os.utime(os.path.join(str(tmp_path), "key-0.json.gz"), (0, 0))
+    os.utime(os.path.join(str(tmp_path), "key-1.json.gz"), (1, 1))
+    # reading key-0 makes key-1 the least recently used
+    assert cache.get("key-0") == responses["key-0"]
+    cache.put("key-2", responses["key-2"])
+    assert cache.metrics().evictions == 1
+    assert cache.get("key-1") is None
+    assert cache.get("key-0") == responses["key-0"]
+    assert cache.size_bytes <= cache.max_bytes
+    # the size is restored from the directory
+    assert LocalResponseCache(str(tmp_path)).size_bytes == cache.size_bytes
+
+
+def test_response_cache_subclasses_implement_read_and_write():
+    with pytest.raises(TypeError):
+        ResponseCache()
+
+    class MemoryResponseCache(ResponseCache):
+        def __init__(self):
+            super().__init__()
+            self.data = {}
+
+        def _read(self, key):
+            return self.data.get(key)
+
+        def _write(self, key, data):
+            self.data[key] = data
+
+    cache = MemoryResponseCache()
+    cache.put("key", {"Blocks": []})
+    assert cache.get("key") == {"Blocks": []}
+    assert cache.get("other") is None
+    assert cache.metrics().hit_rate == 0.5
@@ -0,0 +1,50 @@
+import multiprocessing
+import os
+
+import pytest
+
+from textractcaller import configure_clients, get_client, reset_clients
+from textractcaller.t_clients import DEFAULT_MAX_POOL_CONNECTIONS
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    reset_clients()
+    yield
+    configure_clients(max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS, retry_mode="standard")
+    reset_clients()
+
+
+def test_get_client_shared():
+    textract = get_client("textract", region_name="us-east-1")
+    assert get_client("textract", region_name="us-east-1") is textract
+    assert get_client("textract", region_name="us-west-2") is not textract
+    assert get_client("s3", region_name="us-east-1") is not textract
+    assert textract.meta.config.max_pool_connections == DEFAULT_MAX_POOL_CONNECTIONS
+    assert textract.meta.config.tcp_keepalive
+
+
+def test_configure_clients():
+    textract = get_client("textract", region_name="us-east-1")
+    configure_clients(max_pool_connections=64, retry_mode="adaptive")
+    configured = get_client("textract", region_name="us-east-1")
+    assert configured is not textract
+    assert configured.meta.config.max_pool_connections == 64
+    assert configured.meta.config.retries["mode"] == "adaptive"
+
+
+def _client_id(queue):
+    queue.put(id(get_client("textract", region_name="us-east-1")))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+def test_get_client_after_fork():
+    textract = get_client("textract", region_name="us-east-1")
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=_client_id, args=(queue,))
+    process.start()
+    child_id = queue.get(timeout=30)
+    process.join(timeout=30)
+    assert child_id != id(textract)
+    assert get_client("textract", region_name="us-east-1") is textract
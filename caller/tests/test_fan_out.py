@@ -0,0 +1,82 @@
+import copy
+
+from textractcaller import (
+    Query,
+    QueriesConfig,
+    Textract_Features,
+    call_textract_pages,
+    merge_page_responses,
+    page_request_params,
+)
+
+
+class ThrottlingException(Exception):
+    pass
+
+
+class PageTextractClient:
+    """returns the same page for every request, throttles every third call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def analyze_document(self, Document, FeatureTypes, **kwargs):
+        self.calls.append(dict(kwargs, FeatureTypes=FeatureTypes))
+        if len(self.calls) % 3 == 0:
+            raise ThrottlingException()
+        return {
+            "DocumentMetadata": {"Pages": 1},
+            "AnalyzeDocumentModelVersion": "1.0",
+            "Blocks": [
+                {"Id": "page", "BlockType": "PAGE", "Page": 1, "Relationships": [{"Type": "CHILD", "Ids": ["word"]}]},
+                {"Id": "word", "BlockType": "WORD", "Page": 1, "Text": Document["Bytes"].decode()},
+            ],
+            "ResponseMetadata": {"HTTPStatusCode": 200},
+        }
+
+
+def test_call_textract_pages():
+    client = PageTextractClient()
+    pages = [f"page {i}".encode() for i in range(5)]
+    response = call_textract_pages(
+        pages, features=[Textract_Features.TABLES], boto3_textract_client=client, max_workers=3, tps=100
+    )
+    assert response["DocumentMetadata"]["Pages"] == 5
+    assert response["AnalyzeDocumentModelVersion"] == "1.0"
+    assert "ResponseMetadata" not in response
+    blocks = response["Blocks"]
+    assert len({block["Id"] for block in blocks}) == 10
+    words = [block for block in blocks if block["BlockType"] == "WORD"]
+    assert [(word["Page"], word["Text"]) for word in words] == [(i + 1, f"page {i}") for i in range(5)]
+    ids = {block["Id"] for block in blocks}
+    for page in (block for block in blocks if block["BlockType"] == "PAGE"):
+        (child,) = page["Relationships"][0]["Ids"]
+        assert child in ids
+        assert next(block for block in blocks if block["Id"] == child)["Page"] == page["Page"]
+
+
+def test_merge_page_responses_keeps_unique_ids():
+    page = {"Blocks": [{"Id": "a", "BlockType": "PAGE"}, {"Id": "b", "BlockType": "LINE"}]}
+    other = {"Blocks": [{"Id": "c", "BlockType": "PAGE"}]}
+    merged = merge_page_responses([page, other, copy.deepcopy(page)])
+    assert [block["Page"] for block in merged["Blocks"]] == [1, 1, 2, 3, 3]
+    assert [block["Id"] for block in merged["Blocks"]][:3] == ["a", "b", "c"]
+    assert len({block["Id"] for block in merged["Blocks"]}) == 5
+    assert page["Blocks"][0] == {"Id": "a", "BlockType": "PAGE"}
+
+
+def test_page_request_params_filters_queries():
+    queries = QueriesConfig(
+        [Query("total?", alias="TOTAL"), Query("name?", pages=["1"]), Query("date?", pages=["2-*"])]
+    )
+    features = [Textract_Features.QUERIES]
+    first = page_request_params(b"page", 1, features=features, queries_config=queries)
+    assert first["QueriesConfig"] == {"Queries": [{"Text": "total?", "Alias": "TOTAL"}, {"Text": "name?"}]}
+    third = page_request_params(b"page", 3, features=features, queries_config=queries)
+    assert third["QueriesConfig"] == {"Queries": [{"Text": "total?", "Alias": "TOTAL"}, {"Text": "date?"}]}
+    only_first = QueriesConfig([Query("name?", pages=["1"])])
+    second = page_request_params(
+        b"page", 2, features=[Textract_Features.QUERIES, Textract_Features.TABLES], queries_config=only_first
+    )
+    assert second["FeatureTypes"] == ["TABLES"]
+    assert "QueriesConfig" not in second
@@ -0,0 +1,57 @@
+import re
+
+import pytest
+
+from textractcaller import JobRecord, JobStore, SQLiteJobStore, client_request_token
+
+
+def test_sqlite_job_store(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    store = SQLiteJobStore(path)
+    store.put(JobRecord(job_id="job-0", textract_api="ANALYZE", request_key="key", features=["TABLES", "FORMS"]))
+    store.put(JobRecord(job_id="job-1", textract_api="ANALYZE", request_key="key", output_location="s3://bucket/out"))
+    store.put(JobRecord(job_id="job-2", textract_api="DETECT", request_key="other-key"))
+    store.update_status("job-0", "FAILED")
+    store.close()
+
+    store = SQLiteJobStore(path)
+    assert [r.job_id for r in store.find("key")] == ["job-0", "job-1"]
+    assert store.get("job-0").status == "FAILED"
+    assert store.get("job-0").features == ["TABLES", "FORMS"]
+    assert store.get("job-1").output_location == "s3://bucket/out"
+    assert [r.job_id for r in store.list("IN_PROGRESS")] == ["job-1", "job-2"]
+    assert len(store.list()) == 3
+    assert store.get("job-3") is None
+
+
+def test_client_request_token():
+    token = client_request_token("a" * 64)
+    assert re.fullmatch(r"[a-zA-Z0-9-_]{1,64}", token)
+    assert token == client_request_token("a" * 64)
+    assert token != client_request_token("a" * 64, attempt=1)
+    assert token != client_request_token("a" * 64, output_location="s3://bucket/out")
+
+
+def test_job_store_subclasses_implement_the_interface():
+    class PartialJobStore(JobStore):
+        def get(self, job_id):
+            return None
+
+    with pytest.raises(TypeError):
+        JobStore()
+    with pytest.raises(TypeError):
+        PartialJobStore()
+
+
+def test_is_reusable():
+    from textractcaller.t_job_store import RESULT_RETENTION_SECONDS, is_reusable
+
+    def record(status, updated_at):
+        return JobRecord(job_id="job", textract_api="ANALYZE", request_key="key", status=status, updated_at=updated_at)
+
+    now = 10 * RESULT_RETENTION_SECONDS
+    assert is_reusable(record("IN_PROGRESS", 0.0), now)
+    assert is_reusable(record("SUCCEEDED", now - 60), now)
+    assert not is_reusable(record("SUCCEEDED", now - RESULT_RETENTION_SECONDS), now)
+    assert not is_reusable(record("FAILED", now - 60), now)
+    assert not is_reusable(record("EXPIRED", now - 60), now)
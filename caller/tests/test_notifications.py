@@ -0,0 +1,170 @@
+import json
+from collections import deque
+
+import pytest
+from botocore.exceptions import ClientError
+
+from textractcaller import JobPoller, NotificationListener, Textract_API, parse_notification
+from test_scheduler import FakeClock, ThrottlingTextractClient
+from test_poller import start_jobs
+
+QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/123456789012/textract-notifications"
+
+
+class LocalQueue:
+    """local stand-in for the SQS client of a queue subscribed to the SNS topic of a NotificationChannel"""
+
+    def __init__(self):
+        self.visible = deque()
+        self.in_flight = {}
+        self.receipts = 0
+
+    def publish(self, job_id, status="SUCCEEDED", raw=False):
+        message = json.dumps({"JobId": job_id, "Status": status, "API": "StartDocumentAnalysis", "JobTag": ""})
+        body = message if raw else json.dumps({"Type": "Notification", "TopicArn": "arn:topic", "Message": message})
+        self.visible.append(body)
+
+    def expire(self):
+        """the visibility timeout of the received messages that were not deleted expires"""
+        self.visible.extend(self.in_flight.values())
+        self.in_flight.clear()
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages, WaitTimeSeconds):
+        assert QueueUrl == QUEUE_URL
+        messages = []
+        while self.visible and len(messages) < MaxNumberOfMessages:
+            self.receipts += 1
+            receipt_handle = f"receipt-{self.receipts}"
+            self.in_flight[receipt_handle] = self.visible.popleft()
+            messages.append(
+                {"MessageId": receipt_handle, "ReceiptHandle": receipt_handle, "Body": self.in_flight[receipt_handle]}
+            )
+        return {"Messages": messages} if messages else {}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        for entry in Entries:
+            del self.in_flight[entry["ReceiptHandle"]]
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []}
+
+
+class FailingQueue(LocalQueue):
+    """local queue whose calls fail with the errors queued in receive_errors and delete_failures"""
+
+    def __init__(self):
+        super().__init__()
+        self.receive_errors = deque()
+        self.delete_failures = deque()  # SenderFault of the failure of the first entry of each DeleteMessageBatch call
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages, WaitTimeSeconds):
+        if self.receive_errors:
+            raise ClientError({"Error": {"Code": self.receive_errors.popleft(), "Message": ""}}, "ReceiveMessage")
+        return super().receive_message(QueueUrl, MaxNumberOfMessages, WaitTimeSeconds)
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        if not self.delete_failures:
+            return super().delete_message_batch(QueueUrl, Entries)
+        failure = {"Id": Entries[0]["Id"], "SenderFault": self.delete_failures.popleft(), "Code": "InternalError"}
+        response = super().delete_message_batch(QueueUrl, Entries[1:])
+        return {"Successful": response["Successful"], "Failed": [failure]}
+
+
+def test_parse_notification():
+    queue = LocalQueue()
+    queue.publish("job-0")
+    queue.publish("job-1", status="FAILED", raw=True)
+    assert parse_notification(queue.visible[0])["JobId"] == "job-0"
+    assert parse_notification(queue.visible[1])["Status"] == "FAILED"
+    assert parse_notification("not json") is None
+    assert parse_notification(json.dumps({"Type": "Notification", "Message": "{}"})) is None
+
+
+def test_notification_listener_dispatch():
+    queue = LocalQueue()
+    listener = NotificationListener(QUEUE_URL, sqs_client=queue, background=False)
+    future = listener.register("job-0")
+    queue.publish("job-1")
+    queue.publish("job-0")
+    queue.publish("job-2", raw=True)
+    queue.visible.append("garbage")
+    assert listener.poll_once() == 1
+    assert future.result()["Status"] == "SUCCEEDED"
+    # the message of job-1 is kept for a later registration and left in the queue for other listeners
+    assert len(queue.in_flight) == 3
+    assert listener.register("job-1").result()["JobId"] == "job-1"
+    assert len(queue.in_flight) == 2
+    assert len(listener) == 0
+
+
+def test_notification_listener_errors():
+    queue = FailingQueue()
+    listener = NotificationListener(QUEUE_URL, sqs_client=queue, wait_time_seconds=0, retry_interval=0.01)
+    # throttling and network errors are retried, the registered jobs keep waiting
+    queue.receive_errors.extend(["ThrottlingException", "RequestThrottled", "ServiceUnavailable"])
+    queue.publish("job-0")
+    assert listener.register("job-0").result(timeout=10)["JobId"] == "job-0"
+    assert not queue.receive_errors
+
+    # a fatal error fails the registered jobs
+    queue.receive_errors.append("AWS.SimpleQueueService.NonExistentQueue")
+    with pytest.raises(ClientError):
+        listener.register("job-1").result(timeout=10)
+    assert len(listener) == 0
+
+    # stop() fails the jobs still registered
+    listener = NotificationListener(QUEUE_URL, sqs_client=queue, background=False)
+    future = listener.register("job-2")
+    listener.stop()
+    with pytest.raises(RuntimeError):
+        future.result()
+
+
+def test_notification_listener_delete_failures(caplog):
+    queue = FailingQueue()
+    listener = NotificationListener(QUEUE_URL, sqs_client=queue, background=False)
+    futures = [listener.register(f"job-{i}") for i in range(2)]
+    queue.publish("job-0")
+    queue.publish("job-1")
+    # a failure on the side of SQS is retried, the message is not received again after its visibility timeout
+    queue.delete_failures.append(False)
+    assert listener.poll_once() == 2
+    assert all(future.done() for future in futures)
+    assert not queue.in_flight
+
+    # a failure caused by the request is logged
+    future = listener.register("job-2")
+    queue.publish("job-2")
+    queue.delete_failures.append(True)
+    assert listener.poll_once() == 1
+    assert future.result()["JobId"] == "job-2"
+    assert len(queue.in_flight) == 1
+    assert "deleting a message" in caplog.text
+
+
+def test_job_poller_with_notifications():
+    clock = FakeClock()
+    client = ThrottlingTextractClient(clock, tps=100, max_jobs=100, job_duration=5)
+    queue = LocalQueue()
+    listener = NotificationListener(QUEUE_URL, sqs_client=queue, background=False)
+    poller = JobPoller(
+        client, notification_listener=listener, fallback_interval=60, background=False, clock=clock, sleep=clock.sleep
+    )
+    job_ids = start_jobs(client, 3)
+    futures = [poller.register(job_id, Textract_API.ANALYZE) for job_id in job_ids]
+    assert len(listener) == 3
+
+    clock.sleep(5)
+    queue.publish(job_ids[0])
+    queue.publish(job_ids[1])
+    listener.poll_once()
+    assert poller.run(timeout=1) == 1
+    # the notified jobs are fetched at once, without any status poll before the notification
+    for job_id, future in zip(job_ids[:2], futures):
+        assert len(future.result()["Blocks"]) == client.blocks
+        assert client.first_get[job_id] == 5
+    assert not futures[2].done()
+
+    # the notification of the last job is lost, it is found by the fallback poll
+    assert poller.run() == 0
+    assert client.first_get[job_ids[2]] == 60
+    assert len(futures[2].result()["Blocks"]) == client.blocks
+    assert len(listener) == 0
@@ -0,0 +1,85 @@
+import datetime
+import io
+import json
+import threading
+import time
+
+from textractcaller import OutputConfig, get_full_json_from_output_config, iter_output_config_parts
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+
+class StubS3Client:
+    """S3 client serving the output parts of a job, with paginated listings and ranged GETs"""
+
+    def __init__(self, bucket, prefix, job_id, parts, latency=0.02, page_size=3):
+        self.bucket = bucket
+        self.latency = latency
+        self.page_size = page_size
+        self.objects = {f"{prefix}/{job_id}/.s3_access_check": b""}
+        for i, part in enumerate(parts):
+            self.objects[f"{prefix}/{job_id}/{i + 1}"] = json.dumps(part).encode("utf-8")
+        self.ranges = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        keys = sorted(k for k in self.objects if k.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        response = {
+            "Contents": [
+                {"Key": k, "Size": len(self.objects[k]), "LastModified": NOW}
+                for k in keys[start : start + self.page_size]
+            ]
+        }
+        if start + self.page_size < len(keys):
+            response["NextContinuationToken"] = str(start + self.page_size)
+        return response
+
+    def get_object(self, Bucket, Key, Range=None):
+        assert Bucket == self.bucket
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.latency)
+        with self.lock:
+            self.running -= 1
+        body = self.objects[Key]
+        if Range:
+            self.ranges.append(Range)
+            first, last = Range[len("bytes=") :].split("-")
+            body = body[int(first) : int(last) + 1]
+        return {"Body": io.BytesIO(body), "LastModified": NOW}
+
+
+def make_parts(count=12, blocks=5):
+    parts = [
+        {"JobStatus": "SUCCEEDED", "Blocks": [{"Id": f"{p}-{b}", "Text": "x" * 50} for b in range(blocks)]}
+        for p in range(count)
+    ]
+    parts[0]["DocumentMetadata"] = {"Pages": count}
+    return parts
+
+
+def test_get_full_json_from_output_config_concurrent():
+    parts = make_parts()
+    s3 = StubS3Client("bucket", "output", "job", parts)
+    output_config = OutputConfig(s3_bucket="bucket", s3_prefix="output")
+
+    response = get_full_json_from_output_config(output_config, "job", s3_client=s3, max_workers=4)
+    assert [b["Id"] for b in response["Blocks"]] == [b["Id"] for p in parts for b in p["Blocks"]]
+    assert response["DocumentMetadata"] == {"Pages": 12}
+    assert 1 < s3.max_running <= 4
+
+    # parts larger than range_size are fetched in ranged GETs and reassembled
+    ranged = get_full_json_from_output_config(output_config, "job", s3_client=s3, max_workers=4, range_size=100)
+    assert ranged == response
+    assert len(s3.ranges) > len(parts)
+
+
+def test_iter_output_config_parts():
+    parts = make_parts(count=5)
+    s3 = StubS3Client("bucket", "output", "job", parts, latency=0)
+    output_config = OutputConfig(s3_bucket="bucket", s3_prefix="output")
+    assert list(iter_output_config_parts(output_config, "job", s3_client=s3, max_workers=2)) == parts
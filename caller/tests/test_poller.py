@@ -0,0 +1,75 @@
+from concurrent.futures import Future
+
+import pytest
+
+from textractcaller import JobPoller, Textract_API
+from test_scheduler import FakeClock, ThrottlingTextractClient
+
+
+def start_jobs(client, count):
+    return [
+        client.start_document_analysis(DocumentLocation={"S3Object": {"Name": f"document-{i}.pdf"}}, FeatureTypes=[])[
+            "JobId"
+        ]
+        for i in range(count)
+    ]
+
+
+def test_job_poller_budget_and_backoff():
+    clock = FakeClock()
+    client = ThrottlingTextractClient(clock, tps=100, max_jobs=100, job_duration=20)
+    poller = JobPoller(client, get_tps=2, background=False, clock=clock, sleep=clock.sleep)
+    job_ids = start_jobs(client, 10)
+    futures = [poller.register(job_id, Textract_API.ANALYZE) for job_id in job_ids[:-1]]
+    futures.append(poller.register(job_ids[-1], Textract_API.ANALYZE, pages=60))
+    assert poller.register(job_ids[0], Textract_API.ANALYZE) is futures[0]
+    assert len(poller) == 10
+
+    assert poller.run() == 0
+    assert all(isinstance(f, Future) and f.done() for f in futures)
+    for future in futures:
+        response = future.result()
+        assert len(response["Blocks"]) == client.blocks
+        assert "NextToken" not in response
+
+    # the Get* calls stay within the global budget, burst included
+    get_calls = sum(count for (operation, _), count in client.calls.items() if operation == "get")
+    assert get_calls <= 2 * clock.now + 2
+    # each job is polled a few times with growing intervals, 3 pages of results included
+    assert get_calls <= 10 * 9
+    # the 60 pages document is not polled before its expected processing time
+    assert client.first_get[job_ids[-1]] >= 30 - 1e-9
+
+
+def test_job_poller_failure():
+    clock = FakeClock()
+    client = ThrottlingTextractClient(clock)
+    poller = JobPoller(client, background=False, clock=clock, sleep=clock.sleep)
+    future = poller.register("unknown-job", Textract_API.ANALYZE)
+    poller.run()
+    with pytest.raises(KeyError):
+        future.result()
+
+
+class RegisteringTextractClient:
+    """completes every job on its first poll, registers another job while the first one is polled"""
+
+    def __init__(self):
+        self.poller = None
+        self.registered = []
+
+    def get_document_analysis(self, JobId, **kwargs):
+        if JobId == "job-a":
+            self.registered.append(self.poller.register("job-b", Textract_API.ANALYZE))
+        return {"JobStatus": "SUCCEEDED", "Blocks": [{"Id": JobId}]}
+
+
+def test_job_poller_registration_during_completion():
+    client = RegisteringTextractClient()
+    poller = JobPoller(client, get_tps=100, min_interval=0.01)
+    client.poller = poller
+    future = poller.register("job-a", Textract_API.ANALYZE)
+    assert future.result(timeout=10)["Blocks"] == [{"Id": "job-a"}]
+    (registered,) = client.registered
+    assert registered.result(timeout=10)["Blocks"] == [{"Id": "job-b"}]
+    poller.stop()
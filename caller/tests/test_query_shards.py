@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+
+import textractcaller.t_call
+import textractcaller.t_call_async
+from textractcaller import (
+    MAX_SYNC_QUERIES,
+    Query,
+    QueriesConfig,
+    Textract_Features,
+    acall_textract,
+    call_textract,
+    merge_query_responses,
+    shard_request_params,
+)
+
+
+class QueryTextractClient:
+    """answers each query of a request with a QUERY and a QUERY_RESULT block, the ids are the same in every response"""
+
+    def __init__(self):
+        self.calls = []
+
+    def analyze_document(self, Document, FeatureTypes, QueriesConfig, **kwargs):
+        self.calls.append({"FeatureTypes": FeatureTypes, "QueriesConfig": QueriesConfig})
+        blocks = [
+            {"Id": "page", "BlockType": "PAGE", "Relationships": [{"Type": "CHILD", "Ids": ["line"]}]},
+            {"Id": "line", "BlockType": "LINE", "Text": "text"},
+        ]
+        for i, query in enumerate(QueriesConfig["Queries"]):
+            blocks.append(
+                {
+                    "Id": f"query-{i}",
+                    "BlockType": "QUERY",
+                    "Query": query,
+                    "Relationships": [{"Type": "ANSWER", "Ids": [f"result-{i}"]}],
+                }
+            )
+            blocks.append({"Id": f"result-{i}", "BlockType": "QUERY_RESULT", "Text": query["Text"].upper()})
+            blocks[0]["Relationships"][0]["Ids"].extend([f"query-{i}", f"result-{i}"])
+        return {"DocumentMetadata": {"Pages": 1}, "Blocks": blocks}
+
+
+class ThrottlingQueryTextractClient(QueryTextractClient):
+    """QueryTextractClient throttling its first calls"""
+
+    def __init__(self, throttled_calls):
+        super().__init__()
+        self.throttled_calls = throttled_calls
+
+    def analyze_document(self, Document, FeatureTypes, QueriesConfig, **kwargs):
+        if self.throttled_calls:
+            self.throttled_calls -= 1
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": ""}}, "AnalyzeDocument")
+        return super().analyze_document(Document, FeatureTypes, QueriesConfig, **kwargs)
+
+
+def check_merged(response, queries):
+    blocks = {block["Id"]: block for block in response["Blocks"]}
+    assert len(blocks) == len(response["Blocks"])
+    assert sum(block["BlockType"] == "LINE" for block in blocks.values()) == 1
+    page_children = set(blocks["page"]["Relationships"][0]["Ids"])
+    answers = {}
+    for block in blocks.values():
+        if block["BlockType"] == "QUERY":
+            (result_id,) = block["Relationships"][0]["Ids"]
+            assert {block["Id"], result_id} <= page_children
+            answers[block["Query"]["Text"]] = blocks[result_id]["Text"]
+    assert answers == {query: query.upper() for query in queries}
+
+
+def test_shard_request_params():
+    params = {
+        "FeatureTypes": ["TABLES", "QUERIES"],
+        "QueriesConfig": {"Queries": [{"Text": f"q{i}"} for i in range(35)]},
+        "ClientRequestToken": "t" * 64,
+    }
+    shards = shard_request_params(params, 15)
+    assert [len(shard["QueriesConfig"]["Queries"]) for shard in shards] == [15, 15, 5]
+    assert [shard["FeatureTypes"] for shard in shards] == [["TABLES", "QUERIES"], ["QUERIES"], ["QUERIES"]]
+    tokens = [shard["ClientRequestToken"] for shard in shards]
+    assert len(set(tokens)) == 3 and all(len(token) <= 64 for token in tokens)
+    assert shard_request_params(params, 35) == [params]
+
+
+def test_call_textract_query_shards():
+    queries = [f"query {i}?" for i in range(2 * MAX_SYNC_QUERIES + 1)]
+    client = QueryTextractClient()
+    response = call_textract(
+        b"image",
+        features=[Textract_Features.FORMS, Textract_Features.QUERIES],
+        queries_config=QueriesConfig([Query(query) for query in queries]),
+        boto3_textract_client=client,
+    )
+    assert sorted(len(call["QueriesConfig"]["Queries"]) for call in client.calls) == [1, 15, 15]
+    assert sorted(call["FeatureTypes"] for call in client.calls) == [["FORMS", "QUERIES"], ["QUERIES"], ["QUERIES"]]
+    check_merged(response, queries)
+
+    response = asyncio.run(
+        acall_textract(
+            b"image",
+            features=[Textract_Features.QUERIES],
+            queries_config=QueriesConfig([Query(query) for query in queries]),
+            boto3_textract_client=QueryTextractClient(),
+        )
+    )
+    check_merged(response, queries)
+
+
+def test_call_textract_query_shards_throttling(monkeypatch):
+    # the shards share a TPS budget, throttled shards are retried at a lower rate
+    monkeypatch.setattr(textractcaller.t_call, "SYNC_SHARD_TPS", 100)
+    monkeypatch.setattr(textractcaller.t_call_async, "SYNC_SHARD_TPS", 100)
+    queries = [f"query {i}?" for i in range(2 * MAX_SYNC_QUERIES + 1)]
+    client = ThrottlingQueryTextractClient(throttled_calls=2)
+    response = call_textract(
+        b"image",
+        features=[Textract_Features.QUERIES],
+        queries_config=QueriesConfig([Query(query) for query in queries]),
+        boto3_textract_client=client,
+    )
+    assert len(client.calls) == 3
+    check_merged(response, queries)
+
+    response = asyncio.run(
+        acall_textract(
+            b"image",
+            features=[Textract_Features.QUERIES],
+            queries_config=QueriesConfig([Query(query) for query in queries]),
+            boto3_textract_client=ThrottlingQueryTextractClient(throttled_calls=2),
+        )
+    )
+    check_merged(response, queries)
+
+
+def test_merge_query_responses_leaves_responses_untouched():
+    client = QueryTextractClient()
+    first = client.analyze_document(b"", ["QUERIES"], {"Queries": [{"Text": "a"}]})
+    second = client.analyze_document(b"", ["QUERIES"], {"Queries": [{"Text": "b"}]})
+    merged = merge_query_responses([first, second])
+    check_merged(merged, ["a", "b"])
+    assert len(first["Blocks"][0]["Relationships"][0]["Ids"]) == 3
+
+
+def test_call_textract_query_shards_return_job_id():
+    with pytest.raises(ValueError):
+        call_textract(
+            "s3://bucket/document.pdf",
+            features=[Textract_Features.QUERIES],
+            queries_config=QueriesConfig([Query(f"query {i}?") for i in range(31)]),
+            return_job_id=True,
+            boto3_textract_client=QueryTextractClient(),
+        )
@@ -0,0 +1,138 @@
+from textractcaller import BatchScheduler, ApiQuota, TokenBucket, Textract_API, Textract_Features
+
+
+class ProvisionedThroughputExceededException(Exception):
+    pass
+
+
+class LimitExceededException(Exception):
+    pass
+
+
+class InvalidS3ObjectException(Exception):
+    pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class ThrottlingTextractClient:
+    """
+    stub of the Textract client enforcing a TPS quota per operation and a concurrent job limit
+    jobs run for job_duration seconds and return their blocks in pages of page_size
+    """
+
+    def __init__(self, clock, tps=5, max_jobs=4, job_duration=3.0, blocks=25, page_size=10):
+        self.clock = clock
+        self.tps = tps
+        self.max_jobs = max_jobs
+        self.job_duration = job_duration
+        self.blocks = blocks
+        self.page_size = page_size
+        self.calls = {}
+        self.jobs = {}
+        self.first_get = {}
+        self.max_running = 0
+
+    def _throttle(self, operation):
+        second = int(self.clock())
+        calls = self.calls.setdefault((operation, second), 0)
+        if calls >= self.tps:
+            raise ProvisionedThroughputExceededException(operation)
+        self.calls[(operation, second)] = calls + 1
+
+    def _running(self):
+        return sum(1 for end in self.jobs.values() if end > self.clock())
+
+    def start_document_analysis(self, DocumentLocation, FeatureTypes, **kwargs):
+        self._throttle("start")
+        if DocumentLocation["S3Object"]["Name"].startswith("invalid"):
+            raise InvalidS3ObjectException()
+        if self._running() >= self.max_jobs:
+            raise LimitExceededException()
+        job_id = f"job-{len(self.jobs)}"
+        self.jobs[job_id] = self.clock() + self.job_duration
+        self.max_running = max(self.max_running, self._running())
+        return {"JobId": job_id, "ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    def get_document_analysis(self, JobId, NextToken=None):
+        self._throttle("get")
+        self.first_get.setdefault(JobId, self.clock())
+        if self.jobs[JobId] > self.clock():
+            return {"JobStatus": "IN_PROGRESS"}
+        start = int(NextToken or 0)
+        response = {
+            "JobStatus": "SUCCEEDED",
+            "DocumentMetadata": {"Pages": 2},
+            "Blocks": [{"Id": f"{JobId}-{i}"} for i in range(start, min(start + self.page_size, self.blocks))],
+        }
+        if start + self.page_size < self.blocks:
+            response["NextToken"] = str(start + self.page_size)
+        return response
+
+
+def test_token_bucket():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, clock=clock)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0.5
+    clock.sleep(0.5)
+    assert bucket.try_acquire() == 0
+    bucket.decrease(0.5)
+    assert bucket.rate == 1
+    assert bucket.try_acquire() == 1
+    bucket.increase(5)
+    assert bucket.rate == 2
+
+
+def test_batch_scheduler_adapts_to_throttling():
+    clock = FakeClock()
+    client = ThrottlingTextractClient(clock)
+    done = []
+    scheduler = BatchScheduler(
+        boto3_textract_client=client,
+        quotas={Textract_API.ANALYZE: ApiQuota(start_tps=20, get_tps=20, max_concurrent_jobs=50)},
+        on_done=done.append,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    documents = [f"s3://bucket/document-{i}.pdf" for i in range(20)] + ["s3://bucket/invalid.pdf"]
+    jobs = scheduler.process(documents, features=[Textract_Features.TABLES])
+
+    assert [job.input_document for job in jobs] == documents
+    assert len(done) == len(documents)
+    assert all(job.status == "SUCCEEDED" for job in jobs[:-1])
+    assert all(len(job.response["Blocks"]) == client.blocks for job in jobs[:-1])
+    assert all("NextToken" not in job.response for job in jobs[:-1])
+    assert jobs[-1].status == "FAILED"
+    assert isinstance(jobs[-1].error, InvalidS3ObjectException)
+    assert client.max_running <= client.max_jobs
+
+    metrics = scheduler.metrics()
+    assert metrics.queue_depth == 0
+    assert metrics.active_jobs == 0
+    assert metrics.succeeded == 20
+    assert metrics.failed == 1
+    assert metrics.throttled > 0
+    assert metrics.concurrent_job_limits[Textract_API.ANALYZE] < 50
+    assert metrics.pages_per_second == 2 * metrics.succeeded / metrics.elapsed
+
+
+def test_batch_scheduler_timeout():
+    clock = FakeClock()
+    client = ThrottlingTextractClient(clock, job_duration=100)
+    scheduler = BatchScheduler(boto3_textract_client=client, clock=clock, sleep=clock.sleep)
+    scheduler.submit("s3://bucket/document.pdf", features=[Textract_Features.FORMS])
+    assert scheduler.run(timeout=10) == 1
+    assert scheduler.metrics().active_jobs == 1
+    assert scheduler.run() == 0
+    assert scheduler.metrics().succeeded == 1
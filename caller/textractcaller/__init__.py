@@ -1,5 +1,16 @@
 from ._version import __version__
-from .t_call import NotificationChannel, OutputConfig, DocumentLocation, Document, get_job_response, get_full_json_from_output_config, get_full_json, call_textract, Textract_Features, call_textract_analyzeid, DocumentPage, QueriesConfig, Query, AdaptersConfig, Adapter, call_textract_expense, Textract_Call_Mode, Textract_API, Textract_Types, call_textract_lending, get_full_json_lending, get_full_json_lending_from_output_config, get_s3_output_config_keys
+from .t_call import NotificationChannel, OutputConfig, DocumentLocation, Document, get_job_response, get_full_json_from_output_config, get_full_json, call_textract, Textract_Features, call_textract_analyzeid, DocumentPage, QueriesConfig, Query, AdaptersConfig, Adapter, call_textract_expense, Textract_Call_Mode, Textract_API, Textract_Types, call_textract_lending, get_full_json_lending, get_full_json_lending_from_output_config, get_s3_output_config_keys, list_output_objects, iter_s3_json_objects, iter_output_config_parts, merge_parts
+from .t_call_async import AsyncClientAdapter, get_async_client, aget_job_response, aget_full_json, aget_full_json_lending, acall_textract, acall_textract_expense, acall_textract_analyzeid, acall_textract_lending
+from .t_scheduler import BatchScheduler, BatchJob, ApiQuota, SchedulerMetrics
+from .t_throttling import TokenBucket, ThrottledCaller
+from .t_notifications import NotificationListener, parse_notification
+from .t_poller import JobPoller, PolledJob
+from .t_cache import ResponseCache, LocalResponseCache, S3ResponseCache, CacheMetrics, request_key
+from .t_job_store import JobStore, SQLiteJobStore, JobRecord, client_request_token
+from .t_fan_out import call_textract_pages, merge_page_responses, page_request_params
+from .t_query_shards import MAX_SYNC_QUERIES, MAX_ASYNC_QUERIES, shard_queries, shard_request_params
+from .t_query_shards import merge_query_responses
+from .t_clients import get_client, get_session, configure_clients, reset_clients, client_config
 
 import logging
 from logging import NullHandler
@@ -0,0 +1,255 @@
+"""
+Response cache in front of the Textract APIs.
+
+Reprocessing a document (retries, backfills, changes in the downstream code) calls Textract again for a response that
+is already known. A ResponseCache stores the responses under a key derived from the content of the document and the
+request configuration: the SHA-256 of the document bytes (the ETag of the object for documents on S3, of the requested
+version when there is one), the API, the features, the queries and the adapters. Job tags, tokens, notification
+channels, output locations and KMS keys do not change the results and are left out of the key.
+
+LocalResponseCache keeps the responses in a local directory, evicting the least recently used ones beyond max_bytes.
+S3ResponseCache keeps them under an S3 prefix, expiration is then left to the lifecycle rules of the bucket.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+from textractcaller.t_clients import get_client
+
+logger = logging.getLogger(__name__)
+
+
+def document_digest(params: dict, s3_client=None) -> str:
+    """
+    returns the identity of the document of Textract request parameters: the SHA-256 of Document.Bytes, or the
+    ETag of the S3 object of Document.S3Object or DocumentLocation.S3Object
+    s3_client: boto3 S3 client reading the ETag, one is created when None
+    """
+    document = params.get("Document") or params.get("DocumentLocation") or {}
+    if "Bytes" in document:
+        return "sha256:" + hashlib.sha256(document["Bytes"]).hexdigest()
+    s3_object = document.get("S3Object")
+    if not s3_object:
+        raise ValueError("no Document or DocumentLocation in the request parameters")
+    head_args = {"Bucket": s3_object["Bucket"], "Key": s3_object["Name"]}
+    if s3_object.get("Version"):
+        head_args["VersionId"] = s3_object["Version"]
+    if s3_client is None:
+        s3_client = get_client("s3")
+    head = s3_client.head_object(**head_args)
+    return "etag:" + head["ETag"].strip('"')
+
+
+def request_key(api: str, params: dict, s3_client=None) -> str:
+    """
+    returns the SHA-256 (hex) identifying a Textract request by its results
+    api: name of the Textract operation (the client method name, e.g. analyze_document)
+    params: request parameters, as passed to the client method
+    s3_client: boto3 S3 client reading the ETag of documents on S3, one is created when None
+    """
+    identity = {
+        "api": api,
+        "document": document_digest(params, s3_client),
+        "features": sorted(params.get("FeatureTypes", [])),
+        "queries": params.get("QueriesConfig"),
+        "adapters": params.get("AdaptersConfig"),
+    }
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheMetrics:
+    """snapshot of the counters of a ResponseCache"""
+
+    hits: int
+    misses: int
+    writes: int
+    evictions: int
+    hit_rate: float  # hits / (hits + misses)
+
+
+class ResponseCache(ABC):
+    """
+    base class of the response caches, subclasses implement _read and _write
+
+    s3_client: boto3 S3 client used to read the ETag of the documents on S3, one is created when needed if None
+    """
+
+    def __init__(self, s3_client=None):
+        self._s3_client = s3_client
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            self._s3_client = get_client("s3")
+        return self._s3_client
+
+    def key(self, api: str, params: dict) -> str:
+        """returns the cache key of a Textract request, see request_key"""
+        return request_key(api, params, self.s3_client)
+
+    def get(self, key: str) -> Optional[dict]:
+        """returns the cached response of key or None"""
+        try:
+            data = self._read(key)
+        except Exception as exception:
+            logger.warning(f"reading {key} from the response cache failed: {exception}")
+            data = None
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        logger.debug(f"response cache hit: {key}")
+        return json.loads(gzip.decompress(data))
+
+    def put(self, key: str, response: dict):
+        """stores a response under key, failures are logged and otherwise ignored"""
+        response = {k: v for k, v in response.items() if k != "ResponseMetadata"}
+        try:
+            self._write(key, gzip.compress(json.dumps(response).encode("utf-8")))
+        except Exception as exception:
+            logger.warning(f"writing {key} to the response cache failed: {exception}")
+            return
+        with self._lock:
+            self.writes += 1
+
+    def metrics(self) -> CacheMetrics:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return CacheMetrics(
+                hits=self.hits,
+                misses=self.misses,
+                writes=self.writes,
+                evictions=self.evictions,
+                hit_rate=self.hits / lookups if lookups else 0.0,
+            )
+
+    @abstractmethod
+    def _read(self, key: str) -> Optional[bytes]:
+        """returns the gzipped response stored under key, None when there is none"""
+
+    @abstractmethod
+    def _write(self, key: str, data: bytes):
+        """stores the gzipped response data under key"""
+
+
+class LocalResponseCache(ResponseCache):
+    """
+    caches the responses as gzipped JSON files in a local directory
+
+    directory: cache directory, created when missing, it can be shared by several processes
+    max_bytes: size of the directory above which the least recently read or written responses are deleted
+    """
+
+    suffix = ".json.gz"
+
+    def __init__(self, directory: str, max_bytes: int = 1024**3, s3_client=None):
+        super().__init__(s3_client=s3_client)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.size_bytes = sum(size for _, _, size in self._entries())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _entries(self):
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(self.suffix):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    yield entry.path, stat.st_mtime, stat.st_size
+
+    def _read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as cached_file:
+                data = cached_file.read()
+            # the modification time orders the entries for the eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def _write(self, key: str, data: bytes):
+        path = self._path(key)
+        # written to a temporary file and renamed, readers never see a partial response
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as temporary_file:
+            temporary_file.write(data)
+        previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(temporary_path, path)
+        with self._lock:
+            self.size_bytes += len(data) - previous_size
+            over_limit = self.size_bytes > self.max_bytes
+        if over_limit:
+            self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        size_bytes = sum(size for _, _, size in entries)
+        evicted = 0
+        for path, _, size in entries:
+            if size_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size_bytes -= size
+            evicted += 1
+        with self._lock:
+            self.size_bytes = size_bytes
+            self.evictions += evicted
+
+
+class S3ResponseCache(ResponseCache):
+    """
+    caches the responses as gzipped JSON objects under an S3 prefix
+
+    s3_bucket, s3_prefix: location of the cache
+    s3_client: boto3 S3 client for the cache and the ETag of the documents, one is created when None
+    """
+
+    def __init__(self, s3_bucket: str, s3_prefix: str, s3_client=None):
+        super().__init__(s3_client=s3_client)
+        self.s3_bucket = s3_bucket
+        self.s3_prefix = s3_prefix.strip("/")
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.s3_prefix}/{key}.json.gz" if self.s3_prefix else f"{key}.json.gz"
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            response = self.s3_client.get_object(Bucket=self.s3_bucket, Key=self._object_key(key))
+        except Exception as exception:
+            code = getattr(exception, "response", {}).get("Error", {}).get("Code")
+            if code in ("NoSuchKey", "404") or exception.__class__.__name__ == "NoSuchKey":
+                return None
+            raise
+        return response["Body"].read()
+
+    def _write(self, key: str, data: bytes):
+        self.s3_client.put_object(
+            Bucket=self.s3_bucket,
+            Key=self._object_key(key),
+            Body=data,
+            ContentType="application/json",
+            ContentEncoding="gzip",
+        )
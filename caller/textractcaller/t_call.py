@@ -1,12 +1,25 @@
-from typing import Union, List, Optional, Tuple
+from typing import Iterable, Iterator, Union, List, Optional, Tuple
 from enum import Enum
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import os
 from dataclasses import dataclass, field
-import boto3
 import time
 import logging
 import json
 
+from textractcaller.t_cache import ResponseCache
+from textractcaller.t_clients import get_client
+from textractcaller.t_query_shards import (
+    ASYNC_SHARD_TPS,
+    MAX_ASYNC_QUERIES,
+    MAX_SYNC_QUERIES,
+    SYNC_SHARD_TPS,
+    merge_query_responses,
+    shard_request_params,
+)
+from textractcaller.t_throttling import ThrottledCaller
+
 
 class Textract_Features(Enum):
     FORMS = 1
@@ -249,13 +262,17 @@ def get_job_response(
 
 
 # TODO would like to use a package for that functionality
-def get_s3_output_config_keys(
+def list_output_objects(
     output_config: OutputConfig, job_id: str, s3_client, subfolder=None
-):
+) -> List[dict]:
+    """
+    returns the S3 objects (dicts with Key, Size and LastModified, as listed by list_objects_v2) of the output of a job,
+    sorted by part number
+    """
     if not output_config or not job_id:
         raise ValueError("no output_config or job_id")
     if not s3_client:
-        s3_client = boto3.client("s3")
+        s3_client = get_client("s3")
     if subfolder:
         params = {
             "Bucket": output_config.s3_bucket.strip("/"),
@@ -272,13 +289,13 @@ def get_s3_output_config_keys(
         }
     logger.info(f"s3-params {params}")
 
-    keys = list()
+    objects = list()
     while True:
         response = s3_client.list_objects_v2(**params)
 
-        keys.extend(
+        objects.extend(
             [
-                o["Key"]
+                o
                 for o in response.get("Contents", [])
                 if o["Key"].split("/")[-1].isnumeric()
             ]
@@ -288,7 +305,108 @@ def get_s3_output_config_keys(
         if not params["ContinuationToken"]:
             break
 
-    return [x for x in sorted(keys, key=lambda item: int(item.split("/")[-1]))]
+    return sorted(objects, key=lambda item: int(item["Key"].split("/")[-1]))
+
+
+def get_s3_output_config_keys(
+    output_config: OutputConfig, job_id: str, s3_client, subfolder=None
+):
+    return [
+        o["Key"]
+        for o in list_output_objects(
+            output_config=output_config, job_id=job_id, s3_client=s3_client, subfolder=subfolder
+        )
+    ]
+
+
+def iter_s3_json_objects(
+    s3_client, bucket: str, objects: List[dict], max_workers: int = 8, range_size: Optional[int] = None
+) -> Iterator[dict]:
+    """
+    downloads JSON objects concurrently and yields them decoded, in the order of objects
+    objects: dicts with the Key and, for ranged GETs, the Size of each object (as returned by list_output_objects)
+    max_workers: number of download threads, whole objects are decoded in these threads as they arrive
+    range_size: objects larger than range_size bytes are downloaded in concurrent ranged GETs of range_size bytes
+    at most 2 * max_workers GETs are in flight, which bounds the memory held by the parts waiting for their turn
+    """
+
+    def get(key: str, byte_range: Optional[Tuple[int, int]] = None) -> bytes:
+        params = {"Bucket": bucket, "Key": key}
+        if byte_range:
+            params["Range"] = f"bytes={byte_range[0]}-{byte_range[1]}"
+        return s3_client.get_object(**params)["Body"].read()
+
+    def get_json(key: str) -> dict:
+        logger.info(f"found keys: {key}")
+        return dict(json.loads(get(key).decode("utf-8")))
+
+    plan = deque()
+    for o in objects:
+        size = o.get("Size")
+        if range_size and size and size > range_size:
+            ranges = [(start, min(start + range_size, size) - 1) for start in range(0, size, range_size)]
+            plan.append((o["Key"], ranges))
+        else:
+            plan.append((o["Key"], None))
+
+    window = 2 * max_workers
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        submitted = deque()
+        in_flight = 0
+        while plan or submitted:
+            while plan and (in_flight < window or not submitted):
+                key, ranges = plan.popleft()
+                if ranges is None:
+                    futures = [executor.submit(get_json, key)]
+                else:
+                    futures = [executor.submit(get, key, byte_range) for byte_range in ranges]
+                submitted.append((ranges is not None, futures))
+                in_flight += len(futures)
+            ranged, futures = submitted.popleft()
+            in_flight -= len(futures)
+            if ranged:
+                yield dict(json.loads(b"".join(f.result() for f in futures).decode("utf-8")))
+            else:
+                yield futures[0].result()
+
+
+def iter_output_config_parts(
+    output_config: OutputConfig,
+    job_id: str,
+    s3_client=None,
+    subfolder=None,
+    max_workers: int = 8,
+    range_size: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    yields the decoded parts of the output of a job in order, downloaded concurrently (see iter_s3_json_objects)
+    to process the Blocks of a large job part by part instead of building the merged response
+    """
+    if not output_config or not job_id:
+        raise ValueError("no output_config or job_id")
+    if not output_config.s3_bucket or not output_config.s3_prefix:
+        raise ValueError("no output_config or job_id")
+    if not s3_client:
+        s3_client = get_client("s3")
+    objects = list_output_objects(
+        output_config=output_config, job_id=job_id, s3_client=s3_client, subfolder=subfolder
+    )
+    return iter_s3_json_objects(
+        s3_client, output_config.s3_bucket, objects, max_workers=max_workers, range_size=range_size
+    )
+
+
+def merge_parts(parts: Iterable[dict], results_key: str = "Blocks") -> dict:
+    """merges the parts of a paginated response into the first one, extending its results_key list"""
+    result_value = dict()
+    for response in parts:
+        if results_key in result_value:
+            result_value[results_key].extend(response[results_key])
+        else:
+            result_value = response
+    if "NextToken" in result_value:
+        del result_value["NextToken"]
+    return result_value
 
 
 def remove_none(obj):
@@ -333,32 +451,21 @@ def remove_none(obj):
 
 
 def get_full_json_from_output_config(
-    output_config: OutputConfig, job_id: str, s3_client=None
+    output_config: OutputConfig,
+    job_id: str,
+    s3_client=None,
+    max_workers: int = 8,
+    range_size: Optional[int] = None,
 ) -> dict:
-    if not output_config or not job_id:
-        raise ValueError("no output_config or job_id")
-    if not output_config.s3_bucket or not output_config.s3_prefix:
-        raise ValueError("no output_config or job_id")
-    if not s3_client:
-        s3_client = boto3.client("s3")
-
-    result_value = dict()
-    keys = get_s3_output_config_keys(
-        output_config=output_config, job_id=job_id, s3_client=s3_client
+    """
+    returns the full json of a job from its OutputConfig location
+    the parts are downloaded by max_workers threads, see iter_s3_json_objects for range_size
+    """
+    result_value = merge_parts(
+        iter_output_config_parts(
+            output_config, job_id, s3_client=s3_client, max_workers=max_workers, range_size=range_size
+        )
     )
-    for key in keys:
-        logger.info(f"found keys: {key}")
-        s3_object = s3_client.get_object(Bucket=output_config.s3_bucket, Key=key)
-        body = s3_object["Body"]
-        body_read = body.read()
-        body_decode = body_read.decode("utf-8")
-        response = dict(json.loads(body_decode))
-        if "Blocks" in result_value:
-            result_value["Blocks"].extend(response["Blocks"])
-        else:
-            result_value = response
-    if "NextToken" in result_value:
-        del result_value["NextToken"]
     result_value = remove_none(result_value)
     return result_value
 
@@ -368,34 +475,20 @@ def get_full_json_lending_from_output_config(
     job_id: str,
     s3_client=None,
     subfolder="detailedResponse",
+    max_workers: int = 8,
+    range_size: Optional[int] = None,
 ) -> dict:
-    if not output_config or not job_id:
-        raise ValueError("no output_config or job_id")
-    if not output_config.s3_bucket or not output_config.s3_prefix:
-        raise ValueError("no output_config or job_id")
-    if not s3_client:
-        s3_client = boto3.client("s3")
-
-    result_value = dict()
-    keys = get_s3_output_config_keys(
-        output_config=output_config,
-        job_id=job_id,
-        s3_client=s3_client,
-        subfolder=subfolder,
+    result_value = merge_parts(
+        iter_output_config_parts(
+            output_config,
+            job_id,
+            s3_client=s3_client,
+            subfolder=subfolder,
+            max_workers=max_workers,
+            range_size=range_size,
+        ),
+        results_key="Results",
     )
-    for key in keys:
-        logger.info(f"found keys: {key}")
-        s3_object = s3_client.get_object(Bucket=output_config.s3_bucket, Key=key)
-        body = s3_object["Body"]
-        body_read = body.read()
-        body_decode = body_read.decode("utf-8")
-        response = dict(json.loads(body_decode))
-        if "Results" in result_value:
-            result_value["Results"].extend(response["Results"])
-        else:
-            result_value = response
-    if "NextToken" in result_value:
-        del result_value["NextToken"]
     result_value = remove_none(result_value)
     return result_value
 
@@ -440,9 +533,15 @@ def get_full_json(
     textract_api: Textract_API = Textract_API.DETECT,
     boto3_textract_client=None,
     job_done_polling_interval=1,
+    job_poller=None,
 ) -> dict:
-    """returns full json for call, even when response is chunked"""
+    """
+    returns full json for call, even when response is chunked
+    job_poller: shared JobPoller waiting for the job instead of polling it here
+    """
     logger.debug(f"get_full_json: job_id: {job_id}, Textract_API: {textract_api.name}")
+    if job_poller:
+        return job_poller.register(job_id, textract_api).result()
     job_response = get_job_response(
         job_id=job_id,
         textract_api=textract_api,
@@ -487,17 +586,15 @@ def get_full_json(
         )
 
 
-def call_textract_lending(
+def _textract_lending_request(
     input_document: str,
     client_request_token: str = "",
     job_tag: str = "",
     notification_channel: Optional[NotificationChannel] = None,
     output_config: Optional[OutputConfig] = None,
     kms_key_id: str = "",
-    return_job_id: bool = False,
-    job_done_polling_interval=1,
-    boto3_textract_client=None,
-):
+) -> dict:
+    """returns the StartLendingAnalysis parameters, shared by call_textract_lending and acall_textract_lending"""
     if len(input_document) > 7 and input_document.lower().startswith("s3://"):
         # Fix #345
         # s3_bucket, s3_key = input_document.replace("s3://", "").split("/", 1)
@@ -505,11 +602,7 @@ def call_textract_lending(
     else:
         raise Exception("input_document needs to be an S3 URL.")
 
-    if not boto3_textract_client:
-        textract = boto3.client("textract")
-    else:
-        textract = boto3_textract_client
-    params = generate_request_params(
+    return generate_request_params(
         document_location=DocumentLocation(s3_bucket=s3_bucket, s3_prefix=s3_key),
         output_config=output_config,
         notification_channel=notification_channel,
@@ -518,6 +611,31 @@ def call_textract_lending(
         job_tag=job_tag,
     )
 
+
+def call_textract_lending(
+    input_document: str,
+    client_request_token: str = "",
+    job_tag: str = "",
+    notification_channel: Optional[NotificationChannel] = None,
+    output_config: Optional[OutputConfig] = None,
+    kms_key_id: str = "",
+    return_job_id: bool = False,
+    job_done_polling_interval=1,
+    boto3_textract_client=None,
+):
+    params = _textract_lending_request(
+        input_document=input_document,
+        client_request_token=client_request_token,
+        job_tag=job_tag,
+        notification_channel=notification_channel,
+        output_config=output_config,
+        kms_key_id=kms_key_id,
+    )
+    if not boto3_textract_client:
+        textract = get_client("textract")
+    else:
+        textract = boto3_textract_client
+
     submission_status = textract.start_lending_analysis(**params)
     if return_job_id:
         return submission_status
@@ -529,7 +647,7 @@ def call_textract_lending(
         )
 
 
-def call_textract(
+def _textract_request(
     input_document: Union[str, bytes],
     features: Optional[List[Textract_Features]] = None,
     queries_config: Optional[QueriesConfig] = None,
@@ -542,42 +660,16 @@ def call_textract(
     return_job_id: bool = False,
     force_async_api: bool = False,
     call_mode: Textract_Call_Mode = Textract_Call_Mode.DEFAULT,
-    boto3_textract_client=None,
-    job_done_polling_interval=1,
-    mime_type: str = None, 
-) -> dict:
+    mime_type: str = None,
+) -> Tuple[Optional[str], dict, Optional[Textract_API]]:
     """
-    calls Textract and returns a response (either full json as string (json.dumps)or the job_id when return_job_id=True)
-    In case of TIFF the default is calling sync, so if a multi-page TIFF is
-    passed in the caller has to set force_async_api=True or will get
-    a botocore.errorfactory.UnsupportedDocumentException
-
-    input_document: points to document on S3 when string starts with s3://
-                    points to local file when string does not start with s3://
-                    or bytearray when object is in memory
-    s3_output_url: s3 output location in the form of s3://<bucket>/<key>
-    return_job_id: return job_id instead of full json in case calling functions handles async process flow
-    force_async_api: when passing in an image default is to call sync API,
-    this forces the async API to be called (input-document has to be on S3)
-    client_request_token: passed down to Textract API
-    job_tag: passed down to Textract API
-    boto_3_textract_client: pass in boto3 client (to overcome missing region in environmnent, e. g.)
-    job_done_polling_interval: when using async (pdf document of force_async_api,
-    mime_type: will set the "file extension". [ 'application/pdf', 'image/png', 'image/jpeg', 'image/tiff' ]
-    the implementation polls every x seconds (1 second by default))
-    returns: dict with either Textract response or async API response (incl. the JobId)
-    raises LimitExceededException when receiving LimitExceededException from Textract API.
-    Expectation is to handle in calling function
+    decides which Textract API call_textract uses and builds its parameters
+    returns: (client method name, parameters, Textract_API of the job for async calls or None for sync calls)
+    the method name is None when no API applies to the input_document
     """
-    logger.debug("call_textract")
-    if not boto3_textract_client:
-        textract = boto3.client("textract")
-    else:
-        textract = boto3_textract_client
     is_s3_document: bool = False
     s3_bucket = ""
     s3_key = ""
-    result_value = {}
     force_sync_api = False
     if call_mode == Textract_Call_Mode.FORCE_SYNC:
         force_sync_api = True
@@ -625,24 +717,10 @@ def call_textract(
 
             if features:
                 logger.debug(f"calling start_document_analysis with: {features}")
-                textract_api = Textract_API.ANALYZE
-                submission_status = textract.start_document_analysis(**params)
+                return "start_document_analysis", params, Textract_API.ANALYZE
             else:
                 logger.debug(f"calling start_document_text_detection")
-                textract_api = Textract_API.DETECT
-                submission_status = textract.start_document_text_detection(**params)
-            if submission_status["ResponseMetadata"]["HTTPStatusCode"] == 200:
-                if return_job_id:
-                    return submission_status
-                else:
-                    result_value = get_full_json(
-                        submission_status["JobId"],
-                        textract_api=textract_api,
-                        boto3_textract_client=textract,
-                        job_done_polling_interval=job_done_polling_interval,
-                    )
-            else:
-                raise Exception(f"Got non-200 response code: {submission_status}")
+                return "start_document_text_detection", params, Textract_API.DETECT
         # SYNC
         elif ext in sync_suffixes or force_sync_api:
             # s3 file
@@ -656,25 +734,18 @@ def call_textract(
                     kms_key_id=kms_key_id,
                     notification_channel=notification_channel,
                 )
-                if features:
-                    result_value = textract.analyze_document(**params)
-                else:
-                    result_value = textract.detect_document_text(**params)
             # local file
             else:
                 with open(input_document, "rb") as input_file:
                     doc_bytes: bytearray = bytearray(input_file.read())
-                    params = generate_request_params(
-                        document=Document(byte_data=doc_bytes),
-                        features=features,
-                        queries_config=queries_config,
-                        adapters_config=adapters_config,
-                    )
-
-                    if features:
-                        result_value = textract.analyze_document(**params)
-                    else:
-                        result_value = textract.detect_document_text(**params)
+                params = generate_request_params(
+                    document=Document(byte_data=doc_bytes),
+                    features=features,
+                    queries_config=queries_config,
+                    adapters_config=adapters_config,
+                )
+            return ("analyze_document" if features else "detect_document_text"), params, None
+        return None, {}, None
 
     # got bytearray, calling sync API
     elif isinstance(input_document, (bytes, bytearray)):
@@ -687,14 +758,153 @@ def call_textract(
             queries_config=queries_config,
             adapters_config=adapters_config,
         )
-        if features:
-            result_value = textract.analyze_document(**params)
-        else:
-            result_value = textract.detect_document_text(**params)
+        return ("analyze_document" if features else "detect_document_text"), params, None
     else:
         raise ValueError(f"unsupported input_document type: {type(input_document)}")
 
-    return result_value
+
+def _call_textract_api(
+    textract,
+    method: str,
+    params: dict,
+    textract_api: Optional[Textract_API],
+    return_job_id: bool = False,
+    job_done_polling_interval=1,
+    response_cache: Optional[ResponseCache] = None,
+    request: Optional[ThrottledCaller] = None,
+) -> dict:
+    """
+    calls the client method of a request built by _textract_request or _textract_expense_request
+    and waits for the job of asynchronous calls unless return_job_id
+    requests with more queries than Textract takes are split into shards called concurrently, see t_query_shards
+    request: ThrottledCaller making the call within the TPS budget of the shards, the client is called directly if None
+    """
+    cache_key = None
+    if response_cache is not None and not return_job_id:
+        cache_key = response_cache.key(method, params)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    shards = shard_request_params(params, MAX_ASYNC_QUERIES if textract_api else MAX_SYNC_QUERIES)
+    # QUERY SHARDS
+    if len(shards) > 1:
+        if return_job_id:
+            raise ValueError(
+                f"{len(params['QueriesConfig']['Queries'])} queries need {len(shards)} jobs, "
+                f"return_job_id requires at most {MAX_ASYNC_QUERIES} queries"
+            )
+        logger.debug(f"{method} with {len(shards)} query shards")
+        shard_request = ThrottledCaller(textract, ASYNC_SHARD_TPS if textract_api else SYNC_SHARD_TPS)
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            responses = list(
+                executor.map(
+                    lambda shard_params: _call_textract_api(
+                        textract,
+                        method,
+                        shard_params,
+                        textract_api,
+                        job_done_polling_interval=job_done_polling_interval,
+                        request=shard_request,
+                    ),
+                    shards,
+                )
+            )
+        response = merge_query_responses(responses)
+    # SYNC
+    elif not textract_api:
+        response = request(method, **params) if request else getattr(textract, method)(**params)
+    # ASYNC
+    else:
+        submission_status = request(method, **params) if request else getattr(textract, method)(**params)
+        if submission_status["ResponseMetadata"]["HTTPStatusCode"] != 200:
+            raise Exception(f"Got non-200 response code: {submission_status}")
+        if return_job_id:
+            return submission_status
+        response = get_full_json(
+            submission_status["JobId"],
+            textract_api=textract_api,
+            boto3_textract_client=textract,
+            job_done_polling_interval=job_done_polling_interval,
+        )
+    if cache_key is not None:
+        response_cache.put(cache_key, response)
+    return response
+
+
+def call_textract(
+    input_document: Union[str, bytes],
+    features: Optional[List[Textract_Features]] = None,
+    queries_config: Optional[QueriesConfig] = None,
+    output_config: Optional[OutputConfig] = None,
+    adapters_config: Optional[AdaptersConfig] = None,
+    kms_key_id: str = "",
+    job_tag: str = "",
+    notification_channel: Optional[NotificationChannel] = None,
+    client_request_token: str = "",
+    return_job_id: bool = False,
+    force_async_api: bool = False,
+    call_mode: Textract_Call_Mode = Textract_Call_Mode.DEFAULT,
+    boto3_textract_client=None,
+    job_done_polling_interval=1,
+    mime_type: str = None, 
+    response_cache: Optional[ResponseCache] = None,
+) -> dict:
+    """
+    calls Textract and returns a response (either full json as string (json.dumps)or the job_id when return_job_id=True)
+    In case of TIFF the default is calling sync, so if a multi-page TIFF is
+    passed in the caller has to set force_async_api=True or will get
+    a botocore.errorfactory.UnsupportedDocumentException
+
+    input_document: points to document on S3 when string starts with s3://
+                    points to local file when string does not start with s3://
+                    or bytearray when object is in memory
+    s3_output_url: s3 output location in the form of s3://<bucket>/<key>
+    return_job_id: return job_id instead of full json in case calling functions handles async process flow
+    force_async_api: when passing in an image default is to call sync API,
+    this forces the async API to be called (input-document has to be on S3)
+    client_request_token: passed down to Textract API
+    job_tag: passed down to Textract API
+    boto_3_textract_client: pass in boto3 client (to overcome missing region in environmnent, e. g.)
+    job_done_polling_interval: when using async (pdf document of force_async_api,
+    mime_type: will set the "file extension". [ 'application/pdf', 'image/png', 'image/jpeg', 'image/tiff' ]
+    the implementation polls every x seconds (1 second by default))
+    response_cache: ResponseCache returning the stored response of a document already processed with the same
+    configuration instead of calling Textract, ignored when return_job_id=True
+    returns: dict with either Textract response or async API response (incl. the JobId)
+    raises LimitExceededException when receiving LimitExceededException from Textract API.
+    Expectation is to handle in calling function
+    """
+    logger.debug("call_textract")
+    if not boto3_textract_client:
+        textract = get_client("textract")
+    else:
+        textract = boto3_textract_client
+    method, params, textract_api = _textract_request(
+        input_document=input_document,
+        features=features,
+        queries_config=queries_config,
+        output_config=output_config,
+        adapters_config=adapters_config,
+        kms_key_id=kms_key_id,
+        job_tag=job_tag,
+        notification_channel=notification_channel,
+        client_request_token=client_request_token,
+        return_job_id=return_job_id,
+        force_async_api=force_async_api,
+        call_mode=call_mode,
+        mime_type=mime_type,
+    )
+    if not method:
+        return {}
+    return _call_textract_api(
+        textract,
+        method,
+        params,
+        textract_api,
+        return_job_id=return_job_id,
+        job_done_polling_interval=job_done_polling_interval,
+        response_cache=response_cache,
+    )
 
 
 @dataclass
@@ -725,20 +935,8 @@ def generate_analyzeid_request_params(document_pages: List[DocumentPage]) -> dic
     return params
 
 
-def call_textract_analyzeid(
-    document_pages: List[Union[str, bytes]],
-    boto3_textract_client=None,
-) -> dict:
-    """
-    calls Textract AnalyzeId and returns a response (either full json as string (json.dumps)or the job_id when return_job_id=True)
-    AnalyzeId endpoint only supports syncronize call so far
-
-    document_pages:
-
-    returns: dict with either Textract AnalyzeId response
-    """
-    logger.debug("call_textract_analyzeid")
-
+def _textract_analyzeid_request(document_pages: List[Union[str, bytes]]) -> dict:
+    """returns the AnalyzeID parameters, shared by call_textract_analyzeid and acall_textract_analyzeid"""
     # checks
     if not document_pages:
         raise ValueError("empty document_pages")
@@ -749,11 +947,6 @@ def call_textract_analyzeid(
     elif len(document_pages) < 1:
         raise ValueError("no document_pages received.")
 
-    if not boto3_textract_client:
-        textract = boto3.client("textract")
-    else:
-        textract = boto3_textract_client
-
     document_pages_param: List[DocumentPage] = list()
     for input_document in document_pages:
         if isinstance(input_document, str):
@@ -778,12 +971,34 @@ def call_textract_analyzeid(
             logger.debug("processing bytes or bytearray")
             document_pages_param.append(DocumentPage(byte_data=bytes(input_document)))
 
-    params = generate_analyzeid_request_params(document_pages=document_pages_param)
+    return generate_analyzeid_request_params(document_pages=document_pages_param)
+
+
+def call_textract_analyzeid(
+    document_pages: List[Union[str, bytes]],
+    boto3_textract_client=None,
+) -> dict:
+    """
+    calls Textract AnalyzeId and returns a response (either full json as string (json.dumps)or the job_id when return_job_id=True)
+    AnalyzeId endpoint only supports syncronize call so far
+
+    document_pages:
+
+    returns: dict with either Textract AnalyzeId response
+    """
+    logger.debug("call_textract_analyzeid")
+
+    params = _textract_analyzeid_request(document_pages)
+
+    if not boto3_textract_client:
+        textract = get_client("textract")
+    else:
+        textract = boto3_textract_client
 
     return textract.analyze_id(**params)
 
 
-def call_textract_expense(
+def _textract_expense_request(
     input_document: Union[str, bytes],
     output_config: Optional[OutputConfig] = None,
     kms_key_id: str = "",
@@ -792,18 +1007,15 @@ def call_textract_expense(
     client_request_token: str = "",
     return_job_id: bool = False,
     force_async_api: bool = False,
-    boto3_textract_client=None,
-    job_done_polling_interval=1,
-) -> dict:
-    logger.debug("call_textract_expense")
-    if not boto3_textract_client:
-        textract = boto3.client("textract")
-    else:
-        textract = boto3_textract_client
+) -> Tuple[Optional[str], dict, Optional[Textract_API]]:
+    """
+    decides which Textract API call_textract_expense uses and builds its parameters
+    returns: (client method name, parameters, Textract_API of the job for async calls or None for sync calls)
+    the method name is None when no API applies to the input_document
+    """
     is_s3_document: bool = False
     s3_bucket = ""
     s3_key = ""
-    result_value = {}
     if isinstance(input_document, str):
         if len(input_document) > 7 and input_document.lower().startswith("s3://"):
             is_s3_document = True
@@ -840,20 +1052,7 @@ def call_textract_expense(
                 client_request_token=client_request_token,
                 job_tag=job_tag,
             )
-            textract_api = Textract_API.EXPENSE
-            submission_status = textract.start_expense_analysis(**params)
-            if submission_status["ResponseMetadata"]["HTTPStatusCode"] == 200:
-                if return_job_id:
-                    return submission_status
-                else:
-                    result_value = get_full_json(
-                        submission_status["JobId"],
-                        textract_api=textract_api,
-                        boto3_textract_client=textract,
-                        job_done_polling_interval=job_done_polling_interval,
-                    )
-            else:
-                raise Exception(f"Got non-200 response code: {submission_status}")
+            return "start_expense_analysis", params, Textract_API.EXPENSE
 
         elif ext in sync_suffixes:
             # s3 file
@@ -864,16 +1063,15 @@ def call_textract_expense(
                     kms_key_id=kms_key_id,
                     notification_channel=notification_channel,
                 )
-                result_value = textract.analyze_expense(**params)
             # local file
             else:
                 with open(input_document, "rb") as input_file:
                     doc_bytes: bytearray = bytearray(input_file.read())
-                    params = generate_request_params(
-                        document=Document(byte_data=doc_bytes)
-                    )
-
-                    result_value = textract.analyze_expense(**params)
+                params = generate_request_params(
+                    document=Document(byte_data=doc_bytes)
+                )
+            return "analyze_expense", params, None
+        return None, {}, None
 
     # got bytearray, calling sync API
     elif isinstance(input_document, (bytes, bytearray)):
@@ -881,8 +1079,47 @@ def call_textract_expense(
         if force_async_api:
             raise Exception("cannot run async for bytearray")
         params = generate_request_params(document=Document(byte_data=input_document))
-        result_value = textract.analyze_expense(**params)
+        return "analyze_expense", params, None
     else:
         raise ValueError(f"unsupported input_document type: {type(input_document)}")
 
-    return result_value
+
+def call_textract_expense(
+    input_document: Union[str, bytes],
+    output_config: Optional[OutputConfig] = None,
+    kms_key_id: str = "",
+    job_tag: str = "",
+    notification_channel: Optional[NotificationChannel] = None,
+    client_request_token: str = "",
+    return_job_id: bool = False,
+    force_async_api: bool = False,
+    boto3_textract_client=None,
+    job_done_polling_interval=1,
+    response_cache: Optional[ResponseCache] = None,
+) -> dict:
+    logger.debug("call_textract_expense")
+    if not boto3_textract_client:
+        textract = get_client("textract")
+    else:
+        textract = boto3_textract_client
+    method, params, textract_api = _textract_expense_request(
+        input_document=input_document,
+        output_config=output_config,
+        kms_key_id=kms_key_id,
+        job_tag=job_tag,
+        notification_channel=notification_channel,
+        client_request_token=client_request_token,
+        return_job_id=return_job_id,
+        force_async_api=force_async_api,
+    )
+    if not method:
+        return {}
+    return _call_textract_api(
+        textract,
+        method,
+        params,
+        textract_api,
+        return_job_id=return_job_id,
+        job_done_polling_interval=job_done_polling_interval,
+        response_cache=response_cache,
+    )
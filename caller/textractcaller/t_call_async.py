@@ -0,0 +1,391 @@
+"""
+asyncio variants of the calls in t_call. They take the same parameters, build the same requests and return the same
+responses, but they can be awaited and wait for async jobs with asyncio.sleep, so that many documents can be processed
+concurrently from a single event loop.
+
+A client whose methods are coroutines (for example an aiobotocore client) is used as is, any other client (a boto3
+client) is wrapped in an AsyncClientAdapter that runs each call in a thread pool.
+"""
+import asyncio
+import functools
+import inspect
+import logging
+from concurrent.futures import Executor
+from typing import List, Optional, Union
+
+from textractcaller.t_cache import ResponseCache
+from textractcaller.t_call import (
+    AdaptersConfig,
+    NotificationChannel,
+    OutputConfig,
+    QueriesConfig,
+    Textract_API,
+    Textract_Call_Mode,
+    Textract_Features,
+    _textract_analyzeid_request,
+    _textract_expense_request,
+    _textract_lending_request,
+    _textract_request,
+)
+from textractcaller.t_clients import get_client
+from textractcaller.t_query_shards import (
+    ASYNC_SHARD_TPS,
+    MAX_ASYNC_QUERIES,
+    MAX_SYNC_QUERIES,
+    SYNC_SHARD_TPS,
+    merge_query_responses,
+    shard_request_params,
+)
+from textractcaller.t_throttling import ThrottledCaller
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncClientAdapter:
+    """
+    exposes the methods of a boto3 client as coroutines, each call runs in executor
+    (the default thread pool of the event loop when executor is None)
+    """
+
+    def __init__(self, client, executor: Optional[Executor] = None):
+        self.client = client
+        self.executor = executor
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+        if not callable(method):
+            return method
+
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(method, *args, **kwargs))
+
+        return call
+
+
+def is_async_client(client) -> bool:
+    """returns True when the methods of client are coroutines (aiobotocore or AsyncClientAdapter)"""
+    return isinstance(client, AsyncClientAdapter) or inspect.iscoroutinefunction(
+        getattr(client, "_make_api_call", None)
+    )
+
+
+def get_async_client(boto3_textract_client=None, executor: Optional[Executor] = None):
+    """
+    returns a client with awaitable methods for boto3_textract_client
+    a new boto3 Textract client is created when boto3_textract_client is None
+    """
+    if not boto3_textract_client:
+        boto3_textract_client = get_client("textract")
+    if is_async_client(boto3_textract_client):
+        return boto3_textract_client
+    return AsyncClientAdapter(boto3_textract_client, executor=executor)
+
+
+async def aget_job_response(
+    job_id: str = "",
+    textract_api: Textract_API = Textract_API.DETECT,
+    extra_args=None,
+    boto3_textract_client=None,
+):
+    if not boto3_textract_client:
+        raise ValueError("Need boto3_textract_client")
+    textract = get_async_client(boto3_textract_client)
+    if extra_args == None:
+        extra_args = {}
+    if textract_api == Textract_API.DETECT:
+        return await textract.get_document_text_detection(JobId=job_id, **extra_args)
+    elif textract_api == Textract_API.EXPENSE:
+        return await textract.get_expense_analysis(JobId=job_id, **extra_args)
+    else:
+        return await textract.get_document_analysis(JobId=job_id, **extra_args)
+
+
+async def aget_full_json(
+    job_id: str = "",
+    textract_api: Textract_API = Textract_API.DETECT,
+    boto3_textract_client=None,
+    job_done_polling_interval=1,
+) -> dict:
+    """returns full json for call, even when response is chunked, waits for the job with asyncio.sleep"""
+    logger.debug(f"aget_full_json: job_id: {job_id}, Textract_API: {textract_api.name}")
+    textract = get_async_client(boto3_textract_client)
+    job_response = await aget_job_response(
+        job_id=job_id,
+        textract_api=textract_api,
+        boto3_textract_client=textract,
+    )
+    job_status = job_response["JobStatus"]
+    while job_status == "IN_PROGRESS":
+        await asyncio.sleep(job_done_polling_interval)
+        job_response = await aget_job_response(
+            job_id=job_id,
+            textract_api=textract_api,
+            boto3_textract_client=textract,
+        )
+        job_status = job_response["JobStatus"]
+    if job_status == "SUCCEEDED":
+        # the first page of results is the response that reported SUCCEEDED
+        result_value = job_response
+        extra_args = {}
+        while "NextToken" in job_response:
+            logger.debug(f"got next token {job_response['NextToken']}")
+            extra_args["NextToken"] = job_response["NextToken"]
+            job_response = await aget_job_response(
+                job_id=job_id,
+                textract_api=textract_api,
+                extra_args=extra_args,
+                boto3_textract_client=textract,
+            )
+            result_value["Blocks"].extend(job_response["Blocks"])
+        if "NextToken" in result_value:
+            del result_value["NextToken"]
+        return result_value
+    else:
+        logger.error(f"{job_response}")
+        raise Exception(
+            f"job_status not SUCCEEDED. job_status: {job_status}, message: {job_response['StatusMessage']}"
+        )
+
+
+async def aget_full_json_lending(
+    job_id: str, boto3_textract_client, job_done_polling_interval=1
+) -> dict:
+    """returns full json for call, even when response is chunked, waits for the job with asyncio.sleep"""
+    logger.debug(f"aget_full_json_lending: job_id: {job_id}")
+    textract = get_async_client(boto3_textract_client)
+    job_response = await textract.get_lending_analysis(JobId=job_id)
+    while job_response["JobStatus"] == "IN_PROGRESS":
+        await asyncio.sleep(job_done_polling_interval)
+        job_response = await textract.get_lending_analysis(JobId=job_id)
+    if job_response["JobStatus"] == "SUCCEEDED":
+        result_value = job_response
+        extra_args = {}
+        while "NextToken" in job_response:
+            extra_args["NextToken"] = job_response["NextToken"]
+            job_response = await textract.get_lending_analysis(JobId=job_id, **extra_args)
+            result_value["Results"].extend(job_response["Results"])
+        if "NextToken" in result_value:
+            del result_value["NextToken"]
+        return result_value
+    else:
+        logger.error(f"{job_response}")
+        raise Exception(
+            f"job_status not SUCCEEDED. job_status: {job_response['JobStatus']}, message: {job_response['StatusMessage']}"
+        )
+
+
+async def _acall(
+    textract,
+    method: Optional[str],
+    params: dict,
+    textract_api: Optional[Textract_API],
+    return_job_id: bool,
+    job_done_polling_interval,
+    response_cache: Optional[ResponseCache] = None,
+    executor: Optional[Executor] = None,
+) -> dict:
+    if not method:
+        return {}
+    cache_key = None
+    if response_cache is not None and not return_job_id:
+        cache_key = await _abuild(executor, response_cache.key, method, params)
+        cached = await _abuild(executor, response_cache.get, cache_key)
+        if cached is not None:
+            return cached
+    response = await _acall_uncached(textract, method, params, textract_api, return_job_id, job_done_polling_interval)
+    if cache_key is not None:
+        await _abuild(executor, response_cache.put, cache_key, response)
+    return response
+
+
+async def _acall_uncached(
+    textract,
+    method: str,
+    params: dict,
+    textract_api: Optional[Textract_API],
+    return_job_id: bool,
+    job_done_polling_interval,
+    request: Optional[ThrottledCaller] = None,
+) -> dict:
+    shards = shard_request_params(params, MAX_ASYNC_QUERIES if textract_api else MAX_SYNC_QUERIES)
+    # QUERY SHARDS
+    if len(shards) > 1:
+        if return_job_id:
+            raise ValueError(
+                f"{len(params['QueriesConfig']['Queries'])} queries need {len(shards)} jobs, "
+                f"return_job_id requires at most {MAX_ASYNC_QUERIES} queries"
+            )
+        shard_request = ThrottledCaller(textract, ASYNC_SHARD_TPS if textract_api else SYNC_SHARD_TPS)
+        responses = await asyncio.gather(
+            *(
+                _acall_uncached(
+                    textract, method, shard_params, textract_api, False, job_done_polling_interval, shard_request
+                )
+                for shard_params in shards
+            )
+        )
+        return merge_query_responses(list(responses))
+    # SYNC
+    if not textract_api:
+        return await (request.acall(method, **params) if request else getattr(textract, method)(**params))
+    # ASYNC
+    submission_status = await (request.acall(method, **params) if request else getattr(textract, method)(**params))
+    if submission_status["ResponseMetadata"]["HTTPStatusCode"] == 200:
+        if return_job_id:
+            return submission_status
+        return await aget_full_json(
+            submission_status["JobId"],
+            textract_api=textract_api,
+            boto3_textract_client=textract,
+            job_done_polling_interval=job_done_polling_interval,
+        )
+    else:
+        raise Exception(f"Got non-200 response code: {submission_status}")
+
+
+async def _abuild(executor: Optional[Executor], build, *args, **kwargs):
+    """the request builders and the response caches read files, they run in executor to not block the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(build, *args, **kwargs))
+
+
+async def acall_textract(
+    input_document: Union[str, bytes],
+    features: Optional[List[Textract_Features]] = None,
+    queries_config: Optional[QueriesConfig] = None,
+    output_config: Optional[OutputConfig] = None,
+    adapters_config: Optional[AdaptersConfig] = None,
+    kms_key_id: str = "",
+    job_tag: str = "",
+    notification_channel: Optional[NotificationChannel] = None,
+    client_request_token: str = "",
+    return_job_id: bool = False,
+    force_async_api: bool = False,
+    call_mode: Textract_Call_Mode = Textract_Call_Mode.DEFAULT,
+    boto3_textract_client=None,
+    job_done_polling_interval=1,
+    mime_type: str = None,
+    executor: Optional[Executor] = None,
+    response_cache: Optional[ResponseCache] = None,
+) -> dict:
+    """
+    awaitable call_textract, see call_textract for the parameters
+    boto3_textract_client: boto3 client (called in executor) or client with coroutine methods like aiobotocore
+    executor: executor running the boto3 calls, the file reads and the response cache, the default executor of the
+    loop when None
+    """
+    logger.debug("acall_textract")
+    textract = get_async_client(boto3_textract_client, executor=executor)
+    method, params, textract_api = await _abuild(
+        executor,
+        _textract_request,
+        input_document=input_document,
+        features=features,
+        queries_config=queries_config,
+        output_config=output_config,
+        adapters_config=adapters_config,
+        kms_key_id=kms_key_id,
+        job_tag=job_tag,
+        notification_channel=notification_channel,
+        client_request_token=client_request_token,
+        return_job_id=return_job_id,
+        force_async_api=force_async_api,
+        call_mode=call_mode,
+        mime_type=mime_type,
+    )
+    return await _acall(
+        textract,
+        method,
+        params,
+        textract_api,
+        return_job_id,
+        job_done_polling_interval,
+        response_cache=response_cache,
+        executor=executor,
+    )
+
+
+async def acall_textract_expense(
+    input_document: Union[str, bytes],
+    output_config: Optional[OutputConfig] = None,
+    kms_key_id: str = "",
+    job_tag: str = "",
+    notification_channel: Optional[NotificationChannel] = None,
+    client_request_token: str = "",
+    return_job_id: bool = False,
+    force_async_api: bool = False,
+    boto3_textract_client=None,
+    job_done_polling_interval=1,
+    executor: Optional[Executor] = None,
+    response_cache: Optional[ResponseCache] = None,
+) -> dict:
+    """awaitable call_textract_expense, see acall_textract for boto3_textract_client and executor"""
+    logger.debug("acall_textract_expense")
+    textract = get_async_client(boto3_textract_client, executor=executor)
+    method, params, textract_api = await _abuild(
+        executor,
+        _textract_expense_request,
+        input_document=input_document,
+        output_config=output_config,
+        kms_key_id=kms_key_id,
+        job_tag=job_tag,
+        notification_channel=notification_channel,
+        client_request_token=client_request_token,
+        return_job_id=return_job_id,
+        force_async_api=force_async_api,
+    )
+    return await _acall(
+        textract,
+        method,
+        params,
+        textract_api,
+        return_job_id,
+        job_done_polling_interval,
+        response_cache=response_cache,
+        executor=executor,
+    )
+
+
+async def acall_textract_analyzeid(
+    document_pages: List[Union[str, bytes]],
+    boto3_textract_client=None,
+    executor: Optional[Executor] = None,
+) -> dict:
+    """awaitable call_textract_analyzeid, see acall_textract for boto3_textract_client and executor"""
+    logger.debug("acall_textract_analyzeid")
+    textract = get_async_client(boto3_textract_client, executor=executor)
+    params = await _abuild(executor, _textract_analyzeid_request, document_pages)
+    return await textract.analyze_id(**params)
+
+
+async def acall_textract_lending(
+    input_document: str,
+    client_request_token: str = "",
+    job_tag: str = "",
+    notification_channel: Optional[NotificationChannel] = None,
+    output_config: Optional[OutputConfig] = None,
+    kms_key_id: str = "",
+    return_job_id: bool = False,
+    job_done_polling_interval=1,
+    boto3_textract_client=None,
+    executor: Optional[Executor] = None,
+):
+    """awaitable call_textract_lending, see acall_textract for boto3_textract_client and executor"""
+    params = _textract_lending_request(
+        input_document=input_document,
+        client_request_token=client_request_token,
+        job_tag=job_tag,
+        notification_channel=notification_channel,
+        output_config=output_config,
+        kms_key_id=kms_key_id,
+    )
+    textract = get_async_client(boto3_textract_client, executor=executor)
+    submission_status = await textract.start_lending_analysis(**params)
+    if return_job_id:
+        return submission_status
+    return await aget_full_json_lending(
+        submission_status["JobId"],
+        boto3_textract_client=textract,
+        job_done_polling_interval=job_done_polling_interval,
+    )
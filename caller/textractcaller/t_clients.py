@@ -0,0 +1,123 @@
+"""
+Process-wide registry of boto3 clients.
+
+Creating a boto3 client takes 50 to 200 ms (loading the service model, resolving the endpoint and the credentials) and
+each client has its own connection pool, so a client created per call pays that cost every time and never reuses a
+connection. get_client returns one client per service, region and profile for the whole process, created on first use
+with a tuned botocore configuration: a connection pool large enough for the thread pools of the package, TCP
+keep-alive and the standard retry mode. The clients are thread safe once created.
+
+The registry is fork safe: a child process (multiprocessing with fork) starts with an empty registry instead of
+sharing the connections of its parent.
+"""
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+# the default ThreadPoolExecutor size, the thread pools of the package are at most that large
+DEFAULT_MAX_POOL_CONNECTIONS = max(10, min(32, (os.cpu_count() or 1) + 4))
+
+_settings = {
+    "max_pool_connections": DEFAULT_MAX_POOL_CONNECTIONS,
+    "tcp_keepalive": True,
+    "retry_mode": "standard",
+    "max_attempts": 5,
+}
+_lock = threading.Lock()
+_sessions: Dict[Tuple[Optional[str], Optional[str]], boto3.session.Session] = {}
+_clients: Dict[Tuple[str, Optional[str], Optional[str]], object] = {}
+_pid = os.getpid()
+
+
+def client_config() -> Config:
+    """returns the botocore Config of the clients of the registry"""
+    return Config(
+        max_pool_connections=_settings["max_pool_connections"],
+        tcp_keepalive=_settings["tcp_keepalive"],
+        retries={"mode": _settings["retry_mode"], "max_attempts": _settings["max_attempts"]},
+    )
+
+
+def configure_clients(
+    max_pool_connections: Optional[int] = None,
+    tcp_keepalive: Optional[bool] = None,
+    retry_mode: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+):
+    """
+    changes the configuration of the clients created from now on, the clients already created are dropped
+    max_pool_connections: size of the connection pool of each client, at least the number of threads sharing a client
+    tcp_keepalive: TCP keep-alive on the connections
+    retry_mode: botocore retry mode, "standard", "adaptive" or "legacy"
+    max_attempts: attempts of each call, the first one included
+    """
+    updates = {
+        "max_pool_connections": max_pool_connections,
+        "tcp_keepalive": tcp_keepalive,
+        "retry_mode": retry_mode,
+        "max_attempts": max_attempts,
+    }
+    with _lock:
+        _settings.update({name: value for name, value in updates.items() if value is not None})
+        _clients.clear()
+
+
+def reset_clients():
+    """drops all the sessions and clients of the registry, they are created again on next use"""
+    global _pid
+    with _lock:
+        _sessions.clear()
+        _clients.clear()
+        _pid = os.getpid()
+
+
+def _check_pid():
+    # the registry of a parent process is never used in a child, even when the fork hook did not run
+    if _pid != os.getpid():
+        reset_clients()
+
+
+def get_session(profile_name: Optional[str] = None, region_name: Optional[str] = None) -> boto3.session.Session:
+    """returns the shared boto3 session of a profile and region (None for the defaults of the environment)"""
+    _check_pid()
+    key = (profile_name, region_name)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = boto3.session.Session(profile_name=profile_name, region_name=region_name)
+        return session
+
+
+def get_client(service_name: str, region_name: Optional[str] = None, profile_name: Optional[str] = None):
+    """
+    returns the shared boto3 client of a service, region and profile (None for the defaults of the environment)
+    the client is created on first use with client_config()
+    """
+    _check_pid()
+    key = (service_name, region_name, profile_name)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    session = get_session(profile_name=profile_name, region_name=region_name)
+    with _lock:
+        # sessions are not thread safe, the clients are created one at a time
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = session.client(service_name, region_name=region_name, config=client_config())
+        return client
+
+
+def _after_fork():
+    global _lock, _pid
+    # another thread of the parent may have held the lock when forking
+    _lock = threading.Lock()
+    _sessions.clear()
+    _clients.clear()
+    _pid = os.getpid()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
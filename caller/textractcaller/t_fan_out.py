@@ -0,0 +1,144 @@
+"""
+Synchronous fan-out for short multi-page documents.
+
+An asynchronous job spends tens of seconds in the queue, while the synchronous APIs answer a single page in a couple of
+seconds. For documents of a few pages, calling AnalyzeDocument (or DetectDocumentText) on every page concurrently and
+stitching the responses is much faster. call_textract_pages takes the pages as single-page documents (images or
+single-page PDFs, split by the caller), calls the synchronous API on each within a TPS budget, and returns one
+response in the shape of a multi-page response: Page numbers follow the order of the pages, Block ids are unique and
+DocumentMetadata counts all the pages.
+
+Queries and adapters restricted to some pages ("Pages": ["2", "4-*"]) are only sent with these pages. A page with
+more queries than AnalyzeDocument takes is analyzed with one request per query shard, see t_query_shards.
+"""
+import copy
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from textractcaller.t_call import (
+    AdaptersConfig,
+    Document,
+    QueriesConfig,
+    Textract_Features,
+    generate_request_params,
+)
+from textractcaller.t_clients import get_client
+from textractcaller.t_query_shards import MAX_SYNC_QUERIES, merge_query_responses, shard_request_params
+from textractcaller.t_throttling import ThrottledCaller
+
+logger = logging.getLogger(__name__)
+
+
+def _pages_match(pages: List[str], page_number: int) -> bool:
+    """whether a Pages list of a query or adapter ("1", "2-5", "3-*", "*") includes page_number"""
+    for page_range in pages:
+        first, _, last = page_range.partition("-")
+        if first == "*":
+            return True
+        if not last:
+            last = first
+        if int(first) <= page_number and (last == "*" or page_number <= int(last)):
+            return True
+    return False
+
+
+def page_request_params(
+    page: bytes,
+    page_number: int,
+    features: Optional[List[Textract_Features]] = None,
+    queries_config: Optional[QueriesConfig] = None,
+    adapters_config: Optional[AdaptersConfig] = None,
+) -> dict:
+    """
+    returns the parameters of the synchronous request for one page of a split document
+    queries and adapters are kept when they apply to page_number, without their Pages (each request has one page)
+    """
+    params = generate_request_params(
+        document=Document(byte_data=page),
+        features=features,
+        queries_config=queries_config,
+        adapters_config=adapters_config,
+    )
+    for config_name, items_name in (("QueriesConfig", "Queries"), ("AdaptersConfig", "Adapters")):
+        if config_name not in params:
+            continue
+        items = []
+        for item in params[config_name][items_name]:
+            if "Pages" in item and not _pages_match(item["Pages"], page_number):
+                continue
+            items.append({k: v for k, v in item.items() if k != "Pages"})
+        if items:
+            params[config_name] = {items_name: items}
+        else:
+            del params[config_name]
+    query_feature = Textract_Features.QUERIES.name
+    if "FeatureTypes" in params and "QueriesConfig" not in params and query_feature in params["FeatureTypes"]:
+        # no query for this page
+        params["FeatureTypes"] = [f for f in params["FeatureTypes"] if f != query_feature]
+        if not params["FeatureTypes"]:
+            del params["FeatureTypes"]
+    return params
+
+
+def merge_page_responses(responses: List[dict]) -> dict:
+    """
+    stitches the responses of single-page requests into one multi-page response
+    the blocks of responses[i] get Page i + 1, ids already used by a previous page are replaced (with their references)
+    """
+    merged: dict = {"DocumentMetadata": {"Pages": len(responses)}, "Blocks": []}
+    seen_ids = set()
+    for page_number, response in enumerate(responses, start=1):
+        for key, value in response.items():
+            if key not in ("Blocks", "DocumentMetadata", "ResponseMetadata") and key not in merged:
+                merged[key] = value
+        blocks = copy.deepcopy(response.get("Blocks", []))
+        renamed = {
+            block["Id"]: str(uuid.uuid5(uuid.NAMESPACE_OID, f"{page_number}:{block['Id']}"))
+            for block in blocks
+            if block["Id"] in seen_ids
+        }
+        for block in blocks:
+            block["Page"] = page_number
+            block["Id"] = renamed.get(block["Id"], block["Id"])
+            if renamed:
+                for relationship in block.get("Relationships", []):
+                    relationship["Ids"] = [renamed.get(i, i) for i in relationship["Ids"]]
+            seen_ids.add(block["Id"])
+        merged["Blocks"].extend(blocks)
+    return merged
+
+
+def call_textract_pages(
+    pages: List[bytes],
+    features: Optional[List[Textract_Features]] = None,
+    queries_config: Optional[QueriesConfig] = None,
+    adapters_config: Optional[AdaptersConfig] = None,
+    boto3_textract_client=None,
+    max_workers: int = 8,
+    tps: float = 5,
+    max_retries: int = 5,
+) -> dict:
+    """
+    calls the synchronous API (AnalyzeDocument with features, DetectDocumentText without) on each page concurrently
+    and returns the merged multi-page response, see merge_page_responses
+    pages: single-page documents (image or single-page PDF bytes), in page order
+    max_workers: concurrent requests
+    tps: requests per second shared by all the workers (the quota of the sync API of the account), lowered on throttling
+    max_retries: throttled requests are retried up to max_retries times, other errors are raised right away
+    """
+    textract = boto3_textract_client if boto3_textract_client else get_client("textract")
+    request = ThrottledCaller(textract, tps, max_retries=max_retries)
+
+    def call(page_number: int, page: bytes) -> dict:
+        params = page_request_params(page, page_number, features, queries_config, adapters_config)
+        method = "analyze_document" if "FeatureTypes" in params else "detect_document_text"
+        shards = shard_request_params(params, MAX_SYNC_QUERIES)
+        if len(shards) > 1:
+            return merge_query_responses([request(method, **shard_params) for shard_params in shards])
+        return request(method, **params)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pages)))) as executor:
+        responses = list(executor.map(call, range(1, len(pages) + 1), pages))
+    return merge_page_responses(responses)
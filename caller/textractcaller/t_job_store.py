@@ -0,0 +1,175 @@
+"""
+Durable registry of asynchronous Textract jobs.
+
+The job id returned by a Start* call only lives in the memory of the process that started the job. A JobStore keeps a
+JobRecord of each job (request key, API, features, job id, status, output location) so that a restarted process can
+find the jobs still in progress, wait for them again instead of starting them again, and reuse the job of a request
+already submitted. The request key is the request_key of the response cache: the identity of the document and of the
+request configuration. Only the jobs in progress and the succeeded jobs whose results Textract still keeps
+(RESULT_RETENTION_SECONDS) are reused, a job Textract no longer knows is recorded as EXPIRED.
+
+SQLiteJobStore is the default implementation, other stores (DynamoDB, a database shared by the workers) implement the
+methods of JobStore.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+IN_PROGRESS = "IN_PROGRESS"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+EXPIRED = "EXPIRED"
+
+# Textract keeps the results of an asynchronous job for 7 days after its completion
+RESULT_RETENTION_SECONDS = 7 * 24 * 3600
+
+
+@dataclass
+class JobRecord:
+    """an asynchronous job as recorded in a JobStore"""
+
+    job_id: str
+    textract_api: str  # name of the Textract_API of the job
+    request_key: str
+    input_document: str = ""  # S3 location of the document
+    features: List[str] = field(default_factory=list)
+    output_location: str = ""  # s3://bucket/prefix of the OutputConfig, empty without OutputConfig
+    client_request_token: str = ""
+    status: str = IN_PROGRESS
+    submitted_at: float = 0.0
+    updated_at: float = 0.0
+
+
+def client_request_token(request_key: str, output_location: str = "", attempt: int = 0) -> str:
+    """
+    returns the ClientRequestToken of a request, so that submitting it again returns the job already started
+    output_location: s3://bucket/prefix of the OutputConfig, part of the request parameters Textract compares
+    attempt: number of jobs of the request that failed before, a failed job is not returned again for a new attempt
+    """
+    token = hashlib.sha256(f"{request_key}:{output_location}".encode("utf-8")).hexdigest()
+    # tokens are at most 64 characters of [a-zA-Z0-9-_]
+    return f"{token[:56]}-{attempt}"
+
+
+def is_reusable(record: JobRecord, now: Optional[float] = None) -> bool:
+    """
+    returns True when the job of record can be waited for again: in progress, or succeeded with results still kept
+    now: current time (time.time() when None)
+    """
+    if record.status == IN_PROGRESS:
+        return True
+    if record.status == SUCCEEDED:
+        now = time.time() if now is None else now
+        return now - (record.updated_at or record.submitted_at) < RESULT_RETENTION_SECONDS
+    return False
+
+
+class JobStore(ABC):
+    """interface of the job stores"""
+
+    @abstractmethod
+    def put(self, record: JobRecord):
+        """adds or replaces the record of record.job_id"""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        """returns the record of job_id or None"""
+
+    @abstractmethod
+    def find(self, request_key: str) -> List[JobRecord]:
+        """returns the records of a request, oldest first"""
+
+    @abstractmethod
+    def list(self, status: Optional[str] = None) -> List[JobRecord]:
+        """returns the records with the given status (all the records when None), oldest first"""
+
+    @abstractmethod
+    def update_status(self, job_id: str, status: str):
+        """sets the status of a job, unknown job ids are ignored"""
+
+
+class SQLiteJobStore(JobStore):
+    """
+    job store in a SQLite database file, usable from several threads and processes
+
+    path: database file, created when missing (":memory:" for a store that does not survive the process)
+    """
+
+    _columns = (
+        "job_id",
+        "textract_api",
+        "request_key",
+        "input_document",
+        "features",
+        "output_location",
+        "client_request_token",
+        "status",
+        "submitted_at",
+        "updated_at",
+    )
+
+    def __init__(self, path: str = "textract_jobs.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, textract_api TEXT NOT NULL, request_key TEXT NOT NULL, "
+                "input_document TEXT, features TEXT, output_location TEXT, client_request_token TEXT, "
+                "status TEXT NOT NULL, submitted_at REAL, updated_at REAL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS jobs_request_key ON jobs (request_key)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+
+    def _select(self, where: str = "", args: tuple = ()) -> List[JobRecord]:
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {', '.join(self._columns)} FROM jobs {where} ORDER BY submitted_at, rowid", args
+            ).fetchall()
+        records = []
+        for row in rows:
+            values = dict(zip(self._columns, row))
+            values["features"] = values["features"].split(",") if values["features"] else []
+            records.append(JobRecord(**values))
+        return records
+
+    def put(self, record: JobRecord):
+        now = time.time()
+        if not record.submitted_at:
+            record.submitted_at = now
+        record.updated_at = now
+        values = [getattr(record, column) for column in self._columns]
+        values[self._columns.index("features")] = ",".join(record.features)
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(self._columns)}) "
+                f"VALUES ({', '.join('?' for _ in self._columns)})",
+                values,
+            )
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        records = self._select("WHERE job_id = ?", (job_id,))
+        return records[0] if records else None
+
+    def find(self, request_key: str) -> List[JobRecord]:
+        return self._select("WHERE request_key = ?", (request_key,))
+
+    def list(self, status: Optional[str] = None) -> List[JobRecord]:
+        if status is None:
+            return self._select()
+        return self._select("WHERE status = ?", (status,))
+
+    def update_status(self, job_id: str, status: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?", (status, time.time(), job_id)
+            )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,227 @@
+"""
+Completion notifications of asynchronous Textract jobs.
+
+A job started with a NotificationChannel publishes its completion status to an SNS topic. With an SQS queue subscribed
+to the topic, a NotificationListener long-polls the queue and resolves the future registered for each job id as soon
+as its message arrives, without any Get* call. Given to a JobPoller, the listener makes it fetch the results of a job
+the moment it completes, periodic polling then only remains as a fallback for lost messages.
+"""
+import json
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from textractcaller.t_clients import get_client
+from textractcaller.t_throttling import error_code
+
+logger = logging.getLogger(__name__)
+
+# errors of ReceiveMessage that retrying does not fix, the other errors (throttling, network) are retried
+FATAL_ERRORS = (
+    "AWS.SimpleQueueService.NonExistentQueue",
+    "QueueDoesNotExist",
+    "AccessDenied",
+    "AccessDeniedException",
+    "InvalidClientTokenId",
+    "UnrecognizedClientException",
+)
+
+
+def parse_notification(body: str) -> Optional[dict]:
+    """
+    returns the Textract completion message ({"JobId": ..., "Status": ..., "API": ..., "JobTag": ...}) of an SQS
+    message body, delivered through SNS (JSON envelope with the message in "Message") or with raw message delivery
+    returns None when the body is not a Textract completion message
+    """
+    try:
+        message = json.loads(body)
+        if isinstance(message, dict) and "JobId" not in message and "Message" in message:
+            message = json.loads(message["Message"])
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(message, dict) or "JobId" not in message:
+        return None
+    return message
+
+
+class NotificationListener:
+    """
+    consumes the completion messages of an SQS queue subscribed to the SNS topic of a NotificationChannel
+
+    queue_url: URL of the SQS queue
+    sqs_client: boto3 SQS client, one is created when None
+    wait_time_seconds: long polling duration of each ReceiveMessage call
+    max_messages: messages received per call (at most 10)
+    max_pending: messages kept for jobs not registered yet, a message can arrive before the job is registered
+    background: receives from a daemon thread started on the first registration, otherwise poll_once() has to be called
+    retry_interval, max_retry_interval: bounds in seconds of the exponential backoff after a failed ReceiveMessage call
+    delete_attempts: DeleteMessageBatch calls for the messages that could not be deleted
+
+    messages are deleted from the queue once dispatched to a registered job, messages of other jobs are left
+    to become visible again, so that several listeners can share a queue
+    the background thread retries the failed ReceiveMessage calls, the futures fail on a FATAL_ERRORS error or stop()
+    """
+
+    def __init__(
+        self,
+        queue_url: str,
+        sqs_client=None,
+        wait_time_seconds: int = 20,
+        max_messages: int = 10,
+        max_pending: int = 10000,
+        background: bool = True,
+        retry_interval: float = 1,
+        max_retry_interval: float = 60,
+        delete_attempts: int = 3,
+    ):
+        self.queue_url = queue_url
+        self.sqs = sqs_client if sqs_client else get_client("sqs")
+        self.wait_time_seconds = wait_time_seconds
+        self.max_messages = max_messages
+        self.max_pending = max_pending
+        self.background = background
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.delete_attempts = delete_attempts
+        self._futures: Dict[str, Future] = {}
+        self._pending: Dict[str, tuple] = {}  # job id -> (message, receipt handle) of messages received early
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._wake = threading.Event()  # interrupts the backoff of the background thread on stop()
+
+    def __len__(self) -> int:
+        return len(self._futures)
+
+    def register(self, job_id: str) -> Future:
+        """returns the future of the completion message of job_id, registering a job twice returns the same future"""
+        with self._lock:
+            future = self._futures.get(job_id)
+            if future is not None:
+                return future
+            future = self._futures[job_id] = Future()
+            pending = self._pending.pop(job_id, None)
+            if self.background and pending is None and (self._thread is None or not self._thread.is_alive()):
+                self._stopped = False
+                self._wake.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="textract-notification-listener", daemon=True
+                )
+                self._thread.start()
+        if pending is not None:
+            self._dispatch([pending])
+        return future
+
+    def unregister(self, job_id: str):
+        """stops waiting for the message of job_id, its future is cancelled if still pending"""
+        with self._lock:
+            future = self._futures.pop(job_id, None)
+        if future is not None:
+            future.cancel()
+
+    def poll_once(self) -> int:
+        """receives one batch of messages and dispatches them, returns the number of messages dispatched"""
+        response = self.sqs.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=self.max_messages,
+            WaitTimeSeconds=self.wait_time_seconds,
+        )
+        received = []
+        for sqs_message in response.get("Messages", []):
+            message = parse_notification(sqs_message.get("Body"))
+            if message is None:
+                message_id = sqs_message.get("MessageId")
+                logger.warning(f"ignoring SQS message that is not a Textract notification: {message_id}")
+                continue
+            received.append((message, sqs_message["ReceiptHandle"]))
+        return self._dispatch(received)
+
+    def _dispatch(self, received: List[tuple]) -> int:
+        dispatched = []
+        with self._lock:
+            for message, receipt_handle in received:
+                future = self._futures.pop(message["JobId"], None)
+                if future is None:
+                    if len(self._pending) < self.max_pending:
+                        self._pending[message["JobId"]] = (message, receipt_handle)
+                    continue
+                dispatched.append((future, message, receipt_handle))
+        if dispatched:
+            self._delete([receipt_handle for _, _, receipt_handle in dispatched])
+        for future, message, _ in dispatched:
+            logger.debug(f"notification for job {message['JobId']}: {message.get('Status')}")
+            if future.set_running_or_notify_cancel():
+                future.set_result(message)
+        return len(dispatched)
+
+    def _delete(self, receipt_handles: List[str]):
+        """
+        deletes the messages of receipt_handles from the queue, retrying the entries failing on the side of SQS
+        a message left in the queue only comes back after its visibility timeout, its job is already resolved then
+        """
+        for start in range(0, len(receipt_handles), 10):
+            entries = [{"Id": str(i), "ReceiptHandle": r} for i, r in enumerate(receipt_handles[start : start + 10])]
+            for attempt in range(1, self.delete_attempts + 1):
+                try:
+                    response = self.sqs.delete_message_batch(QueueUrl=self.queue_url, Entries=entries)
+                except Exception as exception:
+                    code = error_code(exception)
+                    failed = [{"Id": entry["Id"], "Code": code, "Message": str(exception)} for entry in entries]
+                else:
+                    failed = (response or {}).get("Failed", [])
+                retried = {f["Id"] for f in failed if not f.get("SenderFault") and attempt < self.delete_attempts}
+                for failure in failed:
+                    if failure["Id"] not in retried:
+                        logger.warning(
+                            f"deleting a message from {self.queue_url} failed: {failure.get('Code')} "
+                            f"{failure.get('Message', '')}"
+                        )
+                entries = [entry for entry in entries if entry["Id"] in retried]
+                if not entries:
+                    break
+
+    def _fail_futures(self, exception: Exception):
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+        for future in futures:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(exception)
+
+    def _run(self):
+        delay = self.retry_interval
+        while True:
+            with self._lock:
+                if self._stopped or not self._futures:
+                    # the thread ends when idle, the next registration starts a new one
+                    self._thread = None
+                    return
+            try:
+                self.poll_once()
+            except Exception as exception:
+                code = error_code(exception)
+                if code in FATAL_ERRORS:
+                    logger.error(f"receiving from {self.queue_url} failed: {exception}")
+                    self._stopped = True
+                    self._fail_futures(exception)
+                    continue
+                logger.warning(f"receiving from {self.queue_url} failed, retrying in {delay} seconds: {exception}")
+                self._wake.wait(delay)
+                delay = min(delay * 2, self.max_retry_interval)
+            else:
+                delay = self.retry_interval
+
+    def stop(self):
+        """
+        stops the background thread after the current ReceiveMessage call, the futures still registered fail with a
+        RuntimeError
+        """
+        with self._lock:
+            self._stopped = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
+        self._fail_futures(RuntimeError(f"the listener of {self.queue_url} was stopped"))
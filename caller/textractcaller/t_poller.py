@@ -0,0 +1,282 @@
+"""
+One poller for many asynchronous Textract jobs.
+
+get_full_json polls its job in its own loop, so thousands of concurrent jobs mean thousands of pollers and Get* calls
+beyond the TPS quota. A JobPoller tracks all the jobs and polls them round-robin from a single thread, within one
+global Get* budget (a TokenBucket, slowed down on throttling like in the BatchScheduler). Each job backs off
+exponentially with its age, and large documents are not polled before their expected processing time. The result of
+each job is delivered through a concurrent.futures.Future (asyncio.wrap_future makes it awaitable).
+
+With a NotificationListener, the jobs are polled right after their completion message arrives and otherwise only
+every fallback_interval seconds, in case a message is lost.
+"""
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Optional
+
+from textractcaller.t_call import Textract_API
+from textractcaller.t_clients import get_client
+from textractcaller.t_notifications import NotificationListener
+from textractcaller.t_scheduler import GET_OPERATIONS
+from textractcaller.t_throttling import THROTTLING_ERRORS, TokenBucket, error_code
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PolledJob:
+    """a job tracked by the JobPoller"""
+
+    job_id: str
+    textract_api: Textract_API
+    future: Future = field(repr=False)
+    pages: Optional[int] = None  # expected number of pages, when known
+    fetch_results: bool = True  # False to only wait for the job, the future then gets the last status response
+    registered_at: float = 0.0
+    next_poll: float = 0.0
+    polls: int = 0
+    response: Optional[dict] = field(default=None, repr=False)
+    next_token: Optional[str] = field(default=None, repr=False)
+
+
+class JobPoller:
+    """
+    polls registered jobs round-robin within a global Get* budget and resolves their futures
+
+    boto3_textract_client: boto3 Textract client, one is created when None
+    get_tps: Get* calls per second shared by all the jobs (the Get* quotas of the account are per API)
+    min_interval, max_interval: bounds in seconds of the time between two polls of a job
+    backoff_ratio: a job of age t is polled again after t * backoff_ratio seconds, which grows the intervals
+    exponentially
+    seconds_per_page: expected processing time per page, a job of n pages is first polled after n * seconds_per_page
+    rate_increase, rate_decrease: AIMD of the Get* rate on throttling
+    notification_listener: NotificationListener of the queue receiving the completion messages of the jobs, the jobs
+    have to be started with the matching NotificationChannel
+    fallback_interval: time in seconds between two polls of a job when a notification_listener is given
+    background: polls from a daemon thread started on the first registration, otherwise poll_once() has to be called
+    clock, sleep: time functions, replaced in tests to simulate time
+    """
+
+    def __init__(
+        self,
+        boto3_textract_client=None,
+        get_tps: float = 5,
+        min_interval: float = 1,
+        max_interval: float = 30,
+        backoff_ratio: float = 0.5,
+        seconds_per_page: float = 0.5,
+        rate_increase: float = 0.1,
+        rate_decrease: float = 0.5,
+        notification_listener: Optional[NotificationListener] = None,
+        fallback_interval: float = 60,
+        background: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.textract = boto3_textract_client if boto3_textract_client else get_client("textract")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_ratio = backoff_ratio
+        self.seconds_per_page = seconds_per_page
+        self.rate_increase = rate_increase
+        self.rate_decrease = rate_decrease
+        self.notification_listener = notification_listener
+        self.fallback_interval = fallback_interval
+        self.background = background
+        self.get_bucket = TokenBucket(get_tps, clock=clock)
+        self._clock = clock
+        self._sleep = sleep
+        self._jobs: Deque[PolledJob] = deque()
+        self._by_id: Dict[str, PolledJob] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def register(
+        self,
+        job_id: str,
+        textract_api: Textract_API = Textract_API.DETECT,
+        pages: Optional[int] = None,
+        fetch_results: bool = True,
+    ) -> Future:
+        """
+        starts tracking a job and returns the future of its full response (merged pages, like get_full_json)
+        with fetch_results=False the future gets the response that reported the job as SUCCEEDED, to read the results
+        from an OutputConfig location instead
+        the future fails with the same exception as get_full_json when the job fails
+        registering a job twice returns the same future
+        """
+        with self._condition:
+            job = self._by_id.get(job_id)
+            if job is not None:
+                return job.future
+            now = self._clock()
+            job = PolledJob(
+                job_id=job_id,
+                textract_api=textract_api,
+                future=Future(),
+                pages=pages,
+                fetch_results=fetch_results,
+                registered_at=now,
+            )
+            job.next_poll = now + self._interval(job, now)
+            self._jobs.append(job)
+            self._by_id[job_id] = job
+            if self.background and (self._thread is None or not self._thread.is_alive()):
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="textract-job-poller", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        if self.notification_listener is not None:
+            self.notification_listener.register(job_id).add_done_callback(
+                lambda notification: self._notified(job_id, notification)
+            )
+        return job.future
+
+    def _notified(self, job_id: str, notification: Future):
+        if notification.cancelled() or notification.exception() is not None:
+            # polling carries on as a fallback
+            return
+        with self._condition:
+            job = self._by_id.get(job_id)
+            if job is not None:
+                job.next_poll = self._clock()
+                self._condition.notify()
+
+    def _interval(self, job: PolledJob, now: float) -> float:
+        if self.notification_listener is not None:
+            return self.fallback_interval
+        age = now - job.registered_at
+        interval = age * self.backoff_ratio
+        if job.pages:
+            # no need to poll before the expected processing time of the document
+            interval = max(interval, job.pages * self.seconds_per_page - age)
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def poll_once(self) -> float:
+        """
+        polls the due jobs in round-robin order until the Get* budget is spent
+        returns the seconds until the next job is due or the budget allows the next call
+        """
+        wait = math.inf
+        with self._condition:
+            count = len(self._jobs)
+        for _ in range(count):
+            with self._condition:
+                if not self._jobs:
+                    break
+                job = self._jobs[0]
+                now = self._clock()
+                if job.next_poll > now:
+                    self._jobs.rotate(-1)
+                    wait = min(wait, job.next_poll - now)
+                    continue
+                bucket_wait = self.get_bucket.try_acquire()
+                if bucket_wait > 0:
+                    # the job keeps its turn for the next pass
+                    return min(wait, bucket_wait)
+                self._jobs.rotate(-1)
+            self._poll(job)
+            if not job.future.done():
+                wait = min(wait, max(0.0, job.next_poll - self._clock()))
+        return wait
+
+    def _poll(self, job: PolledJob):
+        get_method, results_key = GET_OPERATIONS[job.textract_api]
+        extra_args = {"NextToken": job.next_token} if job.next_token else {}
+        try:
+            job_response = getattr(self.textract, get_method)(JobId=job.job_id, **extra_args)
+        except Exception as exception:
+            if error_code(exception) in THROTTLING_ERRORS:
+                logger.debug(f"{get_method} throttled, rate {self.get_bucket.rate}")
+                self.get_bucket.decrease(self.rate_decrease)
+            else:
+                self._resolve(job, exception=exception)
+            return
+        self.get_bucket.increase(self.rate_increase)
+        job.polls += 1
+        job_status = job_response["JobStatus"]
+        if job_status == "IN_PROGRESS":
+            now = self._clock()
+            job.next_poll = now + self._interval(job, now)
+        elif job_status == "SUCCEEDED":
+            if job.response is None:
+                job.response = job_response
+            else:
+                job.response[results_key].extend(job_response.get(results_key, []))
+            job.next_token = job_response.get("NextToken") if job.fetch_results else None
+            if job.next_token:
+                job.next_poll = self._clock()
+            else:
+                job.response.pop("NextToken", None)
+                self._resolve(job, result=job.response)
+        else:
+            logger.error(f"{job_response}")
+            self._resolve(
+                job,
+                exception=Exception(
+                    f"job_status not SUCCEEDED. job_status: {job_status}, message: {job_response.get('StatusMessage')}"
+                ),
+            )
+
+    def _resolve(self, job: PolledJob, result: Optional[dict] = None, exception: Optional[Exception] = None):
+        with self._condition:
+            self._jobs.remove(job)
+            del self._by_id[job.job_id]
+        if self.notification_listener is not None:
+            self.notification_listener.unregister(job.job_id)
+        if exception is not None:
+            job.future.set_exception(exception)
+        else:
+            job.future.set_result(result)
+
+    def run(self, timeout: Optional[float] = None) -> int:
+        """
+        polls until all the registered jobs are done or timeout seconds have passed, returns the number of jobs left
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        while self._jobs:
+            wait = self.poll_once()
+            if deadline is not None:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    break
+                wait = min(wait, remaining)
+            if wait > 0 and wait != math.inf:
+                self._sleep(wait)
+        return len(self._jobs)
+
+    def _run(self):
+        while True:
+            wait = self.poll_once()
+            with self._condition:
+                if self._stopped:
+                    return
+                if not self._jobs:
+                    # the thread ends when idle, the next registration starts a new one
+                    self._thread = None
+                    return
+                if wait == math.inf:
+                    # the jobs left were registered while the polled ones completed, they were not looked at yet
+                    continue
+                if wait > 0:
+                    # woken up early by a new registration
+                    self._condition.wait(wait)
+
+    def stop(self):
+        """stops the background thread, the pending futures stay unresolved"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
@@ -0,0 +1,104 @@
+"""
+Sharding of large QueriesConfig lists.
+
+Textract takes a limited number of queries per request: MAX_SYNC_QUERIES for AnalyzeDocument and MAX_ASYNC_QUERIES
+for StartDocumentAnalysis. A request with more queries is split into shards of at most that many queries, the shards
+are sent concurrently (or started as parallel jobs) and their responses merged into one response with all the
+queries. Only the first shard runs the other features of the request, the following shards run QUERIES alone, and
+only the QUERY and QUERY_RESULT blocks of the following shards are kept: the other blocks (lines, words) describe the
+same document again. The shards of a request share a TPS budget (SYNC_SHARD_TPS for AnalyzeDocument, ASYNC_SHARD_TPS
+for StartDocumentAnalysis) and their throttled calls are retried, see t_throttling.ThrottledCaller.
+
+This module works on the request parameters and responses (dicts), call_textract and acall_textract shard the requests
+with too many queries on their own.
+"""
+import copy
+import uuid
+from typing import List, Sequence
+
+MAX_SYNC_QUERIES = 15
+MAX_ASYNC_QUERIES = 30
+# requests per second of the shards of a request, conservative quotas of the account to raise to the actual ones
+SYNC_SHARD_TPS = 5
+ASYNC_SHARD_TPS = 2
+
+QUERY_BLOCK_TYPES = ("QUERY", "QUERY_RESULT")
+
+
+def shard_queries(queries: Sequence, max_queries: int) -> List[list]:
+    """splits queries into consecutive lists of at most max_queries queries"""
+    if max_queries < 1:
+        raise ValueError(f"max_queries has to be at least 1, got {max_queries}")
+    return [list(queries[i : i + max_queries]) for i in range(0, len(queries), max_queries)]
+
+
+def shard_client_request_token(token: str, index: int) -> str:
+    """returns the ClientRequestToken of shard index of a request submitted with token (at most 64 characters)"""
+    suffix = f"-q{index}"
+    return token[: 64 - len(suffix)] + suffix
+
+
+def shard_request_params(params: dict, max_queries: int) -> List[dict]:
+    """
+    returns the parameters of the requests of the shards of params, [params] when it has at most max_queries queries
+    the shards after the first one only have the QUERIES feature, a ClientRequestToken gets a suffix per shard
+    """
+    queries = params.get("QueriesConfig", {}).get("Queries", [])
+    if len(queries) <= max_queries:
+        return [params]
+    shards = []
+    for index, shard in enumerate(shard_queries(queries, max_queries)):
+        shard_params = dict(params)
+        shard_params["QueriesConfig"] = {"Queries": shard}
+        if index > 0:
+            shard_params["FeatureTypes"] = ["QUERIES"]
+        if params.get("ClientRequestToken"):
+            shard_params["ClientRequestToken"] = shard_client_request_token(params["ClientRequestToken"], index)
+        shards.append(shard_params)
+    return shards
+
+
+def _add_child(page_block: dict, block_id: str):
+    for relationship in page_block.setdefault("Relationships", []):
+        if relationship["Type"] == "CHILD":
+            relationship["Ids"].append(block_id)
+            return
+    page_block["Relationships"].append({"Type": "CHILD", "Ids": [block_id]})
+
+
+def merge_query_responses(responses: List[dict]) -> dict:
+    """
+    merges the responses of the shards of a request into one response
+    the first response is kept whole, the QUERY and QUERY_RESULT blocks of the others are added to it as children of
+    the PAGE block of their page, ids already used by the first response are replaced (with their references)
+    """
+    merged = dict(responses[0])
+    blocks = list(merged.get("Blocks", []))
+    pages = {}
+    for position, block in enumerate(blocks):
+        if block["BlockType"] == "PAGE":
+            # the relationships of the PAGE blocks change, the responses given are left untouched
+            blocks[position] = copy.deepcopy(block)
+            pages[block.get("Page", 1)] = blocks[position]
+    seen_ids = {block["Id"] for block in blocks}
+    for index, response in enumerate(responses[1:], start=1):
+        query_blocks = [
+            copy.deepcopy(block) for block in response.get("Blocks", []) if block["BlockType"] in QUERY_BLOCK_TYPES
+        ]
+        renamed = {
+            block["Id"]: str(uuid.uuid5(uuid.NAMESPACE_OID, f"{index}:{block['Id']}"))
+            for block in query_blocks
+            if block["Id"] in seen_ids
+        }
+        for block in query_blocks:
+            block["Id"] = renamed.get(block["Id"], block["Id"])
+            if renamed:
+                for relationship in block.get("Relationships", []):
+                    relationship["Ids"] = [renamed.get(i, i) for i in relationship["Ids"]]
+            seen_ids.add(block["Id"])
+            page_block = pages.get(block.get("Page", 1))
+            if page_block is not None:
+                _add_child(page_block, block["Id"])
+        blocks.extend(query_blocks)
+    merged["Blocks"] = blocks
+    return merged
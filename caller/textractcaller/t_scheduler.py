@@ -0,0 +1,412 @@
+"""
+Batch submission of asynchronous Textract jobs within the account quotas.
+
+The BatchScheduler keeps a queue of documents per API and submits them only when the API has capacity. Each API has a
+token bucket for its Start* operation, a token bucket for its Get* operation and a limit of concurrent jobs. The rates
+and the limit adapt with AIMD (additive increase, multiplicative decrease):
+- a throttling error (ProvisionedThroughputExceededException, ThrottlingException) multiplies the rate of the bucket by
+  rate_decrease, each successful call adds rate_increase back, up to the quota
+- a LimitExceededException (too many concurrent jobs) lowers the limit to the number of running jobs, each completed
+  job adds rate_increase back, up to the quota
+Throttled calls are retried, they never reach the caller.
+
+The scheduler is single threaded: run() submits, polls and sleeps until the queue is drained. clock and sleep can be
+replaced, which lets tests run against a stub client in simulated time.
+"""
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Union
+
+from textractcaller.t_call import (
+    AdaptersConfig,
+    NotificationChannel,
+    OutputConfig,
+    QueriesConfig,
+    Textract_API,
+    Textract_Call_Mode,
+    Textract_Features,
+    _textract_expense_request,
+    _textract_lending_request,
+    _textract_request,
+)
+from textractcaller.t_clients import get_client
+from textractcaller.t_throttling import THROTTLING_ERRORS, TokenBucket, error_code
+
+logger = logging.getLogger(__name__)
+
+CONCURRENCY_ERRORS = ("LimitExceededException",)
+
+# Get* operation and paginated result list of each API
+GET_OPERATIONS = {
+    Textract_API.DETECT: ("get_document_text_detection", "Blocks"),
+    Textract_API.ANALYZE: ("get_document_analysis", "Blocks"),
+    Textract_API.EXPENSE: ("get_expense_analysis", "ExpenseDocuments"),
+    Textract_API.LENDING: ("get_lending_analysis", "Results"),
+}
+
+
+@dataclass
+class ApiQuota:
+    """
+    quotas of an asynchronous API, the defaults are conservative
+    set them to the quotas of the account and region (Service Quotas console) to use the full capacity
+    """
+
+    start_tps: float = 2  # transactions per second of the Start* operation
+    get_tps: float = 5  # transactions per second of the Get* operation
+    max_concurrent_jobs: int = 100
+
+
+@dataclass
+class BatchJob:
+    """a document processed by the BatchScheduler"""
+
+    input_document: Union[str, bytes]
+    textract_api: Textract_API
+    method: str
+    params: dict = field(repr=False)
+    job_id: Optional[str] = None
+    status: str = "QUEUED"  # QUEUED, IN_PROGRESS, SUCCEEDED or FAILED
+    response: Optional[dict] = field(default=None, repr=False)
+    error: Optional[Exception] = None
+    throttled: int = 0  # number of throttled calls for this job
+    queued_at: Optional[float] = None
+    submitted_at: Optional[float] = None
+    completed_at: Optional[float] = None
+    next_poll: float = field(default=0.0, repr=False)
+    next_token: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("SUCCEEDED", "FAILED")
+
+
+@dataclass
+class SchedulerMetrics:
+    """snapshot of the state and throughput of a BatchScheduler"""
+
+    queue_depth: int
+    active_jobs: int
+    submitted: int
+    succeeded: int
+    failed: int
+    throttled: int
+    elapsed: float  # seconds since the first submission
+    jobs_per_second: float  # completed jobs (succeeded or failed) per second
+    pages_per_second: float  # pages of the succeeded jobs per second
+    start_tps: Dict[Textract_API, float]  # current Start* rates
+    get_tps: Dict[Textract_API, float]  # current Get* rates
+    concurrent_job_limits: Dict[Textract_API, int]  # current limits of concurrent jobs
+
+
+class _ApiState:
+    def __init__(self, quota: ApiQuota, clock):
+        self.quota = quota
+        self.start_bucket = TokenBucket(quota.start_tps, clock=clock)
+        self.get_bucket = TokenBucket(quota.get_tps, clock=clock)
+        self.job_limit = float(quota.max_concurrent_jobs)
+        self.queue: Deque[BatchJob] = deque()
+        self.active: List[BatchJob] = []
+
+
+class BatchScheduler:
+    """
+    submits queued documents to the asynchronous Textract APIs within the quotas and collects the full responses
+
+    boto3_textract_client: boto3 Textract client, one is created when None
+    quotas: ApiQuota per Textract_API, ApiQuota() for the APIs not listed
+    job_done_polling_interval: seconds between two status checks of a running job
+    rate_increase: added to a rate after each successful call and to a job limit after each completed job
+    rate_decrease: factor applied to a rate after a throttling error
+    on_done: called with each job when it succeeds or fails
+    clock, sleep: time functions, replaced in tests to simulate time
+    """
+
+    def __init__(
+        self,
+        boto3_textract_client=None,
+        quotas: Optional[Dict[Textract_API, ApiQuota]] = None,
+        job_done_polling_interval: float = 1,
+        rate_increase: float = 0.1,
+        rate_decrease: float = 0.5,
+        on_done: Optional[Callable[[BatchJob], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if not 0 < rate_decrease < 1:
+            raise ValueError("rate_decrease has to be between 0 and 1")
+        self.textract = boto3_textract_client if boto3_textract_client else get_client("textract")
+        self.quotas = quotas if quotas else {}
+        self.job_done_polling_interval = job_done_polling_interval
+        self.rate_increase = rate_increase
+        self.rate_decrease = rate_decrease
+        self.on_done = on_done
+        self._clock = clock
+        self._sleep = sleep
+        self._apis: Dict[Textract_API, _ApiState] = {}
+        self._started_at: Optional[float] = None
+        self._submitted = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._throttled = 0
+        self._pages = 0
+
+    def _api(self, textract_api: Textract_API) -> _ApiState:
+        state = self._apis.get(textract_api)
+        if state is None:
+            state = self._apis[textract_api] = _ApiState(
+                self.quotas.get(textract_api, ApiQuota()), self._clock
+            )
+        return state
+
+    def _enqueue(self, input_document, method: str, params: dict, textract_api: Textract_API) -> BatchJob:
+        job = BatchJob(
+            input_document=input_document,
+            textract_api=textract_api,
+            method=method,
+            params=params,
+            queued_at=self._clock(),
+        )
+        self._api(textract_api).queue.append(job)
+        return job
+
+    def submit(
+        self,
+        input_document: str,
+        features: Optional[List[Textract_Features]] = None,
+        queries_config: Optional[QueriesConfig] = None,
+        output_config: Optional[OutputConfig] = None,
+        adapters_config: Optional[AdaptersConfig] = None,
+        kms_key_id: str = "",
+        job_tag: str = "",
+        notification_channel: Optional[NotificationChannel] = None,
+        client_request_token: str = "",
+    ) -> BatchJob:
+        """
+        queues a document on S3 for StartDocumentAnalysis (with features) or StartDocumentTextDetection
+        the parameters are the ones of call_textract, returns the queued job
+        """
+        method, params, textract_api = _textract_request(
+            input_document=input_document,
+            features=features,
+            queries_config=queries_config,
+            output_config=output_config,
+            adapters_config=adapters_config,
+            kms_key_id=kms_key_id,
+            job_tag=job_tag,
+            notification_channel=notification_channel,
+            client_request_token=client_request_token,
+            return_job_id=True,
+            call_mode=Textract_Call_Mode.FORCE_ASYNC,
+        )
+        return self._enqueue(input_document, method, params, textract_api)
+
+    def submit_expense(
+        self,
+        input_document: str,
+        output_config: Optional[OutputConfig] = None,
+        kms_key_id: str = "",
+        job_tag: str = "",
+        notification_channel: Optional[NotificationChannel] = None,
+        client_request_token: str = "",
+    ) -> BatchJob:
+        """queues a document on S3 for StartExpenseAnalysis, the parameters are the ones of call_textract_expense"""
+        method, params, textract_api = _textract_expense_request(
+            input_document=input_document,
+            output_config=output_config,
+            kms_key_id=kms_key_id,
+            job_tag=job_tag,
+            notification_channel=notification_channel,
+            client_request_token=client_request_token,
+            return_job_id=True,
+            force_async_api=True,
+        )
+        return self._enqueue(input_document, method, params, textract_api)
+
+    def submit_lending(
+        self,
+        input_document: str,
+        client_request_token: str = "",
+        job_tag: str = "",
+        notification_channel: Optional[NotificationChannel] = None,
+        output_config: Optional[OutputConfig] = None,
+        kms_key_id: str = "",
+    ) -> BatchJob:
+        """queues a document on S3 for StartLendingAnalysis, the parameters are the ones of call_textract_lending"""
+        params = _textract_lending_request(
+            input_document=input_document,
+            client_request_token=client_request_token,
+            job_tag=job_tag,
+            notification_channel=notification_channel,
+            output_config=output_config,
+            kms_key_id=kms_key_id,
+        )
+        return self._enqueue(input_document, "start_lending_analysis", params, Textract_API.LENDING)
+
+    def process(self, input_documents: List[str], **kwargs) -> List[BatchJob]:
+        """submits input_documents with the keyword arguments of submit, runs them, returns the jobs in input order"""
+        jobs = [self.submit(input_document, **kwargs) for input_document in input_documents]
+        self.run()
+        return jobs
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(state.queue) for state in self._apis.values())
+
+    @property
+    def active_jobs(self) -> int:
+        return sum(len(state.active) for state in self._apis.values())
+
+    def run(self, timeout: Optional[float] = None) -> int:
+        """
+        submits the queued documents and polls the running jobs until all are done or timeout seconds have passed
+        returns the number of jobs left (queued or running)
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        while self.queue_depth or self.active_jobs:
+            wait = min(self._submit_queued(), self._poll_active())
+            if deadline is not None:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    break
+                wait = min(wait, remaining)
+            if wait > 0:
+                self._sleep(wait)
+        return self.queue_depth + self.active_jobs
+
+    def _complete(self, state: _ApiState, job: BatchJob, status: str, error: Optional[Exception] = None):
+        job.status = status
+        job.error = error
+        job.completed_at = self._clock()
+        if job in state.active:
+            state.active.remove(job)
+            state.job_limit = min(state.quota.max_concurrent_jobs, state.job_limit + self.rate_increase)
+        if status == "SUCCEEDED":
+            self._succeeded += 1
+            self._pages += job.response.get("DocumentMetadata", {}).get("Pages", 0)
+        else:
+            self._failed += 1
+            logger.error(f"job for {job.input_document} failed: {error}")
+        if self.on_done:
+            self.on_done(job)
+
+    def _submit_queued(self) -> float:
+        """submits what the quotas allow, returns the seconds until the next submission is possible"""
+        wait = math.inf
+        for textract_api, state in self._apis.items():
+            while state.queue and len(state.active) < math.floor(state.job_limit):
+                bucket_wait = state.start_bucket.try_acquire()
+                if bucket_wait > 0:
+                    wait = min(wait, bucket_wait)
+                    break
+                job = state.queue[0]
+                try:
+                    submission_status = getattr(self.textract, job.method)(**job.params)
+                except Exception as exception:
+                    code = error_code(exception)
+                    if code in THROTTLING_ERRORS:
+                        logger.debug(f"{job.method} throttled, rate {state.start_bucket.rate}")
+                        job.throttled += 1
+                        self._throttled += 1
+                        state.start_bucket.decrease(self.rate_decrease)
+                    elif code in CONCURRENCY_ERRORS:
+                        logger.debug(f"{job.method} concurrent job limit reached at {len(state.active)} jobs")
+                        job.throttled += 1
+                        self._throttled += 1
+                        state.job_limit = max(1.0, len(state.active))
+                        if not state.active:
+                            # jobs started outside of the scheduler hold the capacity, back off on the start rate
+                            state.start_bucket.decrease(self.rate_decrease)
+                    else:
+                        state.queue.popleft()
+                        self._complete(state, job, "FAILED", exception)
+                    continue
+                state.queue.popleft()
+                state.start_bucket.increase(self.rate_increase)
+                if self._started_at is None:
+                    self._started_at = self._clock()
+                self._submitted += 1
+                job.job_id = submission_status["JobId"]
+                job.status = "IN_PROGRESS"
+                job.submitted_at = self._clock()
+                job.next_poll = job.submitted_at + self.job_done_polling_interval
+                state.active.append(job)
+        return wait
+
+    def _poll_active(self) -> float:
+        """polls the running jobs that are due, returns the seconds until the next poll"""
+        wait = math.inf
+        for textract_api, state in self._apis.items():
+            get_method, results_key = GET_OPERATIONS[textract_api]
+            for job in list(state.active):
+                now = self._clock()
+                if job.next_poll > now:
+                    wait = min(wait, job.next_poll - now)
+                    continue
+                bucket_wait = state.get_bucket.try_acquire()
+                if bucket_wait > 0:
+                    wait = min(wait, bucket_wait)
+                    break
+                extra_args = {"NextToken": job.next_token} if job.next_token else {}
+                try:
+                    job_response = getattr(self.textract, get_method)(JobId=job.job_id, **extra_args)
+                except Exception as exception:
+                    if error_code(exception) in THROTTLING_ERRORS:
+                        job.throttled += 1
+                        self._throttled += 1
+                        state.get_bucket.decrease(self.rate_decrease)
+                    else:
+                        self._complete(state, job, "FAILED", exception)
+                    continue
+                state.get_bucket.increase(self.rate_increase)
+                self._handle_response(state, job, job_response, results_key)
+                if not job.done:
+                    wait = min(wait, max(0.0, job.next_poll - self._clock()))
+        return wait
+
+    def _handle_response(self, state: _ApiState, job: BatchJob, job_response: dict, results_key: str):
+        job_status = job_response["JobStatus"]
+        if job_status == "IN_PROGRESS":
+            job.next_poll = self._clock() + self.job_done_polling_interval
+        elif job_status == "SUCCEEDED":
+            if job.response is None:
+                job.response = job_response
+            else:
+                job.response[results_key].extend(job_response.get(results_key, []))
+            job.next_token = job_response.get("NextToken")
+            if job.next_token:
+                # the next page is fetched as soon as the Get* rate allows
+                job.next_poll = self._clock()
+            else:
+                job.response.pop("NextToken", None)
+                self._complete(state, job, "SUCCEEDED")
+        else:
+            self._complete(
+                state,
+                job,
+                "FAILED",
+                Exception(
+                    f"job_status not SUCCEEDED. job_status: {job_status}, message: {job_response.get('StatusMessage')}"
+                ),
+            )
+
+    def metrics(self) -> SchedulerMetrics:
+        """returns the current queue depth, the counters, the throughput and the current rates and limits"""
+        elapsed = self._clock() - self._started_at if self._started_at is not None else 0.0
+        return SchedulerMetrics(
+            queue_depth=self.queue_depth,
+            active_jobs=self.active_jobs,
+            submitted=self._submitted,
+            succeeded=self._succeeded,
+            failed=self._failed,
+            throttled=self._throttled,
+            elapsed=elapsed,
+            jobs_per_second=(self._succeeded + self._failed) / elapsed if elapsed > 0 else 0.0,
+            pages_per_second=self._pages / elapsed if elapsed > 0 else 0.0,
+            start_tps={api: state.start_bucket.rate for api, state in self._apis.items()},
+            get_tps={api: state.get_bucket.rate for api, state in self._apis.items()},
+            concurrent_job_limits={api: math.floor(state.job_limit) for api, state in self._apis.items()},
+        )
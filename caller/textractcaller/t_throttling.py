@@ -0,0 +1,163 @@
+"""
+Request rate control shared by the callers.
+
+A TokenBucket spreads the calls of an operation within a TPS budget, its rate moves with AIMD (additive increase,
+multiplicative decrease): a throttling error divides it, each successful call adds a step back, up to the initial rate.
+A ThrottledCaller calls the methods of a client within one TokenBucket and retries the throttled calls, it is shared
+by the concurrent requests of a fan-out (pages of a document, query shards of a request).
+"""
+import asyncio
+import functools
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+THROTTLING_ERRORS = ("ProvisionedThroughputExceededException", "ThrottlingException", "TooManyRequestsException")
+
+
+def error_code(exception: Exception) -> str:
+    """returns the AWS error code of a botocore ClientError, the exception class name otherwise"""
+    response = getattr(exception, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code")
+        if code:
+            return code
+    return exception.__class__.__name__
+
+
+class TokenBucket:
+    """
+    token bucket refilled at rate tokens per second, holding up to capacity tokens (rate, at least 1, by default)
+    the rate moves between min_rate and the initial rate with increase() and decrease()
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        min_rate: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate has to be positive")
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """takes tokens and returns 0 when they are available, otherwise returns the seconds until they are"""
+        self._refill()
+        # tolerance for the rounding of the refill, a shorter wait might not even advance the clock
+        if self.tokens >= tokens - 1e-9:
+            self.tokens = max(0.0, self.tokens - tokens)
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    def increase(self, step: float):
+        """additive increase of the rate, up to the initial rate"""
+        self.rate = min(self.max_rate, self.rate + step)
+
+    def decrease(self, factor: float):
+        """multiplicative decrease of the rate, the tokens left are dropped to stop the current burst"""
+        self._refill()
+        self.rate = max(self.min_rate, self.rate * factor)
+        self.tokens = 0.0
+
+
+class ThrottledCaller:
+    """
+    calls the methods of client within a TPS budget shared by all the threads (or coroutines) using it
+    the client methods are exposed as well, a ThrottledCaller can be passed where a boto3 client is expected
+
+    client: boto3 client, or client with coroutine methods for acall()
+    tps: calls per second (the quota of the operation for the account), lowered on throttling
+    max_retries: throttled calls are retried up to max_retries times, other errors are raised right away
+    rate_increase, rate_decrease: AIMD of the rate on throttling
+    clock, sleep: time functions, replaced in tests to simulate time
+    """
+
+    def __init__(
+        self,
+        client,
+        tps: float,
+        max_retries: int = 5,
+        rate_increase: float = 0.1,
+        rate_decrease: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.client = client
+        self.bucket = TokenBucket(tps, clock=clock)
+        self.max_retries = max_retries
+        self.rate_increase = rate_increase
+        self.rate_decrease = rate_decrease
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if not callable(getattr(self.client, name)):
+            return getattr(self.client, name)
+        return functools.partial(self, name)
+
+    def _acquire(self) -> float:
+        with self._lock:
+            return self.bucket.try_acquire()
+
+    def _retry(self, method: str, exception: Exception, attempt: int) -> bool:
+        """whether a failed call is retried, the rate is lowered when it is"""
+        if error_code(exception) not in THROTTLING_ERRORS or attempt == self.max_retries:
+            return False
+        with self._lock:
+            self.bucket.decrease(self.rate_decrease)
+        logger.debug(f"{method} throttled, rate {self.bucket.rate}")
+        return True
+
+    def _succeeded(self):
+        with self._lock:
+            self.bucket.increase(self.rate_increase)
+
+    def __call__(self, method: str, **params) -> dict:
+        """calls client.method(**params) once a token is available, retrying the throttled calls"""
+        for attempt in range(self.max_retries + 1):
+            wait = self._acquire()
+            while wait > 0:
+                self._sleep(wait)
+                wait = self._acquire()
+            try:
+                response = getattr(self.client, method)(**params)
+            except Exception as exception:
+                if self._retry(method, exception, attempt):
+                    continue
+                raise
+            self._succeeded()
+            return response
+
+    async def acall(self, method: str, **params) -> dict:
+        """awaitable __call__ for a client with coroutine methods, waits with asyncio.sleep"""
+        for attempt in range(self.max_retries + 1):
+            wait = self._acquire()
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait = self._acquire()
+            try:
+                response = await getattr(self.client, method)(**params)
+            except Exception as exception:
+                if self._retry(method, exception, attempt):
+                    continue
+                raise
+            self._succeeded()
+            return response
@@ -1,3 +1,4 @@
+import copy
 import json
 import os
 import PIL
@@ -15,6 +16,7 @@ from textractor.visualizers.entitylist import EntityList
 from textractor.exceptions import InvalidProfileNameError
 from textractor.entities.selection_element import SelectionElement
 from textractor.data.constants import TextTypes, SimilarityMetric, TextractFeatures, DirectionalFinderType, Direction
+from textractor.data.text_linearization_config import TextLinearizationConfig
 
 try:
     import sentence_transformers
@@ -22,6 +24,12 @@ try:
 except:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
 
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except:
+    PYARROW_AVAILABLE = False
+
 class TestDocument(unittest.TestCase):
     def test_document_smoke_test(self):
         profile_name = "default"
@@ -278,3 +286,348 @@ class TestDocument(unittest.TestCase):
             for layout in page.layouts:
                 for child in layout.children:
                     self.assertIsNotNone(child.confidence, "Child confidence was None")
+
+    @unittest.skipIf(not PYARROW_AVAILABLE, "pyarrow is not installed")
+    def test_document_to_arrow(self):
+        import tempfile
+        import pyarrow.parquet as pq
+        from textractor.utils.arrow_utils import write_parquet
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        path = os.path.join(current_directory, "fixtures/saved_api_responses/test_document_smoke_test.json")
+        document = Document.open(path)
+
+        batches = document.to_arrow("words")
+        self.assertEqual(sum(b.num_rows for b in batches), len(document.words))
+        self.assertEqual(batches[0].column("id").to_pylist()[0], document.pages[0].words[0].id)
+        self.assertEqual(
+            sum(b.num_rows for b in document.to_arrow("key_values")),
+            len(document.key_values) + len(document.checkboxes),
+        )
+        self.assertEqual(
+            sum(b.num_rows for b in document.to_arrow("cells")),
+            sum(len(t.table_cells) for t in document.tables),
+        )
+        self.assertEqual(document.to_arrow("queries"), [])
+
+        queries = Document.open(
+            os.path.join(current_directory, "fixtures/saved_api_responses/test_queries_as_strings.json")
+        ).to_arrow("queries")
+        self.assertEqual(queries[0].column("answer").to_pylist()[0], "Textractor")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "lines.parquet")
+            rows = write_parquet((Document.open(path) for _ in range(3)), filepath, entity="lines")
+            table = pq.read_table(filepath)
+            self.assertEqual(rows, 3 * len(document.lines))
+            self.assertEqual(table.num_rows, rows)
+            self.assertEqual(sorted(set(table.column("document_index").to_pylist())), [0, 1, 2])
+
+    def test_document_linearization_cache(self):
+        from textractor.data.markdown_linearization_config import MarkdownLinearizationConfig
+        from textractor.utils.linearization_cache import LinearizationCache
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        document = Document.open(
+            os.path.join(current_directory, "fixtures/saved_api_responses/test_document_smoke_test.json")
+        )
+
+        text = document.get_text()
+        markdown = document.to_markdown()
+        self.assertEqual(len(LinearizationCache._caches[document]), 2)
+        # Equal configurations share the same entry
+        self.assertEqual(document.get_text(TextLinearizationConfig()), text)
+        self.assertEqual(document.to_markdown(MarkdownLinearizationConfig()), markdown)
+        self.assertEqual(len(LinearizationCache._caches[document]), 2)
+
+        # Copies start without cached outputs
+        self.assertNotIn(copy.copy(document), LinearizationCache._caches)
+        self.assertNotIn(copy.deepcopy(document.pages[0]), LinearizationCache._caches)
+
+        # The returned word list can be modified without altering the cache
+        _, words = document.get_text_and_words()
+        word_count = len(words)
+        words.clear()
+        self.assertEqual(len(document.get_text_and_words()[1]), word_count)
+
+        # Mutating the document invalidates the cache
+        word = document.pages[0].layouts[0].words[0]
+        document.pages[0].layouts[0].remove(word)
+        self.assertNotEqual(document.get_text(), text)
+
+        LinearizationCache.clear()
+        self.assertNotIn(document, LinearizationCache._caches)
+
+        LinearizationCache.enabled = False
+        try:
+            document.get_text()
+            self.assertNotIn(document, LinearizationCache._caches)
+        finally:
+            LinearizationCache.enabled = True
+
+    def test_document_linearization_cache_setters(self):
+        import threading
+        from textractor.utils.linearization_cache import LinearizationCache
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        document = Document.open(
+            os.path.join(current_directory, "fixtures/saved_api_responses/test_document_to_html_form.png.json")
+        )
+
+        def check(mutate):
+            document.get_text()
+            mutate()
+            with LinearizationCache.disabled():
+                expected = document.get_text()
+            self.assertEqual(document.get_text(), expected)
+
+        key_value = document.key_values[0]
+        check(lambda: setattr(key_value, "key", []))
+        check(lambda: setattr(key_value.value, "words", []))
+        table = next(t for t in document.tables if t.title is not None)
+        check(lambda: setattr(table, "title", None))
+        check(lambda: document.pages[0].layouts[0].children.pop())
+
+        # Setting the same text again keeps the cache
+        generation = LinearizationCache._generation
+        word = document.words[0]
+        word.text = word.text
+        self.assertEqual(LinearizationCache._generation, generation)
+
+        # disabled() only applies to the current thread
+        document.get_text()
+        with LinearizationCache.disabled():
+            self.assertFalse(LinearizationCache.is_enabled())
+            enabled = []
+            thread = threading.Thread(target=lambda: enabled.append(LinearizationCache.is_enabled()))
+            thread.start()
+            thread.join()
+            self.assertEqual(enabled, [True])
+        self.assertTrue(LinearizationCache.is_enabled())
+
+    def test_document_iter_chunks(self):
+        from textractor.exceptions import InputError
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        document = Document.open(
+            os.path.join(current_directory, "fixtures/saved_api_responses/test_document_to_html_tutorial.pdf.json")
+        )
+        words = document.get_text().split()
+
+        for boundary in ["layout", "paragraph", "page"]:
+            chunks = list(document.iter_chunks(max_chars=300, boundary=boundary))
+            self.assertTrue(all(len(c.text) <= 300 for c in chunks))
+            self.assertTrue(all(c.pages == [1] and c.layout_ids and c.bbox for c in chunks))
+            if boundary != "page":
+                # Without overlap nor split units, chunks cover the text exactly once
+                chunks = list(document.iter_chunks(max_chars=1000, boundary=boundary))
+                self.assertGreater(len(chunks), 1)
+                self.assertEqual(" ".join(c.text for c in chunks).split(), words)
+
+        chunks = list(document.iter_chunks(max_chars=300, overlap=150, boundary="paragraph"))
+        self.assertGreater(len(" ".join(c.text for c in chunks).split()), len(words))
+        self.assertEqual(len(list(document.iter_chunks(max_chars=10**6, boundary="page"))), 1)
+
+        with self.assertRaises(InputError):
+            next(document.iter_chunks(boundary="sentence"))
+        with self.assertRaises(InputError):
+            next(document.iter_chunks(max_chars=100, overlap=100))
+
+    def test_document_span_to_words(self):
+        from textractor.data.html_linearization_config import HTMLLinearizationConfig
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        document = Document.open(
+            os.path.join(current_directory, "fixtures/saved_api_responses/test_document_to_html_tutorial.pdf.json")
+        )
+
+        for config in [TextLinearizationConfig(), HTMLLinearizationConfig()]:
+            text = document.get_text(config)
+            index = document.get_offset_index(config)
+            self.assertEqual(index.text, text)
+            self.assertEqual(index.starts, sorted(index.starts))
+
+            start = text.index("Curriculum Design")
+            end = start + len("Curriculum Design")
+            self.assertEqual([w.text for w in document.span_to_words(start, end, config)], ["Curriculum", "Design"])
+            # Spans partially covering a word return the word
+            self.assertEqual([w.text for w in document.span_to_words(start + 3, start + 4, config)], ["Curriculum"])
+            # Separators do not map to any word
+            self.assertEqual(document.span_to_words(end, end + 1, config), [])
+
+            bboxes = document.span_to_bboxes(start, end, config)
+            self.assertEqual(len(bboxes), 1)
+            self.assertEqual(bboxes[0][0], 1)
+
+        config = HTMLLinearizationConfig()
+        text = document.get_text(config)
+        start = text.index("<table>")
+        words = document.span_to_words(start, start + len("<table>"), config, include_structure=True)
+        self.assertEqual([w.text for w in words], ["<table>"])
+
+    def test_text_offset_index_exact(self):
+        from collections import Counter
+        from textractor.data.html_linearization_config import HTMLLinearizationConfig
+        from textractor.data.markdown_linearization_config import MarkdownLinearizationConfig
+        from textractor.utils.linearization_cache import LinearizationCache
+        from textractor.utils.offset_utils import TextOffsetIndex
+        from textractor.utils.text_utils import escape_text
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        configs = [
+            TextLinearizationConfig(),
+            HTMLLinearizationConfig(),
+            MarkdownLinearizationConfig(),
+            TextLinearizationConfig(
+                add_prefixes_and_suffixes_as_words=True,
+                add_prefixes_and_suffixes_in_text=True,
+                table_cell_prefix="<c>",
+                table_cell_suffix="</c>",
+                table_cell_empty_cell_placeholder="EMPTY",
+            ),
+        ]
+        for name in ["screenshot.png", "matrix.png", "paystub_tables.png"]:
+            document = Document.open(
+                os.path.join(
+                    current_directory, f"fixtures/saved_api_responses/test_document_to_html_{name}.json"
+                )
+            )
+            for config in configs:
+                with LinearizationCache.recording_offsets():
+                    text, words = document.get_text_and_words(config)
+                index = TextOffsetIndex.from_text(text)
+                self.assertEqual(text, document.get_text(config))
+                self.assertEqual(index.starts, sorted(index.starts))
+                for start, end, word in zip(index.starts, index.ends, index.words):
+                    if text[start:end] in (word.text, escape_text(word.text, config)):
+                        continue
+                    # Tabulate reformats the numbers of markdown tables, 93.50 is written 93.5
+                    self.assertEqual(float(text[start:end]), float(word.text))
+
+                # Checkboxes in tables are linearized twice, they are matched on their text and position
+                def key(w):
+                    return (w.text, w.bbox.x, w.bbox.y)
+                self.assertFalse(Counter(key(w) for w in words) - Counter(key(w) for w in index.words))
+
+    def test_document_write_html_and_markdown(self):
+        import gzip
+        import io
+        import tempfile
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        document = Document.open(
+            os.path.join(
+                current_directory,
+                "fixtures/saved_api_responses/test_textractor_analyze_document_multipage_pdf.json",
+            )
+        )
+
+        output = io.StringIO()
+        document.write_html(output)
+        self.assertEqual(output.getvalue(), document.to_html())
+
+        output = io.BytesIO()
+        document.write_markdown(output)
+        self.assertEqual(output.getvalue().decode("utf-8"), document.to_markdown())
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "document.md.gz")
+            with gzip.open(path, "wb") as f:
+                document.write_markdown(f)
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                self.assertEqual(f.read(), document.to_markdown())
+
+            path = os.path.join(tmp_dir, "document.html")
+            document.write_html(path)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), document.to_html())
+
+            path = os.path.join(tmp_dir, "document.md")
+            document.write_markdown(path)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), document.to_markdown().encode("utf-8"))
+
+    def test_corpus_index(self):
+        import tempfile
+        from textractor.utils.index_utils import CorpusIndex
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        multipage = os.path.join(
+            current_directory, "fixtures/saved_api_responses/test_textractor_analyze_document_multipage_pdf.json"
+        )
+        form = os.path.join(current_directory, "fixtures/saved_api_responses/test_signature.json")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "index.db")
+            with CorpusIndex(path) as index:
+                self.assertGreater(index.add_document(Document.open(multipage), multipage), 0)
+                index.add_document(Document.open(form), form)
+                # Adding a document twice replaces it
+                index.add_document(Document.open(form), form)
+                self.assertEqual(index.sources, [multipage, form])
+
+            # The index is persisted on disk
+            with CorpusIndex(path) as index:
+                self.assertIn(form, index)
+                hits = index.search("Immunization Registry")
+                self.assertEqual(len(hits), 2)
+                self.assertTrue(all(h.source == form and h.page == 1 for h in hits))
+                self.assertEqual(hits[0].positions[1], hits[0].positions[0] + 1)
+                self.assertEqual(hits[0].text.lower().rstrip("."), "immunization registry")
+                self.assertEqual(len(hits[0].bboxes), 2)
+
+                page = hits[0].open_page()
+                self.assertIsInstance(page, Page)
+                self.assertIn("immunization registry", page.get_text())
+
+                # Fuzzy expansion tolerates OCR errors
+                self.assertEqual(index.search("imunization registry"), [])
+                self.assertEqual(len(index.search("imunization registry", max_distance=1)), 2)
+                self.assertIn("immunization", index.expand_term("imunization", max_distance=1))
+
+                self.assertEqual(len(index.search("Textractor", limit=1)), 1)
+                self.assertTrue(index.remove_document(form))
+                self.assertFalse(index.remove_document(form))
+                self.assertEqual(index.search("immunization"), [])
+                self.assertEqual(index.expand_term("immunization"), [])
+                self.assertEqual(len(index), 1)
+
+    def test_corpus_index_large_expansion(self):
+        import itertools
+        import sqlite3
+        import string
+        from textractor.parsers import response_parser
+        from textractor.utils.index_utils import CorpusIndex
+
+        # One line made of the 1296 terms of two letters or digits, all within 2 edits of each other
+        texts = ["".join(p) for p in itertools.product(string.ascii_lowercase + string.digits, repeat=2)]
+        geometry = {"BoundingBox": {"Width": 0.01, "Height": 0.01, "Left": 0.1, "Top": 0.1}, "Polygon": []}
+        words = [
+            {
+                "BlockType": "WORD", "Id": f"w{i}", "Text": t, "TextType": "PRINTED", "Confidence": 99,
+                "Geometry": geometry,
+            }
+            for i, t in enumerate(texts)
+        ]
+        line = {
+            "BlockType": "LINE", "Id": "l0", "Text": " ".join(texts), "Confidence": 99, "Geometry": geometry,
+            "Relationships": [{"Type": "CHILD", "Ids": [w["Id"] for w in words]}],
+        }
+        page = {
+            "BlockType": "PAGE", "Id": "p0", "Geometry": geometry,
+            "Relationships": [{"Type": "CHILD", "Ids": ["l0"]}],
+        }
+        document = response_parser.parse({"DocumentMetadata": {"Pages": 1}, "Blocks": [page, line] + words})
+
+        with CorpusIndex() as index:
+            index.add_document(document, "terms")
+            # Expansions are capped, closest terms first
+            expansion = index.expand_term("ab", max_distance=2)
+            self.assertEqual(len(expansion), 100)
+            self.assertEqual(expansion[0], "ab")
+            self.assertEqual(len(index.expand_term("ab", max_distance=2, max_expansions=len(texts))), len(texts))
+            # Expansions larger than the number of sql parameters allowed
+            index._connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+            self.assertEqual(len(index.search("ab", max_distance=2, max_expansions=len(texts))), len(texts))
+            hits = index.search("ab ac", max_distance=2, max_expansions=len(texts))
+            self.assertEqual(len(hits), len(texts) - 1)
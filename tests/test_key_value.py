@@ -128,3 +128,33 @@ class TestKeyValue(unittest.TestCase):
     def test_repr(self):
         """Test case to retrieve KeyValue representation"""
         self.assertEqual(self.kv.__repr__(), "TEST KEY WORDS : TEST VALUE")
+
+
+    def test_with_prefix(self):
+        """Test case to get a prefixed view of a key-value pair"""
+        view = self.kv.with_prefix("1_")
+        self.assertIsInstance(view, KeyValue)
+        self.assertEqual(view.key[0].text, "1_TEST")
+        self.assertEqual(self.kv.key[0].text, "TEST")
+        self.assertIs(view.value, self.kv.value)
+        self.assertIs(view.key[1], self.kv.key[1])
+        self.assertIs(view.key[0].bbox, self.kv.key[0].bbox)
+        self.assertEqual(view.__repr__(), "1_TEST KEY WORDS : TEST VALUE")
+
+    def test_with_prefix_keeps_linearization_cache(self):
+        """Test case to check that a prefixed view does not invalidate the cached linearizations"""
+        from textractor.utils.linearization_cache import LinearizationCache
+
+        generation = LinearizationCache._generation
+        self.kv.with_prefix("1_")
+        self.kv.with_prefix("1_", deep_copy=True)
+        self.assertEqual(LinearizationCache._generation, generation)
+
+
+    def test_with_prefix_deep_copy(self):
+        """Test case to get a prefixed deep copy of a key-value pair"""
+        new_kv = self.kv.with_prefix("1_", deep_copy=True)
+        self.assertEqual(new_kv.key[0].text, "1_TEST")
+        self.assertEqual(self.kv.key[0].text, "TEST")
+        self.assertIsNot(new_kv.value, self.kv.value)
+        self.assertIsNot(new_kv.key[1], self.kv.key[1])
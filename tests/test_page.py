@@ -297,3 +297,118 @@ class TestPage(unittest.TestCase):
 
         self.assertIsInstance(page.return_duplicates(), list)
         self.assertIsInstance(page.return_duplicates()[0], EntityList)
+
+    def test_page_xycut_reading_order(self):
+        from textractor.data.text_linearization_config import TextLinearizationConfig
+        from textractor.entities.bbox import BoundingBox
+        from textractor.exceptions import InputError
+        from textractor.utils.reading_order_utils import xy_cut
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        # DetectDocumentText response, each line is wrapped in its own layout
+        document = Document.open(
+            os.path.join(current_directory, "fixtures/saved_api_responses/test_signature.json")
+        )
+        page = document.pages[0]
+
+        config = TextLinearizationConfig(reading_order_engine="xycut")
+        layouts = page.layouts_in_reading_order(config)
+        self.assertEqual(set(layouts), set(page.layouts))
+        # The two columns of the form are read one after the other
+        text = page.get_text(config)
+        self.assertLess(
+            text.index("Other congregate living"),
+            text.index("The following five interventions"),
+        )
+        self.assertLess(
+            text.index("The following five interventions"),
+            text.index("Concerns and questions addressed"),
+        )
+
+        with self.assertRaises(InputError):
+            page.layouts_in_reading_order(TextLinearizationConfig(reading_order_engine="unknown"))
+
+        class Element:
+            def __init__(self, x, y, width, height):
+                self.bbox = BoundingBox(x, y, width, height)
+
+        title = Element(0.1, 0.0, 0.8, 0.05)
+        left = [Element(0.1, 0.1 + i * 0.02, 0.35, 0.015) for i in range(3)]
+        right = [Element(0.55, 0.1 + i * 0.02, 0.35, 0.015) for i in range(3)]
+        footer = Element(0.1, 0.9, 0.8, 0.05)
+        blocks = xy_cut([footer] + right + left + [title])
+        self.assertEqual(blocks, [[title], left, right, [footer]])
+
+    def test_page_xycut_groups(self):
+        from textractor.data.text_linearization_config import TextLinearizationConfig
+
+        def geometry(left, top, width, height):
+            return {
+                "BoundingBox": {"Width": width, "Height": height, "Left": left, "Top": top},
+                "Polygon": [
+                    {"X": left, "Y": top},
+                    {"X": left + width, "Y": top},
+                    {"X": left + width, "Y": top + height},
+                    {"X": left, "Y": top + height},
+                ],
+            }
+
+        # DetectDocumentText response of a page with a title, two paragraphs in the left column, one in the right
+        # column and a footer
+        paragraphs = [("L1", 0.1, 0.2, 3), ("L2", 0.1, 0.3, 3), ("R1", 0.55, 0.2, 8)]
+        lines = [("Title", 0.1, 0.05, 0.8)]
+        for paragraph, left, top, count in paragraphs:
+            lines += [(f"{paragraph}-{i}", left, top + i * 0.02, 0.35) for i in range(count)]
+        lines.append(("Footer", 0.1, 0.9, 0.8))
+        blocks = [
+            {
+                "BlockType": "PAGE",
+                "Id": "page",
+                "Geometry": geometry(0, 0, 1, 1),
+                "Relationships": [{"Type": "CHILD", "Ids": [f"line-{i}" for i in range(len(lines))]}],
+            }
+        ]
+        for i, (text, left, top, width) in enumerate(lines):
+            blocks.append(
+                {
+                    "BlockType": "LINE",
+                    "Id": f"line-{i}",
+                    "Text": text,
+                    "Confidence": 99.0,
+                    "Geometry": geometry(left, top, width, 0.015),
+                    "Relationships": [{"Type": "CHILD", "Ids": [f"word-{i}"]}],
+                }
+            )
+            blocks.append(
+                {
+                    "BlockType": "WORD",
+                    "Id": f"word-{i}",
+                    "Text": text,
+                    "TextType": "PRINTED",
+                    "Confidence": 99.0,
+                    "Geometry": geometry(left, top, width, 0.015),
+                }
+            )
+        page = Document.open({"DocumentMetadata": {"Pages": 1}, "Blocks": blocks}).pages[0]
+
+        config = TextLinearizationConfig(
+            reading_order_engine="xycut", layout_element_separator="\n\n", same_layout_element_separator="\n"
+        )
+        groups = page.layout_groups_in_reading_order(config)
+        self.assertEqual([len(group) for group in groups], [1, 3, 3, 8, 1])
+        # The lines of a paragraph are joined by a line break, the paragraphs and columns are separated
+        self.assertEqual(
+            page.get_text(config),
+            "\n\n".join(
+                ["Title"]
+                + ["\n".join(f"{paragraph}-{i}" for i in range(count)) for paragraph, _, _, count in paragraphs]
+                + ["Footer"]
+            ),
+        )
+        text = page.get_text(config)
+        index = page.get_offset_index(config)
+        for word in page.words:
+            start = index.starts[index.words.index(word)]
+            self.assertEqual(text[start : start + len(word.text)], word.text)
+        # The default engine keeps one line per group
+        self.assertEqual([len(group) for group in page.layout_groups_in_reading_order()], [1] * len(lines))
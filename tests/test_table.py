@@ -116,6 +116,193 @@ class TestTable(unittest.TestCase):
         self.assertNotEqual(document.tables[3].title, None)
         self.assertEqual(len(document.tables[4].footers), 1)
 
+    def test_table_grid_index(self):
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        document = Document.open(
+            os.path.join(current_directory, "fixtures/saved_api_responses/test_table.json")
+        )
+        table = document.tables[0]
+
+        self.assertEqual(table.cell(0, 0), table.table_cells[0])
+        self.assertEqual(table.cell(2, 4).row_index, 3)
+        self.assertEqual(table.cell(2, 4).col_index, 5)
+        self.assertEqual(len(table.row(0)), 5)
+        self.assertEqual(len(table.column(0)), 3)
+        self.assertEqual([c.col_index for c in table.row(1)], [1, 2, 3, 4, 5])
+        self.assertEqual([c.row_index for c in table.column(-1)], [1, 2, 3])
+        self.assertEqual(list(table.column_header_cells(0)), [table.cell(0, 0)])
+        self.assertEqual(len(table.column_header_cells(1)), 1)
+
+        document = Document.open(
+            os.path.join(current_directory, "fixtures/saved_api_responses/test_table_with_title_and_footers.json")
+        )
+        table = document.tables[3]
+        self.assertIsNot(table.cell(0, 2), table.cell(0, 0))
+        self.assertIs(table.cell(0, 2, resolve_merged=True), table.cell(0, 0))
+        self.assertIs(table.cell(1, 0, resolve_merged=True), table.cell(1, 0))
+
+    def test_table_export_matches_pandas(self):
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        document = Document.open(
+            os.path.join(current_directory, "fixtures/saved_api_responses/test_table_with_title_and_footers.json")
+        )
+
+        frames = document.tables_to_frames()
+        self.assertEqual(len(frames), len(document.tables))
+        for table, frame in zip(document.tables, frames):
+            self.assertTrue(frame.equals(table.to_pandas()))
+            self.assertEqual(table.to_csv(), table.to_pandas().to_csv())
+            self.assertEqual(
+                table.to_csv(use_columns=True),
+                table.to_pandas(use_columns=True).to_csv(),
+            )
+
+    def test_table_export_without_pandas(self):
+        import sys
+        from unittest import mock
+        from textractor.exceptions import MissingDependencyException
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        document = Document.open(
+            os.path.join(current_directory, "fixtures/saved_api_responses/test_table_with_title_and_footers.json")
+        )
+        expected = [
+            (table.to_pandas().to_csv(), table.to_pandas(use_columns=True).to_csv()) for table in document.tables
+        ]
+
+        # pandas cannot be imported, to_csv is written with the csv module
+        with mock.patch.dict(sys.modules, {"pandas": None}):
+            for table, (csv, csv_with_columns) in zip(document.tables, expected):
+                self.assertEqual(table.to_csv(), csv)
+                self.assertEqual(table.to_csv(use_columns=True), csv_with_columns)
+                with self.assertRaises(MissingDependencyException):
+                    table.to_pandas()
+
+    def test_export_tables_to_excel_streaming(self):
+        import tempfile
+        import zipfile
+        from textractor.utils.excel_utils import export_tables_to_excel
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        path = os.path.join(current_directory, "fixtures/saved_api_responses/test_table_with_title_and_footers.json")
+        document = Document.open(path)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "tables.xlsx")
+            count = export_tables_to_excel((Document.open(path) for _ in range(2)), filepath)
+            self.assertEqual(count, 2 * len(document.tables))
+            with zipfile.ZipFile(filepath) as xlsx:
+                sheets = [n for n in xlsx.namelist() if n.startswith("xl/worksheets/sheet")]
+                self.assertEqual(len(sheets), count)
+                self.assertIn(b"<mergeCell ", xlsx.read("xl/worksheets/sheet4.xml"))
+
+            count = export_tables_to_excel([document], filepath, one_sheet_per_page=True)
+            self.assertEqual(count, len(document.tables))
+            with zipfile.ZipFile(filepath) as xlsx:
+                sheets = [n for n in xlsx.namelist() if n.startswith("xl/worksheets/sheet")]
+                self.assertEqual(len(sheets), len(document.pages))
+
+    def test_table_selection(self):
+        from unittest import mock
+        from textractor.data.constants import SimilarityMetric
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        document = Document.open(os.path.join(current_directory, "fixtures/saved_api_responses/test_table.json"))
+        table = document.tables[0]
+        text = table.get_text()
+
+        # The selections are read from the grid index, the table is not deep-copied
+        with mock.patch("textractor.entities.table.deepcopy") as deepcopy:
+            sliced = table[1:, 1:]
+            by_name = table.get_columns_by_name(["Cell 1"], SimilarityMetric.LEVENSHTEIN, 1.1)
+            deepcopy.assert_not_called()
+
+        self.assertEqual(sliced.get_table_range(), (2, 4))
+        self.assertEqual(
+            [c.get_text() for c in sliced.row(0)], [c.get_text() for c in table.row(1)[1:]]
+        )
+        self.assertEqual(list(sliced.children), sliced.table_cells)
+        self.assertIs(sliced.cell(0, 0).words[0], table.cell(1, 1).words[0])
+        self.assertEqual(by_name.get_table_range(), (3, 5))
+        self.assertEqual(by_name.get_text(), text)
+        # The table itself is left untouched
+        self.assertEqual(table.get_table_range(), (3, 5))
+        self.assertEqual(table.get_text(), text)
+
+    def test_table_linearization_structure_words(self):
+        from textractor.data.text_linearization_config import TextLinearizationConfig
+        from textractor.data.html_linearization_config import HTMLLinearizationConfig
+        from textractor.utils.linearization_cache import LinearizationCache
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        document = Document.open(
+            os.path.join(current_directory, "fixtures/saved_api_responses/test_table_with_title_and_footers.json")
+        )
+        # Table with merged cells
+        table = document.tables[3]
+        config = TextLinearizationConfig(
+            add_prefixes_and_suffixes_as_words=True,
+            table_duplicate_text_in_merged_cells=True,
+            table_flatten_headers=True,
+            table_cell_prefix="<c>",
+            table_cell_suffix="</c>",
+        )
+
+        with LinearizationCache.disabled():
+            for c in [config, HTMLLinearizationConfig()]:
+                # The text only path skips the words but gives the same text
+                text, words = table.get_text_and_words(c)
+                self.assertEqual(table.get_text(c), text)
+
+        _, words = table.get_text_and_words(config)
+        structure_words = [w for w in words if w.is_structure]
+        self.assertTrue(structure_words)
+        self.assertEqual(len({w.id for w in words}), len(words))
+        self.assertTrue(all(w.id.startswith(table.id) for w in structure_words))
+        self.assertTrue(all(w.table_id == table.id for w in words))
+        # The flattened header words are kept
+        header_words = [w for c in table.table_cells if c.is_column_header for w in c.words]
+        self.assertTrue(set(w.id for w in header_words) <= set(w.id for w in words))
+
+    def test_table_linearization_text_only(self):
+        from unittest import mock
+        from textractor.data.html_linearization_config import HTMLLinearizationConfig
+        from textractor.data.markdown_linearization_config import MarkdownLinearizationConfig
+        from textractor.entities.table import Table
+        from textractor.utils.linearization_cache import LinearizationCache
+
+        current_directory = os.path.abspath(os.path.dirname(__file__))
+        document = Document.open(
+            os.path.join(current_directory, "fixtures/saved_api_responses/test_table_with_title_and_footers.json")
+        )
+        self.assertTrue(document.tables)
+
+        with LinearizationCache.disabled():
+            expected = [
+                document.get_text_and_words()[0],
+                document.get_text_and_words(MarkdownLinearizationConfig())[0],
+                "".join(f"<div>{p.get_text_and_words(HTMLLinearizationConfig())[0]}</div>" for p in document.pages),
+                document.pages[0].get_text_and_words(MarkdownLinearizationConfig())[0],
+            ]
+        LinearizationCache.clear()
+
+        # The document and page exports go through the layouts down to the tables without building the table words
+        with mock.patch.object(
+            Table, "_get_linearized_words", autospec=True, side_effect=Table._get_linearized_words
+        ) as get_linearized_words:
+            outputs = [
+                document.get_text(),
+                document.to_markdown(),
+                document.to_html(),
+                document.pages[0].to_markdown(),
+            ]
+            get_linearized_words.assert_not_called()
+            document.get_text_and_words()
+            get_linearized_words.assert_called()
+
+        self.assertEqual(outputs[:2] + [outputs[3]], expected[:2] + [expected[3]])
+        self.assertEqual(outputs[2], f"<html><body>{expected[2]}</body></html>")
+
 if __name__ == "__main__":
     test = TestTable()
     test.setUp()
@@ -1,17 +1,138 @@
+import asyncio
+import copy
+import datetime
+import inspect
+import io
+import json
+import time
 import os
 import PIL
 import unittest
 import boto3
+from botocore.exceptions import ClientError
+import tempfile
 import uuid
 import logging
 from tests.utils import get_fixture_path
 
-from textractor import Textractor
+from textractor import Textractor, AsyncTextractor
 from textractor.entities.document import Document
 from textractor.entities.lazy_document import LazyDocument
+from textractcaller import JobPoller
+from textractcaller.t_call import Textract_API
 from textractor.data.constants import TextractFeatures
-from textractor.exceptions import InvalidProfileNameError, S3FilePathMissing
+from textractor.exceptions import IncorrectMethodException, InvalidProfileNameError, S3FilePathMissing
 from textractor.utils.s3_utils import upload_to_s3, delete_from_s3
+from textractor.utils.results_utils import get_full_json_from_output_config
+from textractcaller import OutputConfig, LocalResponseCache, SQLiteJobStore
+
+
+class StubTextractClient:
+    """Textract client replaying a saved response, jobs stay IN_PROGRESS for a few polls and results are paginated"""
+
+    def __init__(self, response, in_progress_polls=2, page_size=50):
+        self.response = response
+        self.in_progress_polls = in_progress_polls
+        self.page_size = page_size
+        self.polls = {}
+
+    def analyze_document(self, Document, FeatureTypes, **kwargs):
+        self.polls.setdefault("sync", 0)
+        self.polls["sync"] += 1
+        return copy.deepcopy(self.response)
+
+    def start_document_analysis(self, **kwargs):
+        job_id = f"job-{len(self.polls)}"
+        self.polls[job_id] = 0
+        return {"JobId": job_id, "ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    def get_document_analysis(self, JobId, NextToken=None, **kwargs):
+        self.polls[JobId] += 1
+        if self.polls[JobId] <= self.in_progress_polls:
+            return {"JobStatus": "IN_PROGRESS"}
+        start = int(NextToken or 0)
+        response = copy.deepcopy(self.response)
+        response["JobStatus"] = "SUCCEEDED"
+        response["Blocks"] = response["Blocks"][start : start + self.page_size]
+        if start + self.page_size < len(self.response["Blocks"]):
+            response["NextToken"] = str(start + self.page_size)
+        return response
+
+
+class StubQueriesTextractClient(StubTextractClient):
+    """
+    StubTextractClient answering the queries of each request with new QUERY and QUERY_RESULT blocks, the first
+    throttled_starts Start* calls are throttled
+    """
+
+    def __init__(self, response, throttled_starts=0):
+        super().__init__(response, in_progress_polls=0)
+        self.requests = []
+        self.jobs = {}
+        self.throttled_starts = throttled_starts
+
+    def _answer(self, QueriesConfig=None, **kwargs):
+        response = copy.deepcopy(self.response)
+        page = next(block for block in response["Blocks"] if block["BlockType"] == "PAGE")
+        for query in (QueriesConfig or {}).get("Queries", []):
+            query_id, result_id = str(uuid.uuid4()), str(uuid.uuid4())
+            response["Blocks"].append(
+                {
+                    "BlockType": "QUERY",
+                    "Id": query_id,
+                    "Relationships": [{"Type": "ANSWER", "Ids": [result_id]}],
+                    "Query": {"Text": query["Text"]},
+                }
+            )
+            response["Blocks"].append(
+                {"BlockType": "QUERY_RESULT", "Confidence": 90.0, "Text": query["Text"].upper(), "Id": result_id}
+            )
+            page["Relationships"][0]["Ids"].extend([query_id, result_id])
+        return response
+
+    def analyze_document(self, **kwargs):
+        self.requests.append(kwargs)
+        return self._answer(**kwargs)
+
+    def start_document_analysis(self, **kwargs):
+        if self.throttled_starts:
+            self.throttled_starts -= 1
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": ""}}, "StartDocumentAnalysis")
+        self.requests.append(kwargs)
+        job_id = f"job-{len(self.jobs)}"
+        self.jobs[job_id] = kwargs
+        return {"JobId": job_id, "ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    def get_document_analysis(self, JobId, NextToken=None):
+        response = self._answer(**self.jobs[JobId])
+        response["JobStatus"] = "SUCCEEDED"
+        return response
+
+
+class StubOutputS3Client:
+    """S3 client serving the output parts of a job, part i is only listed from the i-th listing on"""
+
+    def __init__(self, parts):
+        self.objects = {"output/job/.s3_access_check": b""}
+        for i, part in enumerate(parts):
+            self.objects[f"output/job/{i + 1}"] = json.dumps(part).encode("utf-8")
+        self.listings = 0
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        self.listings += 1
+        keys = [k for k in self.objects if not k.split("/")[-1].isnumeric() or int(k.split("/")[-1]) <= self.listings]
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return {"Contents": [{"Key": k, "Size": len(self.objects[k]), "LastModified": now} for k in keys]}
+
+    def get_object(self, Bucket, Key, Range=None):
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+
+class StubHeadS3Client:
+    """S3 client returning the same ETag for every object"""
+
+    def head_object(self, Bucket, Key, VersionId=None):
+        return {"ETag": '"0123456789abcdef"'}
 
 
 class TestTextractor(unittest.TestCase):
@@ -205,3 +326,332 @@ class TestTextractor(unittest.TestCase):
         
         self.assertIsInstance(document, LazyDocument)
         self.assertEqual(len(document.pages), 1)
+
+    def test_async_textractor(self):
+        with open(os.path.join(os.path.dirname(__file__), "fixtures/saved_api_responses/test_document_smoke_test.json")) as f:
+            response = json.load(f)
+        client = StubTextractClient(response)
+        extractor = AsyncTextractor(region_name="us-west-2", textract_client=client, polling_interval=0)
+
+        async def run():
+            return await asyncio.gather(
+                extractor.start_document_analysis(
+                    "s3://bucket/document.pdf", features=[TextractFeatures.TABLES], save_image=False
+                ),
+                extractor.start_document_analysis(
+                    "s3://bucket/document.pdf", features=[TextractFeatures.TABLES], save_image=False
+                ),
+            )
+
+        documents = asyncio.run(run())
+        expected = Document.open(response)
+        self.assertEqual(len(client.polls), 2)
+        for document in documents:
+            self.assertIsInstance(document, Document)
+            self.assertEqual(len(document.response["Blocks"]), len(response["Blocks"]))
+            self.assertNotIn("NextToken", document.response)
+            self.assertEqual(document.get_text(), expected.get_text())
+
+        client.polls["job-2"] = 0
+        document = asyncio.run(extractor.get_result("job-2", Textract_API.ANALYZE))
+        self.assertEqual(len(document.words), len(expected.words))
+
+    def test_async_textractor_response_cache(self):
+        with open(os.path.join(os.path.dirname(__file__), "fixtures/saved_api_responses/test_document_smoke_test.json")) as f:
+            response = json.load(f)
+        client = StubTextractClient(response, in_progress_polls=0)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = LocalResponseCache(directory)
+            extractor = AsyncTextractor(region_name="us-west-2", textract_client=client, response_cache=cache)
+            extractor.textractor.s3_client = StubHeadS3Client()
+
+            def start():
+                return asyncio.run(
+                    extractor.start_document_analysis(
+                        "s3://bucket/document.pdf", features=[TextractFeatures.TABLES], save_image=False
+                    )
+                )
+
+            first = start()
+            second = start()
+            self.assertEqual(len(client.polls), 1)
+            self.assertEqual(second.get_text(), first.get_text())
+            self.assertEqual(cache.metrics().hits, 1)
+
+    def test_lazy_document_job_poller(self):
+        with open(os.path.join(os.path.dirname(__file__), "fixtures/saved_api_responses/test_document_smoke_test.json")) as f:
+            response = json.load(f)
+        client = StubTextractClient(response)
+        poller = JobPoller(client, get_tps=100, min_interval=0.01)
+        extractor = Textractor(region_name="us-west-2", job_poller=poller)
+        extractor.textract_client = client
+
+        documents = [
+            extractor.start_document_analysis(
+                "s3://bucket/document.pdf", features=[TextractFeatures.TABLES], save_image=False
+            )
+            for _ in range(3)
+        ]
+        self.assertTrue(all(d._future is not None for d in documents))
+        expected = Document.open(response)
+        for document in documents:
+            self.assertIsInstance(document, LazyDocument)
+            self.assertEqual(document.get_text(), expected.get_text())
+        self.assertEqual(len(poller), 0)
+        poller.stop()
+
+    def test_get_full_json_from_output_config_completion(self):
+        with open(os.path.join(os.path.dirname(__file__), "fixtures/saved_api_responses/test_document_smoke_test.json")) as f:
+            response = json.load(f)
+        blocks = response["Blocks"]
+        parts = []
+        for i in range(0, len(blocks), 40):
+            part = dict(response, Blocks=blocks[i : i + 40])
+            if i + 40 < len(blocks):
+                part["NextToken"] = str(i + 40)
+            parts.append(part)
+        s3_client = StubOutputS3Client(parts)
+
+        start = time.time()
+        result = get_full_json_from_output_config(
+            OutputConfig(s3_bucket="bucket", s3_prefix="output"), "job", s3_client=s3_client, polling_interval=0.01
+        )
+        # Returned as soon as the part without NextToken is merged, waiting for the parts written later
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(s3_client.listings, len(parts))
+        self.assertEqual([b["Id"] for b in result["Blocks"]], [b["Id"] for b in blocks])
+        self.assertNotIn("NextToken", result)
+
+    def test_get_full_json_from_output_config_incomplete(self):
+        class StatusTextractClient:
+            def __init__(self, status):
+                self.status = status
+                self.calls = 0
+
+            def get_document_analysis(self, JobId, **kwargs):
+                self.calls += 1
+                return {"JobStatus": self.status, "StatusMessage": "stub"}
+
+        # The final part is never written
+        output_config = OutputConfig(s3_bucket="bucket", s3_prefix="output")
+        parts = [{"Blocks": [], "NextToken": "1"}]
+        for status in ["FAILED", "PARTIAL_SUCCESS"]:
+            textract_client = StatusTextractClient(status)
+            with self.assertRaisesRegex(Exception, status):
+                get_full_json_from_output_config(
+                    output_config,
+                    "job",
+                    s3_client=StubOutputS3Client(parts),
+                    polling_interval=0.01,
+                    textract_api=Textract_API.ANALYZE,
+                    textract_client=textract_client,
+                )
+            self.assertEqual(textract_client.calls, 1)
+
+        # The timeout runs from the last IN_PROGRESS status
+        start = time.monotonic()
+        in_progress_until = start + 0.3
+        textract_client = StatusTextractClient("IN_PROGRESS")
+        textract_client.get_document_analysis = lambda JobId, **kwargs: {
+            "JobStatus": "IN_PROGRESS" if time.monotonic() < in_progress_until else "SUCCEEDED"
+        }
+        with self.assertRaises(TimeoutError):
+            get_full_json_from_output_config(
+                output_config,
+                "job",
+                s3_client=StubOutputS3Client(parts),
+                polling_interval=0.01,
+                textract_api=Textract_API.ANALYZE,
+                textract_client=textract_client,
+                status_polling_interval=0.05,
+                timeout=0.2,
+            )
+        self.assertGreater(time.monotonic() - start, 0.4)
+
+        # Without the status of the job (a wrong prefix), the wait is bounded by default
+        self.assertIsNotNone(inspect.signature(get_full_json_from_output_config).parameters["timeout"].default)
+        with self.assertRaises(TimeoutError):
+            get_full_json_from_output_config(
+                OutputConfig(s3_bucket="bucket", s3_prefix="wrong"),
+                "job",
+                s3_client=StubOutputS3Client([]),
+                polling_interval=0.01,
+                timeout=0.1,
+            )
+
+    def test_response_cache(self):
+        with open(os.path.join(os.path.dirname(__file__), "fixtures/saved_api_responses/test_document_smoke_test.json")) as f:
+            response = json.load(f)
+        client = StubTextractClient(response, in_progress_polls=0)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = LocalResponseCache(directory)
+            extractor = Textractor(region_name="us-west-2", response_cache=cache)
+            extractor.textract_client = client
+            extractor.s3_client = StubHeadS3Client()
+
+            documents = [
+                extractor.start_document_analysis(
+                    "s3://bucket/document.pdf", features=[TextractFeatures.TABLES], save_image=False
+                )
+                for _ in range(2)
+            ]
+            # The second call is a miss as well, the first document is not resolved yet
+            self.assertEqual(len(client.polls), 2)
+            expected = Document.open(response)
+            self.assertEqual(documents[0].get_text(), expected.get_text())
+
+            document = extractor.start_document_analysis(
+                "s3://bucket/document.pdf", features=[TextractFeatures.TABLES], save_image=False
+            )
+            self.assertEqual(len(client.polls), 2)
+            self.assertIsNone(document.job_id)
+            self.assertIsNotNone(document.document)
+            self.assertEqual(document.get_text(), expected.get_text())
+
+            extractor.start_document_analysis(
+                "s3://bucket/document.pdf", features=[TextractFeatures.FORMS], save_image=False
+            )
+            self.assertEqual(len(client.polls), 3)
+            metrics = cache.metrics()
+            self.assertEqual((metrics.hits, metrics.misses, metrics.writes), (1, 3, 1))
+
+    def test_job_store_resume(self):
+        with open(os.path.join(os.path.dirname(__file__), "fixtures/saved_api_responses/test_document_smoke_test.json")) as f:
+            response = json.load(f)
+        client = StubTextractClient(response, in_progress_polls=0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "jobs.db")
+            extractor = Textractor(region_name="us-west-2", job_store=SQLiteJobStore(path))
+            extractor.textract_client = client
+            extractor.s3_client = StubHeadS3Client()
+            document = extractor.start_document_analysis(
+                "s3://bucket/document.pdf", features=[TextractFeatures.TABLES], save_image=False
+            )
+            # Submitting the same request again reuses the job
+            again = extractor.start_document_analysis(
+                "s3://bucket/document.pdf", features=[TextractFeatures.TABLES], save_image=False
+            )
+            self.assertEqual(again.job_id, document.job_id)
+            self.assertEqual(len(client.polls), 1)
+            record = extractor.job_store.get(document.job_id)
+            self.assertEqual(record.status, "IN_PROGRESS")
+            self.assertEqual(record.features, ["TABLES"])
+            self.assertTrue(record.client_request_token)
+
+            # A new process finds the job in progress
+            restarted = Textractor(region_name="us-west-2", job_store=SQLiteJobStore(path))
+            restarted.textract_client = client
+            resumed = restarted.resume()
+            self.assertEqual([d.job_id for d in resumed], [document.job_id])
+            self.assertEqual(resumed[0].get_text(), Document.open(response).get_text())
+            self.assertEqual(restarted.job_store.get(document.job_id).status, "SUCCEEDED")
+            self.assertEqual(restarted.resume(), [])
+
+    def test_job_store_expired_jobs(self):
+        from unittest import mock
+        from textractcaller.t_job_store import RESULT_RETENTION_SECONDS
+
+        class ExpiringTextractClient(StubTextractClient):
+            """Textract client forgetting the jobs listed in expired"""
+
+            expired = set()
+
+            def get_document_analysis(self, JobId, NextToken=None, **kwargs):
+                if JobId in self.expired:
+                    raise ClientError(
+                        {"Error": {"Code": "InvalidJobIdException", "Message": "Invalid job id"}},
+                        "GetDocumentAnalysis",
+                    )
+                return super().get_document_analysis(JobId, NextToken, **kwargs)
+
+        with open(os.path.join(os.path.dirname(__file__), "fixtures/saved_api_responses/test_document_smoke_test.json")) as f:
+            response = json.load(f)
+        client = ExpiringTextractClient(response, in_progress_polls=0)
+        extractor = Textractor(region_name="us-west-2", job_store=SQLiteJobStore(":memory:"))
+        extractor.textract_client = client
+        extractor.s3_client = StubHeadS3Client()
+
+        def start():
+            return extractor.start_document_analysis(
+                "s3://bucket/document.pdf", features=[TextractFeatures.TABLES], save_image=False
+            )
+
+        document = start()
+        document.get_text()
+        self.assertEqual(extractor.job_store.get(document.job_id).status, "SUCCEEDED")
+        # The results of a succeeded job are reused while Textract keeps them
+        self.assertEqual(start().job_id, document.job_id)
+
+        with mock.patch("time.time", return_value=time.time() + RESULT_RETENTION_SECONDS + 1):
+            renewed = start()
+        self.assertNotEqual(renewed.job_id, document.job_id)
+        self.assertEqual(extractor.job_store.get(document.job_id).status, "EXPIRED")
+        self.assertNotEqual(
+            extractor.job_store.get(renewed.job_id).client_request_token,
+            extractor.job_store.get(document.job_id).client_request_token,
+        )
+
+        # A job unknown to Textract is recorded as expired and is not reused
+        client.expired.add(renewed.job_id)
+        with self.assertRaises(ClientError):
+            renewed.get_text()
+        self.assertEqual(extractor.job_store.get(renewed.job_id).status, "EXPIRED")
+        self.assertNotIn(start().job_id, (document.job_id, renewed.job_id))
+
+    def test_query_shards(self):
+        with open(os.path.join(os.path.dirname(__file__), "fixtures/saved_api_responses/test_document_smoke_test.json")) as f:
+            response = json.load(f)
+        queries = [f"What is value {i}?" for i in range(40)]
+        expected = Document.open(response)
+        extractor = Textractor(region_name="us-west-2")
+
+        # Sync, at most 15 queries per AnalyzeDocument call
+        client = StubQueriesTextractClient(response)
+        extractor.textract_client = client
+        document = extractor.analyze_document(
+            os.path.join(os.path.dirname(__file__), "fixtures/single-page-1.png"),
+            features=[TextractFeatures.TABLES, TextractFeatures.QUERIES],
+            queries=queries,
+            save_image=False,
+        )
+        self.assertEqual([len(r["QueriesConfig"]["Queries"]) for r in client.requests], [15, 15, 10])
+        self.assertEqual([r["FeatureTypes"] for r in client.requests[1:]], [["QUERIES"], ["QUERIES"]])
+        self.assertEqual(sorted(q.query for q in document.pages[0].queries), sorted(queries))
+        self.assertTrue(all(q.result.answer == q.query.upper() for q in document.pages[0].queries))
+        self.assertEqual(len(document.words), len(expected.words))
+
+        # Async, at most 30 queries per job, the throttled jobs of the shards are started again
+        client = StubQueriesTextractClient(response, throttled_starts=1)
+        extractor.textract_client = client
+        document = extractor.start_document_analysis(
+            "s3://bucket/document.pdf",
+            features=[TextractFeatures.TABLES, TextractFeatures.QUERIES],
+            queries=queries,
+            save_image=False,
+        )
+        self.assertEqual(sorted(len(r["QueriesConfig"]["Queries"]) for r in client.requests), [10, 30])
+        self.assertEqual(sorted(q.query for q in document.pages[0].queries), sorted(queries))
+        self.assertEqual(len(document.words), len(expected.words))
+
+    def test_analyze_document_fan_out(self):
+        with open(os.path.join(os.path.dirname(__file__), "fixtures/saved_api_responses/test_document_smoke_test.json")) as f:
+            response = json.load(f)
+        client = StubTextractClient(response)
+        extractor = Textractor(region_name="us-west-2")
+        extractor.textract_client = client
+        images = [
+            PIL.Image.open(os.path.join(os.path.dirname(__file__), "fixtures/single-page-1.png")),
+            PIL.Image.open(os.path.join(os.path.dirname(__file__), "fixtures/single-page-2.png")),
+        ]
+        with self.assertRaises(IncorrectMethodException):
+            extractor.analyze_document(images, features=[TextractFeatures.TABLES])
+
+        document = extractor.analyze_document(images, features=[TextractFeatures.TABLES], fan_out=True)
+        self.assertEqual(client.polls["sync"], 2)
+        self.assertEqual(len(document.pages), 2)
+        self.assertEqual(document.response["DocumentMetadata"]["Pages"], 2)
+        self.assertEqual(len({block["Id"] for block in document.response["Blocks"]}), 2 * len(response["Blocks"]))
+        expected = Document.open(response)
+        for page, image in zip(document.pages, images):
+            self.assertEqual(len(page.words), len(expected.words))
+            self.assertEqual(page.image.size, image.size)
@@ -45,3 +45,26 @@ class TestWordOrdering(unittest.TestCase):
 
         self.assertEqual(document.tables[0].table_cells[0].text.strip(), "Are those Words in order?")
 
+
+    def test_word_ordering_across_lines(self):
+        import random
+        from textractor.entities.bbox import BoundingBox
+        from textractor.entities.line import Line
+        from textractor.entities.word import Word
+        from textractor.utils.text_utils import linearize_children
+
+        words = []
+        for line_index, line_text in enumerate(["Are those", "words in", "order ?"]):
+            y = 0.1 + 0.2 * line_index
+            line = Line(f"line-{line_index}", BoundingBox(0.1, y, 0.5, 0.02))
+            for word_index, text in enumerate(line_text.split()):
+                word = Word(f"word-{line_index}-{word_index}", BoundingBox(0.1 + 0.2 * word_index, y, 0.1, 0.02), text)
+                word.line = line
+                words.append(word)
+        # Orphan words are not linearized
+        words.append(Word("orphan", BoundingBox(0.1, 0.9, 0.1, 0.02), "orphan"))
+        random.Random(0).shuffle(words)
+
+        text, linearized_words = linearize_children(words)
+        self.assertEqual(text.split(), ["Are", "those", "words", "in", "order", "?"])
+        self.assertEqual([w.text for w in linearized_words], text.split())
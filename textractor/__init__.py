@@ -1,3 +1,4 @@
 __version__ = "1.9.2"
 
 from .textractor import Textractor
+from .async_textractor import AsyncTextractor
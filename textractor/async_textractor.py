@@ -0,0 +1,266 @@
+"""
+:class:`AsyncTextractor` exposes the methods of :class:`Textractor` as coroutines so that many documents can be
+processed concurrently from a single event loop. The asynchronous APIs (Start*) are awaited until the job completes,
+polling with :code:`asyncio.sleep` instead of blocking a thread per document, and return the parsed :class:`Document`.
+
+The AWS calls and the parsing run in an executor, unless an asynchronous Textract client (aiobotocore for example) is
+given, in which case the job polling goes through that client directly.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import Executor
+from typing import Union
+
+from textractcaller import aget_full_json, aget_job_response, get_async_client
+from textractcaller.t_cache import ResponseCache
+from textractcaller.t_call import Textract_API
+from textractcaller.t_call_async import is_async_client
+from textractcaller.t_job_store import JobStore
+from textractcaller.t_poller import JobPoller
+from textractcaller.t_query_shards import merge_query_responses
+
+from textractor.data.constants import TextractAPI
+from textractor.entities.document import Document
+from textractor.entities.lazy_document import LazyDocument
+from textractor.parsers import response_parser
+from textractor.textractor import Textractor
+from textractor.utils.results_utils import get_full_json_from_output_config
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTextractor:
+    """
+    Asynchronous counterpart of :class:`Textractor`, every method is a coroutine returning a :class:`Document`.
+
+    :param profile_name: Customer's profile name as set in the ~/.aws/config file
+    :type profile_name: str, optional
+    :param region_name: If AWSCLI isn't setup, the user can pass region to let boto3 pick up credentials from the system.
+    :type region_name: str, optional
+    :param kms_key_id: Customer's AWS KMS key (cryptographic key)
+    :type kms_key_id: str, optional
+    :param textract_client: Textract client to use instead of the one created from the session. A boto3 client is
+                            used for all the calls, a client with coroutine methods (aiobotocore) is only used to wait
+                            for the jobs.
+    :param executor: Executor running the blocking calls, defaults to the default executor of the event loop
+    :type executor: Executor, optional
+    :param polling_interval: Time in seconds between two status checks of an asynchronous job
+    :type polling_interval: float, optional
+    :param job_poller: Shared poller waiting for the asynchronous jobs instead of one polling loop per job
+    :type job_poller: JobPoller, optional
+    :param job_store: Durable record of the asynchronous jobs, see :class:`Textractor`
+    :type job_store: JobStore, optional
+    :param response_cache: Cache of the Textract responses, see :class:`Textractor`. The cached documents are returned
+                           without starting a job.
+    :type response_cache: ResponseCache, optional
+    """
+
+    def __init__(
+        self,
+        profile_name: str = None,
+        region_name: str = None,
+        kms_key_id: str = "",
+        textract_client=None,
+        executor: Executor = None,
+        polling_interval: float = 1,
+        job_poller: JobPoller = None,
+        job_store: JobStore = None,
+        response_cache: ResponseCache = None,
+    ):
+        self.textractor = Textractor(
+            profile_name=profile_name,
+            region_name=region_name,
+            kms_key_id=kms_key_id,
+            job_poller=job_poller,
+            response_cache=response_cache,
+            job_store=job_store,
+        )
+        if textract_client is not None and not is_async_client(textract_client):
+            self.textractor.textract_client = textract_client
+        self.executor = executor
+        self.polling_interval = polling_interval
+        self.textract_client = get_async_client(
+            textract_client or self.textractor.textract_client, executor=executor
+        )
+
+    async def _run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+
+    async def _parse(self, response: dict, images=None) -> Document:
+        document = await self._run(response_parser.parse, response)
+        document.response = response
+        if images is not None:
+            for page, image in zip(document.pages, images):
+                page.image = image
+        return document
+
+    async def detect_document_text(self, *args, **kwargs) -> Document:
+        """
+        Awaitable :meth:`Textractor.detect_document_text`, takes the same parameters.
+
+        :return: Document object returned by the SYNC DetectDocumentText API
+        :rtype: Document
+        """
+        return await self._run(self.textractor.detect_document_text, *args, **kwargs)
+
+    async def analyze_document(self, *args, **kwargs) -> Document:
+        """
+        Awaitable :meth:`Textractor.analyze_document`, takes the same parameters.
+
+        :return: Document object returned by the SYNC AnalyzeDocument API
+        :rtype: Document
+        """
+        return await self._run(self.textractor.analyze_document, *args, **kwargs)
+
+    async def analyze_id(self, *args, **kwargs) -> Document:
+        """
+        Awaitable :meth:`Textractor.analyze_id`, takes the same parameters.
+
+        :return: Document object returned by the SYNC AnalyzeID API
+        :rtype: Document
+        """
+        return await self._run(self.textractor.analyze_id, *args, **kwargs)
+
+    async def analyze_expense(self, *args, **kwargs) -> Document:
+        """
+        Awaitable :meth:`Textractor.analyze_expense`, takes the same parameters.
+
+        :return: Document object returned by the SYNC AnalyzeExpense API
+        :rtype: Document
+        """
+        return await self._run(self.textractor.analyze_expense, *args, **kwargs)
+
+    async def start_document_text_detection(self, *args, **kwargs) -> Document:
+        """
+        Starts a StartDocumentTextDetection job like :meth:`Textractor.start_document_text_detection`, which takes the
+        same parameters, and waits for its completion without blocking the event loop.
+
+        :return: Document object containing the results of the job
+        :rtype: Document
+        """
+        lazy_document = await self._run(self.textractor.start_document_text_detection, *args, **kwargs)
+        return await self.wait(lazy_document)
+
+    async def start_document_analysis(self, *args, **kwargs) -> Document:
+        """
+        Starts a StartDocumentAnalysis job like :meth:`Textractor.start_document_analysis`, which takes the same
+        parameters, and waits for its completion without blocking the event loop.
+
+        :return: Document object containing the results of the job
+        :rtype: Document
+        """
+        lazy_document = await self._run(self.textractor.start_document_analysis, *args, **kwargs)
+        return await self.wait(lazy_document)
+
+    async def start_expense_analysis(self, *args, **kwargs) -> Document:
+        """
+        Starts a StartExpenseAnalysis job like :meth:`Textractor.start_expense_analysis`, which takes the same
+        parameters, and waits for its completion without blocking the event loop.
+
+        :return: Document object containing the results of the job
+        :rtype: Document
+        """
+        lazy_document = await self._run(self.textractor.start_expense_analysis, *args, **kwargs)
+        return await self.wait(lazy_document)
+
+    async def wait(self, lazy_document: LazyDocument) -> Document:
+        """
+        Waits for the job of a :class:`LazyDocument` and returns its Document. The LazyDocument is resolved as well,
+        accessing its attributes afterwards does not call Textract again.
+
+        :param lazy_document: LazyDocument returned by one of the Start* methods of :class:`Textractor`
+        :type lazy_document: LazyDocument
+        :return: Document object containing the results of the job
+        :rtype: Document
+        """
+        if lazy_document.document is not None:
+            return lazy_document.document
+        if lazy_document._query_shards:
+            # The other query shards of the request run as jobs of their own, their queries are merged in
+            responses = await asyncio.gather(
+                *(self._wait_response(document) for document in [lazy_document, *lazy_document._query_shards])
+            )
+            for shard, shard_response in zip(lazy_document._query_shards, responses[1:]):
+                await self._run(shard._store_response, shard_response)
+            response = merge_query_responses(list(responses))
+        else:
+            response = await self._wait_response(lazy_document)
+        await self._run(lazy_document._store_response, response)
+        lazy_document._document = await self._parse(response, lazy_document._images)
+        return lazy_document._document
+
+    async def _wait_response(self, lazy_document: LazyDocument) -> dict:
+        """Waits for the job of a LazyDocument and returns its response, without parsing it"""
+        api = _to_textract_api(lazy_document._api)
+        output_config = lazy_document._output_config
+        try:
+            if lazy_document._future is not None:
+                # Registered with a JobPoller, its future resolves with the response
+                response = await asyncio.wrap_future(lazy_document._future)
+                if output_config:
+                    response = await self._run(
+                        get_full_json_from_output_config,
+                        output_config,
+                        lazy_document.job_id,
+                        self.textractor.s3_client,
+                        textract_api=api,
+                        textract_client=self.textractor.textract_client,
+                    )
+            elif output_config:
+                # The results are read from the output location once the job is done
+                while True:
+                    response = await aget_job_response(
+                        job_id=lazy_document.job_id,
+                        textract_api=api,
+                        boto3_textract_client=self.textract_client,
+                    )
+                    if response["JobStatus"] != "IN_PROGRESS":
+                        break
+                    await asyncio.sleep(self.polling_interval)
+                if response["JobStatus"] != "SUCCEEDED":
+                    raise Exception(f"Job failed with status: {response['JobStatus']}\n{response}")
+                response = await self._run(
+                    get_full_json_from_output_config,
+                    output_config,
+                    lazy_document.job_id,
+                    self.textractor.s3_client,
+                    textract_api=api,
+                    textract_client=self.textractor.textract_client,
+                )
+            else:
+                response = await aget_full_json(
+                    lazy_document.job_id,
+                    api,
+                    boto3_textract_client=self.textract_client,
+                    job_done_polling_interval=self.polling_interval,
+                )
+        except Exception:
+            await self._run(lazy_document._job_failed)
+            raise
+        return response
+
+    async def get_result(self, job_id: str, api: Union[TextractAPI, Textract_API]) -> Document:
+        """
+        Retrieves Textract API output for a given job id, waiting for the job if it is still in progress.
+
+        :param job_id: Textract API JobID
+        :type job_id: str, required
+        :param api: API that started the job
+        :type api: Union[TextractAPI, Textract_API]
+        :return: Returns a Document object
+        :rtype: Document
+        """
+        response = await aget_full_json(
+            job_id,
+            _to_textract_api(api),
+            boto3_textract_client=self.textract_client,
+            job_done_polling_interval=self.polling_interval,
+        )
+        return await self._parse(response)
+
+
+def _to_textract_api(api: Union[TextractAPI, Textract_API]) -> Textract_API:
+    return TextractAPI.TextractAPI_to_Textract_API(api) if isinstance(api, TextractAPI) else api
@@ -169,6 +169,12 @@ class TextLinearizationConfig:
         "[ ]"  #: Representation for selection element when not selected
     )
 
+    reading_order_engine: str = "textract"  #: How layouts are ordered on a page. "textract" uses the reading order returned by Textract (the line order when the LAYOUT feature was not requested), "xycut" orders them geometrically with a recursive XY-cut, which handles multi-column pages without layout analysis
+
+    reading_order_min_gap: float = 0.0  #: Minimum gap between two blocks, in normalized page coordinates, for the "xycut" engine to separate them
+
+    reading_order_line_gap: float = 0.8  #: For the "xycut" engine, lines separated by less than this many line heights belong to the same block, the lines of a block are joined with same_layout_element_separator and the blocks with layout_element_separator
+
     heuristic_h_tolerance: float = 0.3  #: How much the line below and above the current line should differ in width to be separated
 
     heuristic_line_break_threshold: float = 0.9  #: How much space is acceptable between two lines before splitting them. Expressed in multiple of min heights
@@ -1,19 +1,18 @@
 """The Document class is defined to host all the various DocumentEntity objects within it. :class:`DocumentEntity` objects can be 
 accessed, searched and exported the functions given below."""
 
-import boto3
 import json
 import os
 import string
 import logging
-import xlsxwriter
 import io
 from pathlib import Path
-from typing import List, IO, Union, AnyStr, Tuple, Optional
-from copy import deepcopy
+from typing import Iterator, List, IO, Union, AnyStr, Tuple, Optional
 from collections import defaultdict
 from PIL import Image
 
+from textractcaller.t_clients import get_client
+
 from textractor.entities.expense_document import ExpenseDocument
 from textractor.entities.identity_document import IdentityDocument
 from textractor.entities.word import Word
@@ -34,9 +33,15 @@ from textractor.data.constants import (
     Direction,
     DirectionalFinderType,
 )
+from textractor.utils.arrow_utils import iter_record_batches
+from textractor.utils.chunk_utils import TextChunk, iter_chunks
+from textractor.utils.excel_utils import export_tables_to_excel
+from textractor.utils.linearization_cache import LinearizationCache, memoize_linearization
+from textractor.utils.offset_utils import TextOffsetIndex, join_text
 from textractor.utils.search_utils import SearchUtils
 from textractor.data.text_linearization_config import TextLinearizationConfig
 from textractor.data.html_linearization_config import HTMLLinearizationConfig
+from textractor.data.markdown_linearization_config import MarkdownLinearizationConfig
 from textractor.entities.linearizable import Linearizable
 
 logger = logging.getLogger(__name__)
@@ -65,8 +70,7 @@ class Document(SpatialObject, Linearizable):
             return response_parser.parse(fp)
         elif isinstance(fp, str):
             if fp.startswith("s3://"):
-                # FIXME: Opening s3 clients for everything should be avoided
-                client = boto3.client("s3")
+                client = get_client("s3")
                 return response_parser.parse(json.load(download_from_s3(client, fp)))
             with open(fp, "r") as f:
                 return response_parser.parse(json.load(f))
@@ -259,7 +263,9 @@ class Document(SpatialObject, Linearizable):
         :type pages: List[Page]
         """
         self._pages = sorted(pages, key=lambda x: x.page_num)
+        LinearizationCache.invalidate()
 
+    @memoize_linearization
     def get_text_and_words(
         self, config: TextLinearizationConfig = TextLinearizationConfig()
     ) -> Tuple[str, List]:
@@ -267,7 +273,13 @@ class Document(SpatialObject, Linearizable):
         flattened_words = []
         for words in words_lists:
             flattened_words.extend(words)
-        return config.layout_element_separator.join(text), flattened_words
+        return join_text(config.layout_element_separator, text), flattened_words
+
+    def _build_offset_index(self, config: TextLinearizationConfig) -> TextOffsetIndex:
+        return TextOffsetIndex.join(
+            [p.get_offset_index(config) for p in self.pages],
+            config.layout_element_separator,
+        )
 
     def page(self, page_no: int = 0):
         """
@@ -296,12 +308,82 @@ class Document(SpatialObject, Linearizable):
         :rtype: str
         """
         
-        html = "<html><body>"
-        for page in self.pages:
-            html += f"<div>{page.to_html(config=config)}</div>"
-        html += "</body></html>"
-        
-        return html
+        return (
+            "<html><body>"
+            + "".join(f"<div>{page.to_html(config=config)}</div>" for page in self.pages)
+            + "</body></html>"
+        )
+
+    def write_html(
+        self,
+        fp: Union[str, Path, IO[AnyStr]],
+        config: HTMLLinearizationConfig = HTMLLinearizationConfig(),
+    ):
+        """
+        Writes the HTML representation of the document, as returned by :meth:`to_html`, one page at a time. Only
+        the HTML of the current page is held in memory and the linearization of the written pages is not cached.
+
+        :param fp: Path of the output file, or any writable file object. Binary file objects (gzip.open(path, "wb"),
+                   upload streams, ...) receive UTF-8 encoded bytes.
+        :type fp: Union[str, Path, IO[AnyStr]]
+        :param config: HTML linearization configuration object
+        :type config: HTMLLinearizationConfig
+        """
+        self._write_pages(
+            fp,
+            (f"<div>{page.to_html(config=config)}</div>" for page in self.pages),
+            prefix="<html><body>",
+            suffix="</body></html>",
+        )
+
+    def write_markdown(
+        self,
+        fp: Union[str, Path, IO[AnyStr]],
+        config: MarkdownLinearizationConfig = MarkdownLinearizationConfig(),
+    ):
+        """
+        Writes the markdown representation of the document, as returned by :meth:`to_markdown`, one page at a time.
+        Only the markdown of the current page is held in memory and the linearization of the written pages is not
+        cached.
+
+        :param fp: Path of the output file, or any writable file object. Binary file objects (gzip.open(path, "wb"),
+                   upload streams, ...) receive UTF-8 encoded bytes.
+        :type fp: Union[str, Path, IO[AnyStr]]
+        :param config: Markdown linearization configuration object
+        :type config: MarkdownLinearizationConfig
+        """
+        self._write_pages(
+            fp,
+            (page.to_markdown(config=config) for page in self.pages),
+            separator=config.layout_element_separator,
+        )
+
+    def _write_pages(
+        self,
+        fp: Union[str, Path, IO[AnyStr]],
+        page_texts: Iterator[str],
+        prefix: str = "",
+        suffix: str = "",
+        separator: str = "",
+    ):
+        if isinstance(fp, (str, Path)):
+            # The text already contains os.linesep, it is written without newline translation
+            with open(fp, "w", encoding="utf-8", newline="") as f:
+                self._write_pages(f, page_texts, prefix, suffix, separator)
+            return
+        if not hasattr(fp, "write"):
+            raise InputError("fp should be a path or a writable file object")
+
+        binary = isinstance(fp, (io.RawIOBase, io.BufferedIOBase)) or "b" in str(getattr(fp, "mode", ""))
+        write = (lambda text: fp.write(text.encode("utf-8"))) if binary else fp.write
+        if prefix:
+            write(prefix)
+        # The cache is bypassed so that the text of the pages already written is not retained
+        with LinearizationCache.disabled():
+            for i, text in enumerate(page_texts):
+                write((separator if i else "") + text)
+        if suffix:
+            write(suffix)
 
     def __repr__(self):
         return os.linesep.join(
@@ -692,22 +774,91 @@ class Document(SpatialObject, Linearizable):
             f"txt file stored at location {os.path.join(os.getcwd(),filepath)}"
         )
 
-    def export_tables_to_excel(self, filepath):
+    def export_tables_to_excel(self, filepath, one_sheet_per_page: bool = False):
         """
         Creates an excel file and writes each table on a separate worksheet within the workbook.
-        This is stored on the filepath passed by the user.
+        This is stored on the filepath passed by the user. The file is streamed to disk, see
+        :func:`textractor.utils.excel_utils.export_tables_to_excel` to export tables from several documents.
 
         :param filepath: Path to store the exported Excel file.
         :type filepath: str, required
+        :param one_sheet_per_page: Write the tables of each page on a single worksheet instead of one worksheet per table.
+        :type one_sheet_per_page: bool
+        """
+        export_tables_to_excel(self.pages, filepath, one_sheet_per_page=one_sheet_per_page)
+
+    def tables_to_frames(
+        self,
+        use_columns: bool = False,
+        config: TextLinearizationConfig = TextLinearizationConfig(),
+    ) -> List:
+        """
+        Converts all the tables of the document to pandas DataFrames in one pass. This is equivalent to calling
+        :meth:`Table.to_pandas` on each table but avoids the per-table overhead.
+
+        :param use_columns: If the first row of a table is made of column headers, use them for the pandas dataframe. Only supports single row header.
+        :type use_columns: bool
+        :param config: Text linearization configuration object for the table content
+        :type config: TextLinearizationConfig
+
+        :return: List of DataFrames, one per table, in the same order as Document.tables
+        :rtype: List[pd.DataFrame]
         """
-        if not filepath:
-            logger.error("Filepath required to store excel file.")
-        workbook = xlsxwriter.Workbook(filepath)
-        for table in self.tables:
-            workbook = table.to_excel(
-                filepath=None, workbook=workbook, save_workbook=False
+        try:
+            from pandas import DataFrame
+        except ImportError:
+            raise MissingDependencyException(
+                "pandas library is required for exporting tables to DataFrame objects or markdown"
             )
-        workbook.close()
+
+        frames = []
+        for page in self.pages:
+            for table in page.tables:
+                columns, rows = table._get_rows_text(use_columns=use_columns, config=config)
+                frames.append(DataFrame(rows, columns=columns))
+        return frames
+
+    def iter_chunks(
+        self,
+        config: TextLinearizationConfig = TextLinearizationConfig(),
+        max_chars: int = 2000,
+        overlap: int = 0,
+        boundary: str = "layout",
+    ) -> Iterator[TextChunk]:
+        """
+        Lazily yields chunks of the linearized document text in reading order, each with the page numbers, the IDs
+        of the source layouts and their enclosing bounding box. Pages are linearized one at a time and the full text
+        is never built, which keeps memory usage flat on large documents.
+
+        :param config: Text linearization configuration object
+        :type config: TextLinearizationConfig
+        :param max_chars: Maximum number of characters of a chunk
+        :type max_chars: int
+        :param overlap: Maximum number of characters repeated from the end of the previous chunk
+        :type overlap: int
+        :param boundary: One of "layout", "paragraph" or "page". Chunks are made of whole units of this type, units
+                         longer than max_chars are split.
+        :type boundary: str
+
+        :return: Iterator of TextChunk objects
+        :rtype: Iterator[TextChunk]
+        """
+        return iter_chunks(self.pages, config, max_chars=max_chars, overlap=overlap, boundary=boundary)
+
+    def to_arrow(self, entity: str = "words") -> List:
+        """
+        Flattens the entities of the document into Apache Arrow record batches, one batch per page. Each row holds the
+        entity id, page number, page id, bounding box and confidence along with entity specific columns such as the
+        text, parent line, table or cell IDs. See :func:`textractor.utils.arrow_utils.arrow_schema` for the full schema
+        and :func:`textractor.utils.arrow_utils.write_parquet` to export a corpus of documents.
+
+        :param entity: One of "words", "lines", "key_values", "cells" or "queries"
+        :type entity: str
+
+        :return: List of record batches
+        :rtype: List[pyarrow.RecordBatch]
+        """
+        return list(iter_record_batches(self, entity))
 
     def independent_words(self):
         """
@@ -753,6 +904,7 @@ class Document(SpatialObject, Linearizable):
         prefix: str = "",
         direction=Direction.BELOW,
         entities=[],
+        deep_copy: bool = False,
     ):
         """
         The function returns entity types present in entities by prepending the prefix provided by te user. This helps in cases of repeating
@@ -768,6 +920,9 @@ class Document(SpatialObject, Linearizable):
         :type prefix: str, optional
         :param entities: List of DirectionalFinderType inputs.
         :type entities: List[DirectionalFinderType]
+        :param deep_copy: By default, the returned key-values are lightweight views sharing their words and values with the
+                          original entities (see :meth:`KeyValue.with_prefix`). Set to True to return independent deep copies instead.
+        :type deep_copy: bool
 
         :return: Returns the EntityList of modified key-value and/or checkboxes
         :rtype: EntityList
@@ -797,12 +952,8 @@ class Document(SpatialObject, Linearizable):
 
         final_kv = []
         for kv in new_key_values:
-            if kv.key:
-                key_words = [deepcopy(word) for word in kv.key]
-                key_words[0].text = prefix + key_words[0].text
-                new_kv = deepcopy(kv)
-                new_kv.key = key_words
-                final_kv.append(new_kv)
+            if kv.key and (prefix or deep_copy):
+                final_kv.append(kv.with_prefix(prefix, deep_copy=deep_copy))
             else:
                 final_kv.append(kv)
 
@@ -9,6 +9,7 @@ from textractor.data.text_linearization_config import TextLinearizationConfig
 from textractor.data.html_linearization_config import HTMLLinearizationConfig
 from textractor.data.markdown_linearization_config import MarkdownLinearizationConfig
 from textractor.entities.linearizable import Linearizable
+from textractor.utils.linearization_cache import ChildList, LinearizationCache
 
 class DocumentEntity(Linearizable, ABC):
     """
@@ -29,7 +30,7 @@ class DocumentEntity(Linearizable, ABC):
         self.id = entity_id
         self._bbox: BoundingBox = bbox
         self.metadata = {}  # Holds optional information about the entity
-        self._children = []
+        self._children = ChildList()
         self._children_type = None
         self._raw_object = None
 
@@ -41,6 +42,7 @@ class DocumentEntity(Linearizable, ABC):
         :type children: list
         """
         self._children.extend(children)
+        LinearizationCache.invalidate()
 
     @property
     def raw_object(self) -> Dict:
@@ -76,6 +78,7 @@ class DocumentEntity(Linearizable, ABC):
         :type x: float
         """
         self._bbox.x = x
+        LinearizationCache.invalidate()
 
     @property
     def y(self) -> float:
@@ -94,6 +97,7 @@ class DocumentEntity(Linearizable, ABC):
         :type y: float
         """
         self._bbox.y = y
+        LinearizationCache.invalidate()
 
     @property
     def width(self) -> float:
@@ -112,6 +116,7 @@ class DocumentEntity(Linearizable, ABC):
         :type width: float
         """
         self._bbox.width = width
+        LinearizationCache.invalidate()
 
     @property
     def height(self) -> float:
@@ -130,6 +135,7 @@ class DocumentEntity(Linearizable, ABC):
         :type height: float
         """
         self._bbox.height = height
+        LinearizationCache.invalidate()
 
     @property
     def bbox(self) -> BoundingBox:
@@ -142,6 +148,7 @@ class DocumentEntity(Linearizable, ABC):
     @bbox.setter
     def bbox(self, bbox: BoundingBox):
         self._bbox = bbox
+        LinearizationCache.invalidate()
 
     @property
     def children(self):
@@ -195,6 +202,7 @@ class DocumentEntity(Linearizable, ABC):
         self._children.remove(c)
         if self._children:
             self.bbox = BoundingBox.enclosing_bbox(self._children)
+        LinearizationCache.invalidate()
         return True
 
     def visit(self, word_set):
@@ -202,6 +210,7 @@ class DocumentEntity(Linearizable, ABC):
             if c.__class__.__name__ == "Word":
                 if c.id in word_set:
                     self._children.remove(c)
+                    LinearizationCache.invalidate()
                 else:
                     word_set.add(c.id)
             else:
@@ -7,6 +7,7 @@ bounding box information, value, existence of checkbox, page number, Page ID and
 """
 
 import logging
+from copy import copy, deepcopy
 from typing import List
 import uuid
 
@@ -19,6 +20,8 @@ from textractor.data.constants import TextTypes
 from textractor.data.text_linearization_config import TextLinearizationConfig
 from textractor.visualizers.entitylist import EntityList
 from textractor.utils.html_utils import add_id_to_html_tag
+from textractor.utils.linearization_cache import LinearizationCache
+from textractor.utils.offset_utils import word_text, words_text
 
 logger = logging.getLogger(__name__)
 
@@ -116,6 +119,7 @@ class KeyValue(DocumentEntity):
         :type words: list
         """
         self._words = EntityList(words)
+        LinearizationCache.invalidate()
 
     @property
     def value(self) -> Value:
@@ -141,6 +145,7 @@ class KeyValue(DocumentEntity):
         :type value: Value
         """
         self._value = value
+        LinearizationCache.invalidate()
 
     @property
     def page(self) -> int:
@@ -222,10 +227,43 @@ class KeyValue(DocumentEntity):
             )
             return False
 
+    def with_prefix(self, prefix: str, deep_copy: bool = False) -> "KeyValue":
+        """
+        Returns a :class:`KeyValue` whose key starts with prefix. By default this is a lightweight view that shares
+        its value, bounding box and key words with the original object, only the first key word is copied to carry
+        the prefix. Modifying the children of the view will therefore modify the original :class:`KeyValue`.
+
+        :param prefix: Prefix to prepend to the first word of the key
+        :type prefix: str
+        :param deep_copy: Set to True to return a fully independent deep copy instead of a view. Note that this copies
+                          the page that the entity belongs to through its bounding box and can be slow.
+        :type deep_copy: bool
+
+        :return: KeyValue with the prefixed key
+        :rtype: KeyValue
+        """
+        if not self._words:
+            return deepcopy(self) if deep_copy else self
+
+        # The copies are private to the new KeyValue, no cached linearization can depend on them: the private
+        # attributes are set directly so that the linearization caches are not invalidated
+        if deep_copy:
+            key_words = [deepcopy(word) for word in self._words]
+            key_words[0]._text = prefix + key_words[0]._text
+            new_kv = deepcopy(self)
+            new_kv._words = EntityList(key_words)
+            return new_kv
+
+        first_word = copy(self._words[0])
+        first_word._text = prefix + first_word._text
+        new_kv = copy(self)
+        new_kv._words = EntityList([first_word] + list(self._words[1:]))
+        return new_kv
+
     def get_text_and_words(
         self, config: TextLinearizationConfig = TextLinearizationConfig()
     ):
-        key_text, key_words = " ".join([w.text for w in self.key]), self.key
+        key_text, key_words = words_text([w.text for w in self.key], self.key), self.key
         value_text, value_words = self.value.get_text_and_words(config) if self.value else ("", "")
         words = []
         if not len(key_text) and not len(value_text):
@@ -236,22 +274,43 @@ class KeyValue(DocumentEntity):
             if not (len(key_text) > len(s) and key_text[-len(s) :] == s)
             else " "
         )
+        # The structure words are created first so that the text records their spans
+        structure_words = {}
+        key_value_prefix = add_id_to_html_tag(config.key_value_prefix, self.id, config)
+        if config.add_prefixes_and_suffixes_as_words:
+            key_bbox = BoundingBox.enclosing_bbox(self.key) if key_words else None
+            for name, structure_text, bbox in [
+                ("key_value_prefix", key_value_prefix, self.bbox),
+                ("key_prefix", config.key_prefix, key_bbox),
+                ("key_suffix", config.key_suffix, key_bbox),
+                ("key_value_suffix", config.key_value_suffix, self.bbox),
+            ]:
+                if structure_text and bbox is not None:
+                    structure_words[name] = Word(str(uuid.uuid4()), bbox, structure_text, is_structure=True)
         if config.add_prefixes_and_suffixes_in_text:
-            text = f"{add_id_to_html_tag(config.key_value_prefix, self.id, config)}{config.key_prefix}{key_text}{key_suffix}{value_text}{config.key_value_suffix}"
+            text = (
+                word_text(key_value_prefix, structure_words.get("key_value_prefix")) +
+                word_text(config.key_prefix, structure_words.get("key_prefix")) +
+                key_text +
+                # The key suffix is replaced by a space when the key already ends with it
+                word_text(key_suffix, structure_words.get("key_suffix") if key_suffix == config.key_suffix else None) +
+                value_text +
+                word_text(config.key_value_suffix, structure_words.get("key_value_suffix"))
+            )
         else:
-            text = f"{key_text}{config.same_paragraph_separator}{value_text}"
+            text = key_text + config.same_paragraph_separator + value_text
 
         if config.add_prefixes_and_suffixes_as_words:
-            words += [Word(str(uuid.uuid4()), self.bbox, add_id_to_html_tag(config.key_value_prefix, self.id, config), is_structure=True)] if config.key_value_prefix else []
+            words += [structure_words["key_value_prefix"]] if "key_value_prefix" in structure_words else []
             if key_words:
                 words += (
-                    ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(self.key), config.key_prefix, is_structure=True)] if config.key_prefix else []) +
+                    ([structure_words["key_prefix"]] if "key_prefix" in structure_words else []) +
                     key_words +
-                    ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(self.key), config.key_suffix, is_structure=True)] if config.key_suffix else [])
+                    ([structure_words["key_suffix"]] if "key_suffix" in structure_words else [])
                 )
             if value_words: 
                 words += value_words
-            words += ([Word(str(uuid.uuid4()), self.bbox, config.key_value_suffix, is_structure=True)] if config.key_value_suffix else [])
+            words += [structure_words["key_value_suffix"]] if "key_value_suffix" in structure_words else []
         else:
             words += key_words + value_words
 
@@ -26,6 +26,8 @@ from textractor.data.constants import (
 from textractor.data.text_linearization_config import TextLinearizationConfig
 from textractor.utils.text_utils import group_elements_horizontally, linearize_children
 from textractor.utils.html_utils import add_id_to_html_tag
+from textractor.utils.linearization_cache import memoize_linearization
+from textractor.utils.offset_utils import word_text
 
 
 class Layout(DocumentEntity):
@@ -93,6 +95,7 @@ class Layout(DocumentEntity):
         _, words = self.get_text_and_words(config)
         return words
 
+    @memoize_linearization
     def get_text_and_words(
         self, config: TextLinearizationConfig = TextLinearizationConfig()
     ) -> Tuple[str, List[Word]]:
@@ -171,61 +174,26 @@ class Layout(DocumentEntity):
                 else:
                     final_words += child_words
             final_text += config.list_layout_suffix
-        elif self.layout_type == LAYOUT_TITLE:
+        elif self.layout_type in (LAYOUT_TITLE, LAYOUT_HEADER, LAYOUT_SECTION_HEADER, LAYOUT_TEXT):
             final_text, final_words = linearize_children(
                 self.children, config, no_new_lines=True
             )
-            if config.add_prefixes_and_suffixes_in_text:
-                final_text = add_id_to_html_tag(config.title_prefix, self.id, config) + final_text + config.title_suffix
-            if config.add_prefixes_and_suffixes_as_words:
-                final_words = (
-                    ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), add_id_to_html_tag(config.title_prefix, self.id, config), is_structure=True)] if config.title_prefix else []) + 
-                    final_words + 
-                    ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), config.title_suffix, is_structure=True)] if config.title_suffix else []) 
-                )
-        elif self.layout_type == LAYOUT_HEADER:
-            final_text, final_words = linearize_children(
-                self.children, config, no_new_lines=True
-            )
-            if config.add_prefixes_and_suffixes_in_text:
-                final_text = (
-                    add_id_to_html_tag(config.header_prefix, self.id, config) + final_text + config.header_suffix
-                )
-            if config.add_prefixes_and_suffixes_as_words:
-                final_words = (
-                    ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), add_id_to_html_tag(config.header_prefix, self.id, config), is_structure=True)] if config.header_prefix else []) + 
-                    final_words + 
-                    ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), config.header_suffix, is_structure=True)] if config.header_suffix else []) 
-                )
-        elif self.layout_type == LAYOUT_SECTION_HEADER:
-            final_text, final_words = linearize_children(
-                self.children, config, no_new_lines=True
-            )
-            if config.add_prefixes_and_suffixes_in_text:
-                final_text = (
-                    add_id_to_html_tag(config.section_header_prefix, self.id, config) + final_text + config.section_header_suffix
-                )
-            if config.add_prefixes_and_suffixes_as_words:
-                final_words = (
-                    ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), add_id_to_html_tag(config.section_header_prefix, self.id, config), is_structure=True)] if config.section_header_prefix else []) + 
-                    final_words + 
-                    ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), config.section_header_suffix, is_structure=True)] if config.section_header_suffix else []) 
-                )
-        elif self.layout_type == LAYOUT_TEXT:
-            final_text, final_words = linearize_children(
-                self.children,
+            prefix, suffix = {
+                LAYOUT_TITLE: (config.title_prefix, config.title_suffix),
+                LAYOUT_HEADER: (config.header_prefix, config.header_suffix),
+                LAYOUT_SECTION_HEADER: (config.section_header_prefix, config.section_header_suffix),
+                LAYOUT_TEXT: (config.text_prefix, config.text_suffix),
+            }[self.layout_type]
+            final_text, final_words = self._add_prefix_and_suffix(
+                final_text,
+                final_words,
+                prefix,
+                suffix,
                 config,
-                no_new_lines=True,
-            )
-            final_text = (
-                add_id_to_html_tag(config.text_prefix, self.id, config) + final_text + config.text_suffix
+                # Text layouts always have their prefix and suffix in the text
+                in_text=config.add_prefixes_and_suffixes_in_text or self.layout_type == LAYOUT_TEXT,
+                as_words=config.add_prefixes_and_suffixes_as_words,
             )
-            if config.add_prefixes_and_suffixes_as_words:
-                final_words = (
-                    ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), add_id_to_html_tag(config.text_prefix, self.id, config), is_structure=True)] if config.text_prefix else []) + 
-                    final_words + 
-                    ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), config.text_suffix, is_structure=True)] if config.text_suffix else []) 
-                )
         else:
             final_text, final_words = linearize_children(
                 self.children,
@@ -233,47 +201,25 @@ class Layout(DocumentEntity):
                 no_new_lines=False,
                 is_layout_table=self.layout_type == LAYOUT_TABLE,
             )
-
-            if config.add_prefixes_and_suffixes_in_text:
-                if self.layout_type == LAYOUT_TABLE:
-                    final_text = (
-                        add_id_to_html_tag(config.table_layout_prefix, self.id, config) + final_text + config.table_layout_suffix
-                    )
-                elif self.layout_type == LAYOUT_KEY_VALUE:
-                    final_text = (
-                        add_id_to_html_tag(config.key_value_layout_prefix, self.id, config) + final_text + config.key_value_layout_suffix
-                    )
-                elif self.layout_type == LAYOUT_FIGURE:
-                    final_text = (
-                        add_id_to_html_tag(config.figure_layout_prefix, self.id, config) + final_text + config.figure_layout_suffix
-                    )
-                elif self.layout_type == LAYOUT_ENTITY:
-                    final_text = (
-                        add_id_to_html_tag(config.entity_layout_prefix, self.id, config) + final_text + config.entity_layout_suffix
-                    )
-                elif self.layout_type == LAYOUT_FOOTER:
-                    final_text = (
-                        add_id_to_html_tag(config.footer_layout_prefix, self.id, config) + final_text + config.footer_layout_suffix
-                    )
-            if config.add_prefixes_and_suffixes_as_words:
-                if self.layout_type == LAYOUT_TABLE:
-                    final_words = (
-                        ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), add_id_to_html_tag(config.table_layout_prefix, self.id, config), is_structure=True)] if config.table_layout_prefix else []) + 
-                        final_words + 
-                        ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), config.table_layout_suffix, is_structure=True)] if config.table_layout_suffix else []) 
-                    )
-                elif self.layout_type == LAYOUT_KEY_VALUE:
-                    final_words = (
-                        ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), add_id_to_html_tag(config.key_value_layout_prefix, self.id, config), is_structure=True)] if config.key_value_layout_prefix else []) + 
-                        final_words + 
-                        ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), config.key_value_layout_suffix, is_structure=True)] if config.key_value_layout_suffix else []) 
-                    )
-                elif self.layout_type == LAYOUT_FIGURE:
-                    final_words = (
-                        ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), add_id_to_html_tag(config.figure_layout_prefix, self.id, config), is_structure=True)] if config.figure_layout_prefix else []) + 
-                        final_words + 
-                        ([Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(final_words), config.figure_layout_suffix, is_structure=True)] if config.figure_layout_suffix else []) 
-                    )
+            prefix, suffix = {
+                LAYOUT_TABLE: (config.table_layout_prefix, config.table_layout_suffix),
+                LAYOUT_KEY_VALUE: (config.key_value_layout_prefix, config.key_value_layout_suffix),
+                LAYOUT_FIGURE: (config.figure_layout_prefix, config.figure_layout_suffix),
+                LAYOUT_ENTITY: (config.entity_layout_prefix, config.entity_layout_suffix),
+                LAYOUT_FOOTER: (config.footer_layout_prefix, config.footer_layout_suffix),
+            }.get(self.layout_type, ("", ""))
+            final_text, final_words = self._add_prefix_and_suffix(
+                final_text,
+                final_words,
+                prefix,
+                suffix,
+                config,
+                in_text=config.add_prefixes_and_suffixes_in_text,
+                as_words=(
+                    config.add_prefixes_and_suffixes_as_words and
+                    self.layout_type in (LAYOUT_TABLE, LAYOUT_KEY_VALUE, LAYOUT_FIGURE)
+                ),
+            )
 
         while (
             config.layout_element_separator * (config.max_number_of_consecutive_new_lines + 1) in final_text
@@ -292,3 +238,37 @@ class Layout(DocumentEntity):
             )
 
         return final_text, final_words
+
+    def _add_prefix_and_suffix(
+        self,
+        text: str,
+        words: List[Word],
+        prefix: str,
+        suffix: str,
+        config: TextLinearizationConfig,
+        in_text: bool,
+        as_words: bool,
+    ) -> Tuple[str, List[Word]]:
+        """
+        Surrounds the layout text and words with the layout prefix and suffix. The structure words are created
+        before the text so that it records their spans.
+
+        :param in_text: Add the prefix and suffix to the text
+        :type in_text: bool
+        :param as_words: Add the prefix and suffix as structure words
+        :type as_words: bool
+        :return: Tuple of text and words
+        :rtype: Tuple[str, List[Word]]
+        """
+        prefix = add_id_to_html_tag(prefix, self.id, config)
+        prefix_word = None
+        suffix_word = None
+        if as_words:
+            if prefix:
+                prefix_word = Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(words), prefix, is_structure=True)
+            if suffix:
+                suffix_word = Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(words), suffix, is_structure=True)
+            words = ([prefix_word] if prefix_word else []) + words + ([suffix_word] if suffix_word else [])
+        if in_text:
+            text = word_text(prefix, prefix_word) + text + word_text(suffix, suffix_word)
+        return text, words
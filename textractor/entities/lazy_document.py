@@ -1,9 +1,8 @@
 """The Document class is defined to host all the various DocumentEntity objects within it. :class:`DocumentEntity` objects can be 
 accessed, searched and exported the functions given below."""
 
-import boto3
 import time
-from typing import Any
+from typing import Any, List
 
 from textractor.entities.document import Document
 from textractor.parsers.response_parser import parse
@@ -14,6 +13,11 @@ from textractcaller.t_call import (
     get_full_json,
     OutputConfig,
 )
+from textractcaller.t_cache import ResponseCache
+from textractcaller.t_clients import get_client
+from textractcaller.t_job_store import JobStore, IN_PROGRESS, SUCCEEDED, FAILED, EXPIRED
+from textractcaller.t_poller import JobPoller
+from textractcaller.t_query_shards import merge_query_responses
 
 
 class LazyDocument:
@@ -30,11 +34,25 @@ class LazyDocument:
         s3_client=None,
         images=None,
         output_config: OutputConfig = None,
+        job_poller: JobPoller = None,
+        response: dict = None,
+        response_cache: ResponseCache = None,
+        cache_key: str = None,
+        job_store: JobStore = None,
+        query_shards: List["LazyDocument"] = None,
     ):
         """
         Creates a new document, ideally containing entity objects pertaining to each page.
 
         :param num_pages: Number of pages in the input Document.
+        :param job_poller: Shared poller to register the job with, see :meth:`register`
+        :param response: Response of the job when already known (from a :class:`ResponseCache`), the document is then
+                         parsed right away and the job is never polled
+        :param response_cache: Cache the response of the job is stored in once retrieved
+        :param cache_key: Key of the response in response_cache
+        :param job_store: Job store the status of the job is updated in once the job is done
+        :param query_shards: LazyDocuments of the jobs running the other shards of the queries of the request, their
+                             queries are merged into the document
         """
         self.job_id = job_id
         self._api = api
@@ -45,6 +63,150 @@ class LazyDocument:
         self._output_config = output_config
         self._s3_polling_interval = 1
         self._textract_polling_interval = 5
+        self._future = None
+        self._response_cache = response_cache
+        self._cache_key = cache_key
+        self._job_store = job_store
+        self._query_shards = query_shards or []
+        if response is not None:
+            self._set_response(response)
+        elif job_poller is not None:
+            self.register(job_poller)
+
+    def _store_response(self, response: dict):
+        """Stores the response of the job in the response cache and records the job as succeeded"""
+        if self._response_cache is not None and self._cache_key:
+            self._response_cache.put(self._cache_key, response)
+        if self._job_store is not None and self.job_id:
+            self._job_store.update_status(self.job_id, SUCCEEDED)
+
+    def _job_failed(self):
+        """
+        Records the job as failed in the job store when retrieving its results failed because of the job status, or
+        as expired when Textract no longer knows the job
+        """
+        if self._job_store is None or not self.job_id:
+            return
+        try:
+            job_status = get_job_response(
+                job_id=self.job_id,
+                textract_api=TextractAPI.TextractAPI_to_Textract_API(self._api)
+                if isinstance(self._api, TextractAPI)
+                else self._api,
+                boto3_textract_client=self._textract_client,
+                extra_args={"MaxResults": 1},
+            )["JobStatus"]
+        except Exception as exception:
+            if getattr(exception, "response", {}).get("Error", {}).get("Code") == "InvalidJobIdException":
+                self._job_store.update_status(self.job_id, EXPIRED)
+            # Otherwise the job itself may be fine, it is resumed later
+            return
+        if job_status not in (IN_PROGRESS, SUCCEEDED):
+            self._job_store.update_status(self.job_id, FAILED)
+
+    def _fetch_response(self) -> dict:
+        """Waits for the job and returns its response, the job is recorded as failed in the job store on failure"""
+        try:
+            if self._future is not None:
+                response = self._future.result()
+                if self._output_config:
+                    response = get_full_json_from_output_config(
+                        self._output_config,
+                        self.job_id,
+                        self._s3_client,
+                        textract_api=TextractAPI.TextractAPI_to_Textract_API(self._api)
+                        if isinstance(self._api, TextractAPI)
+                        else self._api,
+                        textract_client=self._textract_client,
+                        status_polling_interval=self._textract_polling_interval,
+                    )
+            elif self._output_config:
+                start = time.time()
+                response = None
+                while not results_exist(
+                    self.job_id,
+                    self._output_config.s3_bucket,
+                    self._output_config.s3_prefix,
+                    self._s3_client,
+                ):
+                    time.sleep(self._s3_polling_interval)
+                    if time.time() - start > self._textract_polling_interval:
+                        response = get_job_response(
+                            job_id=self.job_id,
+                            textract_api=TextractAPI.TextractAPI_to_Textract_API(self._api)
+                            if isinstance(self._api, TextractAPI)
+                            else self._api,
+                            boto3_textract_client=self._textract_client,
+                        )
+                        job_status = response["JobStatus"]
+                        if job_status == "IN_PROGRESS":
+                            start = time.time()
+                            response = None
+                            continue
+                        elif job_status == "SUCCEEDED" and "NextToken" in response:
+                            response = get_full_json(
+                                self.job_id,
+                                TextractAPI.TextractAPI_to_Textract_API(self._api)
+                                if isinstance(self._api, TextractAPI)
+                                else self._api,
+                                self._textract_client,
+                                job_done_polling_interval=1,
+                            )
+                            break
+                        elif job_status == "SUCCEEDED":
+                            break
+                        else:
+                            raise Exception(f"Job failed with status: {job_status}\n{response}")
+                    
+                if not response:
+                    response = get_full_json_from_output_config(
+                        self._output_config,
+                        self.job_id,
+                        self._s3_client,
+                        textract_api=TextractAPI.TextractAPI_to_Textract_API(self._api)
+                        if isinstance(self._api, TextractAPI)
+                        else self._api,
+                        textract_client=self._textract_client,
+                        status_polling_interval=self._textract_polling_interval,
+                    )
+            else:
+                if not self._textract_client:
+                    self._textract_client = get_client("textract")
+                response = get_full_json(
+                    self.job_id,
+                    TextractAPI.TextractAPI_to_Textract_API(self._api)
+                    if isinstance(self._api, TextractAPI)
+                    else self._api,
+                    self._textract_client,
+                    job_done_polling_interval=self.textract_polling_interval,
+                )
+        except Exception:
+            self._job_failed()
+            raise
+        return response
+
+    def _set_response(self, response: dict):
+        self._document = parse(response)
+        if self._images is not None:
+            for i, page in enumerate(self._document.pages):
+                page.image = self._images[i]
+        self._document.response = response
+
+    def register(self, job_poller: JobPoller):
+        """Registers the job with a shared :class:`JobPoller`. The poller tracks the job along with all the other
+        registered jobs, accessing a property of the document then waits for the poller instead of polling the job.
+
+        :param job_poller: Poller tracking the job
+        :type job_poller: JobPoller
+        """
+        self._future = job_poller.register(
+            self.job_id,
+            TextractAPI.TextractAPI_to_Textract_API(self._api)
+            if isinstance(self._api, TextractAPI)
+            else self._api,
+            # With an output config, the poller only waits for the job and the results are read from S3
+            fetch_results=not self._output_config,
+        )
 
     @property
     def s3_polling_interval(self) -> int:
@@ -114,70 +276,25 @@ class LazyDocument:
             "textract_polling_interval",
             "_textract_polling_interval",
             "_output_config",
+            "_future",
+            "_response_cache",
+            "_cache_key",
+            "_job_store",
+            "_query_shards",
         ]:
             return object.__getattribute__(self, __name)
 
         if self._document is None:
-            if self._output_config:
-                start = time.time()
-                response = None
-                while not results_exist(
-                    self.job_id,
-                    self._output_config.s3_bucket,
-                    self._output_config.s3_prefix,
-                    self._s3_client,
-                ):
-                    time.sleep(self._s3_polling_interval)
-                    if time.time() - start > self._textract_polling_interval:
-                        response = get_job_response(
-                            job_id=self.job_id,
-                            textract_api=TextractAPI.TextractAPI_to_Textract_API(self._api)
-                            if isinstance(self._api, TextractAPI)
-                            else self._api,
-                            boto3_textract_client=self._textract_client,
-                        )
-                        job_status = response["JobStatus"]
-                        if job_status == "IN_PROGRESS":
-                            start = time.time()
-                            response = None
-                            continue
-                        elif job_status == "SUCCEEDED" and "NextToken" in response:
-                            response = get_full_json(
-                                self.job_id,
-                                TextractAPI.TextractAPI_to_Textract_API(self._api)
-                                if isinstance(self._api, TextractAPI)
-                                else self._api,
-                                self._textract_client,
-                                job_done_polling_interval=1,
-                            )
-                            break
-                        elif job_status == "SUCCEEDED":
-                            break
-                        else:
-                            raise Exception(f"Job failed with status: {job_status}\n{response}")
-                        
-                if not response:
-                    response = get_full_json_from_output_config(
-                        self._output_config,
-                        self.job_id,
-                        self._s3_client,
-                    )
-            else:
-                if not self._textract_client:
-                    self._textract_client = boto3.client("textract")
-                response = get_full_json(
-                    self.job_id,
-                    TextractAPI.TextractAPI_to_Textract_API(self._api)
-                    if isinstance(self._api, TextractAPI)
-                    else self._api,
-                    self._textract_client,
-                    job_done_polling_interval=self.textract_polling_interval,
-                )
-            self._document = parse(response)
-            if self._images is not None:
-                for i, page in enumerate(self._document.pages):
-                    page.image = self._images[i]
-            self._document.response = response
+            response = self._fetch_response()
+            if self._query_shards:
+                responses = [response]
+                for shard in self._query_shards:
+                    shard_response = shard._fetch_response()
+                    shard._store_response(shard_response)
+                    responses.append(shard_response)
+                response = merge_query_responses(responses)
+            self._store_response(response)
+            self._set_response(response)
         return object.__getattribute__(
             object.__getattribute__(self, "_document"), __name
         )
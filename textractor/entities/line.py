@@ -17,6 +17,8 @@ from textractor.entities.document_entity import DocumentEntity
 from textractor.visualizers.entitylist import EntityList
 from textractor.utils.html_utils import escape_text
 from textractor.data.text_linearization_config import TextLinearizationConfig
+from textractor.utils.linearization_cache import ChildList
+from textractor.utils.offset_utils import words_text
 
 class Line(DocumentEntity):
     """
@@ -41,9 +43,9 @@ class Line(DocumentEntity):
     ):
         super().__init__(entity_id, bbox)
         if words is not None and len(words) > 0:
-            self._children: List[Word] = sorted(words, key=lambda x: (x.bbox.x, x.bbox.y))
+            self._children: List[Word] = ChildList(sorted(words, key=lambda x: (x.bbox.x, x.bbox.y)))
         else:
-            self._children = []
+            self._children = ChildList()
 
         self._confidence = confidence / 100
         self._page = None
@@ -71,7 +73,8 @@ class Line(DocumentEntity):
         for w in self.words:
             w.line_id = self.id
             w.line_bbox = self.bbox
-        return escape_text(self.text, config), self.words
+        text = words_text([escape_text(w.text, config) for w in self.words], self.words)
+        return text, self.words
 
     @property
     def page(self):
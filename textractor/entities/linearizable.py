@@ -8,6 +8,8 @@ from typing import Dict, List, Tuple
 from textractor.data.text_linearization_config import TextLinearizationConfig
 from textractor.data.html_linearization_config import HTMLLinearizationConfig
 from textractor.data.markdown_linearization_config import MarkdownLinearizationConfig
+from textractor.utils.linearization_cache import LinearizationCache, cached
+from textractor.utils.offset_utils import TextOffsetIndex
 
 class Linearizable(ABC):    
     def get_text(
@@ -21,7 +23,8 @@ class Linearizable(ABC):
         :return: Linearized text of the entity
         :rtype: str
         """
-        text, _ = self.get_text_and_words(config=config)
+        with LinearizationCache.text_only():
+            text, _ = self.get_text_and_words(config=config)
         return text
 
     @property
@@ -58,6 +61,78 @@ class Linearizable(ABC):
         """
         return self.get_text(config)
 
+    def get_offset_index(
+        self, config: TextLinearizationConfig = TextLinearizationConfig()
+    ) -> TextOffsetIndex:
+        """
+        Returns the character offset index of the linearized text of the entity, it maps each word returned by
+        get_text_and_words to its start and end offsets in the text. The index is cached with the linearization.
+
+        :param config: Text linearization configuration object
+        :type config: TextLinearizationConfig
+        :return: Offset index of the linearized text
+        :rtype: TextOffsetIndex
+        """
+        return cached(
+            self,
+            ("offset_index",) + LinearizationCache.config_key(config),
+            lambda: self._build_offset_index(config),
+        )
+
+    def _build_offset_index(self, config: TextLinearizationConfig) -> TextOffsetIndex:
+        """
+        Builds the index from the word spans recorded in the linearized text of the entity. Entities whose text is
+        the concatenation of their children text override this to combine the children indexes instead.
+        """
+        with LinearizationCache.recording_offsets():
+            text, _ = self.get_text_and_words(config)
+        return TextOffsetIndex.from_text(text)
+
+    def span_to_words(
+        self,
+        start: int,
+        end: int,
+        config: TextLinearizationConfig = TextLinearizationConfig(),
+        include_structure: bool = False,
+    ) -> List:
+        """
+        Returns the words overlapping the character span [start, end) of the text linearized with config, in
+        O(log n) once the offset index is built.
+
+        :param start: Start offset of the span in the linearized text
+        :type start: int
+        :param end: End offset of the span in the linearized text (exclusive)
+        :type end: int
+        :param config: Configuration used to linearize the text the offsets refer to
+        :type config: TextLinearizationConfig
+        :param include_structure: Include structure words such as table or layout prefixes and suffixes
+        :type include_structure: bool
+        :return: Words overlapping the span, in text order
+        :rtype: List[Word]
+        """
+        return self.get_offset_index(config).span_to_words(start, end, include_structure)
+
+    def span_to_bboxes(
+        self,
+        start: int,
+        end: int,
+        config: TextLinearizationConfig = TextLinearizationConfig(),
+    ) -> List:
+        """
+        Returns the bounding boxes covering the character span [start, end) of the text linearized with config, one
+        per line of text.
+
+        :param start: Start offset of the span in the linearized text
+        :type start: int
+        :param end: End offset of the span in the linearized text (exclusive)
+        :type end: int
+        :param config: Configuration used to linearize the text the offsets refer to
+        :type config: TextLinearizationConfig
+        :return: List of (page number, bounding box) tuples, in text order
+        :rtype: List[Tuple[int, BoundingBox]]
+        """
+        return self.get_offset_index(config).span_to_bboxes(start, end)
+
     @abstractmethod
     def get_text_and_words(
         self, config: TextLinearizationConfig = TextLinearizationConfig()
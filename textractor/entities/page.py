@@ -6,9 +6,8 @@ The :class:`Page` object also contains the metadata such as the physical dimensi
 import os
 import string
 import logging
-import xlsxwriter
+from statistics import median
 from typing import List, Tuple
-from copy import deepcopy
 from collections import defaultdict
 from textractor.entities.expense_document import ExpenseDocument
 
@@ -36,10 +35,15 @@ from textractor.data.constants import (
     LAYOUT_FIGURE,
     LAYOUT_TABLE,
     LAYOUT_KEY_VALUE,
+    LAYOUT_ENTITY,
 )
 from textractor.data.text_linearization_config import TextLinearizationConfig
 from textractor.entities.selection_element import SelectionElement
 from textractor.utils.geometry_util import sort_by_position
+from textractor.utils.excel_utils import export_tables_to_excel
+from textractor.utils.linearization_cache import LinearizationCache, memoize_linearization
+from textractor.utils.offset_utils import join_text
+from textractor.utils.reading_order_utils import READING_ORDER_ENGINES, xy_cut
 from textractor.utils.search_utils import SearchUtils, jaccard_similarity
 from textractor.visualizers.entitylist import EntityList
 from textractor.entities.linearizable import Linearizable
@@ -102,6 +106,7 @@ class Page(SpatialObject, Linearizable):
         """
         self._words = words
         self._words = EntityList(sort_by_position(list(set(self._words))))
+        LinearizationCache.invalidate()
 
     @property
     def lines(self) -> EntityList[Line]:
@@ -122,6 +127,7 @@ class Page(SpatialObject, Linearizable):
         :type lines: List[Line]
         """
         self._lines = EntityList(sort_by_position(lines))
+        LinearizationCache.invalidate()
 
     @property
     def text(self) -> str:
@@ -133,6 +139,7 @@ class Page(SpatialObject, Linearizable):
         """
         return self.get_text()
 
+    @memoize_linearization
     def get_text_and_words(
         self, config: TextLinearizationConfig = TextLinearizationConfig()
     ) -> Tuple[str, List[Word]]:
@@ -144,6 +151,82 @@ class Page(SpatialObject, Linearizable):
         :return: Tuple of page text and words
         :rtype: Tuple[str, List[Word]]
         """
+        page_texts_and_words = [
+            [l.get_text_and_words(config) for l in group] for group in self.layout_groups_in_reading_order(config)
+        ]
+
+        if not page_texts_and_words:
+            return "", []
+
+        text = []
+        combined_words = []
+        for group in page_texts_and_words:
+            text.append(
+                join_text(config.same_layout_element_separator, (self._group_text(t, config) for t, _ in group))
+            )
+            for _, w in group:
+                combined_words += w
+        return join_text(config.layout_element_separator, text), combined_words
+
+    @staticmethod
+    def _group_text(text: str, config: TextLinearizationConfig) -> str:
+        # Layout texts end with a line break, the XY-cut groups separate their layouts with a single one
+        if config.reading_order_engine == "xycut" and text.endswith(config.same_layout_element_separator):
+            return text[: len(text) - len(config.same_layout_element_separator)]
+        return text
+
+    def layouts_in_reading_order(
+        self, config: TextLinearizationConfig = TextLinearizationConfig()
+    ) -> List[Layout]:
+        """
+        Returns the layouts of the page sorted in reading order, this is the order used by :meth:`get_text_and_words`.
+        With the default "textract" reading order engine, layouts without a reading order are placed using a distance
+        heuristic. With the "xycut" engine, layouts are ordered geometrically, see :func:`xy_cut`.
+
+        :param config: Text linearization configuration object, only the reading_order_* options are used
+        :type config: TextLinearizationConfig
+        :return: List of Layout objects in reading order
+        :rtype: List[Layout]
+        """
+        return [layout for group in self.layout_groups_in_reading_order(config) for layout in group]
+
+    def layout_groups_in_reading_order(
+        self, config: TextLinearizationConfig = TextLinearizationConfig()
+    ) -> List[List[Layout]]:
+        """
+        Returns the layouts of the page in reading order, grouped as they are linearized: the layouts of a group are
+        joined with config.same_layout_element_separator and the groups with config.layout_element_separator. With the
+        default "textract" engine, each layout is a group of its own. With the "xycut" engine, the one-line layouts
+        created when the LAYOUT feature was not requested are grouped by XY-cut block, so that the lines of a column
+        or a paragraph are read together, the other layouts remain groups of their own.
+
+        :param config: Text linearization configuration object, only the reading_order_* options are used
+        :type config: TextLinearizationConfig
+        :return: Groups of Layout objects in reading order
+        :rtype: List[List[Layout]]
+        """
+        if config.reading_order_engine == "xycut":
+            lines = [line for line in self.lines if line.bbox.height > 0]
+            groups = []
+            for block in xy_cut(
+                list(self.layouts),
+                min_gap=config.reading_order_min_gap,
+                line_height=median(line.bbox.height for line in lines) if lines else None,
+                line_gap=config.reading_order_line_gap,
+            ):
+                previous = None
+                for layout in block:
+                    if layout.layout_type == LAYOUT_ENTITY and previous == LAYOUT_ENTITY:
+                        groups[-1].append(layout)
+                    else:
+                        groups.append([layout])
+                    previous = layout.layout_type
+            return groups
+        elif config.reading_order_engine != "textract":
+            raise InputError(
+                f"reading_order_engine should be one of {', '.join(READING_ORDER_ENGINES)}, got {config.reading_order_engine}"
+            )
+
         unsorted_layouts = [l for l in self.layouts if l.reading_order < 0]
         sorted_layouts = [l for l in self.layouts if l.reading_order >= 0]
         if unsorted_layouts:
@@ -166,16 +249,7 @@ class Page(SpatialObject, Linearizable):
                 else:
                     sorted_layouts.append(unsorted_layout)
 
-        page_texts_and_words = [l.get_text_and_words(config) for l in sorted_layouts]
-
-        if not page_texts_and_words:
-            return "", []
-
-        text, words = zip(*page_texts_and_words)
-        combined_words = []
-        for w in words:
-            combined_words += w
-        return config.layout_element_separator.join(text), combined_words
+        return [[layout] for layout in sorted_layouts]
 
     @property
     def page_layout(self) -> PageLayout:
@@ -226,6 +300,7 @@ class Page(SpatialObject, Linearizable):
         :type kv: List[KeyValue]
         """
         self._key_values = EntityList(sort_by_position(kv))
+        LinearizationCache.invalidate()
 
     @property
     def checkboxes(self) -> EntityList[KeyValue]:
@@ -246,6 +321,7 @@ class Page(SpatialObject, Linearizable):
         :type checkbox: List[KeyValue]
         """
         self._checkboxes = EntityList(sort_by_position(checkbox))
+        LinearizationCache.invalidate()
 
     @property
     def tables(self) -> EntityList[Table]:
@@ -266,6 +342,7 @@ class Page(SpatialObject, Linearizable):
         :type tables: list
         """
         self._tables = EntityList(tables)
+        LinearizationCache.invalidate()
 
     @property
     def queries(self) -> EntityList[Query]:
@@ -286,6 +363,7 @@ class Page(SpatialObject, Linearizable):
         :type signatures: list
         """
         self._queries = EntityList(queries)
+        LinearizationCache.invalidate()
 
     @property
     def signatures(self) -> EntityList[Signature]:
@@ -306,6 +384,7 @@ class Page(SpatialObject, Linearizable):
         :type signatures: list
         """
         self._signatures = EntityList(signatures)
+        LinearizationCache.invalidate()
 
     @property
     def layouts(self) -> EntityList[Layout]:
@@ -336,6 +415,7 @@ class Page(SpatialObject, Linearizable):
         :type layouts: list
         """
         self._layouts = EntityList(layouts)
+        LinearizationCache.invalidate()
 
     @property
     def expense_documents(self) -> EntityList[ExpenseDocument]:
@@ -843,19 +923,12 @@ class Page(SpatialObject, Linearizable):
     def export_tables_to_excel(self, filepath):
         """
         Creates an excel file and writes each table on a separate worksheet within the workbook.
-        This is stored on the filepath passed by the user.
+        This is stored on the filepath passed by the user. The file is streamed to disk.
 
         :param filepath: Path to store the exported Excel file.
         :type filepath: str, required
         """
-        if not filepath:
-            logger.error("Filepath required to store excel file.")
-        workbook = xlsxwriter.Workbook(filepath)
-        for table in self.tables:
-            workbook = table.to_excel(
-                filepath=None, workbook=workbook, save_workbook=False
-            )
-        workbook.close()
+        export_tables_to_excel(self.tables, filepath)
 
     def _update_entity_page_num(self):
         """Updates page number if Textractor API call was given a list of images."""
@@ -910,6 +983,7 @@ class Page(SpatialObject, Linearizable):
         prefix: str = "",
         direction=Direction.BELOW,
         entities=[],
+        deep_copy: bool = False,
     ):
         """
         The function returns entity types present in entities by prepending the prefix provided by te user. This helps in cases of repeating
@@ -923,6 +997,9 @@ class Page(SpatialObject, Linearizable):
         :type prefix: str, optional
         :param entities: List of DirectionalFinderType inputs.
         :type entities: List[DirectionalFinderType]
+        :param deep_copy: By default, the returned key-values are lightweight views sharing their words and values with the
+                          original entities (see :meth:`KeyValue.with_prefix`). Set to True to return independent deep copies instead.
+        :type deep_copy: bool
 
         :return: Returns the EntityList of modified key-value and/or checkboxes
         :rtype: EntityList
@@ -951,12 +1028,8 @@ class Page(SpatialObject, Linearizable):
 
         final_kv = []
         for kv in new_key_values:
-            if kv.key:
-                key_words = [deepcopy(word) for word in kv.key]
-                key_words[0].text = prefix + key_words[0].text
-                new_kv = deepcopy(kv)
-                new_kv.key = key_words
-                final_kv.append(new_kv)
+            if kv.key and (prefix or deep_copy):
+                final_kv.append(kv.with_prefix(prefix, deep_copy=deep_copy))
             else:
                 final_kv.append(kv)
 
@@ -14,6 +14,7 @@ from textractor.entities.line import Line
 from textractor.entities.bbox import BoundingBox
 from textractor.data.constants import SELECTED, NOT_SELECTED, SelectionStatus
 from textractor.entities.document_entity import DocumentEntity
+from textractor.utils.offset_utils import word_text
 
 
 class SelectionElement(DocumentEntity):
@@ -75,7 +76,7 @@ class SelectionElement(DocumentEntity):
 
         words = [w]
 
-        text = w.text
+        text = word_text(w.text, w)
             
         for w in words:
             w.value_id = str(self.id)
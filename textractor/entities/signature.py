@@ -13,6 +13,7 @@ from textractor.entities.bbox import BoundingBox
 from textractor.entities.document_entity import DocumentEntity
 from textractor.entities.line import Line
 from textractor.entities.word import Word
+from textractor.utils.offset_utils import word_text
 
 
 class Signature(DocumentEntity):
@@ -91,4 +92,4 @@ class Signature(DocumentEntity):
             entity_id=str(uuid.uuid4()), bbox=self.bbox, text=config.signature_token
         )
         w.line = Line(entity_id=str(uuid.uuid4()), bbox=self.bbox, words=[w])
-        return config.signature_token, [w]
+        return word_text(config.signature_token, w), [w]
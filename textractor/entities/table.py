@@ -6,15 +6,16 @@ Tables are hierarchical objects composed of :class:`TableCell` objects, which *i
 page ID of the page within which it exists in the document. 
 """
 
-import itertools
+import csv
+import io
 import logging
 import os
-import uuid
+import re
 import xlsxwriter
-from copy import deepcopy
+from copy import copy, deepcopy
 
 
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 from textractor.exceptions import InputError, MissingDependencyException
 from textractor.entities.bbox import BoundingBox
@@ -33,9 +34,15 @@ from textractor.utils.text_utils import group_elements_horizontally, linearize_c
 from textractor.data.text_linearization_config import TextLinearizationConfig
 from textractor.data.html_linearization_config import HTMLLinearizationConfig
 from textractor.utils.html_utils import add_id_to_html_tag
+from textractor.utils.linearization_cache import ChildList, LinearizationCache, memoize_linearization
+from textractor.utils.offset_utils import LinearizedText, join_text, word_text
 
 logger = logging.getLogger(__name__)
 
+# A cell written by tabulate without codes, the separator lines have no letter or digit
+_TABULATE_TOKEN = re.compile(r"[^\s|]*[0-9A-Za-z][^\s|]*")
+
+
 class Table(DocumentEntity):
     """
     To create a new :class:`Table` object we need the following:
@@ -46,6 +53,9 @@ class Table(DocumentEntity):
 
     def __init__(self, entity_id, bbox: BoundingBox):
         super().__init__(entity_id, bbox)
+        self._grid: List[List[TableCell]] = []
+        self._merged_origins: Dict[Tuple[int, int], TableCell] = {}
+        self._cells_by_metadata: Dict[str, List[TableCell]] = {}
         self.table_cells: List[TableCell] = []
         self._column_headers: Dict[str, List[TableCell]] = {}
         self._title: TableTitle = None
@@ -54,6 +64,26 @@ class Table(DocumentEntity):
         self._page = None
         self._page_id = None
 
+    @property
+    def table_cells(self) -> List[TableCell]:
+        """
+        :return: Returns the :class:`TableCell` objects of the table, sorted by row and column index.
+        :rtype: List[TableCell]
+        """
+        return self._table_cells
+
+    @table_cells.setter
+    def table_cells(self, cells: List[TableCell]):
+        """
+        Sets the :class:`TableCell` objects of the table and rebuilds the grid index used for cell lookups.
+
+        :param cells: List of TableCell objects
+        :type cells: List[TableCell]
+        """
+        self._table_cells = cells
+        self._build_grid()
+        LinearizationCache.invalidate()
+
     @property
     def words(self):
         """
@@ -109,6 +139,7 @@ class Table(DocumentEntity):
         """
 
         self._table_type = table_type
+        LinearizationCache.invalidate()
 
     @property
     def title(self):
@@ -129,6 +160,7 @@ class Table(DocumentEntity):
         """
 
         self._title = title
+        LinearizationCache.invalidate()
 
     @property
     def footers(self):
@@ -149,6 +181,7 @@ class Table(DocumentEntity):
         """
 
         self._footers = footers
+        LinearizationCache.invalidate()
 
     @property
     def column_headers(self) -> Dict[str, List[TableCell]]:
@@ -169,6 +202,7 @@ class Table(DocumentEntity):
         """
 
         self._column_headers = column_headers
+        LinearizationCache.invalidate()
 
     @property
     def page_id(self) -> str:
@@ -199,11 +233,109 @@ class Table(DocumentEntity):
 
     @property
     def column_count(self):
-        return max(list(self._get_table_cells(row_wise=False, column_wise=True).keys()))
+        return len(self._grid[0]) if self._grid else 0
 
     @property
     def row_count(self):
-        return max(list(self._get_table_cells().keys()))
+        return len(self._grid)
+
+    def cell(self, row: int, column: int, resolve_merged: bool = False) -> TableCell:
+        """
+        Returns the :class:`TableCell` at the given position in constant time. Indices are zero-based like
+        :code:`table[row, column]`, so :code:`table.cell(0, 0)` is the top-left cell.
+
+        :param row: Zero-based row index
+        :type row: int
+        :param column: Zero-based column index
+        :type column: int
+        :param resolve_merged: If the cell is part of a merged cell, return the top-left cell of the merged cell instead.
+        :type resolve_merged: bool
+
+        :return: TableCell at the given position, None if the table has no cell there.
+        :rtype: TableCell
+        """
+        cell = self._grid[row][column]
+        if resolve_merged and cell is not None:
+            return self._merged_origins.get((cell.row_index, cell.col_index), cell)
+        return cell
+
+    def row(self, row: int) -> EntityList[TableCell]:
+        """
+        Returns the cells of a row, ordered by column.
+
+        :param row: Zero-based row index
+        :type row: int
+
+        :return: List of TableCell objects in the row
+        :rtype: EntityList[TableCell]
+        """
+        return EntityList([cell for cell in self._grid[row] if cell is not None])
+
+    def column(self, column: int) -> EntityList[TableCell]:
+        """
+        Returns the cells of a column, ordered by row.
+
+        :param column: Zero-based column index
+        :type column: int
+
+        :return: List of TableCell objects in the column
+        :rtype: EntityList[TableCell]
+        """
+        return EntityList(
+            [row[column] for row in self._grid if row[column] is not None]
+        )
+
+    def column_header_cells(self, column: int) -> EntityList[TableCell]:
+        """
+        Returns the cells marked as column header in a column, ordered by row.
+
+        :param column: Zero-based column index
+        :type column: int
+
+        :return: List of column header TableCell objects in the column
+        :rtype: EntityList[TableCell]
+        """
+        column_index = range(1, self.column_count + 1)[column]
+        return EntityList(
+            [
+                cell
+                for cell in self._cells_by_metadata.get(IS_COLUMN_HEAD, [])
+                if cell.col_index == column_index
+            ]
+        )
+
+    def _build_grid(self):
+        """
+        Builds the row x column index of the table cells. Each position of the grid points to the
+        :class:`TableCell` at that position (or None) and each cell belonging to a merged cell is mapped to the
+        top-left cell of its merged range. Cells are also indexed by their metadata flags.
+        """
+        row_count = max((cell.row_index for cell in self._table_cells), default=0)
+        column_count = max((cell.col_index for cell in self._table_cells), default=0)
+        self._grid = [[None] * column_count for _ in range(row_count)]
+        self._merged_origins = {}
+        self._cells_by_metadata = {}
+        for cell in self._table_cells:
+            self._grid[cell.row_index - 1][cell.col_index - 1] = cell
+            for key, flag in cell.metadata.items():
+                if flag is True:
+                    self._cells_by_metadata.setdefault(key, []).append(cell)
+            if cell.siblings and (cell.row_index, cell.col_index) not in self._merged_origins:
+                origin = min(cell.siblings, key=lambda c: (c.row_index, c.col_index))
+                for sibling in cell.siblings:
+                    self._merged_origins[(sibling.row_index, sibling.col_index)] = origin
+
+    def _rows(self) -> List[Tuple[int, List[TableCell]]]:
+        """
+        :return: Returns the non-empty rows of the table as (row_index, cells) tuples, cells being ordered by column.
+        :rtype: List[Tuple[int, List[TableCell]]]
+        """
+        rows = []
+        for i, row in enumerate(self._grid):
+            cells = [cell for cell in row if cell is not None]
+            if cells:
+                rows.append((i + 1, cells))
+        return rows
 
     def get_words_by_type(self, text_type=TextTypes.PRINTED):
         """
@@ -291,10 +423,7 @@ class Table(DocumentEntity):
 
         for cell in cells:
             cell.table_id = self.id
-        self.table_cells = cells
-        self.table_cells = sorted(
-            self.table_cells, key=lambda x: (x.row_index, x.col_index)
-        )
+        self.table_cells = sorted(cells, key=lambda x: (x.row_index, x.col_index))
 
     def _get_table_cells(
         self, row_wise: bool = True, column_wise: bool = False
@@ -317,21 +446,14 @@ class Table(DocumentEntity):
             )
             return {}
 
-        attribute = "row_index" if row_wise else "col_index"
-        alt_attribute = "col_index" if row_wise else "row_index"
-        sorted_cells = {}
-        for cell in self.table_cells:
-            index = getattr(cell, attribute)
-            if index in sorted_cells.keys():
-                sorted_cells[index].append(cell)
-            else:
-                sorted_cells[index] = [cell]
-
-        for key in sorted_cells.keys():
-            sorted_cells[key] = sorted(
-                sorted_cells[key], key=lambda x: getattr(x, alt_attribute)
-            )
+        if row_wise:
+            return {index: cells for index, cells in self._rows()}
 
+        sorted_cells = {}
+        for i in range(self.column_count):
+            cells = [row[i] for row in self._grid if row[i] is not None]
+            if cells:
+                sorted_cells[i + 1] = cells
         return sorted_cells
 
     def get_cells_by_type(self, cell_type: CellTypes = CellTypes.COLUMN_HEADER):
@@ -356,7 +478,7 @@ class Table(DocumentEntity):
             return []
         filtered_cells = {}
 
-        for cell in self.table_cells:
+        for cell in self._cells_by_metadata.get(cell_property, []):
             if cell.metadata[cell_property]:
                 if not cell.metadata[IS_MERGED_CELL]:
                     header = " ".join([word.text for word in cell.words])
@@ -431,20 +553,7 @@ class Table(DocumentEntity):
             for cell in self._column_headers[col]:
                 column_indices.add(cell.col_index)
 
-        table_cells = deepcopy(self.table_cells)
-        table_cells = [cell for cell in table_cells if cell.col_index in column_indices]
-        new_cols = set(range(1, len(column_indices) + 1))
-        new_col_mapping = dict(zip(column_indices, new_cols))
-
-        new_table_cells = []
-        for cell in table_cells:
-            cell.col_index = new_col_mapping[cell.col_index]
-            new_table_cells.append(cell)
-
-        new_table = deepcopy(self)
-        new_table.add_cells(new_table_cells)
-
-        return new_table
+        return self._select(range(self.row_count), sorted(i - 1 for i in column_indices))
 
     def __getitem__(self, key):
         """
@@ -478,23 +587,27 @@ class Table(DocumentEntity):
         rows = get_indices(row_index, max_rows)
         cols = get_indices(col_index, max_cols)
 
-        table_rows = self._get_table_cells(row_wise=True, column_wise=False)
+        return self._select(rows, cols)
 
+    def _select(self, rows: List[int], columns: List[int]) -> "Table":
+        """
+        Returns a new :class:`Table` made of the cells at the given zero-based rows and columns, read from the grid
+        index. The cells are re-indexed from 1 and keep their words. The table attributes (title, footers, ...) are
+        shared with this table instead of being deep-copied.
+        """
         filtered_rows = {}
-        for row_number in rows:
-            if row_number + 1 in table_rows.keys():
-                row_data = table_rows[row_number + 1]
-                col_cells = []
-                for col_number in cols:
-                    col_cells.append(row_data[col_number])
-                filtered_rows[row_number] = col_cells
-
-        new_table_cells = _get_new_table_cells(rows, filtered_rows)
-
-        new_table = deepcopy(self)
-        new_table.table_cells = new_table_cells
-        new_table._children = new_table_cells
-
+        for row in rows:
+            cells = [self._grid[row][column] for column in columns if self._grid[row][column] is not None]
+            if cells:
+                filtered_rows[row] = cells
+        new_table_cells = _get_new_table_cells(list(filtered_rows), filtered_rows) if filtered_rows else []
+
+        new_table = copy(self)
+        new_table.metadata = dict(self.metadata)
+        new_table._footers = list(self._footers)
+        new_table._column_headers = {}
+        new_table._children = ChildList(new_table_cells)
+        new_table.add_cells(new_table_cells)
         return new_table
 
     def to_pandas(self, use_columns=False, config: TextLinearizationConfig = TextLinearizationConfig()):
@@ -505,6 +618,10 @@ class Table(DocumentEntity):
         :param config: Text linearization configuration object for the table content
         :return:
         """
+        columns, table = self._get_rows_text(use_columns=use_columns, config=config)
+        return self._to_dataframe(columns, table)
+
+    def _to_dataframe(self, columns: List[str], table: List[List[str]]):
         try:
             from pandas import DataFrame
         except ImportError:
@@ -512,9 +629,94 @@ class Table(DocumentEntity):
                 "pandas library is required for exporting tables to DataFrame objects or markdown"
             )
 
-        rows = sorted([(key, list(group)) for key, group in itertools.groupby(
-            self.table_cells, key=lambda cell: cell.row_index
-        )], key=lambda r: r[0])
+        return DataFrame(table, columns=columns)
+
+    def _to_markdown(self, config: TextLinearizationConfig) -> str:
+        """
+        Returns the table formatted by tabulate, as :code:`to_pandas(use_columns=True).to_markdown()`, with the spans
+        of the cell words. Tabulate pads and reformats the cells, so each text cell is wrapped in ANSI escape codes that
+        tabulate leaves out of the column widths, the codes give the position of the cell in the output and are removed.
+        Tabulate parses numbers before leaving the codes out, numeric cells are not wrapped and are found, in order, as
+        the next token of the output. The words of a cell written as is keep their position in it, the words of a
+        reformatted cell (:code:`93.50` written :code:`93.5`) span the whole cell.
+        """
+        columns, table = self._get_rows_text(use_columns=True, config=config)
+        # Text already holding escape codes is left unmarked, its words are not indexed
+        marked = LinearizationCache.is_recording_offsets() and not any(
+            "\x1b" in c for row in [columns or []] + table for c in row
+        )
+        cells = []
+
+        def mark(text):
+            core = text.strip()
+            if not core:
+                return text
+            cells.append(core)
+            if not marked or _is_tabulate_number(core):
+                return text
+            # Surrounding whitespace is left outside the codes, tabulate strips it
+            start = len(text) - len(str.lstrip(text))
+            return f"{text[:start]}\x1b[{len(cells)}m{core}\x1b[0m{text[start + len(core):]}"
+
+        df = self._to_dataframe(
+            [mark(c) for c in columns] if columns is not None else None,
+            [[mark(c) for c in row] for row in table],
+        )
+        has_column = any([isinstance(c, str) for c in df.columns])
+        if config.table_remove_column_headers:
+            headers = df.columns if has_column else ["" for c in df.columns]
+        else:
+            headers = df.columns
+        output = df.to_markdown(tablefmt=config.table_tabulate_format, headers=headers, index=False)
+        if not marked:
+            return output
+
+        parts = []
+        positions = {}
+        last = 0
+        length = 0
+        for match in re.finditer("\x1b\\[(\\d+)m", output):
+            parts.append(output[last:match.start()])
+            length += match.start() - last
+            last = match.end()
+            if match.group(1) != "0":
+                index = int(match.group(1)) - 1
+                start = length
+            else:
+                positions[index] = (start, length)
+        parts.append(output[last:])
+        output = "".join(parts)
+
+        # The column names of a dataframe without columns are written before the cells
+        sequence = [(None, str(h)) for h in headers if columns is None and str(h).strip()] + list(enumerate(cells))
+        spans = []
+        position = 0
+        for index, cell in sequence:
+            if index in positions:
+                start, position = positions[index]
+            else:
+                match = _TABULATE_TOKEN.search(output, position)
+                start, position = match.span()
+            if not isinstance(cell, LinearizedText):
+                continue
+            if output[start:position] == cell:
+                spans.extend((start + s, start + e, w) for s, e, w in cell.spans)
+            else:
+                spans.extend((start, position, w) for _, _, w in cell.spans)
+        return LinearizedText(output, spans)
+
+    def _get_rows_text(
+        self, use_columns=False, config: TextLinearizationConfig = TextLinearizationConfig()
+    ) -> Tuple[List[str], List[List[str]]]:
+        """
+        Linearizes the content of each cell, this is what :meth:`to_pandas` and :meth:`to_csv` are built upon.
+
+        :param use_columns: If the first row of the table is made of column headers, return them as column names. Only supports single row header.
+        :param config: Text linearization configuration object for the table content
+        :return: Tuple of column names (None if the header was not used) and rows of cell text
+        :rtype: Tuple[List[str], List[List[str]]]
+        """
+        rows = self._rows()
         row_offset = 0
 
         columns = None
@@ -567,7 +769,7 @@ class Table(DocumentEntity):
                 )
 
         if columns and any([c for c in columns]) and config.table_flatten_headers:
-            columns = ["".join(c) for c in columns]
+            columns = [join_text("", c) for c in columns]
             table = [columns]
         elif columns and any([c for c in columns]):
             # We reset the row offset as only the first line will be taken as header
@@ -601,20 +803,27 @@ class Table(DocumentEntity):
                     text = cell.get_text(config)
                 table[-1][cell.col_index - 1] = text if text or not config.table_cell_empty_cell_placeholder else config.table_cell_empty_cell_placeholder
 
-        return DataFrame(
-            table[1:] if use_columns else table,
-            columns=columns if use_columns else None,
-        )
+        return (columns, table[1:]) if use_columns else (None, table)
 
     def to_csv(self, use_columns = False, config: TextLinearizationConfig = TextLinearizationConfig()) -> str:
         """Returns the table in the Comma-Separated-Value (CSV) format
 
+        The output is identical to :code:`table.to_pandas().to_csv()` but is written directly, pandas is not required.
+
         :param use_columns: If the first row of the table is made of column headers, use them for the pandas dataframe. Only supports single row header.
         :param config: Text linearization configuration object for the table content
         :return: Table as a CSV string.
         :rtype: str
         """
-        return self.to_pandas(use_columns=use_columns, config=config).to_csv()
+        columns, table = self._get_rows_text(use_columns=use_columns, config=config)
+        column_count = max([len(columns or [])] + [len(row) for row in table])
+
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator=os.linesep)
+        writer.writerow([""] + (columns if columns is not None else list(range(column_count))))
+        for i, row in enumerate(table):
+            writer.writerow([i] + row + [""] * (column_count - len(row)))
+        return output.getvalue()
 
     def to_excel(self, filepath=None, workbook=None, save_workbook=True):
         """
@@ -637,7 +846,27 @@ class Table(DocumentEntity):
                 logger.error("You need to provide a filepath or a workbook")
 
         worksheet = workbook.add_worksheet()
+        self._write_to_worksheet(worksheet)
+
+        if save_workbook:
+            workbook.close()
+
+        else:
+            return workbook
+
+    def _write_to_worksheet(self, worksheet, row_offset: int = 0) -> int:
+        """
+        Writes the table cells to an xlsxwriter worksheet, merged cells are written as merged ranges. Cells are written
+        in row order so that this can be used with workbooks opened in constant_memory mode.
 
+        :param worksheet: Worksheet to write the table to
+        :type worksheet: xlsxwriter.worksheet.Worksheet
+        :param row_offset: Index of the worksheet row where the first row of the table is written
+        :type row_offset: int
+
+        :return: Index of the worksheet row following the table
+        :rtype: int
+        """
         merged_cells = set()
         for cell in self.table_cells:
             cell_content = cell.__repr__().split(">")[1][1:]
@@ -648,22 +877,17 @@ class Table(DocumentEntity):
                 else:
                     merged_cells.add((first_row, first_col, last_row, last_col))
                 worksheet.merge_range(
-                    first_row - 1,
+                    row_offset + first_row - 1,
                     first_col - 1,
-                    last_row - 1,
+                    row_offset + last_row - 1,
                     last_col - 1,
                     cell_content,
                 )
             else:
                 worksheet.write_string(
-                    cell.row_index - 1, cell.col_index - 1, cell_content
+                    row_offset + cell.row_index - 1, cell.col_index - 1, cell_content
                 )
-
-        if save_workbook:
-            workbook.close()
-
-        else:
-            return workbook
+        return row_offset + self.row_count
 
     def to_html(self) -> str:
         """Returns the table in the HTML format
@@ -674,27 +898,66 @@ class Table(DocumentEntity):
         
         return self.get_text(HTMLLinearizationConfig())
 
+    @memoize_linearization
     def get_text_and_words(
         self, config: TextLinearizationConfig = TextLinearizationConfig()
     ):
-        local_config = deepcopy(config)
-        words_ = self.words
-        # If no text, return empty string
-        if not words_ and local_config.table_remove_column_headers:
-            return "", []
-
-        # If not many words, only return text
-        if len(words_) < local_config.table_min_table_words:
-            return linearize_children(words_, config=config)
+        return self._linearize(config, with_words=not LinearizationCache.is_text_only())
 
-        words = [Word(str(uuid.uuid4()), self.bbox, add_id_to_html_tag(local_config.table_prefix, self.id, local_config))] if local_config.table_prefix else []
-        rows = sorted([(key, list(group)) for key, group in itertools.groupby(
-            self.table_cells, key=lambda cell: cell.row_index
-        )], key=lambda r: r[0])
+    def _linearize_merged_cell(
+        self, cell: TableCell, merged_range: Tuple, config: TextLinearizationConfig, merged_cells: Dict
+    ) -> Tuple[str, List[Word]]:
+        """
+        Linearizes the content of all the siblings of a merged cell. The output is kept in merged_cells, keyed by
+        merged range, so that cells of the same merged cell are only linearized once per table linearization.
+        """
+        if merged_range not in merged_cells:
+            children = []
+            for sib in cell.siblings:
+                children.extend(sib.children)
+            merged_cells[merged_range] = linearize_children(children, config=config, no_new_lines=True)
+        return merged_cells[merged_range]
+
+    def _get_linearized_words(
+        self, config: TextLinearizationConfig, rows: List[Tuple[int, List[TableCell]]]
+    ) -> Tuple[List[Word], Dict[Tuple, Word]]:
+        """
+        Returns the words of the linearized table, prefixes, suffixes and placeholders included, and the words
+        created for the prefixes, suffixes and placeholders keyed by their place in the table, for the text to record
+        their spans.
+        """
+        # Structure words are ubiquitous in large tables, their ids are derived from the table id instead of being
+        # generated with uuid4
+        structure_word_count = 0
+        structure_words = {}
+
+        def new_word(bbox, text, is_structure=False, cell_attributes=None, key=None):
+            nonlocal structure_word_count
+            structure_word_count += 1
+            word = Word(f"{self.id}-{structure_word_count}", bbox, text, is_structure=is_structure)
+            if key is not None:
+                structure_words[key] = word
+            if cell_attributes:
+                (
+                    word.cell_id,
+                    word.cell_bbox,
+                    word.col_index,
+                    word.col_span,
+                    word.row_index,
+                    word.row_span,
+                ) = cell_attributes
+            return word
+
+        words = (
+            [new_word(self.bbox, add_id_to_html_tag(config.table_prefix, self.id, config), key=("table_prefix",))]
+            if config.table_prefix else
+            []
+        )
         processed_cells = set()
+        merged_cells = {}
         # Fill the table
         row_offset = 0
-        if local_config.table_flatten_headers:
+        if config.table_flatten_headers:
             columns = [[] for _ in range(len(rows[0][1]))]
             columns_bbox = [[] for _ in range(len(rows[0][1]))]
             for _, row in rows:
@@ -704,178 +967,213 @@ class Table(DocumentEntity):
                 for i, cell in enumerate(row):
                     if (
                         cell not in processed_cells or
-                        local_config.table_duplicate_text_in_merged_cells or
-                        local_config.table_flatten_headers
+                        config.table_duplicate_text_in_merged_cells or
+                        config.table_flatten_headers
                     ):
                         if cell.siblings:
                             # This handles the edge case where we are flattening the headers
                             # so we want to duplicate the cell text but only in its first row
-                            first_row, _, _, _ = cell._get_merged_cell_range()
-                            if cell in processed_cells and first_row != cell.row_index:
+                            merged_range = cell._get_merged_cell_range()
+                            if cell in processed_cells and merged_range[0] != cell.row_index:
                                 continue
-                            children = []
-                            for sib in cell.siblings:
-                                children.extend(sib.children)
-                                processed_cells.add(sib)
-                            _, words = linearize_children(children, config=config, no_new_lines=True)
-                            columns[i].extend(words)
+                            processed_cells.update(cell.siblings)
+                            _, cell_words = self._linearize_merged_cell(cell, merged_range, config, merged_cells)
+                            columns[i].extend(cell_words)
                             columns_bbox[i].append(cell.bbox)
                         else:
-                            _, words = cell.get_text_and_words(config)
-                            columns[i].extend(words)
+                            _, cell_words = cell.get_text_and_words(config)
+                            columns[i].extend(cell_words)
                             columns_bbox[i].append(cell.bbox)
-                    elif local_config.table_cell_empty_cell_placeholder:
-                        columns[i].append(Word(str(uuid.uuid4()), cell.bbox, local_config.table_cell_empty_cell_placeholder))
+                    elif config.table_cell_empty_cell_placeholder:
+                        columns[i].append(
+                            new_word(cell.bbox, config.table_cell_empty_cell_placeholder, key=("placeholder", cell.id))
+                        )
                 row_offset += 1
             if columns:
                 columns_bbox = [BoundingBox.enclosing_bbox(cbb) for cbb in columns_bbox]
-                if local_config.table_row_prefix and local_config.add_prefixes_and_suffixes_as_words:
-                    words.append(Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(columns_bbox), local_config.table_row_prefix, is_structure=True))
+                header_bbox = BoundingBox.enclosing_bbox(columns_bbox)
+                if config.table_row_prefix and config.add_prefixes_and_suffixes_as_words:
+                    words.append(
+                        new_word(header_bbox, config.table_row_prefix, is_structure=True, key=("header_row_prefix",))
+                    )
                 for i, column in enumerate(columns):
                     words.append(
-                        Word(
-                            str(uuid.uuid4()),
+                        new_word(
                             columns_bbox[i],
-                            local_config.table_cell_header_prefix
-                            if local_config.table_cell_header_prefix
-                            else local_config.table_cell_prefix,
-                            is_structure=True
+                            config.table_cell_header_prefix
+                            if config.table_cell_header_prefix
+                            else config.table_cell_prefix,
+                            is_structure=True,
+                            key=("header_cell_prefix", i),
                         )
                     )
                     words.extend(column)
                     words.append(
-                        Word(
-                            str(uuid.uuid4()),
+                        new_word(
                             columns_bbox[i],
-                            local_config.table_cell_header_suffix
-                            if local_config.table_cell_header_suffix
-                            else local_config.table_cell_suffix,
-                            is_structure=True
+                            config.table_cell_header_suffix
+                            if config.table_cell_header_suffix
+                            else config.table_cell_suffix,
+                            is_structure=True,
+                            key=("header_cell_suffix", i),
                         )
                     )
-                if local_config.table_row_suffix and local_config.add_prefixes_and_suffixes_as_words:
-                    words.append(Word(str(uuid.uuid4()), columns_bbox, local_config.table_row_suffix, is_structure=True))
-        for _, cells in rows[row_offset:]:
-            if local_config.table_row_prefix and local_config.add_prefixes_and_suffixes_as_words:
-                words.append(Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(cells), local_config.table_row_prefix, is_structure=True))
+                if config.table_row_suffix and config.add_prefixes_and_suffixes_as_words:
+                    words.append(
+                        new_word(header_bbox, config.table_row_suffix, is_structure=True, key=("header_row_suffix",))
+                    )
+        for row_index, cells in rows[row_offset:]:
+            row_bbox = None
+            if config.table_row_prefix and config.add_prefixes_and_suffixes_as_words:
+                row_bbox = BoundingBox.enclosing_bbox(cells)
+                words.append(
+                    new_word(row_bbox, config.table_row_prefix, is_structure=True, key=("row_prefix", row_index))
+                )
             for cell in sorted(cells, key=lambda c: c.col_index):
                 # Siblings includes the current cell
                 if cell.siblings:
-                    first_row, first_col, last_row, last_col = cell._get_merged_cell_range()
-                    cell_id = cell.id
+                    merged_range = cell._get_merged_cell_range()
+                    first_row, first_col, last_row, last_col = merged_range
                     cell_bbox = BoundingBox.enclosing_bbox(cell.siblings)
-                    col_index = first_col
-                    col_span = last_col - first_col + 1
-                    row_index = first_row
-                    row_span = last_row - first_row + 1
-                    children = []
-                    if (cell.col_index == first_col and cell.row_index == first_row) or local_config.table_duplicate_text_in_merged_cells:
-                        for sib in cell.siblings:
-                            children.extend(sib.children)
-                            processed_cells.add(sib)
-                        _, cell_words = linearize_children(children, config=config, no_new_lines=True)
-                    elif cell.row_index == first_row and local_config.table_cell_left_merge_cell_placeholder:
+                    cell_attributes = (
+                        cell.id,
+                        cell_bbox,
+                        first_col,
+                        last_col - first_col + 1,
+                        first_row,
+                        last_row - first_row + 1,
+                    )
+                    if (cell.col_index == first_col and cell.row_index == first_row) or config.table_duplicate_text_in_merged_cells:
+                        processed_cells.update(cell.siblings)
+                        _, cell_words = self._linearize_merged_cell(cell, merged_range, config, merged_cells)
+                    elif cell.row_index == first_row and config.table_cell_left_merge_cell_placeholder:
                         # Left-merge token
                         cell_words = [
-                            Word(str(uuid.uuid4()),
+                            new_word(
                                 cell_bbox,
-                                local_config.table_cell_left_merge_cell_placeholder,
-                                is_structure=True
+                                config.table_cell_left_merge_cell_placeholder,
+                                is_structure=True,
+                                key=("placeholder", cell.id),
                             )
                         ]
-                    elif cell.col_index == first_col and local_config.table_cell_top_merge_cell_placeholder:
+                    elif cell.col_index == first_col and config.table_cell_top_merge_cell_placeholder:
                         # Top-merge token
                         cell_words = [
-                            Word(str(uuid.uuid4()),
+                            new_word(
                                 cell_bbox,
-                                local_config.table_cell_top_merge_cell_placeholder,
-                                is_structure=True
+                                config.table_cell_top_merge_cell_placeholder,
+                                is_structure=True,
+                                key=("placeholder", cell.id),
                             )
                         ]
-                    elif cell.col_index != first_col and cell.row_index != first_row and local_config.table_cell_cross_merge_cell_placeholder:
+                    elif cell.col_index != first_col and cell.row_index != first_row and config.table_cell_cross_merge_cell_placeholder:
                         # Cross-merge token (left and top)
                         cell_words = [
-                            Word(str(uuid.uuid4()),
+                            new_word(
                                 cell_bbox,
-                                local_config.table_cell_cross_merge_cell_placeholder,
-                                is_structure=True
+                                config.table_cell_cross_merge_cell_placeholder,
+                                is_structure=True,
+                                key=("placeholder", cell.id),
                             )
                         ]
                     else:
                         continue
                 else:
-                    cell_id = cell.id
                     cell_bbox = cell.bbox
-                    col_index = cell.col_index
-                    col_span = cell.col_span
-                    row_index = cell.row_index
-                    row_span = cell.row_span
+                    cell_attributes = (
+                        cell.id,
+                        cell_bbox,
+                        cell.col_index,
+                        cell.col_span,
+                        cell.row_index,
+                        cell.row_span,
+                    )
                     _, cell_words = cell.get_text_and_words(config)
-                if local_config.add_prefixes_and_suffixes_as_words:
-                    if local_config.table_cell_prefix or (local_config.table_cell_header_prefix and cell.is_column_header):
+                if config.add_prefixes_and_suffixes_as_words:
+                    if config.table_cell_prefix or (config.table_cell_header_prefix and cell.is_column_header):
                         words.append(
-                            Word(
-                                str(uuid.uuid4()),
+                            new_word(
                                 cell_bbox,
-                                local_config.table_cell_header_prefix
-                                if cell.is_column_header and local_config.table_cell_header_prefix
-                                else local_config.table_cell_prefix,
-                                is_structure=True
+                                config.table_cell_header_prefix
+                                if cell.is_column_header and config.table_cell_header_prefix
+                                else config.table_cell_prefix,
+                                is_structure=True,
+                                cell_attributes=cell_attributes,
+                                key=("cell_prefix", cell.id),
                             )
                         )
-                        words[-1].cell_id = cell_id
-                        words[-1].cell_bbox = cell_bbox
-                        words[-1].col_index = col_index
-                        words[-1].col_span = col_span
-                        words[-1].row_index = row_index
-                        words[-1].row_span = row_span
 
                     words.extend(cell_words)
-                    if not cell_words and local_config.table_cell_empty_cell_placeholder:
-                        words.append(Word(str(uuid.uuid4()), cell_bbox, local_config.table_cell_empty_cell_placeholder))
+                    if not cell_words and config.table_cell_empty_cell_placeholder:
+                        words.append(
+                            new_word(cell_bbox, config.table_cell_empty_cell_placeholder, key=("placeholder", cell.id))
+                        )
 
-                    if local_config.table_cell_suffix or (local_config.table_cell_header_suffix and cell.is_column_header):
+                    if config.table_cell_suffix or (config.table_cell_header_suffix and cell.is_column_header):
                         words.append(
-                            Word(
-                                str(uuid.uuid4()),
+                            new_word(
                                 cell_bbox,
-                                local_config.table_cell_header_suffix if cell.is_column_header and local_config.table_cell_header_suffix else local_config.table_cell_suffix,
-                                is_structure=True
+                                config.table_cell_header_suffix
+                                if cell.is_column_header and config.table_cell_header_suffix
+                                else config.table_cell_suffix,
+                                is_structure=True,
+                                cell_attributes=cell_attributes,
+                                key=("cell_suffix", cell.id),
                             )
                         )
-                        words[-1].cell_id = cell_id
-                        words[-1].cell_bbox = cell_bbox
-                        words[-1].col_index = col_index
-                        words[-1].col_span = col_span
-                        words[-1].row_index = row_index
-                        words[-1].row_span = row_span
                 else:
                     words.extend(cell_words)
-            if local_config.table_row_suffix and local_config.add_prefixes_and_suffixes_as_words:
-                words.append(Word(str(uuid.uuid4()), BoundingBox.enclosing_bbox(cells), local_config.table_row_suffix, is_structure=True))
+            if config.table_row_suffix and config.add_prefixes_and_suffixes_as_words:
+                words.append(
+                    new_word(
+                        row_bbox or BoundingBox.enclosing_bbox(cells),
+                        config.table_row_suffix,
+                        is_structure=True,
+                        key=("row_suffix", row_index),
+                    )
+                )
 
-        if local_config.table_suffix:
-            words.append(Word(str(uuid.uuid4()), self.bbox, local_config.table_suffix))
+        if config.table_suffix:
+            words.append(new_word(self.bbox, config.table_suffix, key=("table_suffix",)))
 
         for w in words:
             w.table_id = str(self.id)
             w.table_bbox = self.bbox
+        return words, structure_words
+
+    def _linearize(
+        self, config: TextLinearizationConfig, with_words: bool = True
+    ) -> Tuple[str, List[Word]]:
+        # The configuration fields are immutable values, a shallow copy is enough
+        local_config = copy(config)
+        words_ = self.words
+        # If no text, return empty string
+        if not words_ and local_config.table_remove_column_headers:
+            return "", []
+
+        # If not many words, only return text
+        if len(words_) < local_config.table_min_table_words:
+            return linearize_children(words_, config=config)
 
-        text = (add_id_to_html_tag(local_config.table_prefix, self.id, local_config) if local_config.add_prefixes_and_suffixes_in_text else "")
+        rows = self._rows()
+        # Without with_words only the text is used, the words of the table stand in for the linearized words so that
+        # callers testing whether the table has words behave the same
+        if with_words or not words_:
+            words, structure_words = self._get_linearized_words(config, rows)
+        else:
+            words, structure_words = list(words_), {}
+
+        text = (
+            word_text(
+                add_id_to_html_tag(local_config.table_prefix, self.id, local_config),
+                structure_words.get(("table_prefix",)),
+            )
+            if local_config.add_prefixes_and_suffixes_in_text else
+            ""
+        )
         # Markdown
         if local_config.table_linearization_format == "markdown":
-            df = self.to_pandas(
-                use_columns=True,
-                config=config
-            )
-            has_column = any([isinstance(c, str) for c in df.columns])
-            if local_config.table_remove_column_headers:
-                headers = df.columns if has_column else ["" for c in df.columns]
-            else:
-                headers = df.columns
-            table = df.to_markdown(
-                tablefmt=local_config.table_tabulate_format, headers=headers, index=False
-            )
+            table = self._to_markdown(config)
             if local_config.table_tabulate_remove_extra_hyphens:
                 while "-" * 2 in table:
                     table = table.replace("--", "-")
@@ -910,6 +1208,7 @@ class Table(DocumentEntity):
                 
             row_offset = 0
             processed_cells = set()
+            merged_cells = {}
             if local_config.table_flatten_headers:
                 columns = ["" for _ in range(len(rows[0][1]))]
                 column_spans = [1 for _ in range(len(rows[0][1]))]
@@ -926,29 +1225,34 @@ class Table(DocumentEntity):
                             if cell.siblings:
                                 # This handles the edge case where we are flattening the headers
                                 # so we want to duplicate the cell text but only in its first row
-                                first_row, first_col, _, last_col = cell._get_merged_cell_range()
+                                merged_range = cell._get_merged_cell_range()
+                                first_row, first_col, _, last_col = merged_range
                                 # We always compute the colspan, but we will discard them if config.table_duplicate_text_in_merged_cells is True
                                 column_spans[i] = last_col - first_col + 1
                                 if cell in processed_cells and first_row != cell.row_index:
                                     continue
-                                children = []
-                                for sib in cell.siblings:
-                                    children.extend(sib.children)
-                                    processed_cells.add(sib)
-                                text, _ = linearize_children(children, config=local_config, no_new_lines=True)
+                                processed_cells.update(cell.siblings)
+                                text, _ = self._linearize_merged_cell(cell, merged_range, local_config, merged_cells)
                                 columns[i] += text
                             else:
                                 text = cell.get_text(local_config)
                                 columns[i] += text
                         elif local_config.table_cell_empty_cell_placeholder and local_config.table_linearization_format != "html":
-                            columns[i] += local_config.table_cell_empty_cell_placeholder
+                            columns[i] += word_text(
+                                local_config.table_cell_empty_cell_placeholder,
+                                structure_words.get(("placeholder", cell.id)),
+                            )
                         else:
                             columns[i] += ""
                             column_spans[i] = 0
                     row_offset += 1
                 if any(columns):
-                    text += local_config.table_row_prefix if local_config.add_prefixes_and_suffixes_in_text else ""
-                    for column, column_span in zip(columns, column_spans):
+                    text += (
+                        word_text(local_config.table_row_prefix, structure_words.get(("header_row_prefix",)))
+                        if local_config.add_prefixes_and_suffixes_in_text else
+                        ""
+                    )
+                    for i, (column, column_span) in enumerate(zip(columns, column_spans)):
                         if column_span == 0:
                             continue
                         
@@ -959,39 +1263,51 @@ class Table(DocumentEntity):
                         # We don't have any rowspan logic here as the flattened header will have rowspan=1 always.
                         text += (
                             (
-                                prefix + 
+                                word_text(prefix, structure_words.get(("header_cell_prefix", i))) +
                                 (column or local_config.table_cell_empty_cell_placeholder) +
-                                (local_config.table_cell_header_suffix if local_config.table_cell_header_suffix else local_config.table_cell_suffix)
+                                word_text(
+                                    local_config.table_cell_header_suffix or local_config.table_cell_suffix,
+                                    structure_words.get(("header_cell_suffix", i)),
+                                )
                             )
                             if local_config.add_prefixes_and_suffixes_in_text or local_config.table_linearization_format == "html" else
                             (column or local_config.table_cell_empty_cell_placeholder)
                         )
                         text += local_config.table_column_separator
-                    text += (local_config.table_row_suffix if local_config.add_prefixes_and_suffixes_in_text else "")
+                    text += (
+                        word_text(local_config.table_row_suffix, structure_words.get(("header_row_suffix",)))
+                        if local_config.add_prefixes_and_suffixes_in_text else
+                        ""
+                    )
                     text += local_config.table_row_separator
                     
-            for _, row in rows[row_offset:]:
-                text += (local_config.table_row_prefix if local_config.add_prefixes_and_suffixes_in_text else "")
+            for row_index, row in rows[row_offset:]:
+                text += (
+                    word_text(local_config.table_row_prefix, structure_words.get(("row_prefix", row_index)))
+                    if local_config.add_prefixes_and_suffixes_in_text else
+                    ""
+                )
                 for cell in sorted(row, key=lambda c: c.col_index):
+                    placeholder_word = structure_words.get(("placeholder", cell.id))
                     # This will return row_index, col_index, row_index, col_index for regular cells
-                    first_row, first_col, last_row, last_col = cell._get_merged_cell_range()
+                    merged_range = cell._get_merged_cell_range()
+                    first_row, first_col, last_row, last_col = merged_range
                     if cell in processed_cells and local_config.table_linearization_format == "html":
                         continue
                     
                     # Siblings includes the current cell
                     if cell.siblings:
-                        children = []
                         if (cell.col_index == first_col and cell.row_index == first_row) or local_config.table_duplicate_text_in_merged_cells:
-                            for sib in cell.siblings:
-                                children.extend(sib.children)
-                                processed_cells.add(sib)
-                            cell_text, _ = linearize_children(children, config=local_config, no_new_lines=True)
+                            processed_cells.update(cell.siblings)
+                            cell_text, _ = self._linearize_merged_cell(cell, merged_range, local_config, merged_cells)
                         elif cell.row_index == first_row and local_config.table_cell_left_merge_cell_placeholder:
-                            cell_text = local_config.table_cell_left_merge_cell_placeholder
+                            cell_text = word_text(local_config.table_cell_left_merge_cell_placeholder, placeholder_word)
                         elif cell.col_index == first_col and local_config.table_cell_top_merge_cell_placeholder:
-                            cell_text = local_config.table_cell_top_merge_cell_placeholder
+                            cell_text = word_text(local_config.table_cell_top_merge_cell_placeholder, placeholder_word)
                         elif cell.col_index != first_col and cell.row_index != first_row and local_config.table_cell_cross_merge_cell_placeholder:
-                            cell_text = local_config.table_cell_cross_merge_cell_placeholder
+                            cell_text = word_text(
+                                local_config.table_cell_cross_merge_cell_placeholder, placeholder_word
+                            )
                         else:
                             cell_text = ""
                             
@@ -1017,26 +1333,42 @@ class Table(DocumentEntity):
                     else:
                         prefix = local_config.table_cell_header_prefix if local_config.table_cell_header_prefix and cell.is_column_header else local_config.table_cell_prefix
                         
+                    placeholder = word_text(local_config.table_cell_empty_cell_placeholder, placeholder_word)
                     text += (
                         (
-                            prefix +
+                            word_text(prefix, structure_words.get(("cell_prefix", cell.id))) +
                             # Removes trailing whitespace in cell_text
-                            (cell_text.strip() or local_config.table_cell_empty_cell_placeholder) +
-                            (local_config.table_cell_header_suffix if local_config.table_cell_header_suffix and cell.is_column_header else local_config.table_cell_suffix)
+                            (cell_text.strip() or placeholder) +
+                            word_text(
+                                (
+                                    local_config.table_cell_header_suffix
+                                    if local_config.table_cell_header_suffix and cell.is_column_header else
+                                    local_config.table_cell_suffix
+                                ),
+                                structure_words.get(("cell_suffix", cell.id)),
+                            )
                         )
                         if local_config.add_prefixes_and_suffixes_in_text else
-                        (cell_text or local_config.table_cell_empty_cell_placeholder)
+                        (cell_text or placeholder)
                     ) 
                     text += local_config.table_column_separator
                 if text and text[-1] == local_config.table_column_separator:
                     text = text[:-1]
-                text += (local_config.table_row_suffix if local_config.add_prefixes_and_suffixes_in_text else "")
+                text += (
+                    word_text(local_config.table_row_suffix, structure_words.get(("row_suffix", row_index)))
+                    if local_config.add_prefixes_and_suffixes_in_text else
+                    ""
+                )
                 text += local_config.table_row_separator
                 
         if local_config.table_add_title_as_caption and self.title and local_config.table_linearization_format == "html":
             text += "<caption>" + self.title.get_text() + "</caption>"
             
-        text += (local_config.table_suffix if local_config.add_prefixes_and_suffixes_in_text else "")
+        text += (
+            word_text(local_config.table_suffix, structure_words.get(("table_suffix",)))
+            if local_config.add_prefixes_and_suffixes_in_text else
+            ""
+        )
         
         return text, words
 
@@ -1059,6 +1391,19 @@ class Table(DocumentEntity):
         )
 
 
+def _is_tabulate_number(text: str) -> bool:
+    """
+    Whether tabulate parses the text as a number or a boolean, which changes the format and alignment of its column
+    """
+    if text in ("True", "False"):
+        return True
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
 def _get_new_table_cells(rows, filtered_rows):
     """
     Modifies indexing of :class:`TableCell` entities according to the new filtered table format.
@@ -28,6 +28,7 @@ from textractor.data.constants import (
 )
 from textractor.data.constants import TextTypes
 from textractor.utils.text_utils import TextLinearizationConfig, linearize_children
+from textractor.utils.linearization_cache import LinearizationCache
 
 
 class TableCell(DocumentEntity):
@@ -156,6 +157,7 @@ class TableCell(DocumentEntity):
         :type index: int
         """
         self._row_index = index
+        LinearizationCache.invalidate()
 
     @property
     def col_index(self):
@@ -174,6 +176,7 @@ class TableCell(DocumentEntity):
         :type index: int
         """
         self._col_index = index
+        LinearizationCache.invalidate()
 
     @property
     def row_span(self):
@@ -12,6 +12,7 @@ from textractor.entities.bbox import BoundingBox
 from textractor.entities.document_entity import DocumentEntity
 from textractor.entities.word import Word
 from textractor.visualizers.entitylist import EntityList
+from textractor.utils.linearization_cache import LinearizationCache
 
 
 class TableFooter(DocumentEntity):
@@ -49,6 +50,7 @@ class TableFooter(DocumentEntity):
         :type words: list
         """
         self._words = words
+        LinearizationCache.invalidate()
 
     @property
     def text(self) -> str:
@@ -13,6 +13,7 @@ from textractor.entities.document_entity import DocumentEntity
 from textractor.entities.word import Word
 from textractor.utils.text_utils import linearize_children
 from textractor.visualizers.entitylist import EntityList
+from textractor.utils.linearization_cache import LinearizationCache
 
 
 class TableTitle(DocumentEntity):
@@ -50,6 +51,7 @@ class TableTitle(DocumentEntity):
         :type words: list
         """
         self._words = words
+        LinearizationCache.invalidate()
 
     @property
     def text(self) -> str:
@@ -20,6 +20,8 @@ from textractor.visualizers.entitylist import EntityList
 from textractor.data.text_linearization_config import TextLinearizationConfig
 from textractor.utils.text_utils import linearize_children
 from textractor.utils.html_utils import add_id_to_html_tag
+from textractor.utils.linearization_cache import LinearizationCache
+from textractor.utils.offset_utils import word_text
 
 
 class Value(DocumentEntity):
@@ -65,6 +67,7 @@ class Value(DocumentEntity):
         :type words: list
         """
         self._words = sorted(words, key=lambda x: x.bbox.x + x.bbox.y)
+        LinearizationCache.invalidate()
 
     @property
     def key_id(self) -> str:
@@ -105,6 +108,7 @@ class Value(DocumentEntity):
         :type checkbox_present: bool
         """
         self._contains_checkbox = checkbox_present
+        LinearizationCache.invalidate()
 
     @property
     def page(self):
@@ -171,41 +175,36 @@ class Value(DocumentEntity):
                 config=config,
                 no_new_lines=config.remove_new_lines_in_leaf_elements,
             )
-        if config.add_prefixes_and_suffixes_in_text:
-            text = add_id_to_html_tag(config.value_prefix, self.id, config) + text + config.value_suffix
+        # The structure words are created first so that the text records their spans
+        prefix_word = None
+        suffix_word = None
         if config.add_prefixes_and_suffixes_as_words:
-            words = (
-                (
-                    [
-                        Word(
-                            str(uuid.uuid4()),
-                            self.bbox,
-                            add_id_to_html_tag(config.value_prefix, self.id, config),
-                            is_structure=True,
-                            is_clickable=(
-                                bool(words) and words[0] in [config.selection_element_selected, config.selection_element_not_selected]
-                            )
-                        )
-                    ]
-                    if config.value_prefix else
-                    []
-                ) +
-                words +
-                (
-                    [
-                        Word(
-                            str(uuid.uuid4()),
-                            self.bbox,
-                            config.value_suffix,
-                            is_structure=True,
-                            is_clickable=(
-                                bool(words) and words[0] in [config.selection_element_selected, config.selection_element_not_selected]
-                            )
-                        )
-                    ]
-                    if config.value_suffix else
-                    []
+            is_clickable = bool(words) and words[0] in [
+                config.selection_element_selected,
+                config.selection_element_not_selected,
+            ]
+            if config.value_prefix:
+                prefix_word = Word(
+                    str(uuid.uuid4()),
+                    self.bbox,
+                    add_id_to_html_tag(config.value_prefix, self.id, config),
+                    is_structure=True,
+                    is_clickable=is_clickable,
+                )
+            if config.value_suffix:
+                suffix_word = Word(
+                    str(uuid.uuid4()),
+                    self.bbox,
+                    config.value_suffix,
+                    is_structure=True,
+                    is_clickable=is_clickable,
                 )
+            words = ([prefix_word] if prefix_word else []) + words + ([suffix_word] if suffix_word else [])
+        if config.add_prefixes_and_suffixes_in_text:
+            text = (
+                word_text(add_id_to_html_tag(config.value_prefix, self.id, config), prefix_word) +
+                text +
+                word_text(config.value_suffix, suffix_word)
             )
         for w in words:
             w.value_id = str(self.id)
@@ -9,6 +9,8 @@ from textractor.data.text_linearization_config import TextLinearizationConfig
 from textractor.entities.bbox import BoundingBox
 from textractor.entities.document_entity import DocumentEntity
 from textractor.utils.html_utils import escape_text
+from textractor.utils.linearization_cache import LinearizationCache
+from textractor.utils.offset_utils import word_text
 
 class Word(DocumentEntity):
     """
@@ -81,7 +83,10 @@ class Word(DocumentEntity):
         :param text: String containing the text transcription of the Word entity.
         :type text: str
         """
-        self._text = text
+        if text != self._text:
+            # Only an actual change invalidates the cached linearizations
+            self._text = text
+            LinearizationCache.invalidate()
 
     @property
     def text_type(self) -> TextTypes:
@@ -148,7 +153,7 @@ class Word(DocumentEntity):
     def get_text_and_words(
         self, config: TextLinearizationConfig = TextLinearizationConfig()
     ):
-        return escape_text(self.text, config), [self]
+        return word_text(escape_text(self.text, config), self), [self]
 
     def __repr__(self) -> str:
         """
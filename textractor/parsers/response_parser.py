@@ -67,6 +67,7 @@ from textractor.data.constants import (
     LAYOUT_TABLE,
     LAYOUT_KEY_VALUE,
 )
+from textractor.utils.linearization_cache import ChildList
 from textractor.utils.legacy_utils import converter
 from textractor.utils.text_utils import compare_bounding_box
 
@@ -289,7 +290,7 @@ def _create_line_objects(
                 word.line = lines[-1]
                 word.line_id = lines[-1].id
                 word.line_bbox = lines[-1].bbox
-            lines[-1]._children = line_words
+            lines[-1]._children = ChildList(line_words)
             lines[-1].raw_object = line
 
     for line in lines:
@@ -574,7 +575,7 @@ def _create_signature_objects(
                 layout.bbox = BoundingBox.enclosing_bbox(
                     [w.bbox for w in remaining_words]
                 )
-                layout._children = list(set([w.line for w in remaining_words]))
+                layout._children = ChildList(set([w.line for w in remaining_words]))
             else:
                 layouts_to_remove.append(layout)
 
@@ -1319,7 +1320,7 @@ def parse_document_api_response(response: dict) -> Document:
                     label=LAYOUT_ENTITY,
                     reading_order=i,
                 )
-                layout._children = [line]
+                layout._children = ChildList([line])
                 layout.page = page.page_num
                 layout.page_id = page.id
                 layouts.append(layout)
@@ -19,21 +19,43 @@ in one step.
 
 import io
 import os
-import boto3
 import logging
+import time
 import uuid
 from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from typing import List, Union
 from textractcaller import (
     call_textract,
     call_textract_analyzeid,
     call_textract_expense,
+    call_textract_pages,
+    NotificationChannel,
     OutputConfig,
     Query,
     QueriesConfig,
 )
 from textractcaller.t_call import Textract_Call_Mode, Textract_API, get_full_json
+from textractcaller.t_cache import ResponseCache, request_key
+from textractcaller.t_clients import get_client, get_session
+from textractcaller.t_job_store import (
+    JobStore,
+    JobRecord,
+    client_request_token,
+    is_reusable,
+    IN_PROGRESS,
+    SUCCEEDED,
+    EXPIRED,
+)
+from textractcaller.t_poller import JobPoller
+from textractcaller.t_query_shards import (
+    ASYNC_SHARD_TPS,
+    MAX_ASYNC_QUERIES,
+    shard_client_request_token,
+    shard_queries,
+)
+from textractcaller.t_throttling import ThrottledCaller
 from textractor.data.constants import (
     TextractAPI,
     TextractFeatures,
@@ -41,7 +63,7 @@ from textractor.data.constants import (
 from textractor.entities.document import Document
 from textractor.entities.lazy_document import LazyDocument
 from textractor.parsers import response_parser
-from textractor.utils.s3_utils import upload_to_s3, s3_path_to_bucket_and_prefix
+from textractor.utils.s3_utils import upload_to_s3, s3_path_to_bucket_and_prefix, file_source_to_bytes
 from textractor.utils.pdf_utils import rasterize_pdf
 from textractor.exceptions import (
     InputError,
@@ -79,6 +101,17 @@ class Textractor:
     :type profile_name: str, optional
     :param kms_key_id: Customer's AWS KMS key (cryptographic key)
     :type kms_key_id: str, optional
+    :param job_poller: Shared poller the LazyDocument objects returned by the ASYNC methods register with, so that
+                       many concurrent jobs are polled from a single thread within a global Get* rate budget.
+    :type job_poller: JobPoller, optional
+    :param response_cache: Cache of the Textract responses keyed by the content of the document and the request
+                           configuration. Documents already processed with the same configuration are parsed from the
+                           cache without calling Textract.
+    :type response_cache: ResponseCache, optional
+    :param job_store: Durable record of the asynchronous jobs. The jobs are recorded when started and updated when
+                      done, a Start* call for a request already submitted returns the job already started, and
+                      :meth:`resume` returns the jobs in progress after a restart.
+    :type job_store: JobStore, optional
     """
 
     def __init__(
@@ -86,30 +119,39 @@ class Textractor:
         profile_name: str = None,
         region_name: str = None,
         kms_key_id: str = "",
+        job_poller: JobPoller = None,
+        response_cache: ResponseCache = None,
+        job_store: JobStore = None,
     ):
         self.profile_name = profile_name
         self.region_name = region_name
         self.kms_key_id = kms_key_id
+        self.job_poller = job_poller
+        self.response_cache = response_cache
+        self.job_store = job_store
 
+        # Sessions and clients come from the process-wide registry, Textractor objects share their connections
         if self.profile_name is not None:
-            self.session = boto3.session.Session(profile_name=self.profile_name)
+            self.session = get_session(profile_name=self.profile_name)
         elif self.region_name is not None:
-            self.session = boto3.session.Session(region_name=self.region_name)
+            self.session = get_session(region_name=self.region_name)
         elif os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION"):
             # We support both AWS_REGION and AWS_DEFAULT_REGION, with AWS_REGION having precedence.
             self.region_name = os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION")
-            self.session = boto3.session.Session(region_name=self.region_name)
+            self.session = get_session(region_name=self.region_name)
         else:
             raise InputError(
                 "Unable to initiate Textractor. Either profile_name or region requires an input parameter."
             )
-        if self.region_name is not None:
-            self.textract_client = self.session.client(
-                "textract", region_name=self.region_name
-            )
-        else:
-            self.textract_client = self.session.client("textract")
-        self.s3_client = self.session.client("s3")
+        self.textract_client = get_client(
+            "textract", region_name=self.region_name, profile_name=self.profile_name
+        )
+        # The S3 client is in the region of the session, the one of the profile when a profile is given
+        self.s3_client = get_client(
+            "s3",
+            region_name=self.region_name if self.profile_name is None else None,
+            profile_name=self.profile_name,
+        )
 
     def _get_document_images_from_path(self, filepath: str) -> List[Image.Image]:
         """
@@ -218,6 +260,7 @@ class Textractor:
                 call_mode=Textract_Call_Mode.FORCE_SYNC,
                 boto3_textract_client=self.textract_client,
                 job_done_polling_interval=0,
+                response_cache=self.response_cache,
             )
         except Exception as exception:
             if exception.__class__.__name__ == "InvalidS3ObjectException":
@@ -245,6 +288,7 @@ class Textractor:
         client_request_token: str = "",
         job_tag: str = "",
         save_image: bool = True,
+        notification_channel: NotificationChannel = None,
     ) -> LazyDocument:
         """
         Make a call to the ASYNC StartDocumentTextDetection API.
@@ -265,6 +309,10 @@ class Textractor:
         :param save_image: Flag to indicate if document images are to be stored within the Document object. This is optional
                             and necessary only if the customer wants to visualize bounding boxes for their document entities.
         :type save_image: bool
+        :param notification_channel: SNS topic (and role allowing Textract to publish to it) notified when the job completes.
+                                     Give a :class:`JobPoller` with a :class:`NotificationListener` of a queue subscribed
+                                     to the topic to the Textractor to wait for the notification instead of polling.
+        :type notification_channel: NotificationChannel, optional
 
         :return: Lazy-loaded Document object
         :rtype: LazyDocument
@@ -277,45 +325,55 @@ class Textractor:
                 f"file_source needs to be of type str, bytes or PIL Image, not {type(file_source)}"
             )
 
-        # If the file is not already in S3
-        if not isinstance(file_source, str) or not file_source.startswith("s3://"):
-            # Check if the user has given us a bucket to upload to
-            if not s3_upload_path:
-                raise InputError(
-                    "For files not in S3, an S3 upload path must be provided"
-                )
-
-            s3_file_path = os.path.join(s3_upload_path, str(uuid.uuid4()))
-            upload_to_s3(self.s3_client, s3_file_path, file_source)
-            file_source = s3_file_path
-
         output_config = None
         if s3_output_path:
             s3_bucket, s3_prefix = s3_path_to_bucket_and_prefix(s3_output_path)
             output_config = OutputConfig(s3_bucket=s3_bucket, s3_prefix=s3_prefix)
 
-        try:
-            response = call_textract(
-                input_document=file_source,
-                features=[],
-                queries_config=None,  # not supported yet
-                output_config=output_config,
-                kms_key_id=self.kms_key_id,
-                job_tag=job_tag,
-                notification_channel=None,  # not supported yet
-                client_request_token=client_request_token,
-                return_job_id=True,
-                force_async_api=True,
-                call_mode=Textract_Call_Mode.FORCE_ASYNC,
-                boto3_textract_client=self.textract_client,
-                job_done_polling_interval=1,
-            )
-        except Exception as exception:
-            if exception.__class__.__name__ == "InvalidS3ObjectException":
-                raise InvalidS3ObjectException(
-                    "Textract returned InvalidS3ObjectException. Ensure that the s3 path is correct and that both the Textract API and the bucket are in the same region."
+        key, cached_response = self._lookup_request(
+            "start_document_text_detection", file_source
+        )
+        job_id = None if cached_response is not None else self._find_job(key, s3_output_path)
+        if cached_response is None and job_id is None:
+            client_request_token = client_request_token or self._client_request_token(key, s3_output_path)
+            # If the file is not already in S3
+            if not isinstance(file_source, str) or not file_source.startswith("s3://"):
+                # Check if the user has given us a bucket to upload to
+                if not s3_upload_path:
+                    raise InputError(
+                        "For files not in S3, an S3 upload path must be provided"
+                    )
+
+                s3_file_path = os.path.join(s3_upload_path, str(uuid.uuid4()))
+                upload_to_s3(self.s3_client, s3_file_path, file_source)
+                file_source = s3_file_path
+
+            try:
+                response = call_textract(
+                    input_document=file_source,
+                    features=[],
+                    queries_config=None,  # not supported yet
+                    output_config=output_config,
+                    kms_key_id=self.kms_key_id,
+                    job_tag=job_tag,
+                    notification_channel=notification_channel,
+                    client_request_token=client_request_token,
+                    return_job_id=True,
+                    force_async_api=True,
+                    call_mode=Textract_Call_Mode.FORCE_ASYNC,
+                    boto3_textract_client=self.textract_client,
+                    job_done_polling_interval=1,
                 )
-            raise exception
+            except Exception as exception:
+                if exception.__class__.__name__ == "InvalidS3ObjectException":
+                    raise InvalidS3ObjectException(
+                        "Textract returned InvalidS3ObjectException. Ensure that the s3 path is correct and that both the Textract API and the bucket are in the same region."
+                    )
+                raise exception
+            job_id = response["JobId"]
+            self._record_job(
+                job_id, Textract_API.DETECT, key, file_source, [], s3_output_path, client_request_token
+            )
 
         images = None
         if save_image:
@@ -331,11 +389,16 @@ class Textractor:
                 images = self._get_document_images_from_path(original_file_source)
 
         return LazyDocument(
-            response["JobId"],
+            job_id,
             TextractAPI.DETECT_TEXT,
             textract_client=self.textract_client,
             s3_client=self.s3_client,
             images=images,
+            job_poller=self.job_poller,
+            response=cached_response,
+            response_cache=self.response_cache,
+            cache_key=key,
+            job_store=self.job_store,
         )
 
     def analyze_document(
@@ -344,37 +407,46 @@ class Textractor:
         features,
         queries: Union[QueriesConfig, List[Query], List[str]] = None,
         save_image: bool = True,
+        fan_out: bool = False,
+        fan_out_tps: float = 5,
     ) -> Document:
         """
         Make a call to the SYNC AnalyzeDocument API, implicitly parses the response and produces a :class:`Document` object.
-        This function is ideal for single page PDFs or single images.
+        This function is ideal for single page PDFs or single images. With fan_out, multi-page PDFs and lists of
+        images are split into pages that are analyzed concurrently with the SYNC API, which is much faster than an
+        asynchronous job for short documents (up to about 20 pages).
 
         :param file_source: Path to a file stored locally, on an S3 bucket or PIL Image
         :type file_source: str or PIL.Image, required
         :param features: List of TextractFeatures to be extracted from the Document by the TextractAPI
         :type features: list, required
-        :param queries: Queries to run on the document
+        :param queries: Queries to run on the document, more than MAX_SYNC_QUERIES (15) are split across concurrent calls
         :type queries: Union[QueriesConfig, List[Query], List[str]]
         :param save_image: Flag to indicate if document images are to be stored within the Document object. This is optional
                             and necessary only if the customer wants to visualize bounding boxes for their document entities.
         :type save_image: bool
+        :param fan_out: Flag to analyze each page of a multi-page input with its own AnalyzeDocument call, the
+                        responses are merged into a single multi-page Document.
+        :type fan_out: bool
+        :param fan_out_tps: AnalyzeDocument calls per second of the fan out, the quota of the account
+        :type fan_out_tps: float
 
         :return: Returns a Document object containing all the entities, relationships and metadata extracted by the Textract
                  AnalyzeDocument API stored within it.
         :rtype: Document
         """
-        if isinstance(file_source, list) and len(file_source) > 1:
+        if isinstance(file_source, list) and len(file_source) > 1 and not fan_out:
             raise IncorrectMethodException(
                 "List contains more than 1 image. Call start_document_analysis() instead."
             )
 
         elif isinstance(file_source, str):
             logger.debug("Filepath given.")
-            if not save_image and file_source.lower().endswith(".pdf"):
+            if not save_image and not fan_out and file_source.lower().endswith(".pdf"):
                 images = []
             else:
                 images = self._get_document_images_from_path(file_source)
-                if len(images) > 1:
+                if len(images) > 1 and not fan_out:
                     raise IncorrectMethodException(
                         "Input contains more than 1 page. Call start_document_analysis() instead."
                     )
@@ -418,21 +490,31 @@ class Textractor:
                 )
 
         try:
-            response = call_textract(
-                input_document=file_source,
-                features=features,
-                queries_config=queries,  # not supported yet
-                output_config=None,
-                kms_key_id=self.kms_key_id,
-                job_tag="",
-                notification_channel=None,  # not supported yet
-                client_request_token="",
-                return_job_id=False,
-                force_async_api=False,
-                call_mode=Textract_Call_Mode.FORCE_SYNC,
-                boto3_textract_client=self.textract_client,
-                job_done_polling_interval=0,
-            )
+            if fan_out and len(images) > 1:
+                response = call_textract_pages(
+                    [_image_to_byte_array(image) for image in images],
+                    features=features,
+                    queries_config=queries,
+                    boto3_textract_client=self.textract_client,
+                    tps=fan_out_tps,
+                )
+            else:
+                response = call_textract(
+                    input_document=file_source,
+                    features=features,
+                    queries_config=queries,  # not supported yet
+                    output_config=None,
+                    kms_key_id=self.kms_key_id,
+                    job_tag="",
+                    notification_channel=None,  # not supported yet
+                    client_request_token="",
+                    return_job_id=False,
+                    force_async_api=False,
+                    call_mode=Textract_Call_Mode.FORCE_SYNC,
+                    boto3_textract_client=self.textract_client,
+                    job_done_polling_interval=0,
+                    response_cache=self.response_cache,
+                )
         except Exception as exception:
             if exception.__class__.__name__ == "InvalidS3ObjectException":
                 raise InvalidS3ObjectException(
@@ -461,6 +543,7 @@ class Textractor:
         client_request_token: str = "",
         job_tag: str = "",
         save_image: bool = True,
+        notification_channel: NotificationChannel = None,
     ) -> LazyDocument:
         """
         Make a call to the ASYNC StartDocumentAnalysis API, implicitly parses the response and produces a :class:`Document` object.
@@ -475,6 +558,9 @@ class Textractor:
         :param s3_upload_path: If given, will automatically upload the document to the given S3 prefix before calling Textract. Files are uploaded
                                under a uuid. If not given the data is expected to be already in s3
         :type s3_upload_path: str, optional
+        :param queries: Queries to run on the document, more than MAX_ASYNC_QUERIES (30) are split across parallel jobs
+                        whose queries are merged into the returned document
+        :type queries: Union[QueriesConfig, List[Query], List[str]]
         :param client_request_token: The idempotent token that's used to identify the start request. If you use the same. token
                                     with multiple StartDocumentTextDetection requests, the same. JobId is returned. Use ClientRequestToken
                                     to prevent the same. job from being accidentally started more than once.
@@ -484,6 +570,10 @@ class Textractor:
         :param save_image: Flag to indicate if document images are to be stored within the Document object. This is optional
                             and necessary only if the customer wants to visualize bounding boxes for their document entities.
         :type save_image: bool
+        :param notification_channel: SNS topic (and role allowing Textract to publish to it) notified when the job completes.
+                                     Give a :class:`JobPoller` with a :class:`NotificationListener` of a queue subscribed
+                                     to the topic to the Textractor to wait for the notification instead of polling.
+        :type notification_channel: NotificationChannel, optional
 
         :return: Returns a Document object containing all the entities, relationships and metadata extracted by the Textract
                  StartDocumentAnalysis API stored within it.
@@ -497,18 +587,6 @@ class Textractor:
                 f"file_source needs to be of type str, bytes or PIL Image, not {type(file_source)}"
             )
 
-        # If the file is not already in S3
-        if not isinstance(file_source, str) or not file_source.startswith("s3://"):
-            # Check if the user has given us a bucket to upload to
-            if not s3_upload_path:
-                raise InputError(
-                    f"For files not in S3, an S3 upload path must be provided"
-                )
-
-            s3_file_path = os.path.join(s3_upload_path, str(uuid.uuid4()))
-            upload_to_s3(self.s3_client, s3_file_path, file_source)
-            file_source = s3_file_path
-
         output_config = None
         if s3_output_path:
             s3_bucket, s3_prefix = s3_path_to_bucket_and_prefix(s3_output_path)
@@ -538,28 +616,83 @@ class Textractor:
                     f"Queries must be of type QueriesConfig, List[Query] or List[str], not {type(queries)}"
                 )
 
-        try:
-            response = call_textract(
-                input_document=file_source,
-                features=features,
-                queries_config=queries,  # not supported yet
-                output_config=output_config,
-                kms_key_id=self.kms_key_id,
-                job_tag=job_tag,
-                notification_channel=None,  # not supported yet
-                client_request_token=client_request_token,
-                return_job_id=True,
-                force_async_api=True,
-                call_mode=Textract_Call_Mode.FORCE_ASYNC,
-                boto3_textract_client=self.textract_client,
-                job_done_polling_interval=1,
-            )
-        except Exception as exception:
-            if exception.__class__.__name__ == "InvalidS3ObjectException":
-                raise InvalidS3ObjectException(
-                    "Textract returned InvalidS3ObjectException. Ensure that the s3 path is correct and that both the Textract API and the bucket are in the same region."
+        key, cached_response = self._lookup_request(
+            "start_document_analysis", file_source, features, queries
+        )
+        # Textract takes MAX_ASYNC_QUERIES queries per job, more queries are split across parallel jobs. Only the first
+        # job runs the other features.
+        query_shards = [queries]
+        if queries and len(queries.queries) > MAX_ASYNC_QUERIES:
+            query_shards = [QueriesConfig(shard) for shard in shard_queries(queries.queries, MAX_ASYNC_QUERIES)]
+            logger.info(f"Splitting {len(queries.queries)} queries across {len(query_shards)} jobs.")
+        shard_features = [features] + [[TextractFeatures.QUERIES]] * (len(query_shards) - 1)
+        shard_keys = [key]
+        if len(query_shards) > 1:
+            shard_keys = [None if key is None else f"{key}:{index}" for index in range(len(query_shards))]
+
+        job_ids = [None] * len(query_shards)
+        if cached_response is None:
+            job_ids = [self._find_job(shard_key, s3_output_path) for shard_key in shard_keys]
+        if cached_response is None and None in job_ids:
+            # If the file is not already in S3
+            if not isinstance(file_source, str) or not file_source.startswith("s3://"):
+                # Check if the user has given us a bucket to upload to
+                if not s3_upload_path:
+                    raise InputError(
+                        f"For files not in S3, an S3 upload path must be provided"
+                    )
+
+                s3_file_path = os.path.join(s3_upload_path, str(uuid.uuid4()))
+                upload_to_s3(self.s3_client, s3_file_path, file_source)
+                file_source = s3_file_path
+
+            # The jobs of the shards are started concurrently within the Start* budget of the shards
+            missing = [index for index, job_id in enumerate(job_ids) if job_id is None]
+            textract_client = self.textract_client
+            if len(missing) > 1:
+                textract_client = ThrottledCaller(self.textract_client, ASYNC_SHARD_TPS)
+
+            def submit(index: int) -> str:
+                token = client_request_token
+                if token and len(query_shards) > 1:
+                    token = shard_client_request_token(token, index)
+                token = token or self._client_request_token(shard_keys[index], s3_output_path)
+                try:
+                    response = call_textract(
+                        input_document=file_source,
+                        features=shard_features[index],
+                        queries_config=query_shards[index],
+                        output_config=output_config,
+                        kms_key_id=self.kms_key_id,
+                        job_tag=job_tag,
+                        notification_channel=notification_channel,
+                        client_request_token=token,
+                        return_job_id=True,
+                        force_async_api=True,
+                        call_mode=Textract_Call_Mode.FORCE_ASYNC,
+                        boto3_textract_client=textract_client,
+                        job_done_polling_interval=1,
+                    )
+                except Exception as exception:
+                    if exception.__class__.__name__ == "InvalidS3ObjectException":
+                        raise InvalidS3ObjectException(
+                            "Textract returned InvalidS3ObjectException. Ensure that the s3 path is correct and that both the Textract API and the bucket are in the same region."
+                        )
+                    raise exception
+                self._record_job(
+                    response["JobId"],
+                    Textract_API.ANALYZE,
+                    shard_keys[index],
+                    file_source,
+                    shard_features[index],
+                    s3_output_path,
+                    token,
                 )
-            raise exception
+                return response["JobId"]
+
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                for index, job_id in zip(missing, executor.map(submit, missing)):
+                    job_ids[index] = job_id
 
         images = None
         if save_image:
@@ -575,12 +708,30 @@ class Textractor:
                 images = self._get_document_images_from_path(original_file_source)
 
         return LazyDocument(
-            response["JobId"],
+            job_ids[0],
             TextractAPI.ANALYZE,
             textract_client=self.textract_client,
             s3_client=self.s3_client,
             images=images,
             output_config=output_config,
+            job_poller=self.job_poller,
+            response=cached_response,
+            response_cache=self.response_cache,
+            cache_key=key,
+            job_store=self.job_store,
+            query_shards=[
+                LazyDocument(
+                    job_id,
+                    TextractAPI.ANALYZE,
+                    textract_client=self.textract_client,
+                    s3_client=self.s3_client,
+                    output_config=output_config,
+                    job_poller=self.job_poller,
+                    job_store=self.job_store,
+                )
+                for job_id in job_ids[1:]
+                if job_id is not None
+            ],
         )
 
     def analyze_id(
@@ -698,6 +849,7 @@ class Textractor:
                 force_async_api=False,
                 boto3_textract_client=self.textract_client,
                 job_done_polling_interval=0,
+                response_cache=self.response_cache,
             )
         except Exception as exception:
             if exception.__class__.__name__ == "InvalidS3ObjectException":
@@ -721,6 +873,7 @@ class Textractor:
         client_request_token: str = "",
         job_tag: str = "",
         save_image: bool = True,
+        notification_channel: NotificationChannel = None,
     ) -> LazyDocument:
         """Make a call to the ASYNC StartExpenseAnalysis API, implicitly parses the response and produces a :class:`Document` object.
         This function is ideal for multipage PDFs or an image.
@@ -741,6 +894,10 @@ class Textractor:
         :param save_image: Flag to indicate if document images are to be stored within the Document object. This is optional
                             and necessary only if the customer wants to visualize bounding boxes for their document entities.
         :type save_image: bool
+        :param notification_channel: SNS topic (and role allowing Textract to publish to it) notified when the job completes.
+                                     Give a :class:`JobPoller` with a :class:`NotificationListener` of a queue subscribed
+                                     to the topic to the Textractor to wait for the notification instead of polling.
+        :type notification_channel: NotificationChannel, optional
         :raises InputError: Raised when the file source type is invalid
         :raises InvalidS3ObjectException: Raised when the file source region is different the API region.
         :raises exception: Raised if the Textract API call fails
@@ -755,42 +912,52 @@ class Textractor:
                 f"file_source needs to be of type str, bytes or PIL Image, not {type(file_source)}"
             )
 
-        # If the file is not already in S3
-        if not isinstance(file_source, str) or not file_source.startswith("s3://"):
-            # Check if the user has given us a bucket to upload to
-            if not s3_upload_path:
-                raise InputError(
-                    f"For files not in S3, an S3 upload path must be provided"
-                )
-
-            s3_file_path = os.path.join(s3_upload_path, str(uuid.uuid4()))
-            upload_to_s3(self.s3_client, s3_file_path, file_source)
-            file_source = s3_file_path
-
         output_config = None
         if s3_output_path:
             s3_bucket, s3_prefix = s3_path_to_bucket_and_prefix(s3_output_path)
             output_config = OutputConfig(s3_bucket=s3_bucket, s3_prefix=s3_prefix)
 
-        try:
-            response = call_textract_expense(
-                input_document=file_source,
-                output_config=output_config,
-                kms_key_id=self.kms_key_id,
-                job_tag=job_tag,
-                notification_channel=None,  # not supported yet
-                client_request_token=client_request_token,
-                return_job_id=True,
-                force_async_api=True,
-                boto3_textract_client=self.textract_client,
-                job_done_polling_interval=1,
-            )
-        except Exception as exception:
-            if exception.__class__.__name__ == "InvalidS3ObjectException":
-                raise InvalidS3ObjectException(
-                    "Textract returned InvalidS3ObjectException. Ensure that the s3 path is correct and that both the Textract API and the bucket are in the same region."
+        key, cached_response = self._lookup_request(
+            "start_expense_analysis", file_source
+        )
+        job_id = None if cached_response is not None else self._find_job(key, s3_output_path)
+        if cached_response is None and job_id is None:
+            client_request_token = client_request_token or self._client_request_token(key, s3_output_path)
+            # If the file is not already in S3
+            if not isinstance(file_source, str) or not file_source.startswith("s3://"):
+                # Check if the user has given us a bucket to upload to
+                if not s3_upload_path:
+                    raise InputError(
+                        f"For files not in S3, an S3 upload path must be provided"
+                    )
+
+                s3_file_path = os.path.join(s3_upload_path, str(uuid.uuid4()))
+                upload_to_s3(self.s3_client, s3_file_path, file_source)
+                file_source = s3_file_path
+
+            try:
+                response = call_textract_expense(
+                    input_document=file_source,
+                    output_config=output_config,
+                    kms_key_id=self.kms_key_id,
+                    job_tag=job_tag,
+                    notification_channel=notification_channel,
+                    client_request_token=client_request_token,
+                    return_job_id=True,
+                    force_async_api=True,
+                    boto3_textract_client=self.textract_client,
+                    job_done_polling_interval=1,
                 )
-            raise exception
+            except Exception as exception:
+                if exception.__class__.__name__ == "InvalidS3ObjectException":
+                    raise InvalidS3ObjectException(
+                        "Textract returned InvalidS3ObjectException. Ensure that the s3 path is correct and that both the Textract API and the bucket are in the same region."
+                    )
+                raise exception
+            job_id = response["JobId"]
+            self._record_job(
+                job_id, Textract_API.EXPENSE, key, file_source, [], s3_output_path, client_request_token
+            )
 
         images = None
         if save_image:
@@ -806,13 +973,140 @@ class Textractor:
                 images = self._get_document_images_from_path(original_file_source)
 
         return LazyDocument(
-            response["JobId"],
+            job_id,
             TextractAPI.EXPENSE,
             textract_client=self.textract_client,
             s3_client=self.s3_client,
             images=images,
+            job_poller=self.job_poller,
+            response=cached_response,
+            response_cache=self.response_cache,
+            cache_key=key,
+            job_store=self.job_store,
+        )
+
+    def _lookup_request(
+        self, api: str, file_source, features: list = None, queries: QueriesConfig = None
+    ):
+        """
+        Computes the request key of an asynchronous call and looks its response up in the response cache, before the
+        document is uploaded.
+
+        :param api: Name of the Textract operation
+        :type api: str
+        :param file_source: S3 path, local path, bytes or PIL Image of the document
+        :type file_source: Union[str, bytes, Image.Image]
+        :param features: Features of the request
+        :type features: list, optional
+        :param queries: Queries of the request
+        :type queries: QueriesConfig, optional
+        :return: Request key (None without response cache and job store) and cached response (None on a miss)
+        :rtype: Tuple[str, dict]
+        """
+        if self.response_cache is None and self.job_store is None:
+            return None, None
+        if isinstance(file_source, str) and file_source.startswith("s3://"):
+            s3_bucket, s3_prefix = s3_path_to_bucket_and_prefix(file_source)
+            params = {"DocumentLocation": {"S3Object": {"Bucket": s3_bucket, "Name": s3_prefix}}}
+        else:
+            params = {"Document": {"Bytes": file_source_to_bytes(file_source)}}
+        if features:
+            params["FeatureTypes"] = [feature.name for feature in features]
+        if queries:
+            params["QueriesConfig"] = queries.get_dict()
+        key = request_key(api, params, self.s3_client)
+        if self.response_cache is None:
+            return key, None
+        return key, self.response_cache.get(key)
+
+    def _find_job(self, key: str, s3_output_path: str) -> str:
+        """
+        Returns the id of a job of the job store for the same request that is still in progress, or that succeeded
+        and whose results are still kept by Textract, None when there is none. Succeeded jobs past the retention
+        period are recorded as expired.
+        """
+        if self.job_store is None or key is None:
+            return None
+        now = time.time()
+        for record in reversed(self.job_store.find(key)):
+            if record.output_location != s3_output_path:
+                continue
+            if is_reusable(record, now):
+                logger.info(f"Reusing job {record.job_id} of the job store.")
+                return record.job_id
+            if record.status == SUCCEEDED:
+                self.job_store.update_status(record.job_id, EXPIRED)
+        return None
+
+    def _client_request_token(self, key: str, s3_output_path: str) -> str:
+        """
+        Returns the ClientRequestToken of a new job of a request, so that a job started by a process that died before
+        recording it is returned by Textract instead of being started again.
+        """
+        if self.job_store is None or key is None:
+            return ""
+        # Textract returns the job of a token already used, the token changes with each job that cannot be reused
+        attempt = sum(not is_reusable(record) for record in self.job_store.find(key))
+        return client_request_token(key, s3_output_path, attempt)
+
+    def _record_job(
+        self, job_id: str, api: Textract_API, key: str, file_source: str, features: list, s3_output_path: str, token: str
+    ):
+        """
+        Records a new job in the job store.
+        """
+        if self.job_store is None or key is None:
+            return
+        self.job_store.put(
+            JobRecord(
+                job_id=job_id,
+                textract_api=api.name,
+                request_key=key,
+                input_document=file_source,
+                features=[feature.name for feature in features or []],
+                output_location=s3_output_path,
+                client_request_token=token,
+            )
         )
 
+    def resume(self, save_image: bool = False) -> List[LazyDocument]:
+        """
+        Returns a :class:`LazyDocument` for every job of the job store still in progress, to wait for the jobs started
+        before a restart of the process. The documents register with the job poller of the Textractor, if any.
+
+        :param save_image: Flag to indicate if document images are to be stored within the Document objects, the
+                           images are read from the S3 location of the documents.
+        :type save_image: bool
+        :return: Lazy-loaded Document objects of the jobs in progress
+        :rtype: List[LazyDocument]
+        """
+        if self.job_store is None:
+            raise InputError("resume() requires a job_store.")
+        documents = []
+        for record in self.job_store.list(IN_PROGRESS):
+            output_config = None
+            if record.output_location:
+                s3_bucket, s3_prefix = s3_path_to_bucket_and_prefix(record.output_location)
+                output_config = OutputConfig(s3_bucket=s3_bucket, s3_prefix=s3_prefix)
+            images = None
+            if save_image and record.input_document:
+                images = self._get_document_images_from_path(record.input_document)
+            documents.append(
+                LazyDocument(
+                    record.job_id,
+                    TextractAPI.Textract_API_to_TextractAPI(Textract_API[record.textract_api]),
+                    textract_client=self.textract_client,
+                    s3_client=self.s3_client,
+                    images=images,
+                    output_config=output_config,
+                    job_poller=self.job_poller,
+                    response_cache=self.response_cache,
+                    cache_key=record.request_key,
+                    job_store=self.job_store,
+                )
+            )
+        return documents
+
     def get_result(
         self, job_id: str, api: Union[TextractAPI, Textract_API]
     ) -> Document:
@@ -0,0 +1,198 @@
+"""
+Conversion of :class:`Document` entities to Apache Arrow record batches and streaming Parquet export. Each page is
+converted to one record batch so that memory usage is bounded by the size of a page, the resulting batches can be
+handed directly to DuckDB, Polars or Spark.
+
+pyarrow is an optional dependency, install it with `pip install amazon-textract-textractor[arrow]`.
+"""
+
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from textractor.data.constants import IS_MERGED_CELL
+from textractor.exceptions import InputError, MissingDependencyException
+
+
+def _bbox_columns() -> List[Tuple[str, str, Callable]]:
+    return [
+        ("x", "float64", lambda e: e.bbox.x if e.bbox is not None else None),
+        ("y", "float64", lambda e: e.bbox.y if e.bbox is not None else None),
+        ("width", "float64", lambda e: e.bbox.width if e.bbox is not None else None),
+        ("height", "float64", lambda e: e.bbox.height if e.bbox is not None else None),
+    ]
+
+
+def _key_value_value(kv) -> str:
+    if kv.value is None:
+        return None
+    if kv.contains_checkbox:
+        return kv.value.children[0].status.name if kv.value.children else None
+    return kv.value.get_text()
+
+
+def _query_answer(query, attribute: str):
+    return getattr(query.result, attribute) if query.result is not None else None
+
+
+# Column name, arrow type name and getter for each exportable entity. The id, page number and page id columns are
+# common to all entities and added by iter_record_batches.
+_ENTITY_COLUMNS = {
+    "words": [
+        ("text", "string", lambda w: w.text),
+        ("text_type", "string", lambda w: w.text_type.name if w.text_type else None),
+        ("confidence", "float64", lambda w: w.confidence),
+        ("line_id", "string", lambda w: w.line.id if w.line is not None else None),
+        ("cell_id", "string", lambda w: w.cell_id),
+    ]
+    + _bbox_columns(),
+    "lines": [
+        ("text", "string", lambda l: l.text),
+        ("confidence", "float64", lambda l: l.confidence),
+        ("word_count", "int32", lambda l: len(l.words)),
+    ]
+    + _bbox_columns(),
+    "key_values": [
+        ("key", "string", lambda kv: " ".join(w.text for w in kv.key)),
+        ("value", "string", _key_value_value),
+        ("value_id", "string", lambda kv: kv.value.id if kv.value is not None else None),
+        ("contains_checkbox", "bool_", lambda kv: kv.contains_checkbox),
+        ("confidence", "float64", lambda kv: kv.confidence),
+    ]
+    + _bbox_columns(),
+    "cells": [
+        ("text", "string", lambda c: c.text),
+        ("table_id", "string", lambda c: c.table_id),
+        ("parent_cell_id", "string", lambda c: c.parent_cell_id),
+        ("row_index", "int32", lambda c: c.row_index),
+        ("col_index", "int32", lambda c: c.col_index),
+        ("row_span", "int32", lambda c: c.row_span),
+        ("col_span", "int32", lambda c: c.col_span),
+        ("is_column_header", "bool_", lambda c: bool(c.is_column_header)),
+        ("is_merged", "bool_", lambda c: bool(c.metadata.get(IS_MERGED_CELL, False))),
+        ("confidence", "float64", lambda c: c.confidence),
+    ]
+    + _bbox_columns(),
+    "queries": [
+        ("query", "string", lambda q: q.query),
+        ("alias", "string", lambda q: q.alias),
+        ("answer", "string", lambda q: _query_answer(q, "answer")),
+        ("result_id", "string", lambda q: _query_answer(q, "id")),
+        ("confidence", "float64", lambda q: _query_answer(q, "confidence")),
+    ]
+    + _bbox_columns(),
+}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise MissingDependencyException(
+            "pyarrow is required for Arrow and Parquet export. Please install it with `pip install amazon-textract-textractor[arrow]`."
+        )
+    return pyarrow
+
+
+def _check_entity(entity: str):
+    if entity not in _ENTITY_COLUMNS:
+        raise InputError(
+            f"entity should be one of {', '.join(_ENTITY_COLUMNS)}, got {entity}"
+        )
+
+
+def _page_entities(page, entity: str) -> Iterable:
+    if entity == "words":
+        return page.words
+    elif entity == "lines":
+        return page.lines
+    elif entity == "key_values":
+        return list(page.key_values) + list(page.checkboxes)
+    elif entity == "cells":
+        return [cell for table in page.tables for cell in table.table_cells]
+    else:
+        return page.queries
+
+
+def arrow_schema(entity: str = "words", document_index: bool = False):
+    """
+    Returns the Arrow schema of the record batches produced for entity.
+
+    :param entity: One of words, lines, key_values, cells or queries
+    :type entity: str
+    :param document_index: Prepend a document_index column, as done by :func:`write_parquet`
+    :type document_index: bool
+
+    :return: Arrow schema
+    :rtype: pyarrow.Schema
+    """
+    pa = _import_pyarrow()
+    _check_entity(entity)
+    fields = [("document_index", pa.int32())] if document_index else []
+    fields += [("id", pa.string()), ("page", pa.int32()), ("page_id", pa.string())]
+    fields += [(name, getattr(pa, type_name)()) for name, type_name, _ in _ENTITY_COLUMNS[entity]]
+    return pa.schema(fields)
+
+
+def iter_record_batches(document, entity: str = "words", document_index: int = None) -> Iterator:
+    """
+    Yields one Arrow record batch per page of document, pages without any entity of the requested type are skipped.
+
+    :param document: Document to convert
+    :type document: Document
+    :param entity: One of words, lines, key_values, cells or queries
+    :type entity: str
+    :param document_index: If set, a document_index column holding this value is prepended to each batch
+    :type document_index: int
+
+    :return: Iterator of record batches
+    :rtype: Iterator[pyarrow.RecordBatch]
+    """
+    pa = _import_pyarrow()
+    schema = arrow_schema(entity, document_index=document_index is not None)
+    columns = _ENTITY_COLUMNS[entity]
+    for page in document.pages:
+        entities = _page_entities(page, entity)
+        if not entities:
+            continue
+        data = [
+            [e.id for e in entities],
+            [page.page_num] * len(entities),
+            [page.id] * len(entities),
+        ]
+        data += [[getter(e) for e in entities] for _, _, getter in columns]
+        if document_index is not None:
+            data.insert(0, [document_index] * len(entities))
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(data, schema)],
+            schema=schema,
+        )
+
+
+def write_parquet(documents: Iterable, path: str, entity: str = "words") -> int:
+    """
+    Streams the entities of documents to a single Parquet file, one record batch per page. The input is consumed
+    lazily, a generator of Documents can be used to export a corpus with bounded memory, for example:
+    :code:`write_parquet((Document.open(p) for p in paths), "words.parquet")`
+
+    A document_index column holding the position of the document in the input is prepended to the schema
+    returned by :func:`arrow_schema`.
+
+    :param documents: Iterable of Document objects
+    :type documents: Iterable[Document]
+    :param path: Path of the Parquet file to write
+    :type path: str
+    :param entity: One of words, lines, key_values, cells or queries
+    :type entity: str
+
+    :return: Number of rows written
+    :rtype: int
+    """
+    _import_pyarrow()
+    import pyarrow.parquet as pq
+
+    row_count = 0
+    with pq.ParquetWriter(path, arrow_schema(entity, document_index=True)) as writer:
+        for i, document in enumerate(documents):
+            for batch in iter_record_batches(document, entity, document_index=i):
+                writer.write_batch(batch)
+                row_count += batch.num_rows
+    return row_count
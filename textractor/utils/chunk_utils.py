@@ -0,0 +1,166 @@
+"""
+Chunking of the linearized text of a document for LLM and RAG ingestion. The document is linearized one page at a time
+and chunks are yielded lazily, the full text of the document is never built.
+"""
+
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List
+
+from textractor.data.text_linearization_config import TextLinearizationConfig
+from textractor.entities.bbox import BoundingBox
+from textractor.exceptions import InputError
+from textractor.utils.linearization_cache import LinearizationCache
+
+CHUNK_BOUNDARIES = ("layout", "paragraph", "page")
+
+
+@dataclass
+class TextChunk:
+    """
+    A chunk of linearized text along with its provenance in the document.
+    """
+
+    text: str  #: Linearized text of the chunk
+
+    pages: List[int] = field(default_factory=list)  #: Page numbers the chunk text comes from
+
+    layout_ids: List[str] = field(default_factory=list)  #: IDs of the layouts the chunk text comes from
+
+    bbox: BoundingBox = None  #: Bounding box enclosing the source layouts, in normalized page coordinates
+
+
+@dataclass
+class _ChunkUnit:
+    text: str
+    page: int
+    layout_ids: List[str]
+    bbox: BoundingBox
+    separator: str  # Separator inserted before the unit when it follows another unit
+
+
+def _iter_units(pages: Iterable, config: TextLinearizationConfig, boundary: str) -> Iterator[_ChunkUnit]:
+    for page in pages:
+        # The cache is bypassed so that the text of the pages already processed is not retained
+        with LinearizationCache.disabled():
+            layout_texts = [
+                (layout, layout.get_text_and_words(config)[0])
+                for layout in page.layouts_in_reading_order(config)
+            ]
+        layout_texts = [(layout, text) for layout, text in layout_texts if text.strip()]
+        if not layout_texts:
+            continue
+
+        if boundary == "page":
+            yield _ChunkUnit(
+                config.layout_element_separator.join(text for _, text in layout_texts),
+                page.page_num,
+                [layout.id for layout, _ in layout_texts],
+                BoundingBox.enclosing_bbox([layout.bbox for layout, _ in layout_texts]),
+                config.layout_element_separator,
+            )
+            continue
+
+        for layout, text in layout_texts:
+            if boundary == "layout":
+                yield _ChunkUnit(text, page.page_num, [layout.id], layout.bbox, config.layout_element_separator)
+                continue
+            separator = config.layout_element_separator
+            for paragraph in text.split(config.same_layout_element_separator):
+                if not paragraph.strip():
+                    continue
+                yield _ChunkUnit(paragraph, page.page_num, [layout.id], layout.bbox, separator)
+                separator = config.same_layout_element_separator
+
+
+def _make_chunk(text: str, units: List[_ChunkUnit]) -> TextChunk:
+    pages = []
+    layout_ids = []
+    for unit in units:
+        if unit.page not in pages:
+            pages.append(unit.page)
+        for layout_id in unit.layout_ids:
+            if layout_id not in layout_ids:
+                layout_ids.append(layout_id)
+    bboxes = [unit.bbox for unit in units if unit.bbox is not None]
+    return TextChunk(
+        text=text,
+        pages=pages,
+        layout_ids=layout_ids,
+        bbox=BoundingBox.enclosing_bbox(bboxes) if bboxes else None,
+    )
+
+
+def _join_units(units: List[_ChunkUnit]) -> str:
+    return "".join(
+        (unit.separator if i else "") + unit.text for i, unit in enumerate(units)
+    )
+
+
+def iter_chunks(
+    pages: Iterable,
+    config: TextLinearizationConfig = TextLinearizationConfig(),
+    max_chars: int = 2000,
+    overlap: int = 0,
+    boundary: str = "layout",
+) -> Iterator[TextChunk]:
+    """
+    Lazily yields chunks of linearized text in reading order. Chunks are made of whole boundary units (layouts,
+    paragraphs or pages) packed up to max_chars characters, a unit longer than max_chars is split into windows of
+    max_chars characters.
+
+    :param pages: Pages to chunk, in order
+    :type pages: Iterable[Page]
+    :param config: Text linearization configuration object
+    :type config: TextLinearizationConfig
+    :param max_chars: Maximum number of characters of a chunk
+    :type max_chars: int
+    :param overlap: Maximum number of characters repeated from the end of the previous chunk. Only whole units are
+                    repeated, except when a unit is split into windows.
+    :type overlap: int
+    :param boundary: Unit of text that chunks are not split within when possible, one of layout, paragraph or page
+    :type boundary: str
+
+    :return: Iterator of TextChunk objects
+    :rtype: Iterator[TextChunk]
+    """
+    if boundary not in CHUNK_BOUNDARIES:
+        raise InputError(f"boundary should be one of {', '.join(CHUNK_BOUNDARIES)}, got {boundary}")
+    if max_chars <= 0:
+        raise InputError("max_chars should be a positive integer")
+    if overlap < 0 or overlap >= max_chars:
+        raise InputError("overlap should be positive and smaller than max_chars")
+
+    current = []
+    current_length = 0
+    has_new_units = False
+    for unit in _iter_units(pages, config, boundary):
+        if len(unit.text) > max_chars:
+            if has_new_units:
+                yield _make_chunk(_join_units(current), current)
+            for start in range(0, len(unit.text) - overlap, max_chars - overlap):
+                yield _make_chunk(unit.text[start : start + max_chars], [unit])
+            current, current_length, has_new_units = [], 0, False
+            continue
+
+        added_length = len(unit.text) + (len(unit.separator) if current else 0)
+        if current and current_length + added_length > max_chars:
+            if has_new_units:
+                yield _make_chunk(_join_units(current), current)
+            # Carry over the trailing units that fit in the overlap and leave room for the new unit
+            carry = []
+            carry_length = 0
+            for previous in reversed(current):
+                length = carry_length + len(previous.text) + (len(carry[0].separator) if carry else 0)
+                if length > overlap or length + len(unit.separator) + len(unit.text) > max_chars:
+                    break
+                carry.insert(0, previous)
+                carry_length = length
+            current, current_length, has_new_units = carry, carry_length, False
+            added_length = len(unit.text) + (len(unit.separator) if current else 0)
+
+        current.append(unit)
+        current_length += added_length
+        has_new_units = True
+
+    if has_new_units:
+        yield _make_chunk(_join_units(current), current)
@@ -0,0 +1,77 @@
+"""
+Streaming export of :class:`Table` objects to Excel. The workbook is opened in xlsxwriter's constant_memory mode, so
+each row is flushed to disk as soon as the next one is started and memory usage does not grow with the number of
+tables exported.
+"""
+
+import logging
+from typing import Iterable, Iterator
+
+import xlsxwriter
+
+logger = logging.getLogger(__name__)
+
+
+def _iter_tables(entities: Iterable) -> Iterator:
+    """
+    Flattens an iterable of :class:`Table`, :class:`Page` or :class:`Document` objects into tables, lazily.
+
+    :param entities: Iterable of Table, Page or Document objects
+    :type entities: Iterable
+    :return: Iterator of Table objects
+    :rtype: Iterator[Table]
+    """
+    for entity in entities:
+        if entity.__class__.__name__ == "Table":
+            yield entity
+        else:
+            yield from entity.tables
+
+
+def export_tables_to_excel(
+    entities: Iterable,
+    filepath: str,
+    one_sheet_per_page: bool = False,
+) -> int:
+    """
+    Writes tables to an Excel file without keeping the workbook in memory. By default each table is written on its
+    own worksheet, with one_sheet_per_page=True the tables of a page are written one after the other on a single
+    worksheet, separated by an empty row. Merged cells are written as merged ranges.
+
+    The input is consumed lazily, a generator of Documents can be used to export tables from many documents
+    without holding them all in memory, for example:
+    :code:`export_tables_to_excel((Document.open(path) for path in paths), "tables.xlsx")`
+
+    :param entities: Iterable of Table, Page or Document objects
+    :type entities: Iterable
+    :param filepath: Path to store the exported Excel file
+    :type filepath: str
+    :param one_sheet_per_page: Group the tables of each page on a single worksheet
+    :type one_sheet_per_page: bool
+
+    :return: Number of tables written
+    :rtype: int
+    """
+    if not filepath:
+        logger.error("Filepath required to store excel file.")
+
+    workbook = xlsxwriter.Workbook(filepath, {"constant_memory": True})
+    worksheet = None
+    current_page = None
+    row_offset = 0
+    table_count = 0
+    for table in _iter_tables(entities):
+        if not one_sheet_per_page:
+            table._write_to_worksheet(workbook.add_worksheet())
+        else:
+            page = (table.page_id, table.page)
+            if worksheet is None or page != current_page:
+                worksheet = workbook.add_worksheet()
+                current_page = page
+                row_offset = 0
+            # Leave an empty row between two tables of the same page
+            row_offset = table._write_to_worksheet(worksheet, row_offset) + 1
+        table_count += 1
+    workbook.close()
+
+    return table_count
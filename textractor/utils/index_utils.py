@@ -0,0 +1,360 @@
+"""
+Inverted index of the words of a corpus of documents, stored on disk with sqlite3. Each posting records the document,
+the page, the position of the word on the page (in line order) and its bounding box, which is enough to answer
+"which pages mention invoice number X, and where" without opening any document. Documents can be added and removed
+incrementally, queries are single terms or phrases, and terms can be expanded to the indexed terms within an edit
+distance to tolerate OCR errors.
+"""
+
+import sqlite3
+import string
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import editdistance
+
+from textractor.entities.bbox import BoundingBox
+from textractor.exceptions import InputError
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id INTEGER PRIMARY KEY,
+    source TEXT UNIQUE NOT NULL,
+    page_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    length INTEGER NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS terms_length ON terms (length);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    x REAL,
+    y REAL,
+    width REAL,
+    height REAL
+);
+CREATE INDEX IF NOT EXISTS postings_term ON postings (term);
+CREATE INDEX IF NOT EXISTS postings_position ON postings (doc_id, page, position);
+CREATE TEMP TABLE IF NOT EXISTS query_terms (
+    slot INTEGER NOT NULL,
+    term TEXT NOT NULL,
+    PRIMARY KEY (slot, term)
+);
+"""
+
+# Default maximum number of indexed terms a query term is expanded to, the closest terms are kept
+MAX_EXPANSIONS = 100
+
+_PUNCTUATION = string.punctuation + "“”‘’«»"
+
+
+def normalize_term(text: str) -> str:
+    """
+    Normalizes a word to the form stored in the index: lower case, without leading and trailing punctuation.
+
+    :param text: Word text
+    :type text: str
+    :return: Index term, empty if the word is only made of punctuation
+    :rtype: str
+    """
+    return text.strip().strip(_PUNCTUATION).lower()
+
+
+def _split_term(term: str, count: int) -> List[str]:
+    """
+    Splits term into count contiguous parts of nearly equal lengths, term has to be at least count characters long.
+    """
+    size, extra = divmod(len(term), count)
+    parts = []
+    start = 0
+    for i in range(count):
+        end = start + size + (i < extra)
+        parts.append(term[start:end])
+        start = end
+    return parts
+
+
+def _page_terms(page) -> Iterator[Tuple[int, str, str, BoundingBox]]:
+    position = 0
+    for line in page.lines:
+        for word in line.words:
+            term = normalize_term(word.text)
+            if term:
+                yield position, term, word.text, word.bbox
+                position += 1
+
+
+@dataclass
+class SearchHit:
+    """
+    Occurrence of a query in the corpus. The hit only holds the location of the match, the page can be opened
+    with :meth:`open_page`.
+    """
+
+    source: str  #: Source of the document, as given to :meth:`CorpusIndex.add_document`
+
+    page: int  #: Page number, starting at 1
+
+    positions: List[int]  #: Positions of the matching words on the page
+
+    text: str  #: Text of the matching words
+
+    bboxes: List[BoundingBox] = field(default_factory=list)  #: Bounding boxes of the matching words
+
+    _loader: Callable = field(default=None, repr=False, compare=False)
+
+    @property
+    def bbox(self) -> BoundingBox:
+        """
+        :return: Bounding box enclosing the matching words, in normalized page coordinates
+        :rtype: BoundingBox
+        """
+        return BoundingBox.enclosing_bbox(self.bboxes)
+
+    def open_page(self):
+        """
+        Opens the document of the hit with the loader of the index and returns the matching page.
+
+        :return: Matching page
+        :rtype: Page
+        """
+        return self._loader(self.source).pages[self.page - 1]
+
+
+def _open_document(source: str):
+    from textractor.entities.document import Document
+
+    return Document.open(source)
+
+
+class CorpusIndex:
+    """
+    On-disk inverted index of the words of a corpus of documents.
+
+    :param path: Path of the sqlite database holding the index, created if it does not exist. Defaults to an
+                 in-memory index.
+    :type path: str
+    :param loader: Function opening a document from its source, used by :meth:`SearchHit.open_page`. Defaults to
+                   Document.open, which accepts paths to saved API responses, local or on S3.
+    :type loader: Callable[[str], Document]
+    """
+
+    def __init__(self, path: str = ":memory:", loader: Callable = None):
+        self.path = path
+        self.loader = loader or _open_document
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+
+    def add_document(self, document, source: str) -> int:
+        """
+        Indexes the words of document under source. A document already indexed under the same source is replaced.
+
+        :param document: Document to index
+        :type document: Document
+        :param source: Unique identifier of the document, for example the path of the saved API response
+        :type source: str
+        :return: Number of words indexed
+        :rtype: int
+        """
+        with self._connection:
+            self._remove(source)
+            doc_id = self._connection.execute(
+                "INSERT INTO documents (source, page_count) VALUES (?, ?)",
+                (source, len(document.pages)),
+            ).lastrowid
+            postings = []
+            term_counts: Dict[str, int] = {}
+            for page in document.pages:
+                for position, term, text, bbox in _page_terms(page):
+                    postings.append(
+                        (term, doc_id, page.page_num, position, text)
+                        + ((bbox.x, bbox.y, bbox.width, bbox.height) if bbox is not None else (None,) * 4)
+                    )
+                    term_counts[term] = term_counts.get(term, 0) + 1
+            self._connection.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", postings
+            )
+            self._connection.executemany(
+                "INSERT INTO terms (term, length, count) VALUES (?, ?, ?) "
+                "ON CONFLICT (term) DO UPDATE SET count = count + excluded.count",
+                [(term, len(term), count) for term, count in term_counts.items()],
+            )
+        return len(postings)
+
+    def remove_document(self, source: str) -> bool:
+        """
+        Removes a document from the index.
+
+        :param source: Source the document was indexed under
+        :type source: str
+        :return: True if the document was indexed
+        :rtype: bool
+        """
+        with self._connection:
+            return self._remove(source)
+
+    def _remove(self, source: str) -> bool:
+        row = self._connection.execute(
+            "SELECT doc_id FROM documents WHERE source = ?", (source,)
+        ).fetchone()
+        if row is None:
+            return False
+        doc_id = row[0]
+        self._connection.executemany(
+            "UPDATE terms SET count = count - ? WHERE term = ?",
+            [
+                (count, term)
+                for term, count in self._connection.execute(
+                    "SELECT term, COUNT(*) FROM postings WHERE doc_id = ? GROUP BY term", (doc_id,)
+                )
+            ],
+        )
+        self._connection.execute("DELETE FROM terms WHERE count <= 0")
+        self._connection.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+        self._connection.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+        return True
+
+    @property
+    def sources(self) -> List[str]:
+        """
+        :return: Sources of the indexed documents, in insertion order
+        :rtype: List[str]
+        """
+        return [row[0] for row in self._connection.execute("SELECT source FROM documents ORDER BY doc_id")]
+
+    def expand_term(self, term: str, max_distance: int = 1, max_expansions: int = MAX_EXPANSIONS) -> List[str]:
+        """
+        Returns the indexed terms within max_distance edits (Levenshtein distance) of term, including term itself if
+        it is indexed, closest and most frequent terms first. Candidates are pre-filtered by sqlite on their length
+        and on the parts of term they have to contain, only the remaining ones are compared in Python.
+
+        :param term: Term to expand, normalized with :func:`normalize_term`
+        :type term: str
+        :param max_distance: Maximum edit distance
+        :type max_distance: int
+        :param max_expansions: Maximum number of terms returned
+        :type max_expansions: int
+        :return: Matching indexed terms
+        :rtype: List[str]
+        """
+        term = normalize_term(term)
+        if max_distance <= 0:
+            row = self._connection.execute("SELECT term FROM terms WHERE term = ?", (term,)).fetchone()
+            return [row[0]] if row else []
+        sql = "SELECT term, count FROM terms WHERE length BETWEEN ? AND ?"
+        parameters = [len(term) - max_distance, len(term) + max_distance]
+        if len(term) > max_distance:
+            # Each edit changes at most one of max_distance + 1 parts of term, a term within max_distance edits
+            # contains at least one of them unchanged
+            parts = _split_term(term, max_distance + 1)
+            sql += f" AND ({' OR '.join(['instr(term, ?) > 0'] * len(parts))})"
+            parameters.extend(parts)
+        matches = []
+        for candidate, count in self._connection.execute(sql, parameters):
+            distance = editdistance.eval(term, candidate)
+            if distance <= max_distance:
+                matches.append((distance, -count, candidate))
+        matches.sort()
+        return [candidate for _, _, candidate in matches[:max_expansions]]
+
+    def search(
+        self, query: str, max_distance: int = 0, limit: int = None, max_expansions: int = MAX_EXPANSIONS
+    ) -> List[SearchHit]:
+        """
+        Searches the corpus for query. A query of several words is a phrase query, its words have to be consecutive
+        on the page, in line order.
+
+        :param query: Word or phrase to search
+        :type query: str
+        :param max_distance: Maximum edit distance between a query word and the indexed words it matches, 0 only
+                             matches exact terms
+        :type max_distance: int
+        :param max_expansions: Maximum number of indexed terms each query word is expanded to, see :meth:`expand_term`
+        :type max_expansions: int
+        :param limit: Maximum number of hits to return
+        :type limit: int
+        :return: Hits ordered by document, page and position
+        :rtype: List[SearchHit]
+        """
+        terms = [normalize_term(t) for t in query.split()]
+        terms = [t for t in terms if t]
+        if not terms:
+            raise InputError("query should contain at least one word")
+
+        expansions = [self.expand_term(t, max_distance, max_expansions) for t in terms]
+        if not all(expansions):
+            return []
+
+        # Phrase query as a chain of self joins on consecutive positions of the same page
+        columns = []
+        joins = []
+        conditions = []
+        parameters = []
+        for i, expansion in enumerate(expansions):
+            columns.append(f"p{i}.position, p{i}.text, p{i}.x, p{i}.y, p{i}.width, p{i}.height")
+            if i:
+                joins.append(
+                    f"JOIN postings p{i} ON p{i}.doc_id = p0.doc_id AND p{i}.page = p0.page "
+                    f"AND p{i}.position = p0.position + {i}"
+                )
+            # The expansions are stored in a temporary table, they are not bound to the number of sql parameters
+            conditions.append(f"p{i}.term IN (SELECT term FROM query_terms WHERE slot = {i})")
+        sql = (
+            f"SELECT d.source, p0.page, {', '.join(columns)} FROM postings p0 "
+            f"{' '.join(joins)} JOIN documents d ON d.doc_id = p0.doc_id "
+            f"WHERE {' AND '.join(conditions)} ORDER BY p0.doc_id, p0.page, p0.position"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+
+        with self._connection:
+            self._connection.execute("DELETE FROM query_terms")
+            self._connection.executemany(
+                "INSERT INTO query_terms VALUES (?, ?)",
+                [(i, term) for i, expansion in enumerate(expansions) for term in expansion],
+            )
+            rows = self._connection.execute(sql, parameters).fetchall()
+
+        hits = []
+        for row in rows:
+            source, page = row[0], row[1]
+            words = [row[2 + 6 * i : 8 + 6 * i] for i in range(len(terms))]
+            hits.append(
+                SearchHit(
+                    source=source,
+                    page=page,
+                    positions=[w[0] for w in words],
+                    text=" ".join(w[1] for w in words),
+                    bboxes=[BoundingBox(*w[2:]) for w in words if w[2] is not None],
+                    _loader=self.loader,
+                )
+            )
+        return hits
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def __contains__(self, source: str) -> bool:
+        return (
+            self._connection.execute("SELECT 1 FROM documents WHERE source = ?", (source,)).fetchone()
+            is not None
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,258 @@
+"""
+Memoization of the linearization of document entities. Linearizing a large document is costly and the same
+entities are often linearized several times with the same configuration, for example when calling
+:code:`document.get_text()`, :code:`document.to_markdown()` and then :code:`page.get_text_and_words()`.
+
+The output of :code:`get_text_and_words` is stored on each entity, keyed by the type and field values of the
+linearization configuration so that two equal configurations share the same entry. Any mutation of the document
+tree (:code:`DocumentEntity.remove`, :code:`DocumentEntity.add_children`, an in-place change of the children of an
+entity, the setters of the entities such as :code:`Word.text` or :code:`KeyValue.key`, ...) invalidates all the
+cached outputs. Attributes changed directly through their private name are not tracked, call
+:meth:`LinearizationCache.invalidate` after such changes.
+
+:code:`get_text()`, and with it :code:`to_html()` and :code:`to_markdown()`, only use the text of the linearization.
+They run in :meth:`LinearizationCache.text_only` mode, in which tables skip building their words, and their outputs
+are cached apart from the complete ones. The offset index of an entity is built in
+:meth:`LinearizationCache.recording_offsets` mode, the only one in which the text records the spans of its words, and
+its outputs serve the calls of the other modes.
+"""
+
+import itertools
+import threading
+import weakref
+from contextlib import contextmanager
+from copy import copy
+from dataclasses import fields
+from functools import wraps
+from typing import Callable, Tuple
+
+from textractor.data.text_linearization_config import TextLinearizationConfig
+
+
+class LinearizationCache:
+    """
+    Global settings of the linearization cache.
+
+    :code:`LinearizationCache.enabled` turns the cache on or off for the whole process, :meth:`disabled` for the
+    current thread only. :code:`LinearizationCache.max_entries_per_entity` caps the number of configurations
+    remembered by each entity, the oldest entry being evicted first. The entries are kept apart from the entities,
+    copies of an entity, shallow, deep or pickled, start without any.
+    """
+
+    enabled = True
+    max_entries_per_entity = 4
+    _generation = 0
+    _generations = itertools.count(1)
+    _local = threading.local()
+    _field_names = {}
+    # Entity -> {key: (generation, value)}, entities are compared by identity
+    _caches = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Marks all the cached outputs as stale. This is called whenever the document tree is mutated.
+        """
+        # next() on a count is atomic, concurrent invalidations never reuse a generation
+        cls._generation = next(cls._generations)
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        """
+        :return: True when the cache is used by the current thread
+        :rtype: bool
+        """
+        return cls.enabled and not getattr(cls._local, "disabled", 0)
+
+    @classmethod
+    def clear(cls):
+        """
+        Invalidates and frees all the cached outputs.
+        """
+        cls.invalidate()
+        cls._caches.clear()
+
+    @classmethod
+    @contextmanager
+    def disabled(cls):
+        """
+        Context manager that bypasses the cache in the current thread, for example to linearize a document once
+        without retaining its text. Other threads keep using the cache.
+        """
+        cls._local.disabled = getattr(cls._local, "disabled", 0) + 1
+        try:
+            yield
+        finally:
+            cls._local.disabled -= 1
+
+    @classmethod
+    def is_text_only(cls) -> bool:
+        """
+        Returns True when only the text of the linearization is used in the current thread, see :meth:`text_only`.
+        """
+        return getattr(cls._local, "text_only", 0) > 0
+
+    @classmethod
+    @contextmanager
+    def text_only(cls):
+        """
+        Context manager telling the entities linearized in the current thread that only the text returned by
+        :code:`get_text_and_words` is used. Entities whose words are costly to build, such as tables, then return
+        their own words in place of the linearized ones. The text is the same in both modes.
+        """
+        cls._local.text_only = getattr(cls._local, "text_only", 0) + 1
+        try:
+            yield
+        finally:
+            cls._local.text_only -= 1
+
+    @classmethod
+    def is_recording_offsets(cls) -> bool:
+        """
+        Returns True when the text records the spans of its words in the current thread, see
+        :meth:`recording_offsets`.
+        """
+        return getattr(cls._local, "recording_offsets", 0) > 0
+
+    @classmethod
+    @contextmanager
+    def recording_offsets(cls):
+        """
+        Context manager telling the entities linearized in the current thread to return their text as a
+        :class:`~textractor.utils.offset_utils.LinearizedText` recording the span of each word, from which the offset
+        index is built. The text is the same in both modes.
+        """
+        cls._local.recording_offsets = getattr(cls._local, "recording_offsets", 0) + 1
+        try:
+            yield
+        finally:
+            cls._local.recording_offsets -= 1
+
+    @classmethod
+    def config_key(cls, config: TextLinearizationConfig) -> Tuple:
+        """
+        Returns a hashable key made of the configuration type and field values.
+
+        :param config: Linearization configuration
+        :type config: TextLinearizationConfig
+        :return: Key identifying the configuration
+        :rtype: Tuple
+        """
+        config_type = type(config)
+        names = cls._field_names.get(config_type)
+        if names is None:
+            names = tuple(f.name for f in fields(config_type))
+            cls._field_names[config_type] = names
+        return (config_type,) + tuple(getattr(config, name) for name in names)
+
+
+def cached(entity, key: Tuple, compute: Callable):
+    """
+    Returns the value stored for key on entity if it is still valid, otherwise computes and stores it. This is the
+    storage used by :func:`memoize_linearization`, it can be used to cache other values derived from the
+    linearization of an entity.
+
+    :param entity: Entity holding the cache
+    :param key: Hashable key, usually built with :meth:`LinearizationCache.config_key`
+    :type key: Tuple
+    :param compute: Function without arguments returning the value to cache
+    :type compute: Callable
+    :return: Cached or computed value
+    """
+    if not LinearizationCache.is_enabled() or LinearizationCache.max_entries_per_entity <= 0:
+        return compute()
+
+    cache = LinearizationCache._caches.get(entity)
+    if cache is None:
+        cache = LinearizationCache._caches[entity] = {}
+    entry = cache.get(key)
+    if entry is not None and entry[0] == LinearizationCache._generation:
+        return entry[1]
+
+    # A mutation during compute leaves the value stale
+    generation = LinearizationCache._generation
+    value = compute()
+    cache.pop(key, None)
+    cache[key] = (generation, value)
+    while len(cache) > LinearizationCache.max_entries_per_entity:
+        del cache[next(iter(cache))]
+    return value
+
+
+def lookup(entity, key: Tuple):
+    """
+    Returns the value stored for key on entity if it is still valid, None otherwise. Nothing is computed nor stored.
+
+    :param entity: Entity holding the cache
+    :param key: Hashable key, usually built with :meth:`LinearizationCache.config_key`
+    :type key: Tuple
+    :return: Cached value or None
+    """
+    if not LinearizationCache.is_enabled():
+        return None
+    entry = LinearizationCache._caches.get(entity, {}).get(key)
+    if entry is not None and entry[0] == LinearizationCache._generation:
+        return entry[1]
+    return None
+
+
+class ChildList(list):
+    """
+    List of the children of an entity, changing it in place invalidates the linearization cache like
+    :meth:`DocumentEntity.add_children` does.
+    """
+
+    def _mutation(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            LinearizationCache.invalidate()
+            return result
+
+        return wrapper
+
+    append = _mutation(list.append)
+    extend = _mutation(list.extend)
+    insert = _mutation(list.insert)
+    remove = _mutation(list.remove)
+    pop = _mutation(list.pop)
+    clear = _mutation(list.clear)
+    sort = _mutation(list.sort)
+    reverse = _mutation(list.reverse)
+    __setitem__ = _mutation(list.__setitem__)
+    __delitem__ = _mutation(list.__delitem__)
+    __iadd__ = _mutation(list.__iadd__)
+    __imul__ = _mutation(list.__imul__)
+    del _mutation
+
+
+def memoize_linearization(get_text_and_words: Callable) -> Callable:
+    """
+    Decorator caching the output of a :code:`get_text_and_words(self, config)` method per entity and configuration.
+    The returned word list is a copy, callers can extend it without altering the cache.
+
+    :param get_text_and_words: Method to decorate
+    :type get_text_and_words: Callable
+    :return: Decorated method
+    :rtype: Callable
+    """
+
+    @wraps(get_text_and_words)
+    def wrapper(self, config: TextLinearizationConfig = TextLinearizationConfig()):
+        key = LinearizationCache.config_key(config) + ("offsets",)
+        if not LinearizationCache.is_recording_offsets():
+            # An output recording the offsets serves the other calls, the offset index maps the words they return
+            offsets_output = lookup(self, key)
+            if offsets_output is not None:
+                return offsets_output[0], copy(offsets_output[1])
+            key = key[:-1]
+        if LinearizationCache.is_text_only():
+            # A complete output also serves text only calls, the text only outputs are kept under their own key
+            complete_output = lookup(self, key)
+            if complete_output is not None:
+                return complete_output[0], copy(complete_output[1])
+            key += ("text_only",)
+        text, words = cached(self, key, lambda: get_text_and_words(self, config))
+        return text, copy(words)
+
+    return wrapper
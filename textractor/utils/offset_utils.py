@@ -0,0 +1,381 @@
+"""
+Character offset index of linearized text. The index maps each word returned by :code:`get_text_and_words` to its
+position in the linearized text so that a character span, found by a NER model for example, can be resolved to
+words and bounding boxes by binary search.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Optional, Tuple
+
+from textractor.entities.bbox import BoundingBox
+from textractor.utils.linearization_cache import LinearizationCache
+
+
+class LinearizedText(str):
+    """
+    Text returned by :code:`get_text_and_words` in :meth:`LinearizationCache.recording_offsets` mode, it records the
+    (start, end, word) span of each word written in it.
+    Spans are recorded as the text is built: concatenations with :code:`+`, :meth:`join`, slices, :meth:`strip`,
+    :meth:`replace` and :meth:`sub` carry them over, other string operations return a plain :code:`str` without them.
+    Concatenations only keep a reference to their operands, the spans are resolved once by :attr:`spans`.
+
+    :param text: Text, the spans of a LinearizedText are kept
+    :type text: str
+    :param spans: (start, end, word) spans of the words written in text
+    :type spans: Iterable[Tuple[int, int, Word]]
+    """
+
+    __slots__ = ("_entries", "_spans")
+
+    def __new__(cls, text: str = "", spans: Iterable[Tuple[int, int, object]] = ()):
+        if type(text) is cls and not spans:
+            # The text is immutable, it is shared rather than wrapped
+            return text
+        self = super().__new__(cls, text)
+        # Entries are either (start, end, word) spans or (offset, LinearizedText, start, end) parts, the spans of the
+        # part between start and end, clipped to it, moved by offset
+        self._entries = list(spans) if spans else []
+        self._spans = None
+        if isinstance(text, LinearizedText) and text._entries:
+            self._entries.append((0, text, 0, len(text)))
+        return self
+
+    def __reduce__(self):
+        return LinearizedText, (str(self), self.spans)
+
+    @property
+    def spans(self) -> List[Tuple[int, int, object]]:
+        """
+        :return: (start, end, word) spans of the words, in the order they were written
+        :rtype: List[Tuple[int, int, Word]]
+        """
+        spans = self._spans
+        if spans is None:
+            spans = []
+            # Parts are resolved iteratively, chains of concatenations can be deeper than the recursion limit
+            stack = [(0, 0, len(self), self._entries, 0)]
+            while stack:
+                offset, low, high, entries, i = stack.pop()
+                while i < len(entries):
+                    entry = entries[i]
+                    i += 1
+                    if len(entry) == 3:
+                        start, end = max(entry[0] + offset, low), min(entry[1] + offset, high)
+                        if end > start:
+                            spans.append((start, end, entry[2]))
+                    else:
+                        stack.append((offset, low, high, entries, i))
+                        offset += entry[0]
+                        low, high = max(low, offset + entry[2]), min(high, offset + entry[3])
+                        entries, i = entry[1]._entries, 0
+            self._spans = spans
+        return spans
+
+    def _part(self, offset: int, start: int = 0, end: Optional[int] = None) -> Tuple[int, "LinearizedText", int, int]:
+        return offset, self, start, len(self) if end is None else end
+
+    def __add__(self, other):
+        if not isinstance(other, str):
+            return NotImplemented
+        if not other:
+            return self
+        result = LinearizedText(str.__add__(self, other), (self._part(0),) if self._entries else ())
+        if isinstance(other, LinearizedText) and other._entries:
+            result._entries.append(other._part(len(self)))
+        return result
+
+    def __radd__(self, other):
+        if not isinstance(other, str):
+            return NotImplemented
+        if not other:
+            return self
+        return LinearizedText(str.__add__(other, self), (self._part(len(other)),) if self._entries else ())
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            return str.__getitem__(self, key)
+        start, stop, _ = key.indices(len(self))
+        stop = max(start, stop)
+        if start == 0 and stop == len(self):
+            return self
+        return LinearizedText(str.__getitem__(self, key), (self._part(-start, start, stop),) if self._entries else ())
+
+    def join(self, texts: Iterable[str]) -> "LinearizedText":
+        texts = list(texts)
+        result = LinearizedText(str.join(self, texts))
+        offset = 0
+        for i, text in enumerate(texts):
+            if i:
+                if self._entries:
+                    result._entries.append(self._part(offset))
+                offset += len(self)
+            if isinstance(text, LinearizedText) and text._entries:
+                result._entries.append(text._part(offset))
+            offset += len(text)
+        return result
+
+    def strip(self, chars: Optional[str] = None) -> "LinearizedText":
+        start = len(self) - len(str.lstrip(self, chars))
+        return self[start:start + len(str.strip(self, chars))]
+
+    def lstrip(self, chars: Optional[str] = None) -> "LinearizedText":
+        return self[len(self) - len(str.lstrip(self, chars)):]
+
+    def rstrip(self, chars: Optional[str] = None) -> "LinearizedText":
+        return self[: len(str.rstrip(self, chars))]
+
+    def replace(self, old: str, new: str, count: int = -1) -> "LinearizedText":
+        if not old:
+            return LinearizedText(str.replace(self, old, new, count))
+        if old not in self:
+            return self
+        if len(old) == len(new):
+            # The spans do not move
+            return LinearizedText(str.replace(self, old, new, count), (self._part(0),) if self._entries else ())
+        matches = []
+        position = str.find(self, old)
+        while position != -1 and count != len(matches):
+            matches.append((position, position + len(old), new))
+            position = str.find(self, old, position + len(old))
+        return self._substitute(matches)
+
+    def sub(self, pattern: str, repl: str, count: int = 0) -> "LinearizedText":
+        """
+        Equivalent of :code:`re.sub(pattern, repl, text, count)` that moves the spans with the text around them.
+
+        :param pattern: Regular expression
+        :type pattern: str
+        :param repl: Replacement, backreferences are expanded
+        :type repl: str
+        :param count: Maximum number of replacements, 0 for all
+        :type count: int
+        :return: Text with the matches replaced
+        :rtype: LinearizedText
+        """
+        matches = []
+        for match in re.finditer(pattern, self):
+            if count and len(matches) == count:
+                break
+            matches.append((match.start(), match.end(), match.expand(repl)))
+        return self._substitute(matches)
+
+    def _substitute(self, matches: List[Tuple[int, int, str]]) -> "LinearizedText":
+        """
+        Replaces the (start, end, replacement) matches, sorted and not overlapping. Spans overlapping a match are
+        clipped to its replacement.
+        """
+        if not matches:
+            return self
+        parts = []
+        ends = []
+        # Offsets of the replacements in the new text
+        new_starts = []
+        last = 0
+        length = 0
+        for start, end, replacement in matches:
+            parts.append(str.__getitem__(self, slice(last, start)))
+            length += start - last
+            new_starts.append(length)
+            parts.append(replacement)
+            length += len(replacement)
+            ends.append(end)
+            last = end
+        parts.append(str.__getitem__(self, slice(last, None)))
+
+        def move(position):
+            i = bisect_right(ends, position)
+            if i < len(matches) and matches[i][0] < position:
+                return new_starts[i] + min(position - matches[i][0], len(matches[i][2]))
+            if not i:
+                return position
+            return position - ends[i - 1] + new_starts[i - 1] + len(matches[i - 1][2])
+
+        spans = []
+        for start, end, word in self.spans:
+            start, end = move(start), move(end)
+            if end > start:
+                spans.append((start, end, word))
+        return LinearizedText("".join(parts), spans)
+
+
+def word_text(text: str, word=None) -> str:
+    """
+    Returns text as a LinearizedText spanned by word, the text written for a word or a structure word. Without a word
+    or outside of :meth:`LinearizationCache.recording_offsets` mode, text is returned as is.
+
+    :param text: Text of the word as it is written in the linearized text
+    :type text: str
+    :param word: Word spanning the text, None for text that is not a word
+    :type word: Word
+    :return: Text with the span of word, text itself without a word
+    :rtype: str
+    """
+    if not text or word is None or not LinearizationCache.is_recording_offsets():
+        return text
+    return LinearizedText(text, [(0, len(text), word)])
+
+
+def words_text(texts: List[str], words: List[object], separator: str = " ") -> str:
+    """
+    Returns the texts joined by separator, each text spanned by the word at the same position. Equivalent to
+    :code:`LinearizedText(separator).join(word_text(t, w) for t, w in zip(texts, words))` for the words of a line.
+
+    :param texts: Text of each word as it is written in the linearized text
+    :type texts: List[str]
+    :param words: Word spanning each text, None for text that is not a word
+    :type words: List[Word]
+    :param separator: Text written between the words
+    :type separator: str
+    :return: Joined text, with the spans of the words in :meth:`LinearizationCache.recording_offsets` mode
+    :rtype: str
+    """
+    if not LinearizationCache.is_recording_offsets():
+        return separator.join(texts)
+    spans = []
+    offset = 0
+    for text, word in zip(texts, words):
+        if text and word is not None:
+            spans.append((offset, offset + len(text), word))
+        offset += len(text) + len(separator)
+    return LinearizedText(separator.join(texts), spans)
+
+
+def join_text(separator: str, texts: Iterable[str]) -> str:
+    """
+    Returns :code:`separator.join(texts)`, as a LinearizedText keeping the spans of the texts in
+    :meth:`LinearizationCache.recording_offsets` mode.
+
+    :param separator: Text written between the texts
+    :type separator: str
+    :param texts: Texts to join
+    :type texts: Iterable[str]
+    :return: Joined text
+    :rtype: str
+    """
+    if LinearizationCache.is_recording_offsets():
+        return LinearizedText(separator).join(texts)
+    return separator.join(texts)
+
+
+class TextOffsetIndex:
+    """
+    Start and end character offsets of the words of a linearized text, sorted by start offset.
+
+    :param text: Linearized text
+    :type text: str
+    :param words: Words found in the text, sorted by start offset
+    :type words: List[Word]
+    :param starts: Start offset of each word
+    :type starts: List[int]
+    :param ends: End offset (exclusive) of each word
+    :type ends: List[int]
+    """
+
+    def __init__(self, text: str, words: List, starts: List[int], ends: List[int]):
+        self.text = text
+        self.words = words
+        self.starts = starts
+        self.ends = ends
+        # Running maximum of the end offsets, sorted even if words overlap, used to bisect the first word of a span
+        self._max_ends = []
+        max_end = -1
+        for end in ends:
+            max_end = max(max_end, end)
+            self._max_ends.append(max_end)
+
+    @classmethod
+    def from_text(cls, text: str) -> "TextOffsetIndex":
+        """
+        Builds the index from the spans recorded in the text while it was linearized. The index is exact: each word
+        is at the offsets it was written at, whatever the configuration. A word written several times, such as the
+        text of a merged cell duplicated with :code:`table_duplicate_text_in_merged_cells`, has an entry per
+        occurrence. Words returned by get_text_and_words but not written in the text, such as structure words when
+        prefixes and suffixes are not added to the text, are not in the index.
+
+        :param text: Linearized text, as returned by get_text_and_words in :meth:`LinearizationCache.recording_offsets`
+            mode
+        :type text: str
+        :return: Offset index, without entries if text is a plain str
+        :rtype: TextOffsetIndex
+        """
+        entries = sorted(text.spans, key=lambda x: x[0]) if isinstance(text, LinearizedText) else []
+        return cls(
+            text,
+            [w for _, _, w in entries],
+            [s for s, _, _ in entries],
+            [e for _, e, _ in entries],
+        )
+
+    @classmethod
+    def join(cls, indexes: Iterable["TextOffsetIndex"], separator: str) -> "TextOffsetIndex":
+        """
+        Concatenates indexes the same way texts are joined with separator.join(texts).
+
+        :param indexes: Indexes to concatenate
+        :type indexes: Iterable[TextOffsetIndex]
+        :param separator: Separator inserted between the texts
+        :type separator: str
+        :return: Index of the joined text
+        :rtype: TextOffsetIndex
+        """
+        texts = []
+        words = []
+        starts = []
+        ends = []
+        offset = 0
+        for i, index in enumerate(indexes):
+            if i:
+                texts.append(separator)
+                offset += len(separator)
+            texts.append(index.text)
+            words.extend(index.words)
+            starts.extend(s + offset for s in index.starts)
+            ends.extend(e + offset for e in index.ends)
+            offset += len(index.text)
+        return cls("".join(texts), words, starts, ends)
+
+    def span_to_words(self, start: int, end: int, include_structure: bool = False) -> List:
+        """
+        Returns the words overlapping the character span [start, end).
+
+        :param start: Start offset of the span
+        :type start: int
+        :param end: End offset of the span (exclusive)
+        :type end: int
+        :param include_structure: Include structure words (table, layout prefixes and suffixes)
+        :type include_structure: bool
+        :return: Words overlapping the span, in text order
+        :rtype: List[Word]
+        """
+        first = bisect_right(self._max_ends, start)
+        last = bisect_left(self.starts, end)
+        return [
+            self.words[i]
+            for i in range(first, last)
+            if self.ends[i] > start and (include_structure or not self.words[i].is_structure)
+        ]
+
+    def span_to_bboxes(self, start: int, end: int) -> List[Tuple[int, BoundingBox]]:
+        """
+        Returns the bounding boxes covering the character span [start, end), one per line of text.
+
+        :param start: Start offset of the span
+        :type start: int
+        :param end: End offset of the span (exclusive)
+        :type end: int
+        :return: List of (page number, bounding box) tuples, in text order
+        :rtype: List[Tuple[int, BoundingBox]]
+        """
+        groups = []
+        previous_key = None
+        for word in self.span_to_words(start, end):
+            key = (word.page, word.line_id or id(word))
+            if key != previous_key:
+                groups.append((word.page, []))
+                previous_key = key
+            groups[-1][1].append(word.bbox)
+        return [(page, BoundingBox.enclosing_bbox(bboxes)) for page, bboxes in groups]
+
+    def __len__(self) -> int:
+        return len(self.words)
@@ -0,0 +1,126 @@
+"""
+Geometric reading order of page elements. The recursive XY-cut splits a set of elements along the widest horizontal
+or vertical band that no element crosses, until no such band remains, the elements left together form a block. Blocks
+are returned top to bottom and left to right within each cut, which reads multi-column pages column by column.
+Horizontal bands narrower than the spacing of the lines of a paragraph are not cut, so that the lines of a column stay
+in the same block.
+"""
+
+from statistics import median
+from typing import List, Optional, Tuple
+
+READING_ORDER_ENGINES = ("textract", "xycut")
+
+# Gaps at least this fraction of the widest gap are cut at the same time, splitting a column of evenly spaced lines
+# in one pass instead of one line at a time
+CUT_RATIO = 0.5
+
+# Horizontal bands narrower than this many line heights are line spacing within a block
+LINE_GAP = 0.8
+
+
+def _split(elements: List, axis: int, min_gap: float) -> Tuple[List[List], float]:
+    """
+    Splits elements along axis (0 for x, 1 for y) at the gaps wider than min_gap and close to the widest gap. Cutting
+    at the widest gaps first keeps the spacing between lines of adjacent columns from cutting through the columns.
+
+    :return: Groups of elements in axis order and width of the widest gap, -1 if the elements cannot be split
+    :rtype: Tuple[List[List], float]
+    """
+    if axis == 0:
+        spans = sorted(((e.bbox.x, e.bbox.x + e.bbox.width), i, e) for i, e in enumerate(elements))
+    else:
+        spans = sorted(((e.bbox.y, e.bbox.y + e.bbox.height), i, e) for i, e in enumerate(elements))
+
+    gaps = []
+    end = spans[0][0][1]
+    for (start, stop), _, _ in spans[1:]:
+        gaps.append(start - end)
+        end = max(end, stop)
+    widest_gap = max(gaps)
+    if widest_gap <= min_gap:
+        return [elements], -1
+
+    threshold = widest_gap * CUT_RATIO
+    groups = [[spans[0][2]]]
+    for gap, (_, _, element) in zip(gaps, spans[1:]):
+        if gap > min_gap and gap >= threshold:
+            groups.append([])
+        groups[-1].append(element)
+    return groups, widest_gap
+
+
+def xy_cut(
+    elements: List, min_gap: float = 0.0, line_height: Optional[float] = None, line_gap: float = LINE_GAP
+) -> List[List]:
+    """
+    Groups elements into blocks with a recursive XY-cut and returns the blocks in reading order. Each set of elements
+    is cut along the widest gap found on either axis, so that columns separated by a gutter are read one after the
+    other while full width elements such as titles cut the page horizontally. Sorting dominates each cut, making it
+    O(n log n) for typical pages.
+
+    Within a part of the page that has no column (it is never cut vertically), the elements separated by less than
+    line_gap line heights are kept in the same block, in top to bottom order: the lines of a paragraph, or of a
+    column once the columns are cut apart. Wider gaps (between paragraphs) and vertical cuts separate blocks.
+
+    :param elements: Elements with a bbox attribute (Line, Layout, ...)
+    :type elements: List
+    :param min_gap: Minimum width of a gap, in normalized page coordinates, for it to be cut along
+    :type min_gap: float
+    :param line_height: Height of a line of text, the median height of the elements when None
+    :type line_height: float, optional
+    :param line_gap: Elements closer than line_gap * line_height vertically are lines of the same block
+    :type line_gap: float
+    :return: Blocks of elements, in reading order
+    :rtype: List[List]
+    """
+    if not elements:
+        return []
+    if line_height is None:
+        line_height = median(e.bbox.height for e in elements)
+    max_line_gap = line_gap * line_height
+
+    # Nodes of the cut tree: [elements, axis of the cut (None for a leaf), child node indexes]. A child always comes
+    # after its parent, the explicit stack avoids recursion and the reverse pass computes the blocks bottom up.
+    nodes = [[list(elements), None, []]]
+    stack = [0]
+    while stack:
+        node = nodes[stack.pop()]
+        group = node[0]
+        if len(group) == 1:
+            continue
+        y_groups, y_gap = _split(group, 1, min_gap)
+        x_groups, x_gap = _split(group, 0, min_gap)
+        if x_gap < 0 and y_gap < 0:
+            node[0] = sorted(group, key=lambda e: (e.bbox.y, e.bbox.x))
+            continue
+        node[1] = 0 if x_gap > y_gap else 1
+        for child in x_groups if node[1] == 0 else y_groups:
+            node[2].append(len(nodes))
+            stack.append(len(nodes))
+            nodes.append([child, None, []])
+
+    # Blocks of each node and whether the node is free of vertical cuts
+    results: List[Tuple[List[List], bool]] = [([], True)] * len(nodes)
+    for i in reversed(range(len(nodes))):
+        group, axis, children = nodes[i]
+        if axis is None:
+            results[i] = ([group], True)
+            continue
+        child_results = [results[child] for child in children]
+        if axis == 0 or not all(single_column for _, single_column in child_results):
+            results[i] = ([block for blocks, _ in child_results for block in blocks], False)
+            continue
+        merged = []
+        bottom = None
+        for blocks, _ in child_results:
+            for block in blocks:
+                if merged and min(e.bbox.y for e in block) - bottom < max_line_gap:
+                    merged[-1].extend(block)
+                else:
+                    merged.append(list(block))
+                    bottom = None
+                block_bottom = max(e.bbox.y + e.bbox.height for e in block)
+                bottom = block_bottom if bottom is None else max(bottom, block_bottom)
+        results[i] = (merged, True)
+    return results[0][0]
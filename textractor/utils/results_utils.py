@@ -1,14 +1,21 @@
 import time
-import boto3
 import os
 import json
-import datetime
-from textractcaller.t_call import get_s3_output_config_keys, OutputConfig, remove_none
+from typing import Optional
+from textractcaller.t_call import (
+    OutputConfig,
+    Textract_API,
+    get_job_response,
+    iter_s3_json_objects,
+    list_output_objects,
+    remove_none,
+)
+from textractcaller.t_clients import get_client
 
 
 def results_exist(job_id: str, s3_bucket: str, s3_prefix: str, s3_client=None) -> bool:
     if not s3_client:
-        s3_client = boto3.client("s3")
+        s3_client = get_client("s3")
     response = s3_client.list_objects(
         Bucket=s3_bucket,
         Prefix=os.path.join(s3_prefix, job_id + "/"),
@@ -19,38 +26,83 @@ def results_exist(job_id: str, s3_bucket: str, s3_prefix: str, s3_client=None) -
     return "Contents" in response and len(response["Contents"]) > 1
 
 def get_full_json_from_output_config(
-    output_config: OutputConfig, job_id: str, s3_client=None
+    output_config: OutputConfig,
+    job_id: str,
+    s3_client=None,
+    max_workers: int = 8,
+    range_size: int = None,
+    polling_interval: float = 0.5,
+    textract_api: Textract_API = None,
+    textract_client=None,
+    status_polling_interval: float = 5,
+    timeout: Optional[float] = 60,
 ) -> dict:
+    """
+    Returns the full response of a job from its OutputConfig location. Every part but the last carries a NextToken,
+    the parts are merged in order until the part without NextToken, waiting for the parts that are not written yet.
+    The response is returned as soon as the final part is available.
+
+    While the final part is missing and textract_api is given, the status of the job is checked every
+    status_polling_interval seconds, an exception is raised when the job did not succeed (FAILED, PARTIAL_SUCCESS).
+    A TimeoutError is raised when the final part is still missing timeout seconds after the job was last seen in
+    progress, or after the call without textract_api (a wrong prefix, a job that failed). timeout=None waits without
+    limit.
+    """
     if not output_config or not job_id:
         raise ValueError("no output_config or job_id")
     if not output_config.s3_bucket or not output_config.s3_prefix:
         raise ValueError("no output_config or job_id")
     if not s3_client:
-        s3_client = boto3.client("s3")
+        s3_client = get_client("s3")
+    if textract_api is not None and not textract_client:
+        textract_client = get_client("textract")
 
     result_value = dict()
-    last_result = None
-    parsed_keys = set()
-    while last_result is None or (datetime.datetime.now().astimezone() - last_result).total_seconds() < 5:
-        keys = get_s3_output_config_keys(
-            output_config=output_config, job_id=job_id, s3_client=s3_client
-        )
-        for key in keys:
-            if key in parsed_keys:
-                continue
-            parsed_keys.add(key)
-            s3_object = s3_client.get_object(Bucket=output_config.s3_bucket, Key=key)
-            if last_result is None:
-                last_result = s3_object["LastModified"]
-            else:
-                last_result = max(last_result, s3_object["LastModified"])
-            body = s3_object["Body"]
-            body_read = body.read()
-            body_decode = body_read.decode("utf-8")
-            response = dict(json.loads(body_decode))
+    part_count = 0
+    start = time.monotonic()
+    last_status_check = None
+    while True:
+        # Parts are numbered from 1, only the ones following the merged parts without gap are taken
+        objects = []
+        for o in list_output_objects(output_config=output_config, job_id=job_id, s3_client=s3_client):
+            if int(o["Key"].split("/")[-1]) == part_count + len(objects) + 1:
+                objects.append(o)
+        complete = False
+        # The new parts are downloaded concurrently and merged in key order
+        for response in iter_s3_json_objects(
+            s3_client, output_config.s3_bucket, objects, max_workers=max_workers, range_size=range_size
+        ):
+            part_count += 1
+            complete = "NextToken" not in response
             if "Blocks" in result_value:
                 result_value["Blocks"].extend(response["Blocks"])
             else:
                 result_value = response
+        if complete:
+            break
+        now = time.monotonic()
+        if timeout is not None and now - start > timeout:
+            raise TimeoutError(f"the final part of the output of job {job_id} is missing after {timeout} seconds")
+        if textract_api is not None and (
+            last_status_check is None or now - last_status_check >= status_polling_interval
+        ):
+            last_status_check = now
+            # A failed job never writes its final part
+            job_response = get_job_response(
+                job_id=job_id,
+                textract_api=textract_api,
+                extra_args={"MaxResults": 1},
+                boto3_textract_client=textract_client,
+            )
+            if job_response["JobStatus"] == "IN_PROGRESS":
+                # The job writes its output when it completes, the timeout runs from its completion
+                start = now
+            elif job_response["JobStatus"] != "SUCCEEDED":
+                raise Exception(
+                    f"job_status not SUCCEEDED. job_status: {job_response['JobStatus']}, "
+                    f"message: {job_response.get('StatusMessage')}"
+                )
+        time.sleep(polling_interval)
+    result_value.pop("NextToken", None)
     result_value = remove_none(result_value)
     return result_value
@@ -81,3 +81,27 @@ def delete_from_s3(client, s3_path: str):
     bucket, prefix = s3_path_to_bucket_and_prefix(s3_path)
 
     client.delete_object(bucket, prefix)
+
+
+def file_source_to_bytes(file_source: Union[str, bytes, Image.Image]) -> bytes:
+    """Returns the bytes :func:`upload_to_s3` uploads for a local file source
+
+    :param file_source: Path to a local file, bytes or PIL Image
+    :type file_source: Union[str, bytes, Image.Image]
+    :raises InputError: Raised if the file_source is not of type str, bytes or Image
+    :return: Content of the file source
+    :rtype: bytes
+    """
+    if isinstance(file_source, Image.Image):
+        fake_file = BytesIO()
+        file_source.save(fake_file, format="PNG")
+        return fake_file.getvalue()
+    elif isinstance(file_source, bytes):
+        return file_source
+    elif isinstance(file_source, str):
+        with open(file_source, "rb") as f:
+            return f.read()
+    else:
+        raise InputError(
+            f"{file_source} must be of type str or bytes, not {type(file_source)}"
+        )
@@ -1,5 +1,6 @@
 from functools import cmp_to_key
 import os
+import re
 from typing import List, Tuple
 
 from textractor.data.text_linearization_config import TextLinearizationConfig
@@ -7,6 +8,8 @@ from textractor.entities.bbox import BoundingBox
 from textractor.entities.line import Line
 from textractor.entities.word import Word
 from textractor.entities.document_entity import DocumentEntity
+from textractor.utils.html_utils import escape_text
+from textractor.utils.offset_utils import LinearizedText, join_text, words_text
 
 def compare_bounding_box(a, b):
     ha = a.bbox.height
@@ -42,42 +45,83 @@ def group_elements_horizontally(
     :return: DocumentEntity sub-groups
     :rtype: List[List[DocumentEntity]]
     """
-    sorted_elements = sorted(elements, key=cmp_to_key(compare_bounding_box))
-
-    def vertical_overlap(line1, line2):
-        top = max(line1.bbox.y, line2.bbox.y)
-        bottom = min(line1.bbox.y + line1.bbox.height, line2.bbox.y + line2.bbox.height)
-        return max(bottom - top, 0)
-
-    def should_group(line, group):
-        if not group:
-            return False
-        max_height = max(l.bbox.height for l in group)
-        total_overlap = sum(vertical_overlap(line, l) for l in group)
-        return total_overlap / max_height >= overlap_ratio
+    sorted_elements = _sort_reading_order(elements)
 
     grouped_elements = []
     if not sorted_elements:
         return grouped_elements
 
     current_group = [sorted_elements[0]]
+    # Vertical extents and max height of the current group, maintained incrementally so that adding an element does
+    # not rescan the whole group
+    group_extents = [_vertical_extent(sorted_elements[0])]
+    group_max_height = sorted_elements[0].bbox.height
+
+    def should_group(element):
+        if not current_group:
+            return False
+        top, bottom = _vertical_extent(element)
+        threshold = overlap_ratio * group_max_height
+        total_overlap = 0
+        for group_top, group_bottom in group_extents:
+            total_overlap += max(min(bottom, group_bottom) - max(top, group_top), 0)
+            # Overlaps are positive so the sum can only grow, stop as soon as the ratio is reached
+            if total_overlap / group_max_height >= overlap_ratio:
+                return True
+        return total_overlap / group_max_height >= overlap_ratio
+
     for element in sorted_elements[1:]:
         if "Table" in element.__class__.__name__:
             if current_group:
                 grouped_elements.append(current_group)
             grouped_elements.append([element])
             current_group = []
-        elif not current_group:  # if the group is emtpy add the line
-            current_group.append(element)
-        elif should_group(element, current_group):
+            group_extents = []
+        elif not current_group or should_group(element):
+            if not current_group:  # if the group is emtpy add the line
+                group_max_height = element.bbox.height
+            else:
+                group_max_height = max(group_max_height, element.bbox.height)
             current_group.append(element)
+            group_extents.append(_vertical_extent(element))
         else:
             grouped_elements.append(current_group)
             current_group = [element]
+            group_extents = [_vertical_extent(element)]
+            group_max_height = element.bbox.height
     grouped_elements.append(current_group)
     return grouped_elements
 
 
+def _vertical_extent(element: DocumentEntity) -> Tuple[float, float]:
+    return element.bbox.y, element.bbox.y + element.bbox.height
+
+
+def _sort_reading_order(elements: List[DocumentEntity]) -> List[DocumentEntity]:
+    """
+    Sorts elements with :func:`compare_bounding_box`. The bounding box values used by the comparison are computed once
+    per element instead of once per comparison.
+
+    :param elements: DocumentEntity list
+    :type elements: List[DocumentEntity]
+    :return: Sorted elements
+    :rtype: List[DocumentEntity]
+    """
+    def compare(a, b):
+        ha, ay_mid, ax = a[0]
+        hb, by_mid, bx = b[0]
+        if abs(ay_mid - by_mid) < (ha + hb) / 3.5:
+            return 1 if ax > bx else -1
+        return 1 if ay_mid > by_mid else -1
+
+    decorated = [
+        ((e.bbox.height, e.bbox.y + (e.bbox.height / 2.0), e.bbox.x), e)
+        for e in elements
+    ]
+    decorated.sort(key=cmp_to_key(compare))
+    return [e for _, e in decorated]
+
+
 def linearize_children(
     elements: List[DocumentEntity],
     config: TextLinearizationConfig = TextLinearizationConfig(),
@@ -101,23 +145,27 @@ def linearize_children(
     :rtype: Tuple[str, List[Word]]
     """
 
-    words_in_elements = [e for e in elements if isinstance(e, Word)]
-    lines = set([w.line for w in words_in_elements])
-    new_lines = []
-    for line in lines:
-        if line is None:
-            continue
-        new_lines.append(
-            Line(
-                line.id,
-                line.bbox,
-                sorted(
-                    [w for w in words_in_elements if w.line is not None and w.line.id == line.id],
-                    key=lambda x: x.bbox.x,
-                ),
-            )
-        )
-    elements = [e for e in elements if not isinstance(e, Word)] + new_lines
+    single_line_output = _linearize_single_line(
+        elements, config, no_new_lines, is_layout_table
+    )
+    if single_line_output is not None:
+        return single_line_output
+
+    # Words are regrouped into their lines in a single pass. Line objects are deduplicated by identity and words are
+    # attributed by line id, words without a line are dropped.
+    other_elements = []
+    lines = {}
+    words_by_line_id = {}
+    for e in elements:
+        if not isinstance(e, Word):
+            other_elements.append(e)
+        elif e.line is not None:
+            lines.setdefault(id(e.line), e.line)
+            words_by_line_id.setdefault(e.line.id, []).append(e)
+    new_lines = [
+        Line(line.id, line.bbox, words_by_line_id[line.id]) for line in lines.values()
+    ]
+    elements = other_elements + new_lines
     grouped_elements = group_elements_horizontally(
         elements, config.heuristic_overlap_ratio
     )
@@ -136,73 +184,117 @@ def linearize_children(
             )
         return False
 
-    result = ""
+    result = []
     words_output = []
     prev_element = None
 
-    for group_idx, group in enumerate(grouped_elements):
+    for group in grouped_elements:
         sorted_group = sorted(group, key=lambda element: element.bbox.x)
         if not sorted_group:
             continue
 
-        added_words = set()
         for idx, element in enumerate(sorted_group):
             text_element, words_element = element.get_text_and_words(config)
             if "Table" in element.__class__.__name__ and len(words_element):
-                result += text_element
-                for w in words_element:
-                    added_words.add(w.id)
-                words_output += words_element
+                result.append(text_element)
+                words_output.extend(words_element)
             elif "KeyValue" in element.__class__.__name__ and len(words_element):
                 separator = (
                     config.same_paragraph_separator
                     if prev_element and part_of_same_paragraph(prev_element, element, config) else
                     config.same_layout_element_separator
                 )
-                result += separator + text_element
-                for w in words_element:
-                    added_words.add(w.id)
-                words_output += words_element
+                result.append(separator)
+                result.append(text_element)
+                words_output.extend(words_element)
             elif prev_element is None:
-                result += text_element
-                words_output += words_element
+                result.append(text_element)
+                words_output.extend(words_element)
             elif is_layout_table:
-                result += (
-                    "" if idx == 0 else config.table_column_separator
-                ) + text_element
-                words_output += words_element
+                if idx != 0:
+                    result.append(config.table_column_separator)
+                result.append(text_element)
+                words_output.extend(words_element)
             elif part_of_same_paragraph(prev_element, element, config):
-                result += config.same_paragraph_separator + text_element
-                words_output += words_element
+                result.append(config.same_paragraph_separator)
+                result.append(text_element)
+                words_output.extend(words_element)
             else:
-                result += config.same_layout_element_separator + text_element
-                words_output += words_element
+                result.append(config.same_layout_element_separator)
+                result.append(text_element)
+                words_output.extend(words_element)
 
             # FIXME: Seems like this would be mostly needed
             # result += os.linesep
             prev_element = element
 
         if is_layout_table:
-            result += config.table_row_separator
+            result.append(config.table_row_separator)
         else:
-            result += config.same_layout_element_separator
+            result.append(config.same_layout_element_separator)
 
         # We make a dummy line element with the bbox from the previous group
         prev_element = Line(
             "", BoundingBox.enclosing_bbox([o.bbox for o in sorted_group])
         )
 
-    output = "".join(result)
+    output = join_text("", result)
 
     if no_new_lines:
-        while os.linesep in output:
-            output = output.replace(os.linesep, " ")
-        while "  " in output:
-            output = output.replace("  ", " ")
+        output = _remove_new_lines(output)
 
     return output, words_output
 
 
+def _remove_new_lines(text: str) -> str:
+    """
+    Replaces new lines with spaces and collapses consecutive spaces
+
+    :param text: Text to process
+    :type text: str
+    :return: Text without new lines
+    :rtype: str
+    """
+    if not isinstance(text, LinearizedText):
+        return re.sub(" {2,}", " ", text.replace(os.linesep, " "))
+    text = text.replace(os.linesep, " ")
+    return text.sub(" {2,}", " ") if "  " in text else text
+
+
+def _linearize_single_line(
+    elements: List[DocumentEntity],
+    config: TextLinearizationConfig,
+    no_new_lines: bool,
+    is_layout_table: bool,
+) -> Tuple[str, List[Word]]:
+    """
+    Fast path of :func:`linearize_children` for the most common case of a table cell or value: elements that are
+    only words from the same line. The output is identical to the general path.
+
+    :return: Tuple of text and linearized words, None if the elements do not qualify
+    :rtype: Tuple[str, List[Word]]
+    """
+    if not elements or not all(isinstance(e, Word) for e in elements):
+        return None
+    line = elements[0].line
+    if line is None or any(e.line is None or e.line.id != line.id for e in elements):
+        return None
+
+    words = sorted(elements, key=lambda x: (x.bbox.x, x.bbox.y))
+    line_bbox = line.bbox if line.bbox else BoundingBox.enclosing_bbox(words)
+    for w in words:
+        w.line_id = line.id
+        w.line_bbox = line_bbox
+
+    output = words_text([escape_text(w.text, config) for w in words], words) + (
+        config.table_row_separator if is_layout_table else config.same_layout_element_separator
+    )
+    if no_new_lines:
+        output = _remove_new_lines(output)
+
+    return output, words
+
+
 def is_distinct_entity(entity1: DocumentEntity, entity2: DocumentEntity) -> bool:
     """
     Check whether two DocumentEntity have word overlap
@@ -26,6 +26,7 @@ from textractor.data.constants import (
 )
 from textractor.exceptions import EntityListCreationError, NoImageException
 from textractor.entities.linearizable import Linearizable
+from textractor.utils.offset_utils import join_text
 from textractor.data.text_linearization_config import TextLinearizationConfig
 
 logger = logging.getLogger(__name__)
@@ -498,7 +499,7 @@ class EntityList(list, Generic[T], Linearizable):
             entity_text, entity_words = entity.get_text_and_words(config)
             texts.append(entity_text)
             words.extend(entity_words)
-        return separator.join(texts), words
+        return join_text(separator, texts), words
 
 def _convert_form_to_list(
     form_objects,